@@ -0,0 +1,140 @@
+"""
+Microbenchmark de la compresión de frames de `RedisStorage.set_df`.
+
+Codifica y decodifica frames sintéticos tipo ERP (numérico, folios y
+referencias de alta cardinalidad) y tipo sábana SAT (texto largo y
+repetitivo) con cada codec candidato (sin compresión, lz4, zstd 1-9) y con la
+selección automática, y reporta tiempo de codificación, tiempo de
+decodificación, tamaño y razón de compresión.
+
+Uso:
+    python benchmarks/bench_frame_compression.py --rows 1000000
+    python benchmarks/bench_frame_compression.py --output compresion.csv
+"""
+
+import argparse
+import csv
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from conciliaciones.utils.redis.frame_codec import (
+    decode_table,
+    encode_table,
+    frame_to_table,
+)
+from conciliaciones.utils.redis.frame_compression import (
+    CompressionPolicy,
+    select_compression,
+)
+
+CANDIDATES: list[CompressionPolicy] = [
+    CompressionPolicy(codec="none"),
+    CompressionPolicy(codec="lz4"),
+    *(CompressionPolicy(codec="zstd", level=level) for level in range(1, 10)),
+]
+
+
+def build_erp_frame(rows: int, rng: np.random.Generator) -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "folio": rng.integers(0, 10_000_000, rows),
+            "referencia": [f"REF-{i:09d}" for i in rng.integers(0, 10**9, rows)],
+            "fecha": pd.Timestamp("2024-01-01")
+            + pd.to_timedelta(rng.integers(0, 365, rows), unit="D"),
+            "subtotal": rng.normal(10_000, 2_500, rows).round(2),
+            "iva": rng.normal(1_600, 400, rows).round(2),
+            "cuenta": rng.choice([f"1105-{i:03d}" for i in range(50)], rows),
+        }
+    )
+
+
+def build_sat_frame(rows: int, rng: np.random.Generator) -> pd.DataFrame:
+    emisores = [f"EMISOR {i} SA DE CV" for i in range(200)]
+    conceptos = [
+        "SERVICIOS PROFESIONALES DE CONSULTORIA ADMINISTRATIVA",
+        "ARRENDAMIENTO DE INMUEBLE PARA OFICINAS",
+        "COMPRA DE MATERIAL DE OFICINA Y PAPELERIA",
+        "PAGO DE FACTURAS PENDIENTES",
+    ]
+    return pd.DataFrame(
+        {
+            "uuid": [f"{i:08X}-0000-4000-8000-{i:012X}" for i in range(rows)],
+            "rfc_emisor": rng.choice([f"AAA{i:06d}XX1" for i in range(200)], rows),
+            "nombre_emisor": rng.choice(emisores, rows),
+            "tipo_comprobante": rng.choice(["I", "E", "P", "N"], rows),
+            "uso_cfdi": rng.choice(["G01", "G03", "P01", "CP01"], rows),
+            "concepto": rng.choice(conceptos, rows),
+            "estatus": rng.choice(["Vigente", "Cancelado"], rows, p=[0.95, 0.05]),
+            "total": rng.normal(10_000, 2_500, rows).round(2),
+        }
+    )
+
+
+def measure(table: pa.Table, policy: CompressionPolicy, repeat: int) -> dict:
+    encode_times: list[float] = []
+    decode_times: list[float] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        payload = encode_table(table, compression=policy.ipc_codec())
+        encode_times.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        decode_table(payload)
+        decode_times.append(time.perf_counter() - start)
+
+    return {
+        "codec": str(policy),
+        "encode_s": min(encode_times),
+        "decode_s": min(decode_times),
+        "bytes": payload.size,
+        "ratio": table.nbytes / payload.size,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="CSV con los resultados")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    frames = {
+        "erp": frame_to_table(build_erp_frame(args.rows, rng)),
+        "sat": frame_to_table(build_sat_frame(args.rows, rng)),
+    }
+
+    results: list[dict] = []
+    for name, table in frames.items():
+        auto = select_compression(table)
+        print(  # noqa: T201
+            f"\n{name}: {args.rows:,} filas, {table.nbytes / 1024**2:.1f} MB "
+            f"en memoria, selección automática: {auto}"
+        )
+        print(  # noqa: T201
+            f"{'codec':<8} {'encode s':>9} {'decode s':>9} {'MB':>9} {'razón':>7}"
+        )
+        for policy in CANDIDATES:
+            result = {"frame": name, **measure(table, policy, args.repeat)}
+            result["auto"] = str(policy) == str(auto)
+            results.append(result)
+            marker = " *" if result["auto"] else ""
+            print(  # noqa: T201
+                f"{result['codec']:<8} {result['encode_s']:9.3f} "
+                f"{result['decode_s']:9.3f} {result['bytes'] / 1024**2:9.2f} "
+                f"{result['ratio']:7.2f}{marker}"
+            )
+
+    if args.output:
+        with Path(args.output).open("w", newline="") as output:
+            writer = csv.DictWriter(output, fieldnames=list(results[0]))
+            writer.writeheader()
+            writer.writerows(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Microbenchmark de la normalización de nulos de `RedisStorage.get_df`.
+
+Compara la ruta celda por celda (`apply(safe_convert_value)`) contra la ruta
+vectorizada con kernels de Arrow sobre un DataFrame sintético de tipos mixtos.
+
+Uso:
+    python benchmarks/bench_null_normalization.py --rows 1000000
+"""
+
+import argparse
+import time
+from collections.abc import Callable
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from conciliaciones.utils.redis.null_normalization import table_to_normalized_frame
+
+NULL_SENTINELS: set[str] = {"nan", "nat", "none", ""}
+
+
+def safe_convert_value(value: str) -> str | None:
+    """Copia de `RedisStorage.safe_convert_value` (ruta previa)"""
+    try:
+        if pd.isna(value) or str(value).strip().lower() in NULL_SENTINELS:
+            return None
+        return str(value)
+    except Exception:
+        return str(value)
+
+
+def build_frame(rows: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    texts = np.array(["FACTURA", "nan", "None", "", " NaT ", "PAGO", "NOTA"])
+    uuids = np.array([f"UUID-{i:08d}" for i in range(1000)])
+
+    return pd.DataFrame(
+        {
+            "uuid": rng.choice(uuids, rows),
+            "tipo": rng.choice(texts, rows),
+            "rfc": rng.choice(texts, rows),
+            "folio": rng.integers(0, 1_000_000, rows),
+            "total": rng.normal(1000, 250, rows),
+        }
+    )
+
+
+def normalize_per_cell(df: pd.DataFrame) -> pd.DataFrame:
+    for col in df.columns:
+        match df[col].dtype:
+            case "object":
+                df[col] = df[col].astype(str)
+                df[col] = df[col].apply(safe_convert_value)
+            case "int64":
+                df[col] = df[col].astype("Int64")
+    return df
+
+
+def timed(label: str, func: Callable[..., pd.DataFrame], *args: object) -> pd.DataFrame:
+    start = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {elapsed:8.3f} s")  # noqa: T201
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    df = build_frame(args.rows)
+    table = pa.Table.from_pandas(df, preserve_index=False)
+
+    print(f"Filas: {args.rows:,}")  # noqa: T201
+    before = timed(
+        "apply(safe_convert_value)",
+        lambda: normalize_per_cell(table.to_pandas()),
+    )
+    after = timed("Arrow compute", table_to_normalized_frame, table)
+
+    pd.testing.assert_frame_equal(before, after)
+    print("Resultados idénticos")  # noqa: T201
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""
+Benchmark de la lectura de archivos ERP solo con las columnas configuradas.
+
+Genera un export sintético ancho (por default 300 columnas y 500 000 filas) y
+compara la lectura completa seguida de la selección de columnas (la ruta
+previa) contra `read_selected_columns`, en CSV y xlsx. El xlsx se genera con
+menos filas porque escribirlo con openpyxl es lento.
+
+Uso:
+    python benchmarks/bench_pruned_readers.py --rows 500000 --columns 300 \\
+        --selected 12 --xlsx-rows 20000 [--memory]
+"""
+
+import argparse
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+from openpyxl import Workbook
+
+from conciliaciones.clients.erp.erp_data.readers import read_selected_columns
+
+BATCH_ROWS: int = 50_000
+
+
+def build_batch(rows: int, columns: int, rng: np.random.Generator) -> pa.Table:
+    """Columnas de texto, enteros y montos en proporciones de un export ERP"""
+    vocabulary = np.array(["FACTURA", "PAGO", "NOTA", "ANTICIPO", "", "CANCELADA"])
+    arrays: dict[str, pa.Array] = {}
+    for i in range(columns):
+        name = f"col_{i:03d}"
+        match i % 3:
+            case 0:
+                arrays[name] = pa.array(rng.choice(vocabulary, rows))
+            case 1:
+                arrays[name] = pa.array(rng.integers(0, 1_000_000, rows))
+            case _:
+                arrays[name] = pa.array(rng.normal(1000, 250, rows).round(2))
+    return pa.table(arrays)
+
+
+def write_csv(path: Path, rows: int, columns: int) -> None:
+    rng = np.random.default_rng(0)
+    writer: pa_csv.CSVWriter | None = None
+    try:
+        for start in range(0, rows, BATCH_ROWS):
+            batch = build_batch(min(BATCH_ROWS, rows - start), columns, rng)
+            if writer is None:
+                writer = pa_csv.CSVWriter(path, batch.schema)
+            writer.write_table(batch)
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def write_xlsx(path: Path, rows: int, columns: int) -> None:
+    rng = np.random.default_rng(0)
+    workbook = Workbook(write_only=True)
+    worksheet = workbook.create_sheet()
+    worksheet.append([f"col_{i:03d}" for i in range(columns)])
+    for start in range(0, rows, BATCH_ROWS):
+        batch = build_batch(min(BATCH_ROWS, rows - start), columns, rng)
+        for row in zip(*(column.to_pylist() for column in batch.columns), strict=True):
+            worksheet.append(row)
+    workbook.save(path)
+
+
+def timed(
+    label: str,
+    func: Callable[..., pd.DataFrame],
+    *args: object,
+    memory: bool = False,
+) -> pd.DataFrame:
+    if memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - start
+    line = f"{label:<34} {elapsed:8.3f} s"
+    if memory:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        line += f"   pico {peak / 1024**2:8.0f} MB"
+    print(line)  # noqa: T201
+    return result
+
+
+def read_pruned(path: Path, config: SimpleNamespace) -> pd.DataFrame:
+    # Motor "pandas": produce los mismos dtypes que la lectura completa (ver
+    # benchmarks/bench_erp_readers.py para el motor "arrow")
+    with path.open("rb") as source:
+        return read_selected_columns(source, path.name, config, engine="pandas")  # type: ignore
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--columns", type=int, default=300)
+    parser.add_argument("--selected", type=int, default=12)
+    parser.add_argument("--xlsx-rows", type=int, default=20_000)
+    # Mide el pico de memoria con tracemalloc (hace más lentas ambas rutas)
+    parser.add_argument("--memory", action="store_true")
+    args = parser.parse_args()
+
+    selected = [f"col_{i:03d}" for i in range(0, args.columns, 7)][: args.selected]
+    config = SimpleNamespace(
+        header_types=dict.fromkeys(selected),
+        excel_sheet_data=None,
+        initial_column=None,
+        final_column=None,
+        skip_rows=None,
+        skip_footer=None,
+        final_row=None,
+        header_row=None,
+    )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = Path(tmp) / "export.csv"
+        write_csv(csv_path, args.rows, args.columns)
+        print(  # noqa: T201
+            f"CSV: {args.rows:,} filas x {args.columns} columnas, "
+            f"{len(selected)} configuradas, {csv_path.stat().st_size / 1024**2:.0f} MB"
+        )
+        pruned = timed("CSV usecols", read_pruned, csv_path, config, memory=args.memory)
+        full = timed(
+            "CSV completo + selección",
+            lambda: pd.read_csv(csv_path).loc[:, selected],
+            memory=args.memory,
+        )
+        pd.testing.assert_frame_equal(pruned.loc[:, selected], full)
+
+        xlsx_path = Path(tmp) / "export.xlsx"
+        write_xlsx(xlsx_path, args.xlsx_rows, args.columns)
+        print(  # noqa: T201
+            f"xlsx: {args.xlsx_rows:,} filas x {args.columns} columnas, "
+            f"{xlsx_path.stat().st_size / 1024**2:.0f} MB"
+        )
+        pruned = timed(
+            "xlsx columnas configuradas",
+            read_pruned,
+            xlsx_path,
+            config,
+            memory=args.memory,
+        )
+        full = timed(
+            "xlsx completo + selección",
+            lambda: pd.read_excel(xlsx_path).loc[:, selected],
+            memory=args.memory,
+        )
+        pd.testing.assert_frame_equal(pruned.loc[:, selected], full)
+
+
+if __name__ == "__main__":
+    main()
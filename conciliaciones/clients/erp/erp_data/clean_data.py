@@ -1,6 +1,5 @@
 import re
 import uuid
-from io import BytesIO
 
 import pandas as pd
 from k_link.db.core import ObjectId
@@ -19,10 +18,12 @@ from pandas.api.types import is_object_dtype, is_string_dtype
 from conciliaciones.clients.erp.erp_data.get_erp import DatosERP
 from conciliaciones.clients.erp.erp_data.get_pivot_k import PivoteKManager
 from conciliaciones.clients.erp.erp_data.utils.data_types import ValidaDataTypes
+from conciliaciones.models.proceso_conciliacion import ConciliationTask
 from conciliaciones.utils.completion_handler.airflow_contex_exception import (
     AirflowContexException,
 )
 from conciliaciones.utils.headers.headers_types import HeadersTypes
+from conciliaciones.utils.redis.io_metrics import storage_stage
 from conciliaciones.utils.redis.redis_keys import RedisKeys
 from conciliaciones.utils.redis.redis_storage import RedisStorage
 
@@ -96,6 +97,12 @@ class CleanData:
         Valida los pivotes definidos en la configuración de conciliación
         para un proyecto.
         """
+        with storage_stage(
+            ConciliationTask.VALIDATE_PIVOTE, run=self.redis_keys.base_key
+        ):
+            await self._validador_pivotes()
+
+    async def _validador_pivotes(self) -> None:
 
         df_erp = self.get_df_erp()
         erp_files = await ERP_FILES.get(project_id=self.project_id)
@@ -110,14 +117,17 @@ class CleanData:
                 f"No hay configuración de Pivot K para el proyecto: {self.project_id}"
             )
 
-        # Se recupera de redis la lista de dynamic headers
-        headers_pivot: list[HeaderConfig] = self._header_types.get_headers_list(
+        # Se recupera de redis la lista de dynamic headers, indexada por nombre
+        headers_pivot: dict[str, HeaderConfig] = self._header_types.get_headers_index(
             redis_key=self.redis_keys.get_headers_pivot_list_key()
         )
         headers_validation: list[HeaderConfig] = []
 
         total_validos = 0
 
+        # Columnas que la validación agrega o modifica en el frame ERP
+        columns_updated: list[str] = []
+
         for pivote in erp_files.pivot_k:
             pivote_k_header = PivoteKManager.get_pivote_k_header_name(
                 strategy=pivote.pivote_k_header
@@ -142,6 +152,7 @@ class CleanData:
             self._logger.info(f"Total {pivote.pivote_k_header.value}: {total_uuids}")
 
             col_valida_str: str = f"(Valido) {pivote_k_header}"
+            columns_updated.extend([pivote_k_header, col_valida_str])
 
             # Se añade valid header a la lista de dynamic headers
             header_validation: HeaderConfig | None = (
@@ -164,12 +175,13 @@ class CleanData:
             df_filtro: DataFrame = pd.DataFrame(
                 df_erp[df_erp[col_valida_str]][[pivote_k_header]]
             )
-            buffer_df: BytesIO = self.redis.set_parquet(df=df_filtro)
-            self.redis.set(
+            self.redis.set_df(
                 key=self.redis_keys.get_erp_validos_redis_key(
                     strategy=pivote.pivote_k_header
                 ),
-                value=buffer_df,
+                df=df_filtro,
+                catalog_key=self.redis_keys.get_frame_catalog_key(),
+                task=ConciliationTask.VALIDATE_PIVOTE,
             )
 
             validos_uuids = len(df_filtro)
@@ -249,19 +261,26 @@ class CleanData:
                 / len(df_erp)
                 * 100
             )
-        # Se guarda lista dynamic headers en redis
-        await self._header_types.save_redis_headers_list(
-            redis_key=self.redis_keys.get_headers_validation_list_key(),
-            headers_list=headers_validation,
-        )
+        # Headers y métricas se envían a Redis en un solo pipeline
+        with self.redis.batch():
+            # Se guarda lista dynamic headers en redis
+            await self._header_types.save_redis_headers_list(
+                redis_key=self.redis_keys.get_headers_validation_list_key(),
+                headers_list=headers_validation,
+            )
 
-        self._logger.info(f"DF ERP: {df_erp.info()}")
-        buffer_df: BytesIO = self.redis.set_parquet(df=df_erp)
-        self.redis.set(key=self.redis_keys.get_erp_redis_key(), value=buffer_df)
-        self.redis.set(
-            key=self.redis_keys.get_metrics_redis_key(),
-            value=metrics_log,
-        )
+            self._logger.info(f"DF ERP: {df_erp.info()}")
+            # Solo se escriben las columnas de validación; el resto del frame no cambia
+            self.redis.set_columns(
+                key=self.redis_keys.get_erp_redis_key(),
+                df=df_erp[list(dict.fromkeys(columns_updated))],
+                catalog_key=self.redis_keys.get_frame_catalog_key(),
+                task=ConciliationTask.VALIDATE_PIVOTE,
+            )
+            self.redis.set(
+                key=self.redis_keys.get_metrics_redis_key(),
+                value=metrics_log,
+            )
 
     def get_df_erp(self) -> pd.DataFrame:
         """
@@ -433,6 +452,12 @@ class CleanData:
         return column.apply(is_valid_alpha)
 
     async def validador_tipo_datos(self, datasources_optional: list[str]):
+        with storage_stage(
+            ConciliationTask.VALIDATE_DATA, run=self.redis_keys.base_key
+        ):
+            await self._validador_tipo_datos(datasources_optional=datasources_optional)
+
+    async def _validador_tipo_datos(self, datasources_optional: list[str]):
         erp_files: ERPFiles | None = await ERP_FILES.get(project_id=self.project_id)
 
         if erp_files is None:
@@ -524,7 +549,12 @@ class CleanData:
             )
             headers_erp.append(header_origen)
 
-            self.erp.save_redis(df_erp=df_erp_clean, redis_key=redis_key)
+            self.erp.save_redis(
+                df_erp=df_erp_clean,
+                redis_key=redis_key,
+                task=ConciliationTask.VALIDATE_DATA,
+                handoff=True,
+            )
 
         return headers_erp
 
@@ -565,7 +595,12 @@ class CleanData:
                 headers_erp=headers_erp,
             )
 
-            self.erp.save_redis(df_erp=df_catalog_clean, redis_key=redis_key)
+            self.erp.save_redis(
+                df_erp=df_catalog_clean,
+                redis_key=redis_key,
+                task=ConciliationTask.VALIDATE_DATA,
+                handoff=True,
+            )
 
         return headers_erp
 
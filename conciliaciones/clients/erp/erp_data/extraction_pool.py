@@ -0,0 +1,191 @@
+"""
+Extracción concurrente de data sources y catálogos ERP.
+
+`ExtractionPool` ejecuta los trabajos de extracción de un proyecto (descarga,
+parseo, normalización, selección de columnas y guardado en Redis) con una
+concurrencia acotada: mientras un archivo se descarga, otro se parsea y otro se
+guarda. El parseo, que es CPU, corre en un pool de procesos; la descarga y el
+guardado, que son E/S, en el event loop y en hilos.
+
+Cada trabajo guarda su frame en cuanto termina, sin esperar a los demás. Si dos
+trabajos escriben la misma clave, el registrado después guarda después, de modo
+que el contenido final de cada clave es el mismo que con la extracción
+secuencial. Si un trabajo falla se cancelan los demás y se propaga su error.
+
+Configuración por variables de entorno:
+    - ERP_EXTRACTION_CONCURRENCY: Archivos que se procesan a la vez por
+      proyecto (default 4).
+    - ERP_PARSE_PROCESSES: Procesos del pool de parseo (default, el menor entre
+      la concurrencia y los CPUs); 0 parsea en hilos del proceso actual.
+"""
+
+import asyncio
+import functools
+import io
+import multiprocessing
+import os
+from collections.abc import Awaitable, Callable
+from concurrent.futures import Executor, ProcessPoolExecutor
+from types import TracebackType
+from typing import BinaryIO, ParamSpec, TypeVar
+
+import httpx
+import pandas as pd
+from k_link.extensions.datasources import Config, DataSourceCatalog, Uploads
+from k_link.tools import env
+from loggerk import LoggerK
+
+from conciliaciones.clients.erp.erp_data.readers import read_selected_columns
+from conciliaciones.utils.data.normalize import normalize_df
+
+P = ParamSpec("P")
+T = TypeVar("T")
+
+
+class ExtractionNetworkError(Exception):
+    """Error de red al descargar un archivo en el pool de parseo"""
+
+
+def parse_datasource(upload: Uploads, config: Config) -> pd.DataFrame:
+    """Descarga y parsea el archivo de un data source"""
+    try:
+        return normalize_df(upload.datasource(config).dataframe)
+    except httpx.HTTPError as exc:
+        # Las excepciones de httpx no siempre se pueden enviar entre procesos
+        raise ExtractionNetworkError(str(exc)) from None
+
+
+def parse_catalog(
+    content: bytes | BinaryIO,
+    catalog_config: DataSourceCatalog,
+    file_name: str | None = None,
+) -> pd.DataFrame:
+    """
+    Parsea el archivo ya descargado de un catálogo.
+
+    content: Contenido del archivo, o el archivo abierto (p. ej. la descarga
+        en un archivo temporal) para leerlo sin copiarlo en memoria.
+    file_name: Nombre o ruta del archivo. Si se indica y el formato lo
+        permite, solo se leen las columnas configuradas (ver
+        `read_selected_columns`).
+    """
+    file_obj = io.BytesIO(content) if isinstance(content, bytes) else content
+
+    if file_name is not None:
+        df = read_selected_columns(file_obj, file_name, catalog_config)
+        if df is not None:
+            return normalize_df(df)
+
+    data_source_catalog = catalog_config.datasource_type.ds_class(
+        excel_sheet_data=catalog_config.excel_sheet_data,
+        file_path=file_obj,
+        initial_column=catalog_config.initial_column,
+        final_column=catalog_config.final_column,
+        skip_rows=catalog_config.skip_rows,
+        skip_footer=catalog_config.skip_footer,
+        final_row=catalog_config.final_row,
+        header_row=catalog_config.header_row,
+    )
+    return normalize_df(data_source_catalog.dataframe)
+
+
+class ExtractionPool:
+    _logger: LoggerK
+
+    def __init__(
+        self, concurrency: int | None = None, processes: int | None = None
+    ) -> None:
+        self._logger = LoggerK(self.__class__.__name__)
+        self.concurrency: int = max(
+            1, concurrency or int(env.get("ERP_EXTRACTION_CONCURRENCY") or 4)
+        )
+        if processes is None:
+            configured = env.get("ERP_PARSE_PROCESSES")
+            processes = (
+                int(configured)
+                if configured
+                else min(self.concurrency, os.cpu_count() or 1)
+            )
+        self.processes: int = processes
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._task_group = asyncio.TaskGroup()
+        self._executor: Executor | None = None
+        # Evento de guardado del último trabajo registrado para cada clave
+        self._saved: dict[str, asyncio.Event] = {}
+
+    async def __aenter__(self) -> "ExtractionPool":
+        await self._task_group.__aenter__()
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        try:
+            await self._task_group.__aexit__(exc_type, exc, traceback)
+        except BaseExceptionGroup as group:
+            # Se propaga el error del trabajo, como en la extracción secuencial
+            raise group.exceptions[0] from None
+        finally:
+            if self._executor is not None:
+                self._executor.shutdown(wait=exc is None, cancel_futures=True)
+
+    async def run_in_process(
+        self, func: Callable[P, T], *args: P.args, **kwargs: P.kwargs
+    ) -> T:
+        """Ejecuta `func` en el pool de parseo; debe ser una función de módulo"""
+        if self.processes <= 0:
+            return await asyncio.to_thread(func, *args, **kwargs)
+
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.processes,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, functools.partial(func, *args, **kwargs)
+        )
+
+    def submit(
+        self,
+        key: str,
+        extract: Callable[[], Awaitable[T]],
+        save: Callable[[T], Awaitable[None]],
+    ) -> None:
+        """
+        Registra la extracción de un archivo cuyo resultado se guarda en `key`.
+
+        extract: Descarga y parsea el archivo; corre dentro del límite de
+            concurrencia.
+        save: Guarda el resultado; espera a que termine el guardado del trabajo
+            anterior con la misma clave.
+        """
+        previous = self._saved.get(key)
+        saved = asyncio.Event()
+        self._saved[key] = saved
+        self._task_group.create_task(
+            self._run(key, extract, save, previous, saved), name=key
+        )
+
+    async def _run(
+        self,
+        key: str,
+        extract: Callable[[], Awaitable[T]],
+        save: Callable[[T], Awaitable[None]],
+        previous: asyncio.Event | None,
+        saved: asyncio.Event,
+    ) -> None:
+        # El semáforo atiende en orden de llegada, por lo que el trabajo
+        # anterior de la misma clave siempre entra antes que este
+        async with self._semaphore:
+            try:
+                result = await extract()
+                if previous is not None:
+                    await previous.wait()
+                await save(result)
+            finally:
+                saved.set()
+
+        self._logger.info(f"Extracción terminada: {key}")
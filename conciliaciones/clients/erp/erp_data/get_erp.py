@@ -1,10 +1,14 @@
 """
 Clase para extraer datos de erp desde S3 y colocarlos en redis
 Valida las columnas de los archivos Vs la configuración
+
+Los data sources y catálogos de un proyecto se extraen de forma concurrente
+(ver `ExtractionPool`).
 """
 
-import io
-from io import BytesIO
+import asyncio
+import functools
+from contextlib import nullcontext
 
 import httpx
 import pandas as pd
@@ -25,14 +29,30 @@ from k_link.extensions.parameters import (
     UnitParameters,
 )
 from k_link.utils.bucket import BucketManager
-from k_link.utils.files import DataSource
 from k_link.utils.pydantic_types import Date
 from loggerk import LoggerK
 
+from conciliaciones.clients.erp.erp_data.extraction_pool import (
+    ExtractionNetworkError,
+    ExtractionPool,
+    parse_catalog,
+    parse_datasource,
+)
+from conciliaciones.clients.erp.erp_data.parsed_cache import (
+    ParsedFrameCache,
+    s3_object_source,
+    upload_source,
+)
+from conciliaciones.clients.erp.erp_data.s3_download import (
+    download_to_spool,
+    probe_object,
+)
+from conciliaciones.models.proceso_conciliacion import ConciliationTask
 from conciliaciones.utils.completion_handler.airflow_contex_exception import (
     AirflowContexException,
 )
-from conciliaciones.utils.data.normalize import normalize_date, normalize_df
+from conciliaciones.utils.data.normalize import normalize_date
+from conciliaciones.utils.redis.io_metrics import storage_stage
 from conciliaciones.utils.redis.redis_keys import RedisKeys
 from conciliaciones.utils.redis.redis_storage import RedisStorage
 
@@ -72,6 +92,7 @@ class DatosERP:
         self.conciliation_type: ConciliationType = conciliation_type
 
         self.redis = RedisStorage()
+        self._parsed_cache = ParsedFrameCache(self.redis)
         self.redis_keys = RedisKeys(
             run_id=run_id,
             project_id_str=self.project_id_str,
@@ -117,114 +138,185 @@ class DatosERP:
 
         data_sources_catalogs: list[DataSourceCatalog] = erp_files.data_sources_catalogs
 
-        datasources_optional: list[str] = await self.extraer_datos_datasources(
-            data_sources=datasources, today=today
-        )
+        with storage_stage(ConciliationTask.S3_TO_REDIS, run=self.redis_keys.base_key):
+            # Data sources y catálogos comparten el límite de concurrencia
+            async with ExtractionPool() as pool:
+                datasources_optional: list[str] = await self.extraer_datos_datasources(
+                    data_sources=datasources, today=today, pool=pool
+                )
 
-        await self.extraer_datos_catalogos(data_sources_catalog=data_sources_catalogs)
+                await self.extraer_datos_catalogos(
+                    data_sources_catalog=data_sources_catalogs, pool=pool
+                )
 
         return datasources_optional
 
     async def extraer_datos_datasources(
-        self, data_sources: list[DataSources], today: Date
+        self,
+        data_sources: list[DataSources],
+        today: Date,
+        pool: ExtractionPool | None = None,
     ) -> list[str]:
-        datasources_optional: list[str] = []
-        for data_source in data_sources:
-            data_source_name: str = data_source.config.datasource_name
+        """
+        Extrae los data sources del periodo y los guarda en Redis.
 
-            self._logger.info(f"Data Source: {data_source}")
-            self._logger.info(f"Data Source Name: {data_source_name}")
+        pool: Pool en el que se registran las extracciones; sin él se usa uno
+            propio y se espera a que terminen todas.
+        """
+        datasources_optional: list[str] = []
+        async with nullcontext(pool) if pool else ExtractionPool() as extraction_pool:
+            for data_source in data_sources:
+                data_source_name: str = data_source.config.datasource_name
 
-            if data_source.uploads is None:
-                self._airflow_fail_exception.handle_and_store_exception(
-                    f"No se encontraron uploads para el data source {data_source_name}"
-                )
+                self._logger.info(f"Data Source: {data_source}")
+                self._logger.info(f"Data Source Name: {data_source_name}")
 
-            # Obtiene datos de s3 del archivo de la ejecución actual
-            datasource_upload: Uploads = await self.get_data_source_erp(
-                data_source.uploads, today, conciliation_type=self.conciliation_type
-            )
+                if data_source.uploads is None:
+                    self._airflow_fail_exception.handle_and_store_exception(
+                        f"No se encontraron uploads para el data source {data_source_name}"
+                    )
 
-            if datasource_upload.is_optional:
-                datasources_optional.append(data_source_name)
-                continue
+                # Obtiene datos de s3 del archivo de la ejecución actual
+                datasource_upload: Uploads = await self.get_data_source_erp(
+                    data_source.uploads, today, conciliation_type=self.conciliation_type
+                )
 
-            self._logger.info(f"final_row: {data_source.config.final_row}")
+                if datasource_upload.is_optional:
+                    datasources_optional.append(data_source_name)
+                    continue
 
-            # Obtiene Data Frame del archivo de s3
-            df_base: pd.DataFrame = await self.get_data_frame_erp(
-                datasource_upload=datasource_upload, dataframe_config=data_source.config
-            )
+                # Almacena en redis archivos con columnas configuradas
+                redis_key: str = self.redis_keys.get_erp_data_source_redis_key(
+                    datasource=data_source_name
+                )
 
-            self._logger.info(f"Dataframe erp columns: {df_base.columns.to_list()}")
-            self._logger.info(
-                f"Mongo columns: {data_source.config.header_types.keys()}"
-            )
+                extraction_pool.submit(
+                    key=redis_key,
+                    extract=functools.partial(
+                        self._extract_datasource,
+                        data_source=data_source,
+                        datasource_upload=datasource_upload,
+                        pool=extraction_pool,
+                    ),
+                    save=functools.partial(self._save_extracted, redis_key=redis_key),
+                )
 
-            headers_config: dict[str, ObjectId] = data_source.config.header_types
+        return datasources_optional
 
-            # Selecciona solo columnas configuradas en Mongo
-            df_base = await self.select_columns(df_base, config_columns=headers_config)
+    async def _extract_datasource(
+        self,
+        data_source: DataSources,
+        datasource_upload: Uploads,
+        pool: ExtractionPool,
+    ) -> pd.DataFrame:
+        self._logger.info(f"final_row: {data_source.config.final_row}")
 
-            # Almacena en redis archivos con columnas configuradas
-            redis_key: str = self.redis_keys.get_erp_data_source_redis_key(
-                datasource=data_source_name
-            )
+        # Obtiene Data Frame del archivo de s3
+        df_base: pd.DataFrame = await self.get_data_frame_erp(
+            datasource_upload=datasource_upload,
+            dataframe_config=data_source.config,
+            pool=pool,
+        )
 
-            self._logger.info(f"DF Base: {df_base}")
+        self._logger.info(f"Dataframe erp columns: {df_base.columns.to_list()}")
+        self._logger.info(f"Mongo columns: {data_source.config.header_types.keys()}")
 
-            self.save_redis(df_erp=df_base, redis_key=redis_key)
+        headers_config: dict[str, ObjectId] = data_source.config.header_types
 
-        return datasources_optional
+        # Selecciona solo columnas configuradas en Mongo
+        return await self.select_columns(df_base, config_columns=headers_config)
 
     async def extraer_datos_catalogos(
-        self, data_sources_catalog: list[DataSourceCatalog]
+        self,
+        data_sources_catalog: list[DataSourceCatalog],
+        pool: ExtractionPool | None = None,
     ) -> None:
-        for catalog in data_sources_catalog:
-            self._logger.info(f"Data Source Name: {catalog.name}")
+        """
+        Extrae los catálogos y los guarda en Redis.
 
-            catalog_metadata: DataSourceCatalogMetadata | None = (
-                catalog.catalog_metadata
-            )
+        pool: Pool en el que se registran las extracciones; sin él se usa uno
+            propio y se espera a que terminen todas.
+        """
+        async with nullcontext(pool) if pool else ExtractionPool() as extraction_pool:
+            for catalog in data_sources_catalog:
+                self._logger.info(f"Data Source Name: {catalog.name}")
 
-            if catalog_metadata is None:
-                self._airflow_fail_exception.handle_and_store_exception(
-                    f"No se encontró metadata para el catálogo {catalog.name} del proyecto {self.project_id_str}"
+                catalog_metadata: DataSourceCatalogMetadata | None = (
+                    catalog.catalog_metadata
                 )
 
-            df_base: pd.DataFrame = await self.catalog_bucket_to_df(
-                s3_path=catalog_metadata.s3_path,
-                catalog_config=catalog,
-            )
+                if catalog_metadata is None:
+                    self._airflow_fail_exception.handle_and_store_exception(
+                        f"No se encontró metadata para el catálogo {catalog.name} del proyecto {self.project_id_str}"
+                    )
 
-            self._logger.info(f"Dataframe columns: {df_base.columns.to_list()}")
-            self._logger.info(f"Mongo columns: {catalog.header_types.keys()}")
+                redis_key: str = self.redis_keys.get_erp_data_source_redis_key(
+                    datasource=catalog.name
+                )
 
-            headers_config: dict[str, ObjectId] = catalog.header_types
+                extraction_pool.submit(
+                    key=redis_key,
+                    extract=functools.partial(
+                        self._extract_catalog,
+                        s3_path=catalog_metadata.s3_path,
+                        catalog=catalog,
+                        pool=extraction_pool,
+                    ),
+                    save=functools.partial(self._save_extracted, redis_key=redis_key),
+                )
 
-            df_base = await self.select_columns(df_base, config_columns=headers_config)
+    async def _extract_catalog(
+        self, s3_path: str, catalog: DataSourceCatalog, pool: ExtractionPool
+    ) -> pd.DataFrame:
+        df_base: pd.DataFrame = await self.catalog_bucket_to_df(
+            s3_path=s3_path,
+            catalog_config=catalog,
+            pool=pool,
+        )
 
-            redis_key: str = self.redis_keys.get_erp_data_source_redis_key(
-                datasource=catalog.name
-            )
+        self._logger.info(f"Dataframe columns: {df_base.columns.to_list()}")
+        self._logger.info(f"Mongo columns: {catalog.header_types.keys()}")
+
+        headers_config: dict[str, ObjectId] = catalog.header_types
+
+        return await self.select_columns(df_base, config_columns=headers_config)
 
-            self._logger.info(f"DF Catalog: {df_base}")
+    async def _save_extracted(self, df_base: pd.DataFrame, redis_key: str) -> None:
+        self._logger.info(f"DF Base: {df_base}")
 
-            self.save_redis(df_erp=df_base, redis_key=redis_key)
+        # El guardado es E/S bloqueante: se hace en un hilo para no detener
+        # las demás extracciones
+        await asyncio.to_thread(self.save_redis, df_erp=df_base, redis_key=redis_key)
 
-    def save_redis(self, df_erp: pd.DataFrame, redis_key: str) -> None:
+    def save_redis(
+        self,
+        df_erp: pd.DataFrame,
+        redis_key: str,
+        task: ConciliationTask = ConciliationTask.S3_TO_REDIS,
+        handoff: bool = False,
+    ) -> None:
         """
         Guarda un DataFrame en Redis.
 
         Args:
             df_erp (pd.DataFrame): DataFrame a guardar.
+            task (ConciliationTask): Tarea que produce el frame, para el catálogo.
+            handoff (bool): Deja una copia en memoria compartida para la
+                siguiente etapa si corre en el mismo host (solo si
+                REDIS_FRAME_HANDOFF lo habilita).
             :param df_erp:
             :param redis_key:
         """
         self._logger.info("Dataframe info: ")
         self._logger.info(df_erp.info())
-        buffer_df: BytesIO = self.redis.set_parquet(df=df_erp)
-        self.redis.set(key=redis_key, value=buffer_df)
+        self.redis.set_df(
+            key=redis_key,
+            df=df_erp,
+            catalog_key=self.redis_keys.get_frame_catalog_key(),
+            task=task,
+            dedup=True,
+            handoff=handoff,
+        )
         self._logger.info(f"Redis Key: {redis_key}")
 
     async def select_columns(
@@ -316,22 +408,48 @@ class DatosERP:
         return datasource_upload
 
     async def get_data_frame_erp(
-        self, datasource_upload: Uploads, dataframe_config: Config
+        self,
+        datasource_upload: Uploads,
+        dataframe_config: Config,
+        pool: ExtractionPool | None = None,
     ) -> pd.DataFrame:
+        """
+        Descarga y parsea el archivo de un data source.
+
+        Si el upload ya se parseó con la misma configuración se usa el frame de
+        la caché (ver `ParsedFrameCache`).
+
+        pool: Si se indica, el parseo corre en su pool de procesos.
+        """
+        cache_key = self._parsed_cache.key(
+            upload_source(datasource_upload), dataframe_config
+        )
+        cached = await asyncio.to_thread(self._parsed_cache.get, cache_key)
+        if cached is not None:
+            return cached
+
         try:
-            ds: DataSource = datasource_upload.datasource(dataframe_config)
-            df_erp: pd.DataFrame = ds.dataframe
-            df_erp = normalize_df(df_erp)
-        except httpx.HTTPError as exc:
+            if pool is None:
+                df_erp: pd.DataFrame = parse_datasource(
+                    datasource_upload, dataframe_config
+                )
+            else:
+                df_erp = await pool.run_in_process(
+                    parse_datasource, datasource_upload, dataframe_config
+                )
+        except (httpx.HTTPError, ExtractionNetworkError) as exc:
             self._airflow_fail_exception.handle_and_store_exception(
                 f"Network error: {exc}"
             )
+
+        await asyncio.to_thread(self._parsed_cache.put, cache_key, df_erp)
         return df_erp
 
     async def catalog_bucket_to_df(
         self,
         s3_path: str,
         catalog_config: DataSourceCatalog,
+        pool: ExtractionPool | None = None,
     ) -> pd.DataFrame:
         """
         Descarga un archivo de S3 y lo convierte en un DataFrame usando la configuración dada.
@@ -339,6 +457,10 @@ class DatosERP:
         Args:
             s3_path (str): Ruta S3 del archivo.
             catalog_config (DataSourceCatalog): Configuración del catálogo.
+            pool (ExtractionPool | None): Si se indica, el parseo corre en su pool de procesos.
+                El archivo se descarga por bloques a un archivo temporal (ver
+                `download_to_spool`). Si el objeto (ETag y tamaño) ya se parseó con
+                la misma configuración no se descarga (ver `ParsedFrameCache`).
 
         Returns:
             pd.DataFrame: DataFrame con los datos del archivo.
@@ -352,24 +474,46 @@ class DatosERP:
             file_url: str = bucket_manager.create_presigned_url(s3_path)
 
             async with httpx.AsyncClient() as client:
-                response = await client.get(file_url)
-                response.raise_for_status()
-
-            binary_io = io.BytesIO(response.content)
-
-            data_source_catalog = catalog_config.datasource_type.ds_class(
-                excel_sheet_data=catalog_config.excel_sheet_data,
-                file_path=binary_io,
-                initial_column=catalog_config.initial_column,
-                final_column=catalog_config.final_column,
-                skip_rows=catalog_config.skip_rows,
-                skip_footer=catalog_config.skip_footer,
-                final_row=catalog_config.final_row,
-                header_row=catalog_config.header_row,
+                if self._parsed_cache.enabled:
+                    etag, size = await probe_object(client, file_url)
+                    cached = await asyncio.to_thread(
+                        self._parsed_cache.get,
+                        self._parsed_cache.key(
+                            s3_object_source(s3_path, etag, size), catalog_config
+                        ),
+                    )
+                    if cached is not None:
+                        return cached
+
+                download = await download_to_spool(client, file_url)
+
+            with download:
+                self._logger.info(
+                    f"Archivo {s3_path} descargado: {download.size} bytes, "
+                    f"md5 {download.md5}"
+                )
+                if pool is None:
+                    df: pd.DataFrame = parse_catalog(
+                        download.handle, catalog_config, s3_path
+                    )
+                elif download.in_memory:
+                    df = await pool.run_in_process(
+                        parse_catalog, download.read_bytes(), catalog_config, s3_path
+                    )
+                else:
+                    # Enviar un archivo que pasó a disco a otro proceso obliga a
+                    # copiarlo completo en memoria: se parsea desde disco en un hilo
+                    df = await asyncio.to_thread(
+                        parse_catalog, download.handle, catalog_config, s3_path
+                    )
+
+            # Se guarda con la identidad del contenido descargado, por si el
+            # objeto cambió después de consultarla
+            cache_key = self._parsed_cache.key(
+                s3_object_source(s3_path, download.etag, download.size),
+                catalog_config,
             )
-
-            df: pd.DataFrame = normalize_df(data_source_catalog.dataframe)
-
+            await asyncio.to_thread(self._parsed_cache.put, cache_key, df)
             return df
 
         except httpx.HTTPStatusError as e:
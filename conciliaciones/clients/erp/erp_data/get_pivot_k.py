@@ -1,5 +1,4 @@
 import re
-from io import BytesIO
 
 import numpy as np
 import pandas as pd
@@ -24,10 +23,12 @@ from k_link.extensions.pivot_k import (
 from k_link.extensions.report_config import HeaderConfig
 from loggerk import LoggerK
 
+from conciliaciones.models.proceso_conciliacion import ConciliationTask
 from conciliaciones.utils.completion_handler.airflow_contex_exception import (
     AirflowContexException,
 )
 from conciliaciones.utils.headers.headers_types import HeadersTypes
+from conciliaciones.utils.redis.io_metrics import storage_stage
 from conciliaciones.utils.redis.redis_keys import RedisKeys
 from conciliaciones.utils.redis.redis_storage import RedisStorage
 
@@ -76,6 +77,10 @@ class PivoteKManager:
         )
 
     async def get_pivote_k_serie(self) -> None:
+        with storage_stage(ConciliationTask.GET_PIVOTE, run=self.redis_keys.base_key):
+            await self._get_pivote_k_serie()
+
+    async def _get_pivote_k_serie(self) -> None:
         # Obtener los datos de redis
         df: pd.DataFrame | None = self.redis.get_df(
             redis_key=self.redis_keys.get_erp_redis_key()
@@ -101,9 +106,11 @@ class PivoteKManager:
                 f"No hay configuración para la Pivot K del proyecto: {self.project_id_str}"
             )
 
-        # Se recupera lista final de erp headers
-        headers_erp_final: list[HeaderConfig] = self._header_types.get_headers_list(
-            redis_key=self.redis_keys.get_headers_erp_final_list_key()
+        # Se recupera lista final de erp headers, indexada por nombre
+        headers_erp_final: dict[str, HeaderConfig] = (
+            self._header_types.get_headers_index(
+                redis_key=self.redis_keys.get_headers_erp_final_list_key()
+            )
         )
 
         headers_pivot: list[HeaderConfig] = []
@@ -196,8 +203,12 @@ class PivoteKManager:
         )
 
         # Actualiar dataframe en redis
-        buffer_df: BytesIO = self.redis.set_parquet(df=df)
-        self.redis.set(key=self.redis_keys.get_erp_redis_key(), value=buffer_df)
+        self.redis.set_df(
+            key=self.redis_keys.get_erp_redis_key(),
+            df=df,
+            catalog_key=self.redis_keys.get_frame_catalog_key(),
+            task=ConciliationTask.GET_PIVOTE,
+        )
 
     @staticmethod
     def get_pivote_k_header_name(strategy: PivoteKHeader) -> str:
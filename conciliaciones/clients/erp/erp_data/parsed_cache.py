@@ -0,0 +1,100 @@
+"""
+Caché de archivos ERP ya parseados.
+
+Repetir un periodo, reintentar un DAG o conciliar varios meses contra el mismo
+catálogo vuelve a descargar y parsear archivos idénticos. El frame que
+producen la descarga, el parseo y `normalize_df` se guarda en Redis (frame
+Arrow, `set_df`) bajo una clave que identifica el archivo y su lectura; si la
+clave existe, la extracción usa el frame guardado y se salta esos pasos.
+
+La clave (`parsed_upload_{<hash>}`) es el hash de:
+    - el origen del archivo: para catálogos, su ruta S3, ETag y tamaño
+      (`probe_object`, sin descargarlo); para data sources, el registro del
+      upload, pues el archivo lo descarga k_link y un archivo nuevo se registra
+      como un upload nuevo;
+    - la configuración de lectura (headers seleccionados, hoja, filas y
+      columnas), y
+    - PARSED_CACHE_FORMAT, que se incrementa si cambia el parseo o
+      `normalize_df`.
+
+Las claves no pertenecen a una corrida: la limpieza de fin de corrida no las
+elimina y vencen con el TTL de su familia (`Keys.PARSED_UPLOAD`).
+
+Configuración por variables de entorno:
+    - ERP_PARSED_CACHE: "false" desactiva la caché (default activa).
+"""
+
+import hashlib
+import json
+
+import pandas as pd
+from k_link.tools import env
+from loggerk import LoggerK
+from pydantic import BaseModel
+
+from conciliaciones.models.proceso_conciliacion import ConciliationTask
+from conciliaciones.utils.redis.redis_keys import KEY_LAYOUT_LEGACY, Keys, key_layout
+from conciliaciones.utils.redis.redis_storage import RedisStorage
+
+# Versión del formato de los frames en caché
+PARSED_CACHE_FORMAT: int = 1
+
+
+def parsed_upload_key(digest: str) -> str:
+    if key_layout() == KEY_LAYOUT_LEGACY:
+        return f"{Keys.PARSED_UPLOAD.value}_{digest}"
+    # Con la etiqueta de hash el frame y sus claves derivadas comparten slot
+    return f"{Keys.PARSED_UPLOAD.value}_{{{digest}}}"
+
+
+def _fingerprint(model: BaseModel) -> str:
+    return json.dumps(model.model_dump(), sort_keys=True, default=str)
+
+
+def s3_object_source(s3_path: str, etag: str | None, size: int | None) -> str | None:
+    """Origen de un archivo de S3; None si no se conoce su ETag o tamaño"""
+    if not etag or size is None:
+        return None
+    etag = etag.strip('"')
+    return f"s3:{s3_path}:{etag}:{size}"
+
+
+def upload_source(upload: BaseModel) -> str:
+    """Origen del archivo de un upload de data source"""
+    return f"upload:{_fingerprint(upload)}"
+
+
+class ParsedFrameCache:
+    _logger: LoggerK
+
+    def __init__(self, redis: RedisStorage) -> None:
+        self._logger = LoggerK(self.__class__.__name__)
+        self.redis = redis
+        self.enabled: bool = (env.get("ERP_PARSED_CACHE") or "").lower() != "false"
+
+    def key(self, source: str | None, config: BaseModel) -> str | None:
+        """Clave del frame de `source` leído con `config` (None si no aplica)"""
+        if not self.enabled or source is None:
+            return None
+
+        digest = hashlib.blake2b(digest_size=16)
+        for part in (str(PARSED_CACHE_FORMAT), source, _fingerprint(config)):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\x00")
+        return parsed_upload_key(digest.hexdigest())
+
+    def get(self, key: str | None) -> pd.DataFrame | None:
+        if key is None:
+            return None
+
+        df = self.redis.get_df(key, normalize=False)
+        if df is not None:
+            self._logger.info(f"Archivo parseado en caché: {key}")
+        return df
+
+    def put(self, key: str | None, df: pd.DataFrame) -> None:
+        if key is None:
+            return
+
+        self.redis.set_df(key=key, df=df, task=ConciliationTask.S3_TO_REDIS)
+        self._logger.info(f"Archivo parseado guardado en caché: {key}")
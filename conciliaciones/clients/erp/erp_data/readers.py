@@ -0,0 +1,483 @@
+"""
+Lectura de archivos ERP solo con las columnas configuradas.
+
+Los exports de un ERP pueden tener cientos de columnas de las que solo se usan
+las configuradas en `ERPFiles` (`header_types`). Estos lectores reciben esa
+lista y descartan las demás columnas al leer, sin construirlas. Hay dos
+motores:
+
+    - "arrow" (default): los CSV/TXT se leen con `pyarrow.csv` en varios
+      hilos, con el delimitador y la codificación detectados de una muestra
+      del archivo. Las columnas se leen como texto y se convierten a entero,
+      flotante o booleano con kernels de Arrow si todos sus valores lo son,
+      como los infiere `pandas.read_csv`. Las celdas del xlsx se acumulan por
+      bloques de filas en arreglos Arrow: las columnas de tipos mixtos quedan
+      como texto y el texto no se convierte a número.
+    - "pandas": `pandas.read_csv` con `usecols` y, para xlsx, los tipos que
+      infiere `pandas.read_excel`.
+
+En ambos motores la hoja de un xlsx se recorre en el modo de solo lectura de
+openpyxl. Con las versiones de openpyxl probadas (`OPENPYXL_PARSER_VERSIONS`)
+se usa el parser de `xlsx_parser`, que de cada fila solo convierte las celdas
+de las columnas configuradas y de las demás solo revisa si tienen valor; con
+las demás versiones se usa `iter_rows`, que convierte todas las celdas.
+
+Como la lectura por defecto de pandas (`read_csv`, `read_excel` con openpyxl),
+el encabezado es la primera fila. Solo aplican a archivos sin ventana de
+lectura (filas o columnas inicial/final, filas a omitir); para los demás, para
+otros formatos o si falta alguna columna configurada, `read_selected_columns`
+devuelve None y el archivo se lee completo con la clase de k_link del
+data source. Si el motor "arrow" no puede leer un CSV se intenta con "pandas".
+
+Configuración por variables de entorno:
+    - ERP_PRUNED_READERS: "false" desactiva estos lectores (default activos).
+    - ERP_READER_ENGINE: "arrow" (default) o "pandas".
+"""
+
+import codecs
+import csv
+import io
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import PurePosixPath
+from typing import TYPE_CHECKING, BinaryIO, Literal, Protocol
+
+import numpy as np
+import openpyxl
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+from k_link.extensions.datasources import DataSourceCatalog
+from k_link.tools import env
+from openpyxl import load_workbook
+from openpyxl.cell.cell import TYPE_ERROR, TYPE_NUMERIC
+from openpyxl.workbook.workbook import Workbook
+from pandas.io.parsers import TextParser
+
+from conciliaciones.utils.data.arrow_tables import concat_tables
+
+if TYPE_CHECKING:
+    # Solo para anotaciones: openpyxl no expone la clase públicamente
+    from openpyxl.worksheet._read_only import ReadOnlyWorksheet
+
+ReaderEngine = Literal["arrow", "pandas"]
+
+CSV_FORMATS: tuple[str, ...] = ("csv", "txt")
+XLSX_FORMATS: tuple[str, ...] = ("xlsx", "xlsm")
+
+# Atributos de la configuración que definen una ventana de lectura
+_LAYOUT_FIELDS: tuple[str, ...] = (
+    "initial_column",
+    "final_column",
+    "skip_rows",
+    "skip_footer",
+    "final_row",
+    "header_row",
+)
+
+# Bytes del inicio del CSV con los que se detectan codificación y delimitador
+CSV_SNIFF_BYTES: int = 64 * 1024
+
+CSV_DELIMITERS: str = ",;|\t"
+
+# Codificaciones que se prueban en orden; latin-1 decodifica cualquier byte
+CSV_ENCODINGS: tuple[str, ...] = ("utf-8", "cp1252", "latin-1")
+
+# Valores nulos por defecto de `pandas.read_csv`
+CSV_NULL_VALUES: list[str] = [
+    "",
+    "#N/A",
+    "#N/A N/A",
+    "#NA",
+    "-1.#IND",
+    "-1.#QNAN",
+    "-NaN",
+    "-nan",
+    "1.#IND",
+    "1.#QNAN",
+    "<NA>",
+    "N/A",
+    "NA",
+    "NULL",
+    "NaN",
+    "None",
+    "n/a",
+    "nan",
+    "null",
+]
+
+# Textos que `pandas.read_csv` convierte a booleano
+CSV_TRUE_VALUES: list[str] = ["True", "TRUE", "true"]
+CSV_FALSE_VALUES: list[str] = ["False", "FALSE", "false"]
+
+# Filas por bloque al convertir las celdas de un xlsx a arreglos Arrow
+XLSX_BATCH_ROWS: int = 65_536
+
+
+def file_format(file_name: str) -> str:
+    """Extensión del archivo, en minúsculas y sin punto"""
+    return PurePosixPath(file_name).suffix.lstrip(".").lower()
+
+
+def has_simple_layout(config: DataSourceCatalog) -> bool:
+    """True si el archivo se lee completo, con el encabezado en la primera fila"""
+    return not any(getattr(config, field, None) for field in _LAYOUT_FIELDS)
+
+
+def reader_engine() -> ReaderEngine:
+    """Motor de lectura configurado en ERP_READER_ENGINE"""
+    return "pandas" if env.get("ERP_READER_ENGINE") == "pandas" else "arrow"
+
+
+def read_selected_columns(
+    source: BinaryIO,
+    file_name: str,
+    config: DataSourceCatalog,
+    engine: ReaderEngine | None = None,
+) -> pd.DataFrame | None:
+    """
+    Lee solo las columnas configuradas de un archivo.
+
+    engine: Motor de lectura; por defecto, el de ERP_READER_ENGINE.
+
+    Returns:
+        pd.DataFrame | None: None si el archivo no se puede leer así. En ambos
+            casos `source` queda al inicio, para leerlo completo si hace falta.
+    """
+    if (env.get("ERP_PRUNED_READERS") or "").lower() == "false":
+        return None
+    if not config.header_types or not has_simple_layout(config):
+        return None
+
+    engine = engine or reader_engine()
+    columns = list(config.header_types)
+    fmt = file_format(file_name)
+    try:
+        if fmt in CSV_FORMATS:
+            if engine == "arrow":
+                df = _read_csv_arrow(source, columns)
+                if df is not None:
+                    return df
+                source.seek(0)
+            return _read_csv_columns(source, columns)
+        if fmt in XLSX_FORMATS:
+            return _read_xlsx_columns(source, config.excel_sheet_data, columns, engine)
+        return None
+    finally:
+        source.seek(0)
+
+
+def _read_csv_columns(source: BinaryIO, columns: list[str]) -> pd.DataFrame | None:
+    wanted = set(columns)
+    try:
+        df = pd.read_csv(source, usecols=lambda name: name in wanted)
+    except (ValueError, UnicodeDecodeError):
+        return None
+    return df if wanted.issubset(df.columns) else None
+
+
+def sniff_encoding(sample: bytes) -> str:
+    """Primera codificación de CSV_ENCODINGS que decodifica la muestra"""
+    for encoding in CSV_ENCODINGS:
+        try:
+            # La muestra puede cortar un carácter de varios bytes al final
+            codecs.getincrementaldecoder(encoding)().decode(sample, final=False)
+        except UnicodeDecodeError:
+            continue
+        return encoding
+    return CSV_ENCODINGS[-1]
+
+
+def sniff_delimiter(text: str) -> str:
+    """Delimitador de CSV_DELIMITERS de la muestra (por defecto ",")"""
+    # Solo líneas completas
+    text = text[: text.rfind("\n") + 1] or text
+    try:
+        return csv.Sniffer().sniff(text, delimiters=CSV_DELIMITERS).delimiter
+    except csv.Error:
+        header = text.partition("\n")[0]
+        counts = {delimiter: header.count(delimiter) for delimiter in CSV_DELIMITERS}
+        delimiter = max(counts, key=counts.__getitem__)
+        return delimiter if counts[delimiter] else ","
+
+
+def _read_csv_arrow(source: BinaryIO, columns: list[str]) -> pd.DataFrame | None:
+    sample = source.read(CSV_SNIFF_BYTES)
+    source.seek(0)
+    encoding = sniff_encoding(sample)
+    text = sample.decode(encoding, errors="ignore").lstrip("\ufeff")
+    delimiter = sniff_delimiter(text)
+
+    header = next(csv.reader(io.StringIO(text), delimiter=delimiter), [])
+    if not set(columns).issubset(header):
+        return None
+
+    try:
+        table = pa_csv.read_csv(
+            source,
+            read_options=pa_csv.ReadOptions(encoding=encoding, use_threads=True),
+            parse_options=pa_csv.ParseOptions(delimiter=delimiter),
+            convert_options=pa_csv.ConvertOptions(
+                include_columns=columns,
+                column_types={column: pa.string() for column in columns},
+                null_values=CSV_NULL_VALUES,
+                strings_can_be_null=True,
+            ),
+        )
+    except (pa.ArrowInvalid, pa.ArrowKeyError):
+        return None
+
+    return pa.table(
+        [_infer_csv_column(table.column(column)) for column in columns],
+        names=columns,
+    ).to_pandas()
+
+
+def _infer_csv_column(array: pa.ChunkedArray) -> pa.ChunkedArray:
+    """Tipo de una columna leída como texto, como lo infiere `pandas.read_csv`"""
+    for target in (pa.int64(), pa.float64()):
+        try:
+            return pc.cast(array, target)
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+            continue
+
+    is_null = pc.is_null(array)
+    true_values = pc.is_in(array, value_set=pa.array(CSV_TRUE_VALUES))
+    false_values = pc.is_in(array, value_set=pa.array(CSV_FALSE_VALUES))
+    if pc.all(pc.or_(is_null, pc.or_(true_values, false_values))).as_py():
+        return pc.if_else(is_null, pa.scalar(None, pa.bool_()), true_values)
+    return array
+
+
+def _convert_cell(cell: dict) -> object:
+    """Valor de una celda como lo convierte `pandas.read_excel`"""
+    value = cell["value"]
+    if value is None:
+        return ""
+    if cell["data_type"] == TYPE_ERROR:
+        return np.nan
+    if cell["data_type"] == TYPE_NUMERIC:
+        integer = int(value)
+        return integer if integer == value else float(value)
+    return value
+
+
+def _arrow_cell(cell: dict | None) -> object:
+    """Valor de una celda para un arreglo Arrow; las vacías y errores son nulos"""
+    if cell is None or cell["data_type"] == TYPE_ERROR:
+        return None
+    value = _convert_cell(cell)
+    return None if value == "" else value
+
+
+def _to_arrow(values: list) -> pa.Array:
+    try:
+        return pa.array(values)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, OverflowError):
+        # Tipos mixtos, o enteros fuera del rango de int64
+        return pa.array(
+            [None if value is None else str(value) for value in values], pa.string()
+        )
+
+
+# Versiones de openpyxl con las que se probó `xlsx_parser`, que usa su API
+# interna; con las demás la hoja se lee con `iter_rows`
+OPENPYXL_PARSER_VERSIONS: tuple[str, ...] = ("3.1.",)
+
+
+class _SheetRows(Protocol):
+    """
+    Filas de una hoja como (número de fila, celdas, si la fila completa tiene
+    algún valor). Cada celda es un dict con "column", "value" y "data_type".
+    Al asignar `columns` solo se entregan las celdas de esas columnas.
+    """
+
+    columns: set[int] | None
+
+    def parse(self) -> Iterator[tuple[int, list[dict], bool]]: ...
+
+
+class _WorksheetRows:
+    """Filas de una hoja de solo lectura con la API pública (`iter_rows`)"""
+
+    def __init__(self, worksheet: "ReadOnlyWorksheet") -> None:
+        self.worksheet = worksheet
+        self.columns: set[int] | None = None
+
+    def parse(self) -> Iterator[tuple[int, list[dict], bool]]:
+        # Como en `read_excel`, sin confiar en las dimensiones del archivo
+        self.worksheet.reset_dimensions()
+        # `iter_rows` entrega vacías las filas que faltan en la hoja
+        for row_number, row in enumerate(self.worksheet.iter_rows(), start=1):
+            cells: list[dict] = []
+            has_value = False
+            for column, cell in enumerate(row, start=1):
+                if cell.value is None:
+                    continue
+                has_value = has_value or cell.value != ""
+                if self.columns is None or column in self.columns:
+                    cells.append(
+                        {
+                            "column": column,
+                            "value": cell.value,
+                            "data_type": cell.data_type,
+                        }
+                    )
+            yield row_number, cells, has_value
+
+
+@contextmanager
+def _open_sheet_rows(
+    workbook: Workbook, worksheet: "ReadOnlyWorksheet"
+) -> Iterator[_SheetRows]:
+    if not openpyxl.__version__.startswith(OPENPYXL_PARSER_VERSIONS):
+        yield _WorksheetRows(worksheet)
+        return
+
+    # Se importa aquí para no depender de la API interna de otras versiones
+    from conciliaciones.clients.erp.erp_data.xlsx_parser import (  # noqa: PLC0415
+        open_selected_columns_parser,
+    )
+
+    with open_selected_columns_parser(workbook, worksheet) as parser:
+        yield parser
+
+
+def _read_xlsx_columns(
+    source: BinaryIO, sheet: object, columns: list[str], engine: ReaderEngine
+) -> pd.DataFrame | None:
+    if sheet is not None and not isinstance(sheet, str | int):
+        return None
+
+    workbook = load_workbook(source, read_only=True, data_only=True, keep_links=False)
+    try:
+        try:
+            if isinstance(sheet, str):
+                worksheet = workbook[sheet]
+            else:
+                worksheet = workbook.worksheets[sheet or 0]
+        except (KeyError, IndexError):
+            # La hoja configurada no existe
+            return None
+
+        with _open_sheet_rows(workbook, worksheet) as sheet_rows:
+            selected = _iter_selected_rows(sheet_rows, columns)
+            if selected is None:
+                return None
+            if engine == "arrow":
+                return _rows_to_table(*selected).to_pandas(
+                    coerce_temporal_nanoseconds=True
+                )
+            return _rows_to_frame(*selected)
+    finally:
+        workbook.close()
+
+
+def _iter_selected_rows(
+    parser: _SheetRows, columns: list[str]
+) -> tuple[list[str], Iterator[tuple[list[dict | None], bool]]] | None:
+    """
+    Encabezados y filas de datos de las columnas configuradas.
+
+    Cada fila es (celdas de las columnas configuradas, None si la celda no
+    existe; si la fila completa tiene algún valor). Las filas que faltan en
+    la hoja se entregan vacías y las repetidas se ignoran, como en openpyxl.
+
+    Returns:
+        None si el encabezado no tiene todas las columnas configuradas.
+    """
+    rows = parser.parse()
+    row_number, header, _ = next(rows, (0, [], False))
+    if row_number != 1:
+        # El encabezado de `read_excel` es la primera fila de la hoja
+        return None
+
+    # Columna (1-based) de cada header configurado; si se repite, la primera
+    wanted = set(columns)
+    positions: dict[str, int] = {}
+    for cell in header:
+        name = _convert_cell(cell)
+        if name in wanted and name not in positions:
+            positions[name] = cell["column"]  # type: ignore
+    if len(positions) < len(wanted):
+        return None
+
+    selected = list(positions.values())
+    parser.columns = set(selected)
+
+    def data_rows() -> Iterator[tuple[list[dict | None], bool]]:
+        empty_row: list[dict | None] = [None] * len(selected)
+        expected = 2
+        for row_number, cells, has_value in rows:
+            if row_number < expected:
+                continue
+            for _ in range(row_number - expected):
+                yield empty_row, False
+
+            by_column = {cell["column"]: cell for cell in cells}
+            yield [by_column.get(column) for column in selected], has_value
+            expected = row_number + 1
+
+    return list(positions), data_rows()
+
+
+def _rows_to_frame(
+    names: list[str], rows: Iterator[tuple[list[dict | None], bool]]
+) -> pd.DataFrame:
+    """DataFrame con los tipos que infiere `read_excel`"""
+    data: list[list[object]] = [list(names)]
+    last_row_with_data = 0
+    for cells, has_value in rows:
+        data.append(["" if cell is None else _convert_cell(cell) for cell in cells])
+        # Como en `read_excel`, las filas vacías al final se descartan
+        # considerando todas las columnas, no solo las configuradas
+        if has_value:
+            last_row_with_data = len(data) - 1
+
+    return TextParser(
+        data[: last_row_with_data + 1], header=0, skip_blank_lines=False
+    ).read()
+
+
+def _rows_to_table(
+    names: list[str], rows: Iterator[tuple[list[dict | None], bool]]
+) -> pa.Table:
+    """Tabla Arrow construida por bloques de XLSX_BATCH_ROWS filas"""
+    batches: list[pa.Table] = []
+    values: list[list[object]] = [[] for _ in names]
+    # Filas vacías que solo se agregan si después hay una fila con valores
+    pending_empty = 0
+
+    for cells, has_value in rows:
+        if not has_value:
+            pending_empty += 1
+            continue
+
+        for column, cell in zip(values, cells, strict=True):
+            if pending_empty:
+                column.extend([None] * pending_empty)
+            column.append(_arrow_cell(cell))
+        pending_empty = 0
+
+        if len(values[0]) >= XLSX_BATCH_ROWS:
+            batches.append(pa.table([_to_arrow(column) for column in values], names))
+            values = [[] for _ in names]
+
+    if values[0] or not batches:
+        batches.append(pa.table([_to_arrow(column) for column in values], names))
+
+    # Los bloques pueden tener tipos distintos en una columna (p. ej. enteros
+    # y flotantes); se promueven al tipo común, o a texto
+    table = batches[0] if len(batches) == 1 else concat_tables(batches)
+
+    # Como en `read_excel`, una columna sin valores es flotante
+    return table.cast(
+        pa.schema(
+            [
+                field.with_type(pa.float64()) if pa.types.is_null(field.type) else field
+                for field in table.schema
+            ],
+            metadata=table.schema.metadata,
+        )
+    )
@@ -0,0 +1,150 @@
+"""
+Descarga por streaming de archivos de S3.
+
+El archivo se lee por bloques y se escribe en un `SpooledTemporaryFile`: se
+queda en memoria mientras no supere ERP_DOWNLOAD_SPOOL_BYTES y pasa a disco
+al superarlo, de modo que la memoria de la descarga no crece con el tamaño del
+archivo. Los parsers leen directamente del archivo.
+
+Mientras se descarga se calcula el MD5 del contenido; si S3 reporta un ETag de
+un archivo subido en una sola parte (que es el MD5 del contenido), se verifica
+contra él. `probe_object` obtiene el ETag y el tamaño sin descargar el archivo.
+
+Configuración por variables de entorno:
+    - ERP_DOWNLOAD_SPOOL_BYTES: Tamaño a partir del cual la descarga pasa a
+      disco (default 64 MB).
+    - ERP_DOWNLOAD_SPOOL_DIR: Directorio de los archivos en disco (default, el
+      directorio temporal del sistema).
+"""
+
+import hashlib
+import re
+import tempfile
+from contextlib import ExitStack
+from typing import BinaryIO
+
+import httpx
+from k_link.tools import env
+
+# Bytes por bloque leído de la respuesta
+DOWNLOAD_CHUNK_SIZE: int = 1024**2
+
+DEFAULT_SPOOL_MAX_BYTES: int = 64 * 1024**2
+
+# ETag de S3 de un objeto subido en una sola parte: MD5 en hexadecimal
+_SINGLE_PART_ETAG = re.compile(r"[0-9a-f]{32}")
+
+
+def spool_max_bytes() -> int:
+    return int(env.get("ERP_DOWNLOAD_SPOOL_BYTES") or DEFAULT_SPOOL_MAX_BYTES)
+
+
+class SpooledDownload:
+    """Archivo descargado, listo para leerse desde el inicio"""
+
+    def __init__(
+        self,
+        file: tempfile.SpooledTemporaryFile,
+        size: int,
+        md5: str,
+        etag: str | None,
+        max_bytes: int,
+    ) -> None:
+        self.file = file
+        self.size = size
+        self.md5 = md5
+        self.etag = etag
+        self._max_bytes = max_bytes
+
+    @property
+    def in_memory(self) -> bool:
+        """True si el archivo no pasó a disco"""
+        return self.size <= self._max_bytes
+
+    @property
+    def handle(self) -> BinaryIO:
+        self.file.seek(0)
+        return self.file  # type: ignore
+
+    def read_bytes(self) -> bytes:
+        return self.handle.read()
+
+    def verify(self) -> None:
+        """
+        Verifica el MD5 contra el ETag de S3.
+
+        Raises:
+            ValueError: Si el ETag es el MD5 de una sola parte y no coincide.
+        """
+        etag = (self.etag or "").strip('"').lower()
+        if _SINGLE_PART_ETAG.fullmatch(etag) and etag != self.md5:
+            raise ValueError(
+                f"El checksum de la descarga ({self.md5}) no coincide con el ETag "
+                f"de S3 ({etag})"
+            )
+
+    def close(self) -> None:
+        self.file.close()
+
+    def __enter__(self) -> "SpooledDownload":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+
+async def probe_object(
+    client: httpx.AsyncClient, url: str
+) -> tuple[str | None, int | None]:
+    """
+    ETag y tamaño de un objeto sin descargarlo.
+
+    La URL prefirmada solo admite GET, por lo que se pide el primer byte
+    (`Range`) y el tamaño se lee de `Content-Range`.
+
+    Returns:
+        tuple[str | None, int | None]: (ETag, tamaño); None si S3 no los
+            reporta.
+    """
+    async with client.stream("GET", url, headers={"Range": "bytes=0-0"}) as response:
+        if response.status_code != httpx.codes.PARTIAL_CONTENT:
+            return None, None
+        etag: str | None = response.headers.get("ETag")
+        total = response.headers.get("Content-Range", "").rpartition("/")[2]
+        return etag, int(total) if total.isdigit() else None
+
+
+async def download_to_spool(
+    client: httpx.AsyncClient, url: str, max_bytes: int | None = None
+) -> SpooledDownload:
+    """
+    Descarga `url` por bloques a un archivo temporal y verifica su checksum.
+
+    Raises:
+        httpx.HTTPStatusError: Si la respuesta no es exitosa.
+        ValueError: Si el checksum no coincide con el ETag.
+    """
+    max_bytes = max_bytes if max_bytes is not None else spool_max_bytes()
+    digest = hashlib.md5(usedforsecurity=False)
+    size = 0
+
+    # El archivo se cierra si la descarga o la verificación fallan
+    with ExitStack() as stack:
+        spool = stack.enter_context(
+            tempfile.SpooledTemporaryFile(
+                max_size=max_bytes, dir=env.get("ERP_DOWNLOAD_SPOOL_DIR") or None
+            )
+        )
+        async with client.stream("GET", url) as response:
+            response.raise_for_status()
+            etag: str | None = response.headers.get("ETag")
+            async for chunk in response.aiter_bytes(DOWNLOAD_CHUNK_SIZE):
+                spool.write(chunk)
+                digest.update(chunk)
+                size += len(chunk)
+
+        download = SpooledDownload(spool, size, digest.hexdigest(), etag, max_bytes)
+        download.verify()
+        stack.pop_all()
+
+    return download
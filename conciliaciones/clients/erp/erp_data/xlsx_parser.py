@@ -0,0 +1,93 @@
+"""
+Parser de hojas xlsx que solo convierte las celdas de las columnas
+seleccionadas.
+
+Usa la API interna de openpyxl (`WorkSheetParser`, `_get_source`,
+`_date_formats`), por lo que `readers` solo lo usa con las versiones de
+openpyxl con las que se probó (`OPENPYXL_PARSER_VERSIONS`); con las demás la
+hoja se lee con `iter_rows`.
+"""
+
+from collections.abc import Iterator
+from contextlib import contextmanager
+from string import digits
+from xml.etree.ElementTree import Element
+
+from openpyxl.utils import column_index_from_string
+from openpyxl.workbook.workbook import Workbook
+from openpyxl.worksheet._read_only import ReadOnlyWorksheet
+from openpyxl.worksheet._reader import INLINE_STRING, VALUE_TAG, WorkSheetParser
+
+
+class SelectedColumnsParser(WorkSheetParser):
+    """
+    Parser de la hoja de openpyxl que solo convierte las celdas de las columnas
+    seleccionadas; de las demás solo revisa si tienen valor.
+
+    Cada fila se entrega como (número de fila, celdas seleccionadas, si la
+    fila completa tiene algún valor). Con `columns` en None se convierten
+    todas las celdas.
+    """
+
+    def __init__(self, *args: object, **kwargs: object) -> None:
+        super().__init__(*args, **kwargs)
+        self.columns: set[int] | None = None
+
+    def parse_row(self, row: Element) -> tuple[int, list[dict], bool]:  # type: ignore
+        row_number = row.get("r")
+        self.row_counter = (
+            int(float(row_number)) if row_number else self.row_counter + 1
+        )
+        self.col_counter = 0
+
+        cells: list[dict] = []
+        has_value = False
+        for element in row:
+            if self.columns is not None:
+                coordinate = element.get("r")
+                column = (
+                    column_index_from_string(coordinate.rstrip(digits))
+                    if coordinate
+                    else self.col_counter + 1
+                )
+                if column not in self.columns:
+                    self.col_counter = column
+                    has_value = has_value or self._has_value(element)
+                    continue
+
+            cell = self.parse_cell(element)
+            cells.append(cell)
+            has_value = has_value or cell["value"] not in (None, "")
+
+        return self.row_counter, cells, has_value
+
+    def _has_value(self, element: Element) -> bool:
+        """Si la celda tiene un valor no vacío, sin convertirlo"""
+        if element.get("t") == "inlineStr":
+            return element.find(INLINE_STRING) is not None
+        value = element.findtext(VALUE_TAG)
+        if not value:
+            return False
+        if element.get("t") == "s":
+            return self.shared_strings[int(value)] != ""
+        return True
+
+
+@contextmanager
+def open_selected_columns_parser(
+    workbook: Workbook, worksheet: ReadOnlyWorksheet
+) -> Iterator[SelectedColumnsParser]:
+    """Parser de una hoja de un libro abierto en modo de solo lectura"""
+    # Mismos argumentos que la lectura de solo lectura de openpyxl
+    # (`ReadOnlyWorksheet._cells_by_row`), que es la que usa `read_excel`
+    source = worksheet._get_source()
+    try:
+        yield SelectedColumnsParser(
+            source,
+            workbook.shared_strings,
+            data_only=True,
+            epoch=workbook.epoch,
+            date_formats=workbook._date_formats,
+        )
+    finally:
+        source.close()
@@ -1,7 +1,6 @@
 import re
 from abc import ABC, abstractmethod
 from datetime import datetime, timedelta
-from io import BytesIO
 
 import pandas as pd
 from k_link.extensions.pipeline import (
@@ -37,6 +36,7 @@ from conciliaciones.clients.external.pipeline.strategies.operations.simple.opera
 from conciliaciones.clients.external.pipeline.strategies.pivots.pivot_handler import (
     PivotHandler,
 )
+from conciliaciones.models.proceso_conciliacion import ConciliationTask
 from conciliaciones.utils.redis.redis_keys import RedisKeys
 from conciliaciones.utils.redis.redis_storage import RedisStorage
 
@@ -138,8 +138,12 @@ class StrategyGroup(BaseStrategy):
         self._logger.info(f"DataFrame Group: {df_grouped}")
         self._logger.info(f"Redis key: {redis_key}")
 
-        buffer_df: BytesIO = self._redis.set_parquet(df=df_grouped)
-        self._redis.set(key=redis_key, value=buffer_df)
+        self._redis.set_df(
+            key=redis_key,
+            df=df_grouped,
+            catalog_key=self._redis_key.get_frame_catalog_key(),
+            task=ConciliationTask.PIPELINE_MULTISOURCE,
+        )
 
         return DataFrame()
 
@@ -376,7 +380,11 @@ class StrategyPivotTable(BaseStrategy):
         self._logger.info(f"df pivot creada: {df_pivot}")
         self._logger.info(f"Redis key: {redis_key}")
 
-        buffer_df: BytesIO = self._redis.set_parquet(df=df_pivot)
-        self._redis.set(key=redis_key, value=buffer_df)
+        self._redis.set_df(
+            key=redis_key,
+            df=df_pivot,
+            catalog_key=self._redis_key.get_frame_catalog_key(),
+            task=ConciliationTask.PIPELINE_MULTISOURCE,
+        )
 
         return DataFrame()
@@ -27,6 +27,14 @@ from conciliaciones.clients.external.pipeline.base_strategy_abc import (
 )
 from conciliaciones.utils.redis.redis_keys import RedisKeys
 
+# Estrategias que consumen el DataFrame temporal de su fuente; el resto solo
+# requiere que la fuente exista
+DF_TEMP_STRATEGIES: Final[list[Estrategia]] = [
+    Estrategia.JOIN,
+    Estrategia.CONCATENATE,
+    Estrategia.OPERATION,
+]
+
 
 class PipelineFactory:
     _map: Final[dict[Estrategia, type[BaseStrategy]]] = {
@@ -104,11 +112,7 @@ class PipelineConfiguration:
             self._logger.info(f"Aplicando estrategia: {pipeline.tipo}")
 
             pipeline_data_df = pd.DataFrame()
-            if pipeline.tipo in [
-                Estrategia.JOIN,
-                Estrategia.CONCATENATE,
-                Estrategia.OPERATION,
-            ]:
+            if pipeline.tipo in DF_TEMP_STRATEGIES:
                 try:
                     pipeline_data_df: pd.DataFrame = self.pipeline_data_map[
                         (
@@ -15,6 +15,7 @@ from k_link.extensions.report_config import HeaderConfig
 from loggerk import LoggerK
 
 from conciliaciones.clients.external.pipeline.pipeline_configuration import (
+    DF_TEMP_STRATEGIES,
     PipelineConfiguration,
 )
 from conciliaciones.utils.redis.redis_keys import RedisKeys
@@ -88,6 +89,10 @@ class PipelineManager:
                 if pipeline.df_base in datasources_optional:
                     continue
 
+            if pipeline.tipo not in DF_TEMP_STRATEGIES and self._is_cataloged(pipeline):
+                # La estrategia no usa el frame de su fuente: basta con que exista
+                continue
+
             pipeline_data_df, base_name = await self._get_redis_df_pipeline(
                 pipeline=pipeline,
             )
@@ -108,9 +113,27 @@ class PipelineManager:
 
         return await pipeline_configuration.apply_configuration_pipeline()
 
+    def _is_cataloged(self, pipeline: PipelineOperation) -> bool:
+        """Valida en el catálogo de la corrida, sin descargarla, que la fuente existe"""
+        redis_key, _ = self._get_redis_key_pipeline(pipeline)
+        entry = self.redis.get_frame_entry(
+            catalog_key=self._redis_key.get_frame_catalog_key(), key=redis_key
+        )
+        return entry is not None
+
     async def _get_redis_df_pipeline(
         self, pipeline: PipelineOperation
     ) -> tuple[pd.DataFrame, str]:
+        redis_key, base_name = self._get_redis_key_pipeline(pipeline)
+
+        pipeline_df: pd.DataFrame | None = self.redis.get_df(redis_key=redis_key)
+
+        if pipeline_df is None:
+            raise ValueError(f"No se encontró el DataFrame en Redis {redis_key}")
+
+        return pipeline_df, base_name
+
+    def _get_redis_key_pipeline(self, pipeline: PipelineOperation) -> tuple[str, str]:
         redis_key: str | None = None
         base_name: str | None = None
 
@@ -192,14 +215,9 @@ class PipelineManager:
                 f"No se pudo determinar la clave de Redis para el pipeline {pipeline}"
             )
 
-        pipeline_df: pd.DataFrame | None = self.redis.get_df(redis_key=redis_key)
-
-        if pipeline_df is None:
-            raise ValueError(f"No se encontró el DataFrame en Redis {redis_key}")
-
         if base_name is None:
             raise ValueError(
                 f"No se pudo determinar el nombre base para el pipeline {pipeline}"
             )
 
-        return pipeline_df, base_name
+        return redis_key, base_name
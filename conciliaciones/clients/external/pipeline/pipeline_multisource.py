@@ -15,10 +15,12 @@ from k_link.extensions.report_config import HeaderConfig
 from loggerk import LoggerK
 
 from conciliaciones.clients.external.pipeline.pipeline_manager import PipelineManager
+from conciliaciones.models.proceso_conciliacion import ConciliationTask
 from conciliaciones.utils.completion_handler.airflow_contex_exception import (
     AirflowContexException,
 )
 from conciliaciones.utils.headers.headers_types import HeadersTypes
+from conciliaciones.utils.redis.io_metrics import storage_stage
 from conciliaciones.utils.redis.redis_keys import RedisKeys
 from conciliaciones.utils.redis.redis_storage import RedisStorage
 
@@ -86,14 +88,17 @@ class PipelineMultisource:
             return
 
         self._logger.info(f"Fuente ejecutada: {self._data_frame_source.value}")
-        if self._data_frame_source == DataFrameSource.FILE:
-            await self._get_configuration_from_file(data_frames_config)
-        elif self._data_frame_source == DataFrameSource.JSON:
-            await self._get_configuration_from_json(data_frames_config)
-        else:
-            self._airflow_fail_exception.handle_and_store_exception(
-                f"Tipo de DataFrameConfig {self._data_frame_source} no soportado para el proyecto: {self._project_id_str}"
-            )
+        with storage_stage(
+            ConciliationTask.PIPELINE_MULTISOURCE, run=self.redis_keys.base_key
+        ):
+            if self._data_frame_source == DataFrameSource.FILE:
+                await self._get_configuration_from_file(data_frames_config)
+            elif self._data_frame_source == DataFrameSource.JSON:
+                await self._get_configuration_from_json(data_frames_config)
+            else:
+                self._airflow_fail_exception.handle_and_store_exception(
+                    f"Tipo de DataFrameConfig {self._data_frame_source} no soportado para el proyecto: {self._project_id_str}"
+                )
 
     async def _get_configuration_from_file(
         self, data_frame_config: list[DataFrameConfig]
@@ -276,9 +281,14 @@ class PipelineMultisource:
 
         self._logger.info(f"Data Frame: {df_info.getvalue()}")
 
-        buffer_df: io.BytesIO = self.redis.set_parquet(df=df)
-        self.redis.set(key=redis_key, value=buffer_df)
-        self.redis.medir_tamano_valor(df=df, buffer_df=buffer_df)
+        payload_size: int = self.redis.set_df(
+            key=redis_key,
+            df=df,
+            catalog_key=self.redis_keys.get_frame_catalog_key(),
+            task=ConciliationTask.PIPELINE_MULTISOURCE,
+            dedup=True,
+        )
+        self.redis.medir_tamano_valor(df=df, buffer_df=payload_size)
         self._logger.error(f"DataFrame guardado con la Redis Key: {redis_key}")
 
     def _get_list_erp_final(self, df_erp: pd.DataFrame) -> list[HeaderConfig]:
@@ -288,29 +298,27 @@ class PipelineMultisource:
         )
         headers_erp_final: list[HeaderConfig] = []
 
+        # Primera columna del frame por nombre base (sin sufijo de merge)
+        columns_by_base: dict[str, str] = {}
+        for col in df_erp.columns:
+            columns_by_base.setdefault(col.split("_")[0], col)
+
         for header in headers_erp:
-            found = False
-            for col in df_erp.columns:
-                nombre_base = col.split("_")[0]
-
-                if col.endswith("_x") or col.endswith("_y"):
-                    if header.nombre == nombre_base:
-                        header_config: HeaderConfig = HeaderConfig(
-                            nombre=col,
-                            configuracion_tipo_dato=header.configuracion_tipo_dato,
-                            origen=header.origen,
-                            mostrar_reporte=header.mostrar_reporte,
-                        )
-                        headers_erp_final.append(header_config)
-                        found = True
-                        break
-                elif header.nombre == nombre_base:
-                    headers_erp_final.append(header)
-                    found = True
-                    break
-            if found:
+            col = columns_by_base.get(header.nombre)
+            if col is None:
                 continue
 
+            if col.endswith("_x") or col.endswith("_y"):
+                header_config: HeaderConfig = HeaderConfig(
+                    nombre=col,
+                    configuracion_tipo_dato=header.configuracion_tipo_dato,
+                    origen=header.origen,
+                    mostrar_reporte=header.mostrar_reporte,
+                )
+                headers_erp_final.append(header_config)
+            else:
+                headers_erp_final.append(header)
+
         self._logger.info(f"Numero de columnas ERP guardadas: {len(headers_erp)}")
         self._logger.info(f"Headers erp: {headers_erp}")
 
@@ -223,6 +223,18 @@ class OperationHandler(BaseExpressionComponentHandler):
                 aux_df[col] = aux_df[col].fillna("").astype(str)
 
     def _get_types_in_col(self, col: pd.Series) -> list[str]:
+        # Columnas con dtype conservado desde Redis: no es necesario inspeccionar celdas
+        if pd.api.types.is_datetime64_any_dtype(col):
+            return [str(pd.Timestamp)]
+        if pd.api.types.is_timedelta64_dtype(col):
+            return [str(pd.Timedelta)]
+        if pd.api.types.is_bool_dtype(col):
+            return [str(bool)]
+        if pd.api.types.is_integer_dtype(col):
+            return [str(int)]
+        if pd.api.types.is_numeric_dtype(col):
+            return [str(float)]
+
         lista = col.map(
             lambda x: (
                 str(type(x))
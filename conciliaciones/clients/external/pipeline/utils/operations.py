@@ -102,6 +102,18 @@ class OperationUtils:
         return aux_df
 
     def get_types_in_col(self, col: pd.Series) -> list[str]:
+        # Columnas con dtype conservado desde Redis: no es necesario inspeccionar celdas
+        if pd.api.types.is_datetime64_any_dtype(col):
+            return [str(pd.Timestamp)]
+        if pd.api.types.is_timedelta64_dtype(col):
+            return [str(pd.Timedelta)]
+        if pd.api.types.is_bool_dtype(col):
+            return [str(bool)]
+        if pd.api.types.is_integer_dtype(col):
+            return [str(int)]
+        if pd.api.types.is_numeric_dtype(col):
+            return [str(float)]
+
         lista = col.map(
             lambda x: (
                 str(type(x))
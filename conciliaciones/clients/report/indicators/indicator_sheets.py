@@ -22,6 +22,7 @@ from openpyxl.styles import Alignment, Border, Font, PatternFill, Side
 from openpyxl.utils.dataframe import dataframe_to_rows
 
 from conciliaciones.clients.report.indicators.indicator_handler import IndicatorHandler
+from conciliaciones.models.proceso_conciliacion import ConciliationTask
 from conciliaciones.utils.completion_handler.airflow_contex_exception import (
     AirflowContexException,
 )
@@ -176,12 +177,13 @@ class Indicator:
                 indicator_name=indicator_name
             )
 
-            buffer_df: BytesIO = self._redis.set_parquet(df=df_indicador)
-            self._redis.set(
+            payload_size: int = self._redis.set_df(
                 key=redis_key,
-                value=buffer_df,
+                df=df_indicador,
+                catalog_key=self._redis_keys.get_frame_catalog_key(),
+                task=ConciliationTask.RESUMEN_INDICADORES,
             )
-            self._redis.medir_tamano_valor(df=df_indicador, buffer_df=buffer_df)
+            self._redis.medir_tamano_valor(df=df_indicador, buffer_df=payload_size)
 
             self._logger.info(f"Indicador guardado en Redis: {redis_key}")
 
@@ -108,12 +108,16 @@ class ReportStyles:
 
             data_style_enum = DataStyles[tipo_dato.value]
 
-            for i, fecha in enumerate(df[column_name], start=2):
-                if pd.notna(fecha) and str(fecha).strip() != "":
-                    try:
-                        fecha = self._parse_fecha(str(fecha))
-                    except ValueError as _:
-                        continue
+            for i, dato in enumerate(df[column_name], start=2):
+                if pd.notna(dato) and str(dato).strip() != "":
+                    # Las columnas datetime ya llegan tipadas desde Redis
+                    if isinstance(dato, datetime):
+                        fecha = dato.replace(tzinfo=None)
+                    else:
+                        try:
+                            fecha = self._parse_fecha(str(dato))
+                        except ValueError as _:
+                            continue
                     cell = worksheet.cell(row=i, column=column_num, value=fecha)
                     cell.style = self._styles.data_styles[data_style_enum]
                     cell.number_format = "dd/mm/yyyy"
@@ -428,10 +428,24 @@ class ReportDataHandler:
             self._logger.error("Error al subir archivo a S3: %s", exc)
             raise exc
 
-    async def get_dataframe_sat_no_erp(self) -> DataFrame:
+    def _get_frame_schema(self, redis_key: str) -> DataFrame | None:
+        """
+        DataFrame vacío con las columnas y dtypes del frame, tomado del catálogo
+        de la corrida sin descargarlo (None si el frame no está registrado).
+        """
+        return self.redis.get_frame_schema(
+            catalog_key=self.redis_keys.get_frame_catalog_key(), key=redis_key
+        )
+
+    async def get_dataframe_sat_no_erp(
+        self, columns: list[str] | None = None
+    ) -> DataFrame:
         """
         Obtiene el DataFrame de conciliación SAT no ERP desde Redis.
 
+        Args:
+            columns (list[str] | None): Columnas a descargar (por defecto, todas).
+
         Returns:
             DataFrame: df sat_no_erp con las columnas filtradas.
         """
@@ -444,7 +458,9 @@ class ReportDataHandler:
         if self.report_type_headers is None:
             raise ValueError("report_type_headers no está inicializado.")
 
-        df_sat_no_erp: pd.DataFrame | None = self.redis.get_df(redis_key=redis_key)
+        df_sat_no_erp: pd.DataFrame | None = self.redis.get_df(
+            redis_key=redis_key, columns=columns
+        )
 
         if df_sat_no_erp is None:
             raise ValueError(f"df vacio. ID project: {self.project_id_str}")
@@ -463,7 +479,16 @@ class ReportDataHandler:
             ValueError: Si report_type_headers y el df esta vacio.
         """
 
-        df_sat_no_erp: DataFrame = await self.get_dataframe_sat_no_erp()
+        # Con el frame en el catálogo, los headers se resuelven antes de leerlo y
+        # solo se descargan sus columnas
+        columns: list[str] | None = None
+        df_schema: DataFrame | None = self._get_frame_schema(
+            self.redis_keys.get_sat_no_erp_periodo_key()
+        )
+        if df_schema is not None:
+            columns, _ = await self.ordenar_columnas_sat(df=df_schema)
+
+        df_sat_no_erp: DataFrame = await self.get_dataframe_sat_no_erp(columns=columns)
 
         headers_sat, headers_sat_config = await self.ordenar_columnas_sat(
             df=df_sat_no_erp
@@ -649,7 +674,15 @@ class ReportDataHandler:
                 f"No se encontró la llave de Redis para el origen de datos: {origen_df}"
             )
 
-        df: pd.DataFrame | None = self.redis.get_df(redis_key=redis_key)
+        columns: list[str] | None = None
+        if origen_df == OrigenDF.ERP_SAT:
+            df_schema: DataFrame | None = self._get_frame_schema(redis_key)
+            if df_schema is not None:
+                columns = await self.ordenar_columnas_erp_sat(df_schema)
+
+        df: pd.DataFrame | None = self.redis.get_df(
+            redis_key=redis_key, columns=columns
+        )
 
         if df is None:
             self._airflow_fail_exception.handle_and_store_exception(
@@ -711,21 +744,25 @@ class ReportDataHandler:
             return True
         return False
 
-    async def get_dataframe_erp_sat(self) -> DataFrame:
+    async def get_dataframe_erp_sat(
+        self, columns: list[str] | None = None
+    ) -> DataFrame:
         """
         Obtiene el DataFrame de conciliación ERP y SAT desde Redis.
+        Args:
+            columns (list[str] | None): Columnas a descargar (por defecto, todas).
         Returns:
             DataFrame: dataframe filtrado
         """
         redis_key_erp: str = self.redis_keys.get_sat_erp_redis_key()
 
-        df_erp_sat: pd.DataFrame | None = self.redis.get_df(redis_key=redis_key_erp)
+        df_erp_sat: pd.DataFrame | None = self.redis.get_df(
+            redis_key=redis_key_erp, columns=columns
+        )
 
         if df_erp_sat is None:
             raise ValueError(f"df vacio. ID project: {self.project_id_str}")
 
-        self.redis.set("df_erp_limpio.csv", df_erp_sat.to_csv(index=False))
-
         return df_erp_sat
 
     async def get_headers_erp_sat(self, df: DataFrame) -> list[HeaderConfig]:
@@ -782,7 +819,19 @@ class ReportDataHandler:
         Returns:
             DataFrame: dataframe filtrado
         """
-        df_erp_sat: DataFrame = await self.get_dataframe_erp_sat()
+        # Con el frame en el catálogo solo se descargan las columnas del reporte
+        columns: list[str] | None = None
+        df_schema: DataFrame | None = self._get_frame_schema(
+            self.redis_keys.get_sat_erp_redis_key()
+        )
+        if df_schema is not None:
+            columns = [
+                header.nombre
+                for header in await self.get_headers_erp_sat(df=df_schema)
+                if header.nombre
+            ]
+
+        df_erp_sat: DataFrame = await self.get_dataframe_erp_sat(columns=columns)
 
         headers_custom: list[HeaderConfig] = await self.get_headers_erp_sat(
             df=df_erp_sat
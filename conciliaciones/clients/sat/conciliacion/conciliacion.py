@@ -1,5 +1,4 @@
 import typing
-from io import BytesIO
 
 import pandas as pd
 from k_link.db.core import ObjectId
@@ -15,12 +14,17 @@ from k_link.extensions.report_config.header_config import (
 from loggerk import LoggerK
 
 from conciliaciones.clients.erp.erp_data.get_pivot_k import PivoteKManager
+from conciliaciones.models.proceso_conciliacion import ConciliationTask
 from conciliaciones.models.shared import HowType
 from conciliaciones.utils.completion_handler.airflow_contex_exception import (
     AirflowContexException,
 )
+from conciliaciones.utils.redis.io_metrics import storage_stage
 from conciliaciones.utils.redis.redis_keys import RedisKeys
-from conciliaciones.utils.redis.redis_storage import RedisStorage
+from conciliaciones.utils.redis.redis_storage import (
+    FRAME_COLUMN_GROUP_SIZE,
+    RedisStorage,
+)
 
 ERP_FILES_DAO = ERPFilesDAO()
 PROJECT_DAO = ProjectDAO()
@@ -96,6 +100,10 @@ class Conciliaciones:
         return pivot_k
 
     async def conciliacion(self, pivotes: list[PivoteKHeader]) -> None:
+        with storage_stage(ConciliationTask.CONCILIATION, run=self.shared.base_key):
+            await self._conciliacion(pivotes=pivotes)
+
+    async def _conciliacion(self, pivotes: list[PivoteKHeader]) -> None:
         dataframe_erp: pd.DataFrame | None = self.redis.get_df(
             redis_key=self.shared.get_erp_redis_key()
         )
@@ -230,10 +238,13 @@ class Conciliaciones:
         self._logger.info(f"erp + sat columns: {df_erp_sat_concat.columns}")
 
         self._logger.info(f"DataFrame ERP SAT - numero registros: {df_erp_sat_concat}")
-        buffer_df: BytesIO = self.redis.set_parquet(df=df_erp_sat_concat)
-        self.redis.set(
+        self.redis.set_df(
             key=self.shared.get_sat_erp_redis_key(),
-            value=buffer_df,
+            df=df_erp_sat_concat,
+            column_group_size=FRAME_COLUMN_GROUP_SIZE,
+            catalog_key=self.shared.get_frame_catalog_key(),
+            task=ConciliationTask.CONCILIATION,
+            handoff=True,
         )
 
     async def validate_project_type_for_reporting(
@@ -305,10 +316,12 @@ class Conciliaciones:
             f"DataFrame ERP SAT concatenado - numero registros: {len(df_erp_sat)}"
         )
 
-        buffer_df: BytesIO = self.redis.set_parquet(df=df_erp_sat)
-        self.redis.set(
+        self.redis.set_df(
             key=redis_key_erp,
-            value=buffer_df,
+            df=df_erp_sat,
+            column_group_size=FRAME_COLUMN_GROUP_SIZE,
+            catalog_key=self.shared.get_frame_catalog_key(),
+            task=ConciliationTask.VALIDATE_PROJECT_TYPE,
         )
 
     @staticmethod
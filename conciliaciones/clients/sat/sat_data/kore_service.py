@@ -1,4 +1,3 @@
-from io import BytesIO
 from typing import Any
 
 import pandas as pd
@@ -13,12 +12,16 @@ from loggerk import LoggerK
 from conciliaciones.clients.sat.sat_data.kore_filter import KoreFilter, cols_kore_meta
 from conciliaciones.clients.sat.sat_data.utils.flatten_dict import flatten_dict
 from conciliaciones.clients.services.kore import KoreService
+from conciliaciones.models.proceso_conciliacion import ConciliationTask
 from conciliaciones.utils.completion_handler.airflow_contex_exception import (
     AirflowContexException,
 )
 from conciliaciones.utils.headers.headers_types import HeadersTypes
 from conciliaciones.utils.redis.redis_keys import RedisKeys
-from conciliaciones.utils.redis.redis_storage import RedisStorage
+from conciliaciones.utils.redis.redis_storage import (
+    FRAME_COLUMN_GROUP_SIZE,
+    RedisStorage,
+)
 
 
 class KoreMetaService:
@@ -144,7 +147,10 @@ class KoreMetaService:
                 columns={"TipoComprobante": "Pendientes SAT"}, inplace=True
             )
 
-        if len(candidato) > 0 and not df_meta.empty:
+        # Sin merge el frame solo gana la columna de pendientes
+        merged: bool = len(candidato) > 0 and not df_meta.empty
+
+        if merged:
             # Remover duplicados del df_meta por RFC
             rfc_column = (
                 cols_kore_meta["receptor_sat"]
@@ -198,9 +204,11 @@ class KoreMetaService:
             if not df_meta.empty:
                 self._logger.info(f"Pendientes: {df_meta.shape[0]}")
 
-                buffer_df: BytesIO = self._redis.set_parquet(df=df_meta)
-                self._redis.set(
-                    key=self._redis_keys.get_sat_erp_meta_key(), value=buffer_df
+                self._redis.set_df(
+                    key=self._redis_keys.get_sat_erp_meta_key(),
+                    df=df_meta,
+                    catalog_key=self._redis_keys.get_frame_catalog_key(),
+                    task=ConciliationTask.GET_PENDING_METADATA,
                 )
         else:
             self._logger.info("Sin pendientes")
@@ -227,8 +235,22 @@ class KoreMetaService:
             f"Cantidad de registros Final en DF ERP SAT: {len(df_erp_sat)}"
         )
 
-        buffer_df: BytesIO = self._redis.set_parquet(df=df_erp_sat)
-        self._redis.set(key=self._redis_keys.get_sat_erp_redis_key(), value=buffer_df)
+        if not merged:
+            self._redis.set_columns(
+                key=self._redis_keys.get_sat_erp_redis_key(),
+                df=df_erp_sat[[cols_kore_meta["pendientes"]]],
+                catalog_key=self._redis_keys.get_frame_catalog_key(),
+                task=ConciliationTask.GET_PENDING_METADATA,
+            )
+            return
+
+        self._redis.set_df(
+            key=self._redis_keys.get_sat_erp_redis_key(),
+            df=df_erp_sat,
+            column_group_size=FRAME_COLUMN_GROUP_SIZE,
+            catalog_key=self._redis_keys.get_frame_catalog_key(),
+            task=ConciliationTask.GET_PENDING_METADATA,
+        )
 
     async def _get_metadata_cancelada(
         self, project_type: str, enterprises: list[str]
@@ -279,7 +301,9 @@ class KoreMetaService:
                 df_meta, is_pendiente=False
             )
 
-            buffer_df: BytesIO = self._redis.set_parquet(df=df_meta)
-            self._redis.set(
-                key=self._redis_keys.get_sat_erp_meta_cancel_key(), value=buffer_df
+            self._redis.set_df(
+                key=self._redis_keys.get_sat_erp_meta_cancel_key(),
+                df=df_meta,
+                catalog_key=self._redis_keys.get_frame_catalog_key(),
+                task=ConciliationTask.GET_PENDING_METADATA,
             )
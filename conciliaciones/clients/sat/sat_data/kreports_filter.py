@@ -178,7 +178,17 @@ class KReportsFilter:
         redis_key: str,
         rfc: str,
     ):
-        df_exclude_uuids: DataFrame | None = self._redis.get_df(redis_key=redis_key)
+        strategies = report_type.strategies
+
+        if strategies is None:
+            self._airflow_fail_exception.handle_and_store_exception(
+                f"El ReportType con el id: {report_type.id} no tiene estrategias definidas"
+            )
+
+        # Solo se descarga la columna de UUIDs del frame SAT_ERP
+        df_exclude_uuids: DataFrame | None = self._redis.get_df(
+            redis_key=redis_key, columns=[strategies["uuid"]]
+        )
 
         if df_exclude_uuids is None:
             self._airflow_fail_exception.handle_and_store_exception(
@@ -194,13 +204,6 @@ class KReportsFilter:
             start_date = filter_date.start_of_year.date_string
             end_date = filter_date.today().date_string
 
-        strategies = report_type.strategies
-
-        if strategies is None:
-            self._airflow_fail_exception.handle_and_store_exception(
-                f"El ReportType con el id: {report_type.id} no tiene estrategias definidas"
-            )
-
         filters: dict = await self._filter_emitidas(rfc=rfc)
 
         raw_uuids = df_exclude_uuids[strategies["uuid"]].dropna().tolist()  # type: ignore
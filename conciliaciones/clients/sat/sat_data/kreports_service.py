@@ -1,4 +1,4 @@
-from io import BytesIO
+import asyncio
 
 import pandas as pd
 from k_link.db.core import ObjectId
@@ -23,14 +23,27 @@ from conciliaciones.clients.sat.sat_data.utils.flatten_sabana_impuestos import (
     procesar_impuestos,
 )
 from conciliaciones.clients.services.kreports_resource import KreportsResource
+from conciliaciones.models.proceso_conciliacion import ConciliationTask
 from conciliaciones.utils.completion_handler.airflow_contex_exception import (
     AirflowContexException,
 )
+from conciliaciones.utils.redis.async_redis_storage import AsyncRedisStorage
+from conciliaciones.utils.redis.io_metrics import storage_stage
 from conciliaciones.utils.redis.redis_keys import RedisKeys
-from conciliaciones.utils.redis.redis_storage import RedisStorage
+from conciliaciones.utils.redis.redis_storage import (
+    FRAME_COLUMN_GROUP_SIZE,
+    RedisStorage,
+)
 
 PROJECT_DAO = ProjectDAO()
 
+FILTER_TASKS: dict[RequestsFilters, ConciliationTask] = {
+    RequestsFilters.FILTER_SAT_ERP: ConciliationTask.GET_SAT_DATA,
+    RequestsFilters.FILTER_SAT_NO_ERP_PERIODO: ConciliationTask.GET_SAT_NO_ERP,
+    RequestsFilters.FILTER_SHEETS: ConciliationTask.GET_SHEETS,
+    RequestsFilters.FILTER_FISCAL: ConciliationTask.GET_SAT_FISCAL_DATA,
+}
+
 
 class KReportsService:
     list_tax_reports: list[str] = [
@@ -65,6 +78,7 @@ class KReportsService:
         self._report_type_dao = ReportCatalogDAO()
 
         self._redis = RedisStorage()
+        self._async_redis = AsyncRedisStorage()
         self._redis_keys = RedisKeys(
             run_id=run_id,
             project_id_str=project_id_str,
@@ -93,6 +107,20 @@ class KReportsService:
         sheets: bool = False,
         is_fiscal: bool = False,
         tipo_reporte: str | None = None,
+    ) -> None:
+        with storage_stage(
+            FILTER_TASKS.get(self._filter, ConciliationTask.GET_SAT_DATA),
+            run=self._redis_keys.base_key,
+        ):
+            await self._get_sat_report(
+                sheets=sheets, is_fiscal=is_fiscal, tipo_reporte=tipo_reporte
+            )
+
+    async def _get_sat_report(
+        self,
+        sheets: bool = False,
+        is_fiscal: bool = False,
+        tipo_reporte: str | None = None,
     ) -> None:
         self._logger.info(f"Filtro utilizado: {self._filter.value}")
         self._logger.warning(f"Tipo de reporte: {tipo_reporte}")
@@ -199,8 +227,8 @@ class KReportsService:
         self, enterprises: list[str], report_request: KReportsRequest, is_fiscal: bool
     ) -> list[str]:
         total_erp_cfdis = 0
-        erp_merged = []
-        flat_merged = []
+        total_rows = 0
+        columns_sat: list[str] = []
 
         self._logger.info(f"Report type: {report_request.report_id}")
 
@@ -226,6 +254,17 @@ class KReportsService:
                 f"No se encontró la configuración 'request_config' para el tipo de reporte con ID: {report_request.report_id} en la base de datos. Verifique que el campo esté correctamente configurado."
             )
 
+        redis_key: str = self._get_redis_key(
+            report_function=funcion,
+            pivot_header_strategy=self._pivote,  # type: ignore
+            is_fiscal=is_fiscal,
+        )
+        frame_catalog_key: str = self._redis_keys.get_frame_catalog_key()
+
+        # Cada empresa se agrega al stream de la clave en cuanto se obtiene, sin
+        # acumular el reporte completo en memoria
+        await self._async_redis.delete(redis_key)
+
         for enterprise in enterprises:
             if (
                 self._filter == RequestsFilters.FILTER_SAT_NO_ERP_PERIODO
@@ -267,79 +306,98 @@ class KReportsService:
 
             response_dict = erp_cfdis_response.model_dump()
 
-            erp_merged.extend(response_dict["data"])
+            erp_enterprise: list[dict] = response_dict["data"]
+            flat_enterprise: list[dict] = []
 
-            self._logger.info(f"UUID encontrado: {erp_merged}")
-            self._logger.info(f"Flat: {flat_merged}")
+            self._logger.info(f"UUID encontrado: {erp_enterprise}")
 
             try:
                 if name_report == "Nomina_Sabana":
                     self._logger.info("Flat nomina sabana")
-                    flat_merged = [
+                    flat_enterprise = [
                         get_nomina_headers_dict(comprobante)
-                        for comprobante in erp_merged
+                        for comprobante in erp_enterprise
                     ]
                 else:
                     self._logger.info("Flat no nomina sabana")
-                    flat_merged = [
-                        flatten_dict(comprobante) for comprobante in erp_merged
+                    flat_enterprise = [
+                        flatten_dict(comprobante) for comprobante in erp_enterprise
                     ]
             except Exception as _:
                 self._airflow_fail_exception.handle_and_store_exception(
                     "Uno de los comprobantes está dañado, por favor proporcione un diccionario válido."
                 )
 
-            self._logger.info(f"Flat: {flat_merged}")
-
             # Reportes con impuestos
             if name_report in self.list_tax_reports:
                 self._logger.info("Flat pagos sabana")
-                flat_merged = self._get_list_headers(flat_merged)
+                flat_enterprise = self._get_list_headers(flat_enterprise)
+
+            self._logger.info(f"Flat: {flat_enterprise}")
+
+            df_enterprise = self._get_enterprise_df(flat_enterprise)
+            columns_sat.extend(
+                col for col in df_enterprise.columns if col not in columns_sat
+            )
 
-            self._logger.info(f"Flat: {flat_merged}")
+            if df_enterprise.empty:
+                continue
 
-        df_conciliacion = pd.DataFrame(flat_merged)
-        self._logger.info(f"df_sat: {df_conciliacion.columns}")
+            total_rows += df_enterprise.shape[0]
+            await self._async_redis.append_frame(
+                key=redis_key,
+                df=df_enterprise,
+                missing_text="-",
+                catalog_key=frame_catalog_key,
+                task=FILTER_TASKS.get(self._filter),
+            )
 
-        if "impuestos" in df_conciliacion.columns:
-            df_conciliacion = df_conciliacion.drop(
-                columns=["impuestos"], errors="ignore"
+        # Sin registros no hay partes: se guarda el frame vacío con sus columnas
+        if total_rows == 0:
+            await self._async_redis.set_df(
+                key=redis_key,
+                df=pd.DataFrame(columns=columns_sat),
+                column_group_size=FRAME_COLUMN_GROUP_SIZE,
+                catalog_key=frame_catalog_key,
+                task=FILTER_TASKS.get(self._filter),
             )
 
+        self._logger.info(f"Guardando en Redis: {redis_key}")
+
         dinamic_headers: list[str] = []
         if name_report == "Nomina_Sabana" or name_report in self.list_tax_reports:
             dinamic_headers = await self._validate_dinamic_headers_by_nomina(
-                df=df_conciliacion, report_type=report_type
+                df=pd.DataFrame(columns=columns_sat), report_type=report_type
             )
 
-        self._logger.info(f"Registros de df_conciliacion: {df_conciliacion.shape[0]}")
+        self._logger.info(f"Registros de df_conciliacion: {total_rows}")
         self._logger.info(f"Cantidad total de CFDI obtenidos de ERP: {total_erp_cfdis}")
 
-        for col in df_conciliacion.columns:
-            if df_conciliacion[col].dtype == "object":
-                df_conciliacion[col] = df_conciliacion[col].fillna("-")
-
-        await self._save_redis(
-            df=df_conciliacion,
-            report_function=funcion,
-            pivot_header_strategy=self._pivote,  # type: ignore
-            is_fiscal=is_fiscal,
-        )
-
         if self._filter == RequestsFilters.FILTER_SAT_NO_ERP_PERIODO:
             await self.validate_project_type_for_reporting()
 
-        self._logger.info(f"Headers Dataframe SAT: {df_conciliacion.columns.tolist()}")
+        self._logger.info(f"Headers Dataframe SAT: {columns_sat}")
 
         return dinamic_headers
 
-    async def _save_redis(
+    def _get_enterprise_df(self, flat_enterprise: list[dict]) -> pd.DataFrame:
+        df_enterprise = pd.DataFrame(flat_enterprise)
+
+        if "impuestos" in df_enterprise.columns:
+            df_enterprise = df_enterprise.drop(columns=["impuestos"], errors="ignore")
+
+        for col in df_enterprise.columns:
+            if df_enterprise[col].dtype == "object":
+                df_enterprise[col] = df_enterprise[col].fillna("-")
+
+        return df_enterprise
+
+    def _get_redis_key(
         self,
-        df: pd.DataFrame,
         report_function: str,
         pivot_header_strategy: PivoteKHeader,
         is_fiscal: bool,
-    ) -> None:
+    ) -> str:
         if isinstance(pivot_header_strategy, str):
             pivot_header_strategy = PivoteKHeader[pivot_header_strategy]
 
@@ -364,24 +422,28 @@ class KReportsService:
                 f"Filtro no soportado: {self._filter.value} para el proyecto: {self._project_id_str}"
             )
 
-        buffer_df: BytesIO = self._redis.set_parquet(df=df)
-        self._redis.set(
-            key=redis_key,
-            value=buffer_df,
-        )
-
-        self._logger.info(f"Guardando en Redis: {redis_key}")
+        return redis_key
 
     async def _validate_sat_report(self, report_type: ReportCatalog) -> bool:
         redis_key = self._redis_keys.get_sat_erp_redis_key()
 
-        df_exclude_uuids: pd.DataFrame | None = self._redis.get_df(redis_key=redis_key)
+        strategies = report_type.strategies
+
+        # El catálogo basta para saber si el frame tiene UUIDs, sin descargarlo
+        entry = await self._async_redis.get_frame_entry(
+            catalog_key=self._redis_keys.get_frame_catalog_key(), key=redis_key
+        )
+        if entry is not None:
+            return entry.num_rows > 0 and strategies["uuid"] in entry.column_names
+
+        df_exclude_uuids: pd.DataFrame | None = await self._async_redis.get_df(
+            redis_key=redis_key,
+            columns=[strategies["uuid"]] if strategies else None,
+        )
 
         if df_exclude_uuids is None:
             return False
 
-        strategies = report_type.strategies
-
         uuids = df_exclude_uuids.get(strategies["uuid"], pd.Series([]))
 
         if uuids is None or uuids.empty:
@@ -452,8 +514,14 @@ class KReportsService:
             f"El tipo de proyecto es : {project_type}, se hace concat de los DF para el reporte"
         )
         redis_key_erp = self._redis_keys.get_sat_erp_redis_key()
+        redis_key_sat_no_erp_periodo = self._redis_keys.get_sat_no_erp_periodo_key()
 
-        df_erp_sat: pd.DataFrame | None = self._redis.get_df(redis_key=redis_key_erp)
+        df_erp_sat: pd.DataFrame | None
+        df_sat_no_erp_periodo: pd.DataFrame | None
+        df_erp_sat, df_sat_no_erp_periodo = await asyncio.gather(
+            self._async_redis.get_df(redis_key=redis_key_erp),
+            self._async_redis.get_df(redis_key=redis_key_sat_no_erp_periodo),
+        )
 
         if df_erp_sat is None:
             self._airflow_fail_exception.handle_and_store_exception(
@@ -463,12 +531,6 @@ class KReportsService:
         self._logger.info(f"DataFrame ERP SAT: {df_erp_sat}")
         self._logger.info(f"DataFrame ERP SAT - numero registros: {len(df_erp_sat)}")
 
-        redis_key_sat_no_erp_periodo = self._redis_keys.get_sat_no_erp_periodo_key()
-
-        df_sat_no_erp_periodo: pd.DataFrame | None = self._redis.get_df(
-            redis_key=redis_key_sat_no_erp_periodo
-        )
-
         if df_sat_no_erp_periodo is None:
             self._airflow_fail_exception.handle_and_store_exception(
                 f"DataFrame no encontrado con la clave: {redis_key_sat_no_erp_periodo}"
@@ -494,8 +556,10 @@ class KReportsService:
             f"DataFrame ERP SAT concatenado - numero registros: {len(df_erp_sat)}"
         )
 
-        buffer_df: BytesIO = self._redis.set_parquet(df=df_erp_sat)
-        self._redis.set(
+        await self._async_redis.set_df(
             key=redis_key_erp,
-            value=buffer_df,
+            df=df_erp_sat,
+            column_group_size=FRAME_COLUMN_GROUP_SIZE,
+            catalog_key=self._redis_keys.get_frame_catalog_key(),
+            task=ConciliationTask.VALIDATE_PROJECT_TYPE,
         )
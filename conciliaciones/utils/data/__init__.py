@@ -1,3 +1,8 @@
+from conciliaciones.utils.data.arrow_tables import (
+    concat_tables,
+    conform_table,
+    unify_schemas,
+)
 from conciliaciones.utils.data.normalize import (
     concatenate_data,
     normalize_date,
@@ -6,8 +11,11 @@ from conciliaciones.utils.data.normalize import (
 )
 
 __all__: list[str] = [
+    "concat_tables",
     "concatenate_data",
+    "conform_table",
     "normalize_date",
     "normalize_df",
+    "unify_schemas",
     "validate_date",
 ]
@@ -0,0 +1,68 @@
+"""
+Unión de tablas Arrow con esquemas distintos.
+
+Las tablas que se construyen por partes (las partes de un stream de Redis, los
+bloques de filas de un xlsx) pueden no tener las mismas columnas ni los mismos
+tipos. Al unirlas las columnas se juntan por nombre: las que faltan en una
+tabla quedan nulas (o con un texto de relleno) y las de tipos distintos se
+promueven al tipo común, o a texto si no lo hay.
+"""
+
+import pyarrow as pa
+
+
+def unify_schemas(schemas: list[pa.Schema]) -> pa.Schema:
+    """
+    Esquema común de varias tablas.
+
+    Las columnas conservan el orden en que aparecen por primera vez. Los tipos
+    distintos de una columna se promueven (p. ej. int64 y double a double,
+    null a cualquiera); si no son compatibles la columna pasa a texto.
+    """
+    types: dict[str, pa.DataType] = {}
+    for schema in schemas:
+        for field in schema:
+            current = types.get(field.name)
+            if current is None or current == field.type:
+                types[field.name] = field.type
+                continue
+            try:
+                types[field.name] = (
+                    pa.unify_schemas(
+                        [pa.schema([(field.name, current)]), pa.schema([field])],
+                        promote_options="permissive",
+                    )
+                    .field(0)
+                    .type
+                )
+            except (pa.ArrowTypeError, pa.ArrowInvalid):
+                types[field.name] = pa.string()
+
+    return pa.schema(list(types.items()))
+
+
+def conform_table(
+    table: pa.Table, schema: pa.Schema, missing_text: str | None = None
+) -> pa.Table:
+    """
+    Lleva una tabla al esquema común, agregando sus columnas faltantes.
+
+    missing_text: Texto de relleno de las columnas de texto faltantes; las
+        demás columnas faltantes quedan nulas.
+    """
+    columns: list[pa.ChunkedArray | pa.Array] = []
+    for field in schema:
+        if field.name in table.column_names:
+            columns.append(table.column(field.name).cast(field.type))
+        elif missing_text is not None and pa.types.is_string(field.type):
+            columns.append(pa.array([missing_text] * table.num_rows, field.type))
+        else:
+            columns.append(pa.nulls(table.num_rows, field.type))
+
+    return pa.Table.from_arrays(columns, schema=schema)
+
+
+def concat_tables(tables: list[pa.Table]) -> pa.Table:
+    """Une las tablas con su esquema común, sin metadatos"""
+    schema = unify_schemas([table.schema for table in tables])
+    return pa.concat_tables([conform_table(table, schema) for table in tables])
@@ -1,3 +1,4 @@
+from conciliaciones.utils.headers.header_registry import HeaderRegistry
 from conciliaciones.utils.headers.headers_types import HeadersTypes
 
-__all__: list[str] = ["HeadersTypes"]
+__all__: list[str] = ["HeaderRegistry", "HeadersTypes"]
@@ -0,0 +1,157 @@
+"""
+Registro de headers de una corrida.
+
+Las listas de headers (ERP, ERP final, pivotes, validaciones, tipos de
+reporte, ...) se guardan en un solo HASH de Redis por corrida
+(`RedisKeys.get_headers_registry_key`): un campo por lista, con el nombre de
+su clave y la lista serializada en JSON.
+
+El registro se descarga completo con un solo HGETALL y se conserva en memoria,
+compartido por todas las instancias de `HeadersTypes`. Cada escritura publica
+una estampa de versión nueva en `<registro>:version`, igual que los frames de
+`FrameCache`: cada consulta lee solo la estampa y vuelve a descargar el
+registro cuando no coincide con la de la copia en memoria, de modo que las
+listas que guarda otra etapa o proceso se ven en la siguiente consulta. Cada
+lista tiene además un índice por nombre de header, de modo que resolver el
+tipo, origen o rol de pivote de una columna es O(1).
+
+Las listas que una versión anterior guardó en su propia clave se leen de esa
+clave si el registro no las tiene.
+"""
+
+import json
+import threading
+from enum import Enum
+
+from k_link.extensions.report_config import HeaderConfig
+
+from conciliaciones.utils.redis.frame_cache import new_version, version_key
+from conciliaciones.utils.redis.redis_storage import RedisStorage
+
+
+def _header_serializer(obj: object) -> object:
+    if isinstance(obj, Enum):
+        return obj.value
+    if isinstance(obj, HeaderConfig):
+        return {
+            "nombre": obj.nombre,
+            "configuracion_tipo_dato": obj.configuracion_tipo_dato.value,
+            "origen": obj.origen.value,
+            "mostrar_reporte": obj.mostrar_reporte,
+        }
+    raise TypeError(f"Type {type(obj)} not serializable")
+
+
+def dump_headers(headers: list[HeaderConfig]) -> str:
+    """Serializa una lista de headers en JSON"""
+    return json.dumps(headers, default=_header_serializer)
+
+
+def parse_headers(headers_json_str: str) -> list[HeaderConfig]:
+    """Convierte una lista de headers serializada en JSON en objetos HeaderConfig"""
+    return [
+        HeaderConfig(
+            nombre=header["nombre"],
+            configuracion_tipo_dato=header["configuracion_tipo_dato"],
+            origen=header["origen"],
+            mostrar_reporte=header["mostrar_reporte"],
+        )
+        for header in json.loads(headers_json_str)
+    ]
+
+
+class HeaderRegistry:
+    _lock: threading.Lock = threading.Lock()
+    _registries: dict[str, "HeaderRegistry"] = {}
+
+    def __init__(
+        self,
+        registry_key: str,
+        lists: dict[str, list[HeaderConfig]],
+        version: str | None = None,
+    ) -> None:
+        self.registry_key = registry_key
+        self.version = version
+        self._lists = lists
+        self._indexes: dict[str, dict[str, HeaderConfig]] = {}
+
+    @classmethod
+    def load(cls, redis: RedisStorage, registry_key: str) -> "HeaderRegistry":
+        """
+        Registro de la corrida.
+
+        La copia en memoria se usa mientras su versión coincida con la de
+        Redis; si no coincide se descarga de nuevo.
+        """
+        version = redis.get(version_key(registry_key), object_type=str)
+        with cls._lock:
+            registry = cls._registries.get(registry_key)
+        if registry is not None and registry.version == version:
+            return registry
+
+        # La versión se lee antes que los campos: si cambia entre ambas
+        # lecturas, la siguiente consulta descarga de nuevo
+        fields = redis.get_fields(registry_key, object_type=str)
+        registry = cls(
+            registry_key,
+            {list_key: parse_headers(value) for list_key, value in fields.items()},
+            version=version,
+        )
+        with cls._lock:
+            cls._registries[registry_key] = registry
+        return registry
+
+    @classmethod
+    def save_list(
+        cls,
+        redis: RedisStorage,
+        registry_key: str,
+        list_key: str,
+        headers: list[HeaderConfig],
+    ) -> None:
+        """
+        Guarda una lista en el registro y publica una versión nueva.
+
+        La copia en memoria se descarta: puede no tener listas que otro proceso
+        guardó desde que se descargó.
+        """
+        redis.set_field(key=registry_key, field=list_key, value=dump_headers(headers))
+        redis.set(version_key(registry_key), new_version())
+        cls.invalidate(registry_key)
+
+    @classmethod
+    def invalidate(cls, registry_key: str | None = None) -> None:
+        """Descarta la copia en memoria de un registro (o de todos)"""
+        with cls._lock:
+            if registry_key is None:
+                cls._registries.clear()
+            else:
+                cls._registries.pop(registry_key, None)
+
+    def get_list(self, list_key: str) -> list[HeaderConfig] | None:
+        """Lista de headers guardada con `list_key` (None si no está registrada)"""
+        headers = self._lists.get(list_key)
+        return list(headers) if headers is not None else None
+
+    def put_list(self, list_key: str, headers: list[HeaderConfig]) -> None:
+        """Actualiza la copia en memoria de una lista"""
+        self._lists[list_key] = list(headers)
+        self._indexes.pop(list_key, None)
+
+    def index(self, list_key: str) -> dict[str, HeaderConfig]:
+        """
+        Headers de una lista por nombre.
+
+        Si un nombre se repite en la lista se conserva su primera aparición.
+        """
+        index = self._indexes.get(list_key)
+        if index is None:
+            index = {}
+            for header in self._lists.get(list_key, []):
+                index.setdefault(header.nombre, header)
+            self._indexes[list_key] = index
+        return index
+
+    def lookup(self, list_key: str, nombre: str) -> HeaderConfig | None:
+        """Configuración (tipo, origen) de un header de una lista"""
+        return self.index(list_key).get(nombre)
@@ -1,11 +1,12 @@
-import json
-from enum import Enum
-
 from k_link.db.core import ObjectId
 from k_link.extensions.conciliation_type import ConciliationType
 from k_link.extensions.report_config import HeaderConfig, OrigenColumna, TipoDato
 from loggerk import LoggerK
 
+from conciliaciones.utils.headers.header_registry import (
+    HeaderRegistry,
+    parse_headers,
+)
 from conciliaciones.utils.redis.redis_keys import RedisKeys
 from conciliaciones.utils.redis.redis_storage import RedisStorage
 
@@ -33,38 +34,11 @@ class HeadersTypes:
             conciliation_type=conciliation_type,
         )
 
-    @staticmethod
-    def tipo_dato_serializer(obj):
-        """
-        Serializa objetos específicos en un formato compatible con JSON.
-
-        Args:
-            obj (Any): Objeto a serializar, puede ser de tipo Enum o HeaderConfig.
-
-        Returns:
-            Any: Valor serializado del objeto. Puede ser un valor primitivo (para Enum)
-            o un diccionario con los atributos serializados (para HeaderConfig).
-
-        Raises:
-            TypeError: Si el tipo de objeto no es compatible con la serialización definida.
-        """
-
-        if isinstance(obj, Enum):
-            return obj.value
-        if isinstance(obj, HeaderConfig):
-            return {
-                "nombre": obj.nombre,
-                "configuracion_tipo_dato": obj.configuracion_tipo_dato.value,
-                "origen": obj.origen.value,
-                "mostrar_reporte": obj.mostrar_reporte,
-            }
-        raise TypeError(f"Type {type(obj)} not serializable")
-
     def _add_headers_valid(
         self,
         header_valid: str,
         pivot_k_header: str,
-        headers_pivot: list[HeaderConfig],
+        headers_pivot: dict[str, HeaderConfig],
     ) -> HeaderConfig | None:
         """
         Agrega un nuevo header de validación al listado de headers dinámicos si se encuentra un header pivote coincidente.
@@ -72,7 +46,7 @@ class HeadersTypes:
         Args:
             header_valid (str): Nombre del nuevo header de validación a agregar.
             pivot_k_header (str): Nombre del header que actúa como pivote para validar si se debe agregar el nuevo header.
-            headers_dynamic (list[HeaderConfig]): Lista de headers dinámicos donde se buscará el pivote y se agregará el nuevo header.
+            headers_pivot (dict[str, HeaderConfig]): Headers pivote por nombre (`get_headers_index`) donde se buscará el pivote.
 
         Returns:
             None
@@ -81,30 +55,24 @@ class HeadersTypes:
             Info: Si el header de validación fue añadido o si el pivote no fue encontrado.
         """
 
-        header_config = None
-        for header_dynamic in headers_pivot:
-            if header_dynamic.nombre == pivot_k_header:
-                header_config = HeaderConfig(
-                    nombre=header_valid,
-                    configuracion_tipo_dato=TipoDato.BOOLEANO,
-                    origen=OrigenColumna.VALIDACION,
-                    mostrar_reporte=True,
-                )
-
-                self._logger.info(f"Header pivot: {header_valid} añadido")
-
-                break
-
-        if header_config is None:
+        if pivot_k_header not in headers_pivot:
             self._logger.info(f"Header pivot: {header_valid} no encontrado")
+            return None
 
-        return header_config
+        self._logger.info(f"Header pivot: {header_valid} añadido")
+
+        return HeaderConfig(
+            nombre=header_valid,
+            configuracion_tipo_dato=TipoDato.BOOLEANO,
+            origen=OrigenColumna.VALIDACION,
+            mostrar_reporte=True,
+        )
 
     def _add_headers_pivot(
         self,
         header_list: list[str],
         pivote_k_header_k: str,
-        headers_erp_final: list[HeaderConfig],
+        headers_erp_final: dict[str, HeaderConfig],
         headers_pivot: list[HeaderConfig],
     ) -> None:
         """
@@ -113,8 +81,8 @@ class HeadersTypes:
         Args:
             header_list (list[str]): Lista de nombres de headers a verificar y agregar como pivotes.
             pivote_k_header_k (str): Nombre del nuevo header pivote a agregar.
-            headers_erp_final (list[HeaderConfig]): Lista de headers ERP final donde se buscarán las coincidencias.
-            headers_dynamic (list[HeaderConfig]): Lista de headers dinámicos a los cuales se añadirá el nuevo header pivote.
+            headers_erp_final (dict[str, HeaderConfig]): Headers ERP final por nombre (`get_headers_index`) donde se buscarán las coincidencias.
+            headers_pivot (list[HeaderConfig]): Lista de headers pivote a la cual se añadirá el nuevo header pivote.
 
         Returns:
             None
@@ -124,61 +92,66 @@ class HeadersTypes:
         """
 
         for header in header_list:
-            for header_erp in headers_erp_final:
-                if header_erp.nombre == header:
-                    header_dynamic = HeaderConfig(
-                        nombre=pivote_k_header_k,
-                        configuracion_tipo_dato=header_erp.configuracion_tipo_dato,
-                        origen=OrigenColumna.PIVOTE,
-                        mostrar_reporte=True,
-                    )
-                    headers_pivot.append(header_dynamic)
-
-                    self._logger.info(f"Header pivot: {header} añadido")
+            header_erp = headers_erp_final.get(header)
+            if header_erp is None:
+                self._logger.info(f"Header pivot: {header} no encontrado")
+                continue
+
+            header_dynamic = HeaderConfig(
+                nombre=pivote_k_header_k,
+                configuracion_tipo_dato=header_erp.configuracion_tipo_dato,
+                origen=OrigenColumna.PIVOTE,
+                mostrar_reporte=True,
+            )
+            headers_pivot.append(header_dynamic)
 
-                    break
+            self._logger.info(f"Header pivot: {header} añadido")
 
-            self._logger.info(f"Header pivot: {header} no encontrado")
+    @property
+    def registry(self) -> HeaderRegistry:
+        """Registro de headers de la corrida (ver `header_registry`)"""
+        return HeaderRegistry.load(
+            self.redis, self._redis_keys.get_headers_registry_key()
+        )
 
     def get_headers_list(self, redis_key: str) -> list[HeaderConfig]:
         """
-        Recupera los headers dinámicos desde una clave en Redis y los convierte en objetos HeaderConfig.
+        Recupera una lista de headers del registro de la corrida.
 
         Returns:
-            list[HeaderConfig]: Lista de objetos HeaderConfig que representan los headers dinámicos obtenidos desde Redis.
-
-        Raises:
-            ValueError: Si la lista de headers dinámicos en Redis está vacía.
+            list[HeaderConfig]: Lista de objetos HeaderConfig guardada con `redis_key`; vacía si no existe.
 
         Logs:
-            Info: El número de columnas dinámicas obtenidas y la lista completa de headers dinámicos.
+            Info: El número de columnas obtenidas y la lista completa de headers.
         """
 
-        headers_json_str = self.redis.get(key=redis_key, object_type=str)
-
         self._logger.info(f"Lista de headers: {redis_key}")
 
-        if headers_json_str is None:
-            return []
-
-        headers_json: dict = json.loads(headers_json_str)
+        registry = self.registry
+        headers_list: list[HeaderConfig] | None = registry.get_list(redis_key)
 
-        headers_list: list[HeaderConfig] = []
-
-        for header in headers_json:
-            header_config = HeaderConfig(
-                nombre=header["nombre"],
-                configuracion_tipo_dato=header["configuracion_tipo_dato"],
-                origen=header["origen"],
-                mostrar_reporte=header["mostrar_reporte"],
-            )
-            headers_list.append(header_config)
+        if headers_list is None:
+            # Lista guardada en su propia clave por una versión anterior
+            headers_json_str = self.redis.get(key=redis_key, object_type=str)
+            if headers_json_str is None:
+                return []
+            headers_list = parse_headers(headers_json_str)
+            registry.put_list(redis_key, headers_list)
 
         self._logger.info(f"Numero de columnas obtenidas: {len(headers_list)}")
         self._logger.info(f"Headers: {headers_list}")
 
         return headers_list
 
+    def get_headers_index(self, redis_key: str) -> dict[str, HeaderConfig]:
+        """
+        Headers de una lista por nombre, para resolver una columna en O(1).
+
+        Si un nombre se repite en la lista se conserva su primera aparición.
+        """
+        self.get_headers_list(redis_key)
+        return self.registry.index(redis_key)
+
     async def save_redis_headers_list(
         self, redis_key: str, headers_list: list[HeaderConfig]
     ):
@@ -195,25 +168,10 @@ class HeadersTypes:
             Info: El número de columnas ERP guardadas y la lista completa de headers ERP.
         """
 
-        # Serializamos a JSON y lo almacenamos en Redis
-        headers_json = [
-            {
-                "nombre": h.nombre,
-                "configuracion_tipo_dato": h.configuracion_tipo_dato,
-                "origen": h.origen,
-                "mostrar_reporte": h.mostrar_reporte,
-            }
-            for h in headers_list
-        ]
-        headers_json = json.dumps(
-            headers_list, default=HeadersTypes.tipo_dato_serializer
-        )
-
         self._logger.info(f"Numero de columnas guardadas: {len(headers_list)}")
         self._logger.info(f"Headers: {headers_list}")
 
-        # Se guarda lista de headers erp en redis
-        self.redis.set(key=redis_key, value=headers_json)
+        self._save_registry_list(redis_key=redis_key, headers_list=headers_list)
 
     def save_redis_report_types(
         self, name_report_type: str, headers_report_type: list[HeaderConfig]
@@ -233,24 +191,22 @@ class HeadersTypes:
             name_report_type=name_report_type
         )
 
-        # Serializamos a JSON
-        headers_sat_json = [
-            {
-                "nombre": h.nombre,
-                "configuracion_tipo_dato": h.configuracion_tipo_dato,
-                "origen": h.origen,
-                "mostrar_reporte": h.mostrar_reporte,
-            }
-            for h in headers_report_type
-        ]
-        headers_sat_json = json.dumps(
-            headers_report_type, default=HeadersTypes.tipo_dato_serializer
-        )
-
         self._logger.info(
             f"Numero de columnas {name_report_type} guardadas: {len(headers_report_type)}"
         )
         self._logger.info(f"{name_report_type} headers: {headers_report_type}")
 
-        # Se guarda lista de dynamic headers en redis
-        self.redis.set(key=redis_key_headers_sat, value=headers_sat_json)
+        self._save_registry_list(
+            redis_key=redis_key_headers_sat, headers_list=headers_report_type
+        )
+
+    def _save_registry_list(
+        self, redis_key: str, headers_list: list[HeaderConfig]
+    ) -> None:
+        """Guarda una lista en el registro de la corrida"""
+        HeaderRegistry.save_list(
+            self.redis,
+            self._redis_keys.get_headers_registry_key(),
+            list_key=redis_key,
+            headers=headers_list,
+        )
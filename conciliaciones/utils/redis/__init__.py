@@ -1,4 +1,39 @@
+from conciliaciones.utils.redis.async_redis_storage import AsyncRedisStorage
+from conciliaciones.utils.redis.connection_pool import RedisPoolRegistry, RedisPoolStats
+from conciliaciones.utils.redis.frame_cache import FrameCache, FrameCacheStats
+from conciliaciones.utils.redis.frame_catalog import FrameCatalogEntry, FrameColumn
+from conciliaciones.utils.redis.frame_compression import CompressionPolicy
+from conciliaciones.utils.redis.io_metrics import (
+    KeyIOStats,
+    StorageMetrics,
+    storage_stage,
+)
+from conciliaciones.utils.redis.redis_batch import RedisBatch
 from conciliaciones.utils.redis.redis_keys import Keys, RedisKeys
 from conciliaciones.utils.redis.redis_storage import RedisStorage
+from conciliaciones.utils.redis.run_collector import (
+    FamilyMemoryUsage,
+    RedisRunCollector,
+    RunMemoryReport,
+)
 
-__all__: list[str] = ["Keys", "RedisKeys", "RedisStorage"]
+__all__: list[str] = [
+    "AsyncRedisStorage",
+    "CompressionPolicy",
+    "FamilyMemoryUsage",
+    "FrameCache",
+    "FrameCacheStats",
+    "FrameCatalogEntry",
+    "FrameColumn",
+    "KeyIOStats",
+    "Keys",
+    "RedisBatch",
+    "RedisKeys",
+    "RedisPoolRegistry",
+    "RedisPoolStats",
+    "RedisRunCollector",
+    "RedisStorage",
+    "RunMemoryReport",
+    "StorageMetrics",
+    "storage_stage",
+]
@@ -0,0 +1,763 @@
+import asyncio
+import weakref
+from collections.abc import AsyncIterator, Iterator
+from functools import partial
+from typing import Any, Literal, TypeVar
+
+import pyarrow as pa
+import redis
+import redis.asyncio
+from k_link.tools import env
+from loggerk import LoggerK
+from pandas import DataFrame
+
+from conciliaciones.models.proceso_conciliacion import ConciliationTask
+from conciliaciones.utils.redis.connection_pool import RedisPoolRegistry
+from conciliaciones.utils.redis.frame_blobs import (
+    blob_key,
+    blob_refs_key,
+    blob_size_key,
+    table_digest,
+)
+from conciliaciones.utils.redis.frame_cache import FrameCache, new_version, version_key
+from conciliaciones.utils.redis.frame_catalog import (
+    FrameCatalogEntry,
+    append_catalog_entry,
+    build_catalog_entry,
+    current_catalog_entry,
+    parse_catalog,
+    update_catalog_entry,
+)
+from conciliaciones.utils.redis.frame_codec import (
+    FLAG_MANIFEST,
+    FRAME_HEAD_SIZE,
+    HEADER_SIZE,
+    decode_schema,
+    decode_table,
+    encode_reference,
+    encode_table,
+    frame_flags,
+    reference_target,
+    schema_prefix_size,
+    select_columns,
+)
+from conciliaciones.utils.redis.frame_compression import (
+    FrameCompression,
+)
+from conciliaciones.utils.redis.frame_shards import (
+    append_column_shards,
+    assemble_chunk_payloads,
+    concat_chunks,
+    iter_frame_payloads,
+    manifest_num_rows,
+    manifest_shards,
+    projected_indices,
+    required_chunks,
+    single_frame_manifest,
+)
+from conciliaciones.utils.redis.frame_spill import (
+    encode_pointer,
+    file_pointer,
+    handoff_enabled,
+    handoff_key,
+    read_handoff_file,
+    remove_spill_file,
+    spill_threshold,
+    write_handoff_file,
+    write_spill_file,
+)
+from conciliaciones.utils.redis.frame_stream import (
+    STREAM_PAGE_SIZE,
+    concat_stream_tables,
+    stream_key,
+    with_missing_text,
+)
+from conciliaciones.utils.redis.frame_writes import (
+    PayloadBatches,
+    RedisPipeline,
+    dedup_enabled,
+    encode_shards,
+    is_manifest,
+    manifest_shard_keys,
+    needs_rewrite,
+    prepare_table,
+    queue_blob_ref,
+    queue_blob_refresh,
+    queue_catalog_entry,
+    queue_kept_shard_sizes,
+    queue_manifest,
+    queue_version,
+)
+from conciliaciones.utils.redis.io_metrics import (
+    StorageMetrics,
+    add_payload_bytes,
+    mark_cache_hit,
+)
+from conciliaciones.utils.redis.null_normalization import normalize_table
+from conciliaciones.utils.redis.redis_keys import (
+    RedisKeys,
+    legacy_key,
+    with_legacy_keys,
+)
+from conciliaciones.utils.redis.redis_storage import (
+    FRAME_CHUNK_SIZE_BYTES,
+    RedisStorage,
+)
+
+T = TypeVar("T")
+
+
+class AsyncRedisStorage:
+    """
+    Versión asyncio de `RedisStorage` sobre `redis.asyncio`.
+
+    Expone la misma API (`get`, `set`, `get_df`, `set_df`, ...) como corrutinas.
+    La codificación y decodificación de frames, que consumen CPU, se ejecutan en
+    el executor de hilos para que la red de Redis se solape con otras
+    peticiones del event loop (KReports, Kore). Comparte con `RedisStorage` los
+    pasos de escritura (ver `frame_writes`), las estampas de versión y la caché
+    de frames del proceso.
+    """
+
+    def __init__(self, url: str | None = None) -> None:
+        self._logger = LoggerK(self.__class__.__name__)
+        self._url: str = url or env.get("REDIS_URL") or "redis://redis:6379/0"
+        self._clients: weakref.WeakKeyDictionary[
+            asyncio.AbstractEventLoop, redis.asyncio.StrictRedis
+        ] = weakref.WeakKeyDictionary()
+
+    @property
+    def _client(self) -> redis.asyncio.StrictRedis:
+        """Cliente compartido del event loop en ejecución (ver `RedisPoolRegistry`)"""
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None:
+            client = RedisPoolRegistry.get_async_client(url=self._url)
+            self._clients[loop] = client
+        return client
+
+    async def set(self, key: str, value: object) -> None:
+        """Establece el valor asociado a una clave"""
+        with StorageMetrics.measure(key, "set"):
+            serialized_object = await asyncio.to_thread(RedisStorage._serialize, value)
+            add_payload_bytes(len(serialized_object))
+            pipeline = self._client.pipeline(transaction=False)
+            pipeline.set(
+                name=key, value=serialized_object, ex=RedisKeys.ttl_for_key(key)
+            )
+            pipeline.delete(version_key(key))
+            await pipeline.execute()
+            FrameCache.invalidate(self._url, key)
+
+    async def get(
+        self,
+        key: str,
+        object_type: type[T] = type[Any],
+    ) -> T | None:
+        """Obtiene el valor asociado a una clave
+
+        Si la clave no existe, retorna None
+        """
+        with StorageMetrics.measure(key, "get"):
+            serialized_object = await self._client.get(key)
+            if serialized_object is None and legacy_key(key) is not None:
+                # Clave escrita con el layout original (ver `redis_keys`)
+                serialized_object = await self._client.get(legacy_key(key))
+            if serialized_object is None:
+                return None
+            add_payload_bytes(len(serialized_object))
+
+            return await asyncio.to_thread(
+                RedisStorage._deserialize, serialized_object, object_type
+            )
+
+    async def delete(self, key: str) -> None:
+        """Eliminar Clave en Redis, incluyendo los shards si es un frame particionado"""
+        legacy = legacy_key(key)
+        if legacy is not None:
+            await self.delete(legacy)
+
+        pipeline = self._client.pipeline(transaction=False)
+        pipeline.getrange(key, 0, FRAME_HEAD_SIZE - 1)
+        pipeline.get(handoff_key(key))
+        head, handoff = await pipeline.execute()
+
+        shard_keys = await self._get_shard_keys(key, head=head)
+        await self._client.delete(
+            key, version_key(key), handoff_key(key), stream_key(key), *shard_keys
+        )
+        FrameCache.invalidate(self._url, key)
+        await self._release_payload(head, key)
+        remove_spill_file(file_pointer(handoff))
+
+    async def delete_keys(self, *keys: str) -> None:
+        """Eliminar Clave en Redis"""
+        keys = with_legacy_keys(keys)
+        pipeline = self._client.pipeline(transaction=False)
+        for key in keys:
+            pipeline.getrange(key, 0, FRAME_HEAD_SIZE - 1)
+            pipeline.get(handoff_key(key))
+        heads = await pipeline.execute()
+
+        await self._client.delete(
+            *keys,
+            *map(version_key, keys),
+            *map(handoff_key, keys),
+            *map(stream_key, keys),
+        )
+        FrameCache.invalidate(self._url, *keys)
+        for key, head, handoff in zip(keys, heads[::2], heads[1::2], strict=True):
+            await self._release_payload(head, key)
+            remove_spill_file(file_pointer(handoff))
+
+    async def set_df(  # noqa: PLR0913
+        self,
+        key: str,
+        df: DataFrame,
+        *,
+        compression: FrameCompression = "auto",
+        column_group_size: int | None = None,
+        chunk_size_bytes: int = FRAME_CHUNK_SIZE_BYTES,
+        catalog_key: str | None = None,
+        task: ConciliationTask | None = None,
+        dedup: bool | None = None,
+        handoff: bool = False,
+    ) -> int:
+        """
+        Guarda un DataFrame en Redis como frame Arrow IPC (ver `RedisStorage.set_df`).
+
+        Cada frame se codifica en el executor de hilos y se envía en pipelines
+        por lotes.
+        """
+        with StorageMetrics.measure(key, "set", task=task):
+            table, codec = await asyncio.to_thread(prepare_table, df, compression, key)
+            ttl = RedisKeys.ttl_for_key(key)
+            pipeline = self._client.pipeline(transaction=False)
+            pipeline.getrange(key, 0, FRAME_HEAD_SIZE - 1)
+            pipeline.get(handoff_key(key))
+            head, previous_handoff = await pipeline.execute()
+            stale_shard_keys: set[str] = set(await self._get_shard_keys(key, head=head))
+            previous_blob = reference_target(head)
+
+            version = new_version()
+            handoff_pointer = (
+                await asyncio.to_thread(write_handoff_file, table, key, version, ttl)
+                if handoff_enabled(handoff)
+                else None
+            )
+
+            pipeline = self._client.pipeline(transaction=False)
+            target: str | None = None
+            threshold = spill_threshold()
+            frames = partial(
+                iter_frame_payloads,
+                table,
+                compression=codec,
+                column_group_size=column_group_size,
+                chunk_size_bytes=chunk_size_bytes,
+            )
+
+            if threshold is not None and table.nbytes >= threshold:
+                pointer = await asyncio.to_thread(write_spill_file, table, key)
+                payload_size = pointer.payload_bytes
+                pipeline.set(name=key, value=encode_pointer(pointer), ex=ttl)
+            elif dedup_enabled(dedup):
+                target = blob_key(await asyncio.to_thread(table_digest, table))
+                payload_size = await self._store_blob(
+                    target, key, frames(key=target), ttl=ttl
+                )
+                pipeline.set(name=key, value=encode_reference(target), ex=ttl)
+            else:
+                payload_size, frame_keys = await self._write_payloads(
+                    pipeline, frames(key=key), ttl=ttl
+                )
+                stale_shard_keys.difference_update(frame_keys)
+
+            # El frame reemplaza al stream que hubiera en la clave
+            pipeline.delete(stream_key(key), *stale_shard_keys)
+
+            if catalog_key is not None:
+                queue_catalog_entry(
+                    pipeline,
+                    catalog_key,
+                    build_catalog_entry(
+                        key, table, payload_size, task=task, version=version
+                    ),
+                )
+
+            queue_version(pipeline, key, version, ttl, handoff_pointer)
+            await pipeline.execute()
+            FrameCache.invalidate(self._url, key)
+            remove_spill_file(file_pointer(previous_handoff))
+
+            if previous_blob != target:
+                await self._release_blob(previous_blob, key)
+            remove_spill_file(file_pointer(head))
+
+            add_payload_bytes(payload_size)
+            return payload_size
+
+    async def _write_payloads(
+        self,
+        pipeline: RedisPipeline,
+        frames: Iterator[tuple[str, pa.Buffer]],
+        ttl: int | None,
+    ) -> tuple[int, list[str]]:
+        """
+        Agrega al pipeline los frames de una tabla, enviándolo por lotes.
+
+        Los frames se codifican en el executor de hilos; el último lote queda
+        pendiente en el pipeline.
+        """
+        batches = PayloadBatches(pipeline, frames, ttl=ttl)
+        while await asyncio.to_thread(batches.fill):
+            await pipeline.execute()
+
+        return batches.payload_size, batches.frame_keys
+
+    async def _store_blob(
+        self,
+        target: str,
+        key: str,
+        frames: Iterator[tuple[str, pa.Buffer]],
+        ttl: int | None,
+    ) -> int:
+        """Registra `key` como referencia del blob y lo escribe si aún no existe"""
+        transaction = self._client.pipeline(transaction=True)
+        queue_blob_ref(transaction, target, key, ttl)
+        stored_size = (await transaction.execute())[-1]
+
+        pipeline = self._client.pipeline(transaction=False)
+        if stored_size is not None:
+            # Frame idéntico ya guardado: solo se renueva su vigencia
+            if ttl is not None:
+                shard_keys = await self._get_shard_keys(target)
+                queue_blob_refresh(pipeline, target, shard_keys, ttl)
+                await pipeline.execute()
+            return int(stored_size)
+
+        payload_size, _ = await self._write_payloads(pipeline, frames, ttl=ttl)
+        pipeline.set(name=blob_size_key(target), value=payload_size, ex=ttl)
+        await pipeline.execute()
+
+        return payload_size
+
+    async def _release_payload(self, head: bytes | None, key: str) -> None:
+        """Libera el blob o el archivo de desborde de un frame eliminado"""
+        await self._release_blob(reference_target(head), key)
+        remove_spill_file(file_pointer(head))
+
+    async def _release_blob(self, target: str | None, key: str) -> None:
+        """Descuenta `key` de las referencias del blob (ver `RedisStorage`)"""
+        if target is None:
+            return
+
+        refs_key = blob_refs_key(target)
+        await self._client.srem(refs_key, key)
+
+        async with self._client.pipeline(transaction=True) as transaction:
+            try:
+                await transaction.watch(refs_key)
+                if await transaction.scard(refs_key):
+                    return
+                shard_keys = await self._get_shard_keys(target)
+                transaction.multi()
+                transaction.unlink(target, blob_size_key(target), *shard_keys)
+                await transaction.execute()
+            except redis.WatchError:
+                self._logger.info(f"Blob {target} referenciado de nuevo, se conserva")
+
+    async def set_columns(
+        self,
+        key: str,
+        df: DataFrame,
+        compression: FrameCompression = "auto",
+        catalog_key: str | None = None,
+        task: ConciliationTask | None = None,
+    ) -> int:
+        """Agrega o reemplaza columnas de un frame (ver `RedisStorage.set_columns`)"""
+        with StorageMetrics.measure(key, "set", task=task):
+            pipeline = self._client.pipeline(transaction=False)
+            pipeline.getrange(key, 0, FRAME_HEAD_SIZE - 1)
+            pipeline.get(handoff_key(key))
+            pipeline.exists(stream_key(key))
+            head, previous_handoff, is_stream = await pipeline.execute()
+            if not head and not is_stream:
+                raise ValueError(f"No existe el frame con la clave: {key}")
+
+            if needs_rewrite(head):
+                df_full: DataFrame = await self.get_df(redis_key=key)  # type: ignore
+                for col in df.columns:
+                    df_full[col] = df[col].array
+                return await self.set_df(
+                    key=key,
+                    df=df_full,
+                    compression=compression,
+                    catalog_key=catalog_key,
+                    task=task,
+                )
+
+            rename_payload = not is_manifest(head)
+            if rename_payload:
+                schema = await self._single_frame_manifest_schema(key, head)
+            else:
+                schema = await self._get_manifest_schema(await self._client.get(key))
+
+            table, codec = await asyncio.to_thread(prepare_table, df, compression, key)
+            ttl = RedisKeys.ttl_for_key(key)
+            update = await asyncio.to_thread(
+                append_column_shards, schema, key=key, table=table
+            )
+
+            pipeline = self._client.pipeline(transaction=False)
+            batches = PayloadBatches(
+                pipeline, encode_shards(update.new_shards, codec), ttl
+            )
+            while await asyncio.to_thread(batches.fill):
+                await pipeline.execute()
+            await pipeline.execute()
+
+            transaction = self._client.pipeline(transaction=True)
+            payload_size = batches.payload_size + await asyncio.to_thread(
+                queue_manifest, transaction, key, update, rename_payload, ttl
+            )
+
+            version = new_version()
+            if catalog_key is not None:
+                pipeline = self._client.pipeline(transaction=False)
+                queue_kept_shard_sizes(pipeline, key, update, rename_payload)
+                kept_sizes: list[int] = await pipeline.execute()
+                entry = update_catalog_entry(
+                    await self.get_frame_entry(catalog_key, key),
+                    key=key,
+                    schema=update.manifest.schema,
+                    num_rows=manifest_num_rows(manifest_shards(update.manifest.schema)),
+                    payload_bytes=sum(kept_sizes) + payload_size,
+                    table=table,
+                    task=task,
+                    version=version,
+                )
+                queue_catalog_entry(transaction, catalog_key, entry)
+
+            # El handoff quedó desactualizado: los lectores usan Redis
+            queue_version(transaction, key, version, ttl)
+            await transaction.execute()
+            FrameCache.invalidate(self._url, key)
+            remove_spill_file(file_pointer(previous_handoff))
+
+            add_payload_bytes(payload_size)
+            return payload_size
+
+    async def get_df(
+        self,
+        redis_key: str,
+        engine: Literal["auto", "pyarrow", "fastparquet"] = "pyarrow",
+        columns: list[str] | None = None,
+        normalize: bool = True,
+    ) -> DataFrame | None:
+        """Recupera un DataFrame desde Redis (ver `RedisStorage.get_df`)"""
+        with StorageMetrics.measure(redis_key, "get"):
+            if engine == "fastparquet":
+                payload = await self._resolve_reference(
+                    await self._client.get(redis_key)
+                )
+                if payload is None:
+                    legacy = legacy_key(redis_key)
+                    if legacy is None:
+                        return None
+                    return await self.get_df(legacy, engine, columns, normalize)
+                return await asyncio.to_thread(
+                    RedisStorage._payload_to_df, payload, engine, columns, normalize
+                )
+
+            table = await self._get_table(redis_key, columns, normalize=normalize)
+            if table is None:
+                return None
+
+            if normalize:
+                return await asyncio.to_thread(
+                    RedisStorage._normalized_table_to_df, table
+                )
+            return await asyncio.to_thread(RedisStorage._table_to_df, table, False)
+
+    async def append_frame(  # noqa: PLR0913
+        self,
+        key: str,
+        df: DataFrame,
+        *,
+        compression: FrameCompression = "auto",
+        missing_text: str | None = None,
+        catalog_key: str | None = None,
+        task: ConciliationTask | None = None,
+    ) -> int:
+        """Agrega una parte al stream de la clave (ver `RedisStorage.append_frame`)"""
+        with StorageMetrics.measure(key, "set", task=task):
+            table, codec = await asyncio.to_thread(prepare_table, df, compression, key)
+            table = with_missing_text(table, missing_text)
+            frame = await asyncio.to_thread(encode_table, table, compression=codec)
+            add_payload_bytes(frame.size)
+
+            ttl = RedisKeys.ttl_for_key(key)
+            previous = (
+                await self.get_frame_entry(catalog_key, key) if catalog_key else None
+            )
+
+            pipeline = self._client.pipeline(transaction=False)
+            version = new_version()
+            pipeline.rpush(stream_key(key), memoryview(frame))
+            if ttl is not None:
+                pipeline.expire(stream_key(key), ttl)
+            pipeline.set(name=version_key(key), value=version, ex=ttl)
+            parts = (await pipeline.execute())[0]
+
+            if catalog_key is not None:
+                # Una lista nueva empieza un stream: la entrada anterior (de un
+                # stream vencido o de un frame de `set_df`) no se acumula
+                entry = append_catalog_entry(
+                    previous if parts > 1 else None,
+                    key,
+                    table,
+                    frame.size,
+                    task,
+                    version=version,
+                )
+                pipeline = self._client.pipeline(transaction=False)
+                queue_catalog_entry(pipeline, catalog_key, entry)
+                await pipeline.execute()
+            FrameCache.invalidate(self._url, key)
+
+            return parts
+
+    def iter_stream(self, key: str, start: int = 0) -> AsyncIterator[pa.Table]:
+        """Lee las partes de un stream (ver `RedisStorage.iter_stream`)"""
+        return StorageMetrics.measure_aiter(key, self._iter_stream(key, start))
+
+    async def _iter_stream(self, key: str, start: int) -> AsyncIterator[pa.Table]:
+        while True:
+            payloads = await self._client.lrange(
+                stream_key(key), start, start + STREAM_PAGE_SIZE - 1
+            )
+            add_payload_bytes(sum(len(payload) for payload in payloads))
+            for payload in payloads:
+                yield await asyncio.to_thread(decode_table, payload)
+            if len(payloads) < STREAM_PAGE_SIZE:
+                return
+            start += STREAM_PAGE_SIZE
+
+    async def _get_stream_table(self, key: str) -> pa.Table | None:
+        parts = [part async for part in self._iter_stream(key, start=0)]
+        if not parts:
+            return None
+        return await asyncio.to_thread(concat_stream_tables, parts)
+
+    async def get_frame_entry(
+        self, catalog_key: str, key: str
+    ) -> FrameCatalogEntry | None:
+        """Esquema y estadísticas de un frame (ver `RedisStorage.get_frame_entry`)"""
+        pipeline = self._client.pipeline(transaction=False)
+        pipeline.hget(catalog_key, key)
+        pipeline.get(version_key(key))
+        raw_entry, version = await pipeline.execute()
+        return current_catalog_entry(raw_entry, version)
+
+    async def get_frame_schema(self, catalog_key: str, key: str) -> DataFrame | None:
+        """Columnas y dtypes de un frame (ver `RedisStorage.get_frame_schema`)"""
+        entry = await self.get_frame_entry(catalog_key, key)
+        if entry is None:
+            return None
+        return RedisStorage._table_to_df(entry.schema.empty_table(), normalize=True)
+
+    async def get_frame_catalog(self, catalog_key: str) -> list[FrameCatalogEntry]:
+        """Frames vigentes del catálogo de una corrida, de mayor a menor"""
+        raw_entries: dict[bytes, bytes] = await self._client.hgetall(catalog_key)
+        pipeline = self._client.pipeline(transaction=False)
+        for key in raw_entries:
+            pipeline.get(version_key(key.decode("utf-8")))
+        return parse_catalog(list(raw_entries.values()), await pipeline.execute())
+
+    async def get_table(
+        self,
+        redis_key: str,
+        columns: list[str] | None = None,
+    ) -> pa.Table | None:
+        """Recupera un frame como tabla Arrow (ver `RedisStorage.get_table`)"""
+        return await self._get_table(redis_key, columns, normalize=False)
+
+    async def _get_table(
+        self,
+        redis_key: str,
+        columns: list[str] | None,
+        normalize: bool,
+    ) -> pa.Table | None:
+        with StorageMetrics.measure(redis_key, "get"):
+            version, handoff = await self._client.mget(
+                version_key(redis_key), handoff_key(redis_key)
+            )
+            if normalize:
+                table = FrameCache.get(self._url, redis_key, version, normalized=True)
+                if table is not None:
+                    mark_cache_hit()
+                    return select_columns(table, columns)
+
+            table = FrameCache.get(self._url, redis_key, version)
+            if table is None:
+                table = await asyncio.to_thread(read_handoff_file, handoff, version)
+            if table is not None:
+                mark_cache_hit()
+            else:
+                payload = await self._resolve_reference(
+                    await self._client.get(redis_key)
+                )
+                if payload is None:
+                    table = await self._get_stream_table(redis_key)
+                    if table is None:
+                        legacy = legacy_key(redis_key)
+                        if legacy is None:
+                            return None
+                        return await self._get_table(legacy, columns, normalize)
+                elif frame_flags(payload) & FLAG_MANIFEST:
+                    if columns is not None:
+                        # Lectura parcial: no se guarda en caché
+                        table = await self._get_sharded_table(payload, columns=columns)
+                        if normalize:
+                            return await asyncio.to_thread(normalize_table, table)
+                        return table
+                    table = await self._get_sharded_table(payload, columns=None)
+                else:
+                    table = await asyncio.to_thread(
+                        RedisStorage._payload_to_table, payload, None
+                    )
+
+                FrameCache.put(self._url, redis_key, version, table)
+
+            if normalize:
+                return await asyncio.to_thread(
+                    RedisStorage._normalize_cached,
+                    self._url,
+                    redis_key,
+                    version,
+                    table,
+                    columns,
+                )
+            return select_columns(table, columns)
+
+    def iter_batches(
+        self,
+        redis_key: str,
+        columns: list[str] | None = None,
+    ) -> AsyncIterator[pa.RecordBatch]:
+        """Lee un frame como record batches (ver `RedisStorage.iter_batches`)"""
+        return StorageMetrics.measure_aiter(
+            redis_key, self._iter_batches(redis_key, columns=columns)
+        )
+
+    async def _iter_batches(
+        self, redis_key: str, columns: list[str] | None
+    ) -> AsyncIterator[pa.RecordBatch]:
+        version, handoff = await self._client.mget(
+            version_key(redis_key), handoff_key(redis_key)
+        )
+        table = FrameCache.get(self._url, redis_key, version)
+        if table is None:
+            table = await asyncio.to_thread(read_handoff_file, handoff, version)
+        if table is not None:
+            mark_cache_hit()
+            for batch in select_columns(table, columns).to_batches():
+                yield batch
+            return
+
+        payload = await self._resolve_reference(await self._client.get(redis_key))
+        if payload is None:
+            parts = 0
+            async for part in self._iter_stream(redis_key, start=0):
+                parts += 1
+                for batch in select_columns(part, columns).to_batches():
+                    yield batch
+            legacy = legacy_key(redis_key)
+            if not parts and legacy is not None:
+                async for batch in self._iter_batches(legacy, columns):
+                    yield batch
+            return
+
+        if frame_flags(payload) & FLAG_MANIFEST:
+            async for chunk_table in self._iter_sharded_chunks(payload, columns):
+                for batch in chunk_table.to_batches():
+                    yield batch
+            return
+
+        table = await asyncio.to_thread(
+            RedisStorage._payload_to_table, payload, columns
+        )
+        for batch in table.to_batches():
+            yield batch
+
+    async def _get_sharded_table(
+        self, manifest_payload: bytes, columns: list[str] | None
+    ) -> pa.Table:
+        schema = await self._get_manifest_schema(manifest_payload)
+        indices = projected_indices(schema, columns)
+
+        chunk_tables = [
+            chunk_table
+            async for chunk_table in self._iter_sharded_chunks(
+                manifest_payload, columns
+            )
+        ]
+        return await asyncio.to_thread(
+            concat_chunks, schema, indices, iter(chunk_tables)
+        )
+
+    async def _iter_sharded_chunks(
+        self, manifest_payload: bytes, columns: list[str] | None
+    ) -> AsyncIterator[pa.Table]:
+        """Descarga los shards necesarios bloque por bloque, un MGET por bloque"""
+        schema = await self._get_manifest_schema(manifest_payload)
+        indices = projected_indices(schema, columns)
+
+        for shards in required_chunks(manifest_shards(schema), indices):
+            payloads = (
+                await self._client.mget([shard["key"] for shard in shards])
+                if shards
+                else []
+            )
+            add_payload_bytes(sum(len(payload) for payload in payloads if payload))
+            yield await asyncio.to_thread(
+                assemble_chunk_payloads, schema, indices, shards, payloads
+            )
+
+    async def _resolve_reference(self, payload: bytes | None) -> bytes | None:
+        """Payload del blob si `payload` es una referencia (ver `frame_blobs`)"""
+        target = reference_target(payload)
+        if target is not None:
+            payload = await self._client.get(target)
+        if payload is not None:
+            add_payload_bytes(len(payload))
+        return payload
+
+    async def _get_shard_keys(self, key: str, head: bytes | None = None) -> list[str]:
+        """Claves de los shards de un frame particionado (vacío en otro caso)"""
+        header = (
+            head
+            if head is not None
+            else await self._client.getrange(key, 0, HEADER_SIZE - 1)
+        )
+        if not is_manifest(header):
+            return []
+
+        return await asyncio.to_thread(manifest_shard_keys, await self._client.get(key))
+
+    async def _single_frame_manifest_schema(self, key: str, head: bytes) -> pa.Schema:
+        """Esquema del manifiesto de un frame no particionado (ver `RedisStorage`)"""
+        prefix_size = schema_prefix_size(head)
+        if prefix_size > len(head):
+            head = await self._client.getrange(key, 0, prefix_size - 1)
+        schema, num_rows = decode_schema(head)
+        if num_rows is None:
+            table: pa.Table = await self.get_table(key)  # type: ignore
+            schema, num_rows = table.schema, table.num_rows
+        return single_frame_manifest(schema, num_rows, key=key).schema
+
+    @staticmethod
+    async def _get_manifest_schema(manifest_payload: bytes) -> pa.Schema:
+        """Esquema completo de un frame particionado, decodificado fuera del loop"""
+        return (await asyncio.to_thread(decode_table, manifest_payload)).schema
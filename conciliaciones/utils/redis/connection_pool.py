@@ -0,0 +1,200 @@
+"""
+Registro de pools de conexiones Redis compartidos por proceso.
+
+Todas las instancias de `RedisStorage` de un proceso toman prestadas sus
+conexiones de un pool por destino (URL o host/port/db), de modo que crear una
+instancia no abre un socket nuevo y destruirla no lo cierra. `AsyncRedisStorage`
+comparte un cliente asyncio (con su pool) por destino y por event loop.
+
+Con REDIS_CLUSTER=true el destino es un Redis Cluster: se comparte un cliente
+de cluster por destino (y por event loop), que mantiene su propio pool por
+nodo. Las operaciones multi-clave de una corrida requieren el layout de claves
+con etiqueta `{run}` (REDIS_KEY_LAYOUT=2, ver `redis_keys`).
+
+Configuración por variables de entorno:
+    - REDIS_POOL_MAX_CONNECTIONS: Conexiones máximas por pool (default 50).
+    - REDIS_POOL_TIMEOUT: Segundos de espera por una conexión libre (default 20).
+    - REDIS_HEALTH_CHECK_INTERVAL: Segundos de inactividad tras los cuales se
+      valida la conexión con PING antes de usarla (default 30).
+    - REDIS_CLUSTER: "true" si el destino es un Redis Cluster.
+"""
+
+import asyncio
+import threading
+import weakref
+
+import redis
+import redis.asyncio
+from k_link.tools import env
+from loggerk import LoggerK
+from pydantic import BaseModel
+
+
+class RedisPoolStats(BaseModel):
+    target: str
+    max_connections: int
+    created_connections: int
+    available_connections: int
+    in_use_connections: int
+    # Clientes entregados por `get_client`; comparten las conexiones del pool
+    clients_created: int
+
+
+class RedisPoolRegistry:
+    _logger: LoggerK | None = None
+    _lock: threading.Lock = threading.Lock()
+    _pools: dict[str, redis.BlockingConnectionPool] = {}
+    _clients_created: dict[str, int] = {}
+    _clusters: dict[str, redis.RedisCluster] = {}
+    # Los clientes asyncio y sus pools quedan ligados al event loop que los crea
+    _async_clients: weakref.WeakKeyDictionary[
+        asyncio.AbstractEventLoop, dict[str, redis.asyncio.StrictRedis]
+    ] = weakref.WeakKeyDictionary()
+    _async_clusters: weakref.WeakKeyDictionary[
+        asyncio.AbstractEventLoop, dict[str, redis.asyncio.RedisCluster]
+    ] = weakref.WeakKeyDictionary()
+
+    @classmethod
+    def _get_logger(cls) -> LoggerK:
+        if cls._logger is None:
+            cls._logger = LoggerK(cls.__name__)
+        return cls._logger
+
+    @staticmethod
+    def _settings() -> dict:
+        return {
+            "max_connections": int(env.get("REDIS_POOL_MAX_CONNECTIONS") or 50),
+            "timeout": int(env.get("REDIS_POOL_TIMEOUT") or 20),
+            "health_check_interval": int(env.get("REDIS_HEALTH_CHECK_INTERVAL") or 30),
+            "socket_keepalive": True,
+        }
+
+    @classmethod
+    def _cluster_settings(cls) -> dict:
+        # El cliente de cluster no espera por conexiones libres
+        settings = cls._settings()
+        settings.pop("timeout")
+        return settings
+
+    @staticmethod
+    def is_cluster() -> bool:
+        return (env.get("REDIS_CLUSTER") or "").lower() == "true"
+
+    @classmethod
+    def get_client(
+        cls,
+        url: str | None = None,
+        host: str = "redis",
+        port: int = 6379,
+        db: int = 0,
+    ) -> redis.StrictRedis:
+        """
+        Retorna un cliente que usa el pool compartido del destino indicado.
+
+        Cerrar el cliente solo libera su conexión; el pool permanece abierto.
+        """
+        target = url or f"redis://{host}:{port}/{db}"
+        if cls.is_cluster():
+            return cls._get_cluster_client(target)  # type: ignore
+
+        with cls._lock:
+            pool = cls._pools.get(target)
+            if pool is None:
+                pool = redis.BlockingConnectionPool.from_url(target, **cls._settings())
+                cls._pools[target] = pool
+                cls._get_logger().info(f"Pool de Redis creado: {pool}")
+
+            cls._clients_created[target] = cls._clients_created.get(target, 0) + 1
+
+        return redis.StrictRedis(connection_pool=pool)
+
+    @classmethod
+    def get_async_client(cls, url: str) -> redis.asyncio.StrictRedis:
+        """
+        Retorna el cliente asyncio compartido del destino en el event loop actual.
+
+        Debe llamarse dentro de un event loop en ejecución.
+        """
+        loop = asyncio.get_running_loop()
+        if cls.is_cluster():
+            return cls._get_async_cluster_client(loop, url)  # type: ignore
+
+        with cls._lock:
+            clients = cls._async_clients.setdefault(loop, {})
+            client = clients.get(url)
+            if client is None:
+                pool = redis.asyncio.BlockingConnectionPool.from_url(
+                    url, **cls._settings()
+                )
+                client = redis.asyncio.StrictRedis(connection_pool=pool)
+                clients[url] = client
+                cls._get_logger().info(f"Pool asyncio de Redis creado: {pool}")
+
+        return client
+
+    @classmethod
+    def _get_cluster_client(cls, target: str) -> redis.RedisCluster:
+        with cls._lock:
+            client = cls._clusters.get(target)
+            if client is None:
+                client = redis.RedisCluster.from_url(target, **cls._cluster_settings())
+                cls._clusters[target] = client
+                cls._get_logger().info(f"Cliente de Redis Cluster creado: {target}")
+
+            cls._clients_created[target] = cls._clients_created.get(target, 0) + 1
+
+        return client
+
+    @classmethod
+    def _get_async_cluster_client(
+        cls, loop: asyncio.AbstractEventLoop, url: str
+    ) -> redis.asyncio.RedisCluster:
+        with cls._lock:
+            clients = cls._async_clusters.setdefault(loop, {})
+            client = clients.get(url)
+            if client is None:
+                client = redis.asyncio.RedisCluster.from_url(
+                    url, **cls._cluster_settings()
+                )
+                clients[url] = client
+                cls._get_logger().info(
+                    f"Cliente asyncio de Redis Cluster creado: {url}"
+                )
+
+        return client
+
+    @classmethod
+    def stats(cls) -> list[RedisPoolStats]:
+        """Métricas de uso de cada pool registrado"""
+        with cls._lock:
+            pools = list(cls._pools.items())
+            clients_created = dict(cls._clients_created)
+
+        stats: list[RedisPoolStats] = []
+        for target, pool in pools:
+            created = len(pool._connections)
+            available = sum(1 for conn in list(pool.pool.queue) if conn is not None)
+            stats.append(
+                RedisPoolStats(
+                    target=target,
+                    max_connections=pool.max_connections,
+                    created_connections=created,
+                    available_connections=available,
+                    in_use_connections=created - available,
+                    clients_created=clients_created.get(target, 0),
+                )
+            )
+
+        return stats
+
+    @classmethod
+    def close_all(cls) -> None:
+        """Desconecta y olvida todos los pools (fin del proceso o pruebas)"""
+        with cls._lock:
+            for pool in cls._pools.values():
+                pool.disconnect()
+            for client in cls._clusters.values():
+                client.close()
+            cls._pools.clear()
+            cls._clusters.clear()
+            cls._clients_created.clear()
@@ -0,0 +1,78 @@
+"""
+Almacenamiento por contenido de frames (deduplicación).
+
+Con `set_df(..., dedup=True)` el payload se guarda una sola vez bajo el hash
+de su contenido (`frame_blob_<hash>`) y la clave con nombre queda como un
+frame de referencia de unos cuantos bytes que apunta al blob. Los lectores
+resuelven la referencia de forma transparente.
+
+Cada blob lleva:
+    - `<blob>:refs`: SET con las claves que lo referencian (su conteo de
+      referencias).
+    - `<blob>:bytes`: tamaño del payload; se escribe al final, por lo que su
+      existencia indica que el blob está completo.
+
+Volver a guardar un frame idéntico (p. ej. una etapa que se reintenta) solo
+cuesta calcular el hash: el payload no se vuelve a enviar. Al sobrescribir o
+eliminar una referencia se descuenta del blob, y el último en soltarlo lo
+elimina. Las claves de un blob vencen con el TTL de su referencia más reciente.
+La limpieza por patrón (`RedisStorage.unlink_pattern`, que usa
+`RedisRunCollector`) descuenta las referencias de cada clave que elimina y
+nunca borra blobs directamente: un blob puede estar referenciado por otras
+corridas.
+
+La primera escritura de un contenido fija su layout (particionado o no); las
+siguientes referencias lo reutilizan tal cual.
+"""
+
+import hashlib
+
+import pyarrow as pa
+
+from conciliaciones.utils.redis.redis_keys import KEY_LAYOUT_LEGACY, Keys, key_layout
+
+
+def table_digest(table: pa.Table) -> str:
+    """
+    Hash del contenido de una tabla Arrow (esquema, metadatos y buffers).
+
+    Se calcula sobre los buffers en memoria, sin serializar la tabla. Dos
+    tablas iguales con distinta división en chunks producen hashes distintos,
+    lo que solo cuesta perder la deduplicación, nunca mezclar contenidos.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(table.schema.serialize())
+
+    for column in table.columns:
+        for chunk in column.chunks:
+            digest.update(f"{chunk.offset}:{len(chunk)}".encode())
+            _update_array(digest, chunk)
+
+    return digest.hexdigest()
+
+
+def _update_array(digest: hashlib.blake2b, array: pa.Array) -> None:
+    for buffer in array.buffers():
+        if buffer is None:
+            digest.update(b"\x00")
+        else:
+            digest.update(memoryview(buffer))
+
+    # Los arreglos de diccionario guardan sus valores fuera de buffers()
+    if pa.types.is_dictionary(array.type):
+        _update_array(digest, array.dictionary)
+
+
+def blob_key(digest: str) -> str:
+    if key_layout() == KEY_LAYOUT_LEGACY:
+        return f"{Keys.FRAME_BLOB.value}_{digest}"
+    # Con la etiqueta de hash el blob y sus claves derivadas comparten slot
+    return f"{Keys.FRAME_BLOB.value}_{{{digest}}}"
+
+
+def blob_refs_key(key: str) -> str:
+    return f"{key}:refs"
+
+
+def blob_size_key(key: str) -> str:
+    return f"{key}:bytes"
@@ -0,0 +1,157 @@
+"""
+Caché en proceso de frames leídos desde Redis.
+
+Cada frame escrito con `set_df` lleva junto a su valor una estampa de versión
+(`<clave>:version`) que cambia en cada escritura y se elimina con la clave.
+Las lecturas consultan solo la estampa; si coincide con la de la entrada en
+caché se reutiliza la tabla Arrow ya decodificada, sin descargarla de nuevo.
+
+Las tablas Arrow son inmutables, por lo que la caché entrega la misma tabla
+(sin copias) a todos los lectores. La caché es un LRU acotado por bytes,
+compartido por todas las instancias del proceso.
+
+Junto a la tabla decodificada se guarda, bajo la misma versión, la tabla con
+la normalización de nulos ya aplicada (`normalized=True`), de modo que una
+lectura repetida de `get_df` solo cuesta la estampa y la conversión a
+DataFrame. Invalidar una clave descarta ambas.
+
+Configuración por variables de entorno:
+    - REDIS_FRAME_CACHE_MAX_BYTES: Bytes máximos de tablas en caché
+      (default 512 MB, 0 desactiva la caché).
+"""
+
+import threading
+import uuid
+from collections import OrderedDict
+from collections.abc import Hashable
+
+import pyarrow as pa
+from k_link.tools import env
+from pydantic import BaseModel
+
+
+def version_key(key: str) -> str:
+    return f"{key}:version"
+
+
+def new_version() -> str:
+    """Estampa de versión única para una escritura"""
+    return uuid.uuid4().hex
+
+
+class FrameCacheStats(BaseModel):
+    entries: int
+    cached_bytes: int
+    max_bytes: int
+    hits: int
+    misses: int
+    evictions: int
+
+
+class FrameCache:
+    _lock: threading.Lock = threading.Lock()
+    _entries: OrderedDict[tuple[Hashable, str, bool], tuple[bytes, pa.Table]] = (
+        OrderedDict()
+    )
+    _cached_bytes: int = 0
+    _max_bytes: int | None = None
+    _hits: int = 0
+    _misses: int = 0
+    _evictions: int = 0
+
+    @classmethod
+    def max_bytes(cls) -> int:
+        if cls._max_bytes is None:
+            cls._max_bytes = int(
+                env.get("REDIS_FRAME_CACHE_MAX_BYTES") or 512 * 1024**2
+            )
+        return cls._max_bytes
+
+    @classmethod
+    def get(
+        cls,
+        namespace: Hashable,
+        key: str,
+        version: bytes | None,
+        normalized: bool = False,
+    ) -> pa.Table | None:
+        """
+        Tabla en caché si su versión coincide con `version`.
+
+        Una entrada con versión distinta (o sin versión en Redis) se descarta.
+
+        normalized: Busca la tabla con la normalización de nulos aplicada.
+        """
+        entry_key = (namespace, key, normalized)
+        with cls._lock:
+            entry = cls._entries.get(entry_key)
+            if entry is not None and version is not None and entry[0] == version:
+                cls._entries.move_to_end(entry_key)
+                cls._hits += 1
+                return entry[1]
+
+            if entry is not None:
+                cls._drop(entry_key)
+            cls._misses += 1
+            return None
+
+    @classmethod
+    def accepts(cls, version: bytes | None, table: pa.Table) -> bool:
+        """Si `put` guardaría la tabla (versionada y dentro del límite)"""
+        return version is not None and table.nbytes <= cls.max_bytes()
+
+    @classmethod
+    def put(
+        cls,
+        namespace: Hashable,
+        key: str,
+        version: bytes | None,
+        table: pa.Table,
+        normalized: bool = False,
+    ) -> None:
+        """Guarda una tabla decodificada bajo su versión, desalojando por LRU"""
+        if not cls.accepts(version, table):
+            return
+
+        entry_key = (namespace, key, normalized)
+        max_bytes = cls.max_bytes()
+        with cls._lock:
+            cls._drop(entry_key)
+            cls._entries[entry_key] = (version, table)  # type: ignore
+            cls._cached_bytes += table.nbytes
+
+            while cls._cached_bytes > max_bytes:
+                oldest = next(iter(cls._entries))
+                cls._drop(oldest)
+                cls._evictions += 1
+
+    @classmethod
+    def invalidate(cls, namespace: Hashable, *keys: str) -> None:
+        with cls._lock:
+            for key in keys:
+                cls._drop((namespace, key, False))
+                cls._drop((namespace, key, True))
+
+    @classmethod
+    def _drop(cls, entry_key: tuple[Hashable, str, bool]) -> None:
+        entry = cls._entries.pop(entry_key, None)
+        if entry is not None:
+            cls._cached_bytes -= entry[1].nbytes
+
+    @classmethod
+    def stats(cls) -> FrameCacheStats:
+        with cls._lock:
+            return FrameCacheStats(
+                entries=len(cls._entries),
+                cached_bytes=cls._cached_bytes,
+                max_bytes=cls.max_bytes(),
+                hits=cls._hits,
+                misses=cls._misses,
+                evictions=cls._evictions,
+            )
+
+    @classmethod
+    def clear(cls) -> None:
+        with cls._lock:
+            cls._entries.clear()
+            cls._cached_bytes = 0
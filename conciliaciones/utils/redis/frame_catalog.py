@@ -0,0 +1,245 @@
+"""
+Catálogo de frames por corrida.
+
+Cada `set_df` (o `set_columns`) con `catalog_key` registra en un hash de
+Redis (un campo por frame) el esquema, el número de filas, el tamaño y la
+tarea que produjo el frame. Las etapas que solo necesitan columnas, tipos o
+conteos los consultan aquí sin descargar el payload, y el catálogo completo
+permite ver qué etapas producen los frames más grandes de una corrida.
+
+El registro refleja la última escritura de cada frame. `FrameCatalogEntry.schema`
+reconstruye el esquema Arrow a partir de los tipos registrados.
+
+Cada entrada guarda la estampa de versión (ver `frame_cache`) de la escritura
+que la registró. Un frame borrado, vencido o reescrito sin `catalog_key` ya
+no tiene esa estampa, por lo que su entrada se descarta al leerla
+(`current_catalog_entry`) en lugar de confiar en un esquema obsoleto.
+"""
+
+import re
+from datetime import UTC, datetime
+
+import pyarrow as pa
+from pydantic import BaseModel
+
+from conciliaciones.models.proceso_conciliacion import ConciliationTask
+from conciliaciones.utils.data.arrow_tables import unify_schemas
+
+# Tipos Arrow con parámetros que `pa.type_for_alias` no reconoce
+_TIMESTAMP_TZ_PATTERN = re.compile(r"timestamp\[(\w+), tz=(.+)\]")
+_DECIMAL_PATTERN = re.compile(r"decimal(128|256)\((\d+), (\d+)\)")
+_DICTIONARY_PATTERN = re.compile(
+    r"dictionary<values=(.+), indices=(\w+), ordered=([01])>"
+)
+
+
+def arrow_type(type_name: str) -> pa.DataType:
+    """Tipo Arrow de una columna del catálogo; los no reconocidos se leen como texto"""
+    try:
+        return pa.type_for_alias(type_name)
+    except ValueError:
+        pass
+
+    if match := _TIMESTAMP_TZ_PATTERN.fullmatch(type_name):
+        return pa.timestamp(match[1], tz=match[2])
+    if match := _DECIMAL_PATTERN.fullmatch(type_name):
+        factory = pa.decimal128 if match[1] == "128" else pa.decimal256
+        return factory(int(match[2]), int(match[3]))
+    if match := _DICTIONARY_PATTERN.fullmatch(type_name):
+        return pa.dictionary(
+            arrow_type(match[2]), arrow_type(match[1]), ordered=match[3] == "1"
+        )
+    return pa.string()
+
+
+class FrameColumn(BaseModel):
+    name: str
+    type: str
+    # Tamaño en memoria de la columna (None en entradas que no lo registraban)
+    memory_bytes: int | None = None
+
+
+class FrameCatalogEntry(BaseModel):
+    key: str
+    columns: list[FrameColumn]
+    num_rows: int
+    payload_bytes: int
+    memory_bytes: int
+    task: ConciliationTask | None = None
+    created_at: datetime
+    # Estampa de versión del frame al registrar la entrada
+    version: str | None = None
+
+    @property
+    def column_names(self) -> list[str]:
+        return [column.name for column in self.columns]
+
+    @property
+    def dtypes(self) -> dict[str, str]:
+        """Tipo Arrow de cada columna"""
+        return {column.name: column.type for column in self.columns}
+
+    @property
+    def schema(self) -> pa.Schema:
+        """Esquema Arrow del frame, en el orden de sus columnas"""
+        return pa.schema(
+            [pa.field(column.name, arrow_type(column.type)) for column in self.columns]
+        )
+
+
+def build_catalog_entry(
+    key: str,
+    table: pa.Table,
+    payload_bytes: int,
+    task: ConciliationTask | None,
+    version: str,
+) -> FrameCatalogEntry:
+    return FrameCatalogEntry(
+        key=key,
+        columns=[
+            FrameColumn(
+                name=field.name, type=str(field.type), memory_bytes=column.nbytes
+            )
+            for field, column in zip(table.schema, table.columns, strict=True)
+        ],
+        num_rows=table.num_rows,
+        payload_bytes=payload_bytes,
+        memory_bytes=table.nbytes,
+        task=task,
+        created_at=datetime.now(UTC),
+        version=version,
+    )
+
+
+def current_catalog_entry(
+    raw_entry: bytes | str | None, version: bytes | str | None
+) -> FrameCatalogEntry | None:
+    """Entrada del catálogo si corresponde a la versión vigente del frame"""
+    if raw_entry is None or version is None:
+        return None
+
+    entry = FrameCatalogEntry.model_validate_json(raw_entry)
+    if isinstance(version, bytes):
+        version = version.decode("utf-8")
+    return entry if entry.version == version else None
+
+
+def parse_catalog(
+    raw_entries: list[bytes], versions: list[bytes | None]
+) -> list[FrameCatalogEntry]:
+    """
+    Entradas vigentes de un hash de catálogo, de mayor a menor payload.
+
+    versions: Estampa actual del frame de cada entrada, en el mismo orden.
+    """
+    entries = [
+        entry
+        for raw_entry, version in zip(raw_entries, versions, strict=True)
+        if (entry := current_catalog_entry(raw_entry, version)) is not None
+    ]
+    return sorted(entries, key=lambda entry: entry.payload_bytes, reverse=True)
+
+
+def update_catalog_entry(  # noqa: PLR0913
+    previous: FrameCatalogEntry | None,
+    *,
+    key: str,
+    schema: pa.Schema,
+    num_rows: int,
+    payload_bytes: int,
+    table: pa.Table,
+    task: ConciliationTask | None,
+    version: str,
+) -> FrameCatalogEntry:
+    """
+    Entrada de un frame al que se le agregaron o reemplazaron columnas.
+
+    payload_bytes: Tamaño vigente del frame (manifiesto y shards que lista).
+    table: Columnas agregadas o reemplazadas; su tamaño en memoria sustituye al
+        de las columnas anteriores. Si la entrada anterior no registró el
+        tamaño de alguna columna que se conserva, se suma al total anterior.
+    """
+    added = {
+        field.name: column.nbytes
+        for field, column in zip(table.schema, table.columns, strict=True)
+    }
+    known = (
+        {column.name: column.memory_bytes for column in previous.columns}
+        if previous
+        else {}
+    )
+    columns = [
+        FrameColumn(
+            name=field.name,
+            type=str(field.type),
+            memory_bytes=added.get(field.name, known.get(field.name)),
+        )
+        for field in schema
+    ]
+    column_sizes = [column.memory_bytes for column in columns]
+    if None in column_sizes:
+        memory_bytes = (previous.memory_bytes if previous else 0) + table.nbytes
+    else:
+        memory_bytes = sum(column_sizes)  # type: ignore
+
+    return FrameCatalogEntry(
+        key=key,
+        columns=columns,
+        num_rows=num_rows,
+        payload_bytes=payload_bytes,
+        memory_bytes=memory_bytes,
+        task=task,
+        created_at=datetime.now(UTC),
+        version=version,
+    )
+
+
+def append_catalog_entry(  # noqa: PLR0913
+    previous: FrameCatalogEntry | None,
+    key: str,
+    table: pa.Table,
+    payload_bytes: int,
+    task: ConciliationTask | None,
+    *,
+    version: str,
+) -> FrameCatalogEntry:
+    """
+    Entrada de un stream al que se le agregó una parte (ver `frame_stream`).
+
+    Acumula filas y tamaños. El tipo de cada columna es el del esquema común
+    de las partes (`unify_schemas`), el mismo que resulta al
+    concatenarlas.
+
+    previous: Entrada del stream antes de esta parte; None si la parte empieza
+        un stream nuevo.
+    """
+    schema = unify_schemas(
+        [previous.schema, table.schema] if previous else [table.schema]
+    )
+    previous_memory = (
+        {column.name: column.memory_bytes for column in previous.columns}
+        if previous
+        else {}
+    )
+
+    columns: list[FrameColumn] = []
+    for field in schema:
+        memory_bytes = previous_memory.get(field.name, 0)
+        if memory_bytes is not None and field.name in table.column_names:
+            memory_bytes += table.column(field.name).nbytes
+        columns.append(
+            FrameColumn(
+                name=field.name, type=str(field.type), memory_bytes=memory_bytes
+            )
+        )
+
+    return FrameCatalogEntry(
+        key=key,
+        columns=columns,
+        num_rows=(previous.num_rows if previous else 0) + table.num_rows,
+        payload_bytes=(previous.payload_bytes if previous else 0) + payload_bytes,
+        memory_bytes=(previous.memory_bytes if previous else 0) + table.nbytes,
+        task=task,
+        created_at=datetime.now(UTC),
+        version=version,
+    )
@@ -0,0 +1,233 @@
+"""
+Codec binario de DataFrames para Redis.
+
+Formato de un frame:
+    - Encabezado de 8 bytes: magic (4) + versión (1) + flags (1) + reservado (2)
+    - Bytes de un stream Arrow IPC
+
+El encabezado permite distinguir los frames de los valores pickle heredados
+y evolucionar el formato sin romper a los lectores existentes.
+
+El esquema Arrow conserva los metadatos de pandas, por lo que la lectura
+devuelve los mismos dtypes que se escribieron (Int64 nullable, datetime,
+decimal, category). Las columnas object con tipos mixtos que Arrow no puede
+representar se guardan como texto y se listan en los metadatos del esquema.
+
+El esquema de cada frame registra además su número de filas, de modo que
+`decode_schema` obtiene esquema y filas de los bytes iniciales del frame
+(`schema_prefix_size`) sin descargar los datos.
+"""
+
+import json
+import struct
+from typing import Literal
+
+import pyarrow as pa
+from pandas import DataFrame
+from typing_extensions import Buffer
+
+from conciliaciones.utils.redis.io_metrics import codec_timed
+
+FRAME_MAGIC: bytes = b"KFRM"
+FRAME_VERSION: int = 1
+
+_HEADER = struct.Struct(">4sBBH")
+HEADER_SIZE: int = _HEADER.size
+
+# Flags del encabezado
+FLAG_MANIFEST: int = 0x01
+FLAG_REFERENCE: int = 0x02
+FLAG_FILE: int = 0x04
+
+# Bytes iniciales de un valor que bastan para leer su encabezado y, si es una
+# referencia o un puntero a archivo, su destino
+FRAME_HEAD_SIZE: int = 1024
+
+STRINGIFIED_COLUMNS_KEY: bytes = b"conciliaciones.stringified_columns"
+
+FRAME_ROWS_KEY: bytes = b"conciliaciones.num_rows"
+
+# Marca de continuación y longitud del mensaje IPC que sigue al encabezado
+_IPC_MESSAGE_PREFIX = struct.Struct("<Ii")
+
+IpcCompression = Literal["lz4", "zstd"] | pa.Codec | None
+
+
+def is_frame(payload: Buffer) -> bool:
+    """Indica si el valor almacenado en Redis es un frame del codec"""
+    return bytes(memoryview(payload)[: len(FRAME_MAGIC)]) == FRAME_MAGIC
+
+
+def frame_flags(payload: Buffer) -> int:
+    """Flags del encabezado de un frame (0 si el payload no es un frame)"""
+    header = bytes(memoryview(payload)[:HEADER_SIZE])
+    if len(header) < HEADER_SIZE or not is_frame(header):
+        return 0
+    return _HEADER.unpack(header)[2]
+
+
+def encode_header(flags: int) -> bytes:
+    return _HEADER.pack(FRAME_MAGIC, FRAME_VERSION, flags, 0)
+
+
+def encode_reference(target: str) -> bytes:
+    """Frame de referencia: solo el encabezado y la clave del payload real"""
+    return encode_header(FLAG_REFERENCE) + target.encode("utf-8")
+
+
+def reference_target(payload: Buffer | None) -> str | None:
+    """Clave a la que apunta un frame de referencia (None si no es referencia)"""
+    if not payload or not frame_flags(payload) & FLAG_REFERENCE:
+        return None
+    return bytes(memoryview(payload)[HEADER_SIZE:]).decode("utf-8")
+
+
+def select_columns(table: pa.Table, columns: list[str] | None) -> pa.Table:
+    """
+    Proyecta las columnas solicitadas, en el orden solicitado.
+
+    Las columnas que no existen en la tabla se ignoran.
+    """
+    if columns is None:
+        return table
+    names: set[str] = set(table.column_names)
+    return table.select([col for col in columns if col in names])
+
+
+@codec_timed("encode")
+def encode_table(
+    table: pa.Table,
+    compression: IpcCompression = "lz4",
+    flags: int = 0,
+) -> pa.Buffer:
+    """
+    Serializa una tabla Arrow como frame.
+
+    El encabezado y el stream IPC se escriben sobre el mismo buffer de salida,
+    por lo que no se generan copias intermedias del payload.
+    """
+    metadata = dict(table.schema.metadata or {})
+    metadata[FRAME_ROWS_KEY] = str(table.num_rows).encode("utf-8")
+    table = table.replace_schema_metadata(metadata)
+
+    sink = pa.BufferOutputStream()
+    sink.write(encode_header(flags))
+
+    options = pa.ipc.IpcWriteOptions(compression=compression)
+    with pa.ipc.new_stream(sink, table.schema, options=options) as writer:
+        writer.write_table(table)
+
+    return sink.getvalue()
+
+
+@codec_timed("encode")
+def frame_to_table(df: DataFrame) -> pa.Table:
+    """
+    Convierte un DataFrame a tabla Arrow conservando su esquema pandas.
+
+    Solo las columnas object que Arrow no puede convertir (tipos mixtos) se
+    guardan como texto, sobre una copia superficial: el DataFrame del llamador
+    no se modifica.
+    """
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        stringified: list[str] = []
+    except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+        df = df.copy(deep=False)
+        stringified = []
+        for col in df.columns[df.dtypes == "object"]:
+            try:
+                pa.array(df[col], from_pandas=True)
+            except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+                df[col] = df[col].astype(str)
+                stringified.append(str(col))
+        table = pa.Table.from_pandas(df, preserve_index=False)
+
+    metadata = dict(table.schema.metadata or {})
+    metadata[STRINGIFIED_COLUMNS_KEY] = json.dumps(stringified).encode("utf-8")
+
+    return table.replace_schema_metadata(metadata)
+
+
+def stringified_columns(schema: pa.Schema) -> list[str] | None:
+    """
+    Columnas guardadas como texto por `frame_to_table`.
+
+    Retorna None para frames escritos antes de conservar el esquema, en los que
+    todas las columnas object se guardaban como texto.
+    """
+    metadata = schema.metadata or {}
+    if STRINGIFIED_COLUMNS_KEY not in metadata:
+        return None
+    return json.loads(metadata[STRINGIFIED_COLUMNS_KEY])
+
+
+def encode_frame(df: DataFrame, compression: IpcCompression = "lz4") -> pa.Buffer:
+    """Serializa un DataFrame como frame"""
+    return encode_table(frame_to_table(df), compression=compression)
+
+
+@codec_timed("decode")
+def decode_table(payload: Buffer, columns: list[str] | None = None) -> pa.Table:
+    """
+    Deserializa un frame como tabla Arrow.
+
+    Los buffers de la tabla apuntan directamente a `payload`, sin copias.
+
+    Raises:
+        ValueError: Si el payload no es un frame o su versión no es soportada.
+    """
+    buffer = pa.py_buffer(payload)
+
+    if buffer.size < HEADER_SIZE:
+        raise ValueError("Frame incompleto: encabezado truncado")
+
+    magic, version, _, _ = _HEADER.unpack(buffer.slice(0, HEADER_SIZE).to_pybytes())
+
+    if magic != FRAME_MAGIC:
+        raise ValueError("El valor almacenado no es un frame")
+    if version > FRAME_VERSION:
+        raise ValueError(f"Versión de frame no soportada: {version}")
+
+    reader = pa.ipc.open_stream(pa.BufferReader(buffer.slice(HEADER_SIZE)))
+    table = reader.read_all()
+    return select_columns(
+        table.replace_schema_metadata(_without_num_rows(table.schema)), columns
+    )
+
+
+def _without_num_rows(schema: pa.Schema) -> dict:
+    metadata = dict(schema.metadata or {})
+    metadata.pop(FRAME_ROWS_KEY, None)
+    return metadata
+
+
+def schema_prefix_size(head: Buffer) -> int:
+    """
+    Bytes iniciales de un frame que contienen su encabezado y su esquema.
+
+    head: Bytes iniciales del frame (al menos los del encabezado y la longitud
+        del mensaje de esquema).
+    """
+    prefix = bytes(
+        memoryview(head)[HEADER_SIZE : HEADER_SIZE + _IPC_MESSAGE_PREFIX.size]
+    )
+    if len(prefix) < _IPC_MESSAGE_PREFIX.size:
+        raise ValueError("Frame incompleto: esquema truncado")
+    _, metadata_size = _IPC_MESSAGE_PREFIX.unpack(prefix)
+    return HEADER_SIZE + _IPC_MESSAGE_PREFIX.size + metadata_size
+
+
+def decode_schema(head: Buffer) -> tuple[pa.Schema, int | None]:
+    """
+    Esquema y número de filas de un frame, sin leer sus datos.
+
+    head: Al menos los primeros `schema_prefix_size` bytes del frame.
+
+    Returns:
+        El número de filas es None en frames escritos antes de registrarlo.
+    """
+    schema = pa.ipc.read_schema(pa.py_buffer(head).slice(HEADER_SIZE))
+    num_rows = (schema.metadata or {}).get(FRAME_ROWS_KEY)
+    schema = schema.with_metadata(_without_num_rows(schema))
+    return schema, int(num_rows) if num_rows is not None else None
@@ -0,0 +1,183 @@
+"""
+Selección de compresión de los frames.
+
+Con `compression="auto"` (default de `set_df`) el codec y su nivel se eligen
+por frame según su tamaño en memoria y la cardinalidad de sus columnas de
+texto:
+
+    - Frames pequeños (listas de headers, configuraciones): sin compresión,
+      el costo de CPU no compensa los bytes ahorrados.
+    - Frames medianos: lz4 (snappy en Parquet), que comprime y descomprime a
+      velocidad de memoria.
+    - Frames grandes: zstd nivel 1; si la mayor parte de sus bytes es texto
+      repetitivo (sábanas SAT, ERP), nivel 3 mientras el frame sea lo bastante
+      pequeño para pagarlo. Niveles mayores apenas mejoran la razón a más del
+      doble de tiempo de codificación (ver benchmarks/bench_frame_compression.py).
+
+Cada familia de claves (`Keys`) puede fijar su política, ya sea en
+`FAMILY_COMPRESSION` o con la variable de entorno REDIS_FRAME_COMPRESSION,
+p. ej. "sat_erp=zstd:9,dynamic_headers=none". La variable se interpreta una
+sola vez por proceso; las familias o políticas inválidas se registran en el log
+y se ignoran.
+
+Arrow IPC no soporta snappy: en los frames IPC una política snappy se escribe
+con lz4, su equivalente en velocidad.
+"""
+
+from functools import cache
+from typing import Literal
+
+import pyarrow as pa
+import pyarrow.compute as pc
+from k_link.tools import env
+from loggerk import LoggerK
+from pydantic import BaseModel, Field, ValidationError
+
+from conciliaciones.utils.redis.frame_codec import IpcCompression
+from conciliaciones.utils.redis.redis_keys import Keys, RedisKeys
+
+CompressionCodec = Literal["none", "lz4", "snappy", "zstd"]
+
+FrameCompression = Literal["auto", "lz4", "zstd"] | pa.Codec | None
+
+# Debajo de este tamaño los frames se guardan sin comprimir
+UNCOMPRESSED_MAX_BYTES: int = 64 * 1024
+
+# Debajo de este tamaño basta con un codec rápido
+FAST_CODEC_MAX_BYTES: int = 4 * 1024**2
+
+# Frames hasta este tamaño pagan un nivel alto de zstd
+ZSTD_HIGH_LEVEL_MAX_BYTES: int = 256 * 1024**2
+
+# Filas muestreadas por columna para estimar su cardinalidad
+CARDINALITY_SAMPLE_ROWS: int = 10_000
+
+# Una columna de texto es repetitiva si sus valores distintos no pasan de esta
+# proporción de la muestra
+LOW_CARDINALITY_RATIO: float = 0.1
+
+# Proporción de bytes de texto repetitivo a partir de la cual se usa un nivel
+# alto de zstd
+REPETITIVE_SHARE_MIN: float = 0.5
+
+
+class CompressionPolicy(BaseModel):
+    codec: CompressionCodec
+    level: int | None = Field(default=None, ge=1, le=9)
+
+    def ipc_codec(self) -> pa.Codec | None:
+        """Codec para `pa.ipc.IpcWriteOptions`"""
+        if self.codec == "none":
+            return None
+        if self.codec == "zstd":
+            return pa.Codec("zstd", compression_level=self.level or 1)
+        return pa.Codec("lz4")
+
+    def parquet_options(self) -> dict:
+        """Argumentos `compression` y `compression_level` de Parquet"""
+        if self.codec == "zstd":
+            return {"compression": "zstd", "compression_level": self.level or 1}
+        return {"compression": self.codec}
+
+    def __str__(self) -> str:
+        return f"{self.codec}:{self.level}" if self.level else self.codec
+
+
+# Políticas fijas por familia; REDIS_FRAME_COMPRESSION tiene precedencia
+FAMILY_COMPRESSION: dict[Keys, CompressionPolicy] = {}
+
+
+def parse_policy(value: str) -> CompressionPolicy:
+    """Política a partir de "codec" o "codec:nivel" (p. ej. "zstd:6")"""
+    codec, _, level = value.strip().partition(":")
+    return CompressionPolicy(codec=codec, level=int(level) if level else None)
+
+
+@cache
+def _env_overrides() -> dict[Keys, CompressionPolicy]:
+    """Políticas de REDIS_FRAME_COMPRESSION, interpretadas una sola vez"""
+    overrides: dict[Keys, CompressionPolicy] = {}
+    for item in (env.get("REDIS_FRAME_COMPRESSION") or "").split(","):
+        if not item.strip():
+            continue
+        family, _, policy = item.partition("=")
+        try:
+            overrides[Keys(family.strip())] = parse_policy(policy)
+        except (ValueError, ValidationError) as error:
+            LoggerK(__name__).warning(
+                f"REDIS_FRAME_COMPRESSION: se ignora {item.strip()!r}: {error}"
+            )
+    return overrides
+
+
+def family_compression(key: str) -> CompressionPolicy | None:
+    """Política fijada para la familia de la clave, si existe"""
+    family = RedisKeys.key_family(key)
+    if family is None:
+        return None
+    return _env_overrides().get(family) or FAMILY_COMPRESSION.get(family)
+
+
+def low_cardinality_share(table: pa.Table) -> float:
+    """
+    Proporción de los bytes de la tabla en columnas de texto repetitivas.
+
+    La cardinalidad se estima sobre las primeras filas de cada columna.
+    """
+    if table.nbytes == 0:
+        return 0.0
+
+    sample_rows = min(table.num_rows, CARDINALITY_SAMPLE_ROWS)
+    repetitive_bytes = 0
+    for column in table.columns:
+        if pa.types.is_dictionary(column.type):
+            repetitive_bytes += column.nbytes
+            continue
+        if not (
+            pa.types.is_string(column.type) or pa.types.is_large_string(column.type)
+        ):
+            continue
+
+        distinct = pc.count_distinct(column.slice(0, sample_rows)).as_py()
+        if distinct <= max(1, sample_rows * LOW_CARDINALITY_RATIO):
+            repetitive_bytes += column.nbytes
+
+    return repetitive_bytes / table.nbytes
+
+
+def select_compression(
+    table: pa.Table,
+    key: str | None = None,
+    fast_codec: Literal["lz4", "snappy"] = "lz4",
+) -> CompressionPolicy:
+    """
+    Política de compresión para una tabla.
+
+    key: Clave del frame; si su familia tiene una política fija, se usa esa.
+    fast_codec: Codec rápido del formato destino (lz4 en IPC, snappy en Parquet).
+    """
+    if key is not None:
+        policy = family_compression(key)
+        if policy is not None:
+            return policy
+
+    size = table.nbytes
+    if size < UNCOMPRESSED_MAX_BYTES:
+        return CompressionPolicy(codec="none")
+    if size < FAST_CODEC_MAX_BYTES:
+        return CompressionPolicy(codec=fast_codec)
+
+    if low_cardinality_share(table) >= REPETITIVE_SHARE_MIN:
+        level = 3 if size < ZSTD_HIGH_LEVEL_MAX_BYTES else 1
+        return CompressionPolicy(codec="zstd", level=level)
+
+    return CompressionPolicy(codec="zstd", level=1)
+
+
+def resolve_ipc_compression(
+    compression: FrameCompression, table: pa.Table, key: str
+) -> IpcCompression:
+    """Compresión IPC de un frame; "auto" aplica `select_compression`"""
+    if compression == "auto":
+        return select_compression(table, key=key).ipc_codec()
+    return compression
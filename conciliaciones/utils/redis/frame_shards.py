@@ -0,0 +1,376 @@
+"""
+Layout de frames particionados por grupos de columnas y bloques de filas.
+
+Un frame particionado se guarda como:
+    - Un manifiesto bajo la clave del frame: frame vacío (FLAG_MANIFEST) cuyo
+      esquema es el esquema completo y cuyos metadatos listan los shards.
+    - Un frame por cada combinación (bloque de filas, grupo de columnas) bajo
+      `<clave>:shard:<n>`.
+
+Las lecturas con proyección solo descargan los shards que contienen las
+columnas solicitadas, y los bloques de filas permiten leer el frame por
+partes sin materializarlo completo.
+
+Las columnas agregadas o reemplazadas con `append_column_shards` se guardan
+como shards nuevos; en los shards anteriores la posición de una columna
+reemplazada queda en None y se ignora al ensamblar. Los shards cuyas columnas
+quedan todas reemplazadas salen del manifiesto para eliminarse.
+"""
+
+import json
+import math
+from collections.abc import Iterator
+from typing import NamedTuple
+
+import pyarrow as pa
+from typing_extensions import Buffer
+
+from conciliaciones.utils.redis.frame_codec import (
+    FLAG_MANIFEST,
+    STRINGIFIED_COLUMNS_KEY,
+    IpcCompression,
+    decode_table,
+    encode_table,
+    stringified_columns,
+)
+
+PANDAS_METADATA_KEY: bytes = b"pandas"
+
+SHARDS_KEY: bytes = b"conciliaciones.shards"
+
+
+class ColumnShards(NamedTuple):
+    """Resultado de `append_column_shards`"""
+
+    manifest: pa.Table
+    # Shards nuevos (clave, tabla) a escribir
+    new_shards: list[tuple[str, pa.Table]]
+    # Shards que ya no aportan columnas al frame
+    dead_shard_keys: list[str]
+
+
+def shard_key(key: str, index: int) -> str:
+    return f"{key}:shard:{index}"
+
+
+def _shard_index(shard: dict) -> int:
+    return int(shard["key"].rsplit(":", 1)[-1])
+
+
+def split_column_groups(table: pa.Table, group_size: int | None) -> list[list[int]]:
+    """Índices de columnas de cada grupo, en orden del esquema"""
+    indices = list(range(table.num_columns))
+    if group_size is None:
+        return [indices]
+    if group_size < 1:
+        raise ValueError(f"column_group_size debe ser mayor a 0: {group_size}")
+
+    return [
+        indices[start : start + group_size]
+        for start in range(0, len(indices), group_size)
+    ] or [[]]
+
+
+def split_row_chunks(table: pa.Table, chunk_size_bytes: int) -> list[tuple[int, int]]:
+    """
+    Bloques de filas (offset, longitud) de a lo más `chunk_size_bytes`.
+
+    El tamaño se estima con el tamaño en memoria de la tabla Arrow, que es una
+    cota superior del payload comprimido.
+    """
+    if chunk_size_bytes < 1:
+        raise ValueError(f"chunk_size_bytes debe ser mayor a 0: {chunk_size_bytes}")
+
+    num_rows = table.num_rows
+    if num_rows == 0 or table.nbytes <= chunk_size_bytes:
+        return [(0, num_rows)]
+
+    chunks = math.ceil(table.nbytes / chunk_size_bytes)
+    rows_per_chunk = math.ceil(num_rows / chunks)
+
+    return [
+        (offset, min(rows_per_chunk, num_rows - offset))
+        for offset in range(0, num_rows, rows_per_chunk)
+    ]
+
+
+def build_manifest(
+    table: pa.Table,
+    key: str,
+    groups: list[list[int]],
+    chunks: list[tuple[int, int]],
+) -> pa.Table:
+    """Tabla vacía con el esquema completo y la ubicación de cada shard"""
+    shards = []
+    for chunk_index, (offset, length) in enumerate(chunks):
+        for group in groups:
+            shards.append(
+                {
+                    "key": shard_key(key, len(shards)),
+                    "columns": group,
+                    "chunk": chunk_index,
+                    "offset": offset,
+                    "length": length,
+                }
+            )
+
+    metadata = dict(table.schema.metadata or {})
+    metadata[SHARDS_KEY] = json.dumps(shards).encode("utf-8")
+
+    return table.schema.with_metadata(metadata).empty_table()
+
+
+def manifest_shards(schema: pa.Schema) -> list[dict]:
+    """Shards registrados en el esquema de un manifiesto"""
+    metadata = schema.metadata or {}
+    if SHARDS_KEY not in metadata:
+        raise ValueError("El manifiesto no contiene la lista de shards")
+    return json.loads(metadata[SHARDS_KEY])
+
+
+def shard_slice(table: pa.Table, shard: dict) -> pa.Table:
+    """Porción de la tabla que corresponde a un shard"""
+    return table.slice(shard["offset"], shard["length"]).select(shard["columns"])
+
+
+def projected_indices(schema: pa.Schema, columns: list[str] | None) -> list[int]:
+    """
+    Índices de las columnas solicitadas, en el orden solicitado.
+
+    Las columnas que no existen en el esquema se ignoran.
+    """
+    if columns is None:
+        return list(range(len(schema)))
+
+    positions: dict[str, int] = {}
+    for index, name in enumerate(schema.names):
+        positions.setdefault(name, index)
+
+    return [positions[col] for col in columns if col in positions]
+
+
+def required_chunks(shards: list[dict], indices: list[int]) -> list[list[dict]]:
+    """
+    Shards que contienen al menos una de las columnas solicitadas, agrupados
+    por bloque de filas y en orden de filas.
+    """
+    wanted = set(indices)
+    chunks: dict[int, list[dict]] = {}
+    for shard in shards:
+        chunks.setdefault(shard["chunk"], [])
+        if wanted.intersection(shard["columns"]):
+            chunks[shard["chunk"]].append(shard)
+
+    return [chunks[chunk] for chunk in sorted(chunks)]
+
+
+def projected_schema(schema: pa.Schema, indices: list[int]) -> pa.Schema:
+    return pa.schema(
+        [schema.field(index) for index in indices], metadata=schema.metadata
+    )
+
+
+def assemble_chunk(
+    schema: pa.Schema,
+    indices: list[int],
+    shards: list[dict],
+    shard_tables: list[pa.Table],
+) -> pa.Table:
+    """Reconstruye un bloque de filas a partir de sus shards descargados"""
+    arrays: dict[int, pa.ChunkedArray] = {}
+    for shard, shard_table in zip(shards, shard_tables, strict=True):
+        for position, index in enumerate(shard["columns"]):
+            if index is not None:
+                arrays[index] = shard_table.column(position)
+
+    return pa.Table.from_arrays(
+        [arrays[index] for index in indices],
+        schema=projected_schema(schema, indices),
+    )
+
+
+def concat_chunks(
+    schema: pa.Schema, indices: list[int], chunk_tables: Iterator[pa.Table]
+) -> pa.Table:
+    """Concatena los bloques de filas en la tabla lógica"""
+    tables = list(chunk_tables)
+    if not tables:
+        return projected_schema(schema, indices).empty_table()
+    return pa.concat_tables(tables)
+
+
+def iter_frame_payloads(
+    table: pa.Table,
+    key: str,
+    compression: IpcCompression,
+    column_group_size: int | None,
+    chunk_size_bytes: int,
+) -> Iterator[tuple[str, pa.Buffer]]:
+    """
+    Pares (clave, frame) a escribir en Redis para guardar una tabla.
+
+    Los frames se codifican conforme se consumen, para no tener todo el payload
+    en memoria. En el layout particionado el manifiesto se produce al final,
+    cuando todos los shards ya fueron producidos.
+    """
+    groups = split_column_groups(table, column_group_size)
+    chunks = split_row_chunks(table, chunk_size_bytes)
+
+    if column_group_size is None and len(chunks) == 1:
+        yield key, encode_table(table, compression=compression)
+        return
+
+    manifest = build_manifest(table, key=key, groups=groups, chunks=chunks)
+
+    for shard in manifest_shards(manifest.schema):
+        yield (
+            shard["key"],
+            encode_table(shard_slice(table, shard), compression=compression),
+        )
+
+    yield key, encode_table(manifest, flags=FLAG_MANIFEST)
+
+
+def assemble_chunk_payloads(
+    schema: pa.Schema,
+    indices: list[int],
+    shards: list[dict],
+    payloads: list[Buffer | None],
+) -> pa.Table:
+    """
+    Decodifica los payloads de los shards de un bloque y arma el bloque.
+
+    Raises:
+        ValueError: Si alguno de los shards no existe en Redis.
+    """
+    missing = [
+        shard["key"]
+        for shard, payload in zip(shards, payloads, strict=True)
+        if payload is None
+    ]
+    if missing:
+        raise ValueError(f"Shards faltantes para el frame: {missing}")
+
+    shard_tables = [decode_table(payload) for payload in payloads]  # type: ignore
+    return assemble_chunk(schema, indices, shards, shard_tables)
+
+
+def manifest_num_rows(shards: list[dict]) -> int:
+    """Filas del frame lógico descrito por un manifiesto"""
+    chunks = {shard["chunk"]: shard["length"] for shard in shards}
+    return sum(chunks.values())
+
+
+def single_frame_manifest(schema: pa.Schema, num_rows: int, key: str) -> pa.Table:
+    """
+    Manifiesto de un frame no particionado, cuyo payload pasa a ser el shard 0.
+    """
+    return build_manifest(
+        schema.empty_table(),
+        key=key,
+        groups=[list(range(len(schema)))],
+        chunks=[(0, num_rows)],
+    )
+
+
+def _merge_schema_metadata(schema: pa.Schema, table: pa.Table) -> dict:
+    """Metadatos del esquema con las columnas de `table` agregadas o reemplazadas"""
+    metadata = dict(schema.metadata or {})
+    table_metadata = table.schema.metadata or {}
+    names = set(table.column_names)
+
+    if PANDAS_METADATA_KEY in metadata and PANDAS_METADATA_KEY in table_metadata:
+        pandas_metadata = json.loads(metadata[PANDAS_METADATA_KEY])
+        pandas_metadata["columns"] = [
+            column
+            for column in pandas_metadata["columns"]
+            if column["name"] not in names
+        ] + json.loads(table_metadata[PANDAS_METADATA_KEY])["columns"]
+        metadata[PANDAS_METADATA_KEY] = json.dumps(pandas_metadata).encode("utf-8")
+
+    stringified = stringified_columns(schema)
+    if stringified is not None:
+        stringified = [col for col in stringified if col not in names]
+        stringified += stringified_columns(table.schema) or []
+        metadata[STRINGIFIED_COLUMNS_KEY] = json.dumps(stringified).encode("utf-8")
+
+    return metadata
+
+
+def append_column_shards(
+    schema: pa.Schema,
+    key: str,
+    table: pa.Table,
+) -> ColumnShards:
+    """
+    Agrega o reemplaza columnas de un frame particionado.
+
+    Las columnas de `table` se parten con los mismos bloques de filas del
+    frame, en un shard nuevo por bloque. Las columnas que ya existían se
+    reemplazan en su posición; las demás se agregan al final. Los shards
+    anteriores que se quedan sin columnas vigentes salen del manifiesto y se
+    reportan para eliminarse; los shards nuevos toman índices que ningún shard
+    anterior usó, de modo que eliminar los anteriores no toca a los nuevos.
+
+    Returns:
+        Manifiesto actualizado, shards nuevos y claves de los shards muertos.
+
+    Raises:
+        ValueError: Si `table` no tiene el mismo número de filas que el frame.
+    """
+    shards = manifest_shards(schema)
+    num_rows = manifest_num_rows(shards)
+    if table.num_rows != num_rows:
+        raise ValueError(
+            f"Las columnas tienen {table.num_rows} filas y el frame {key} {num_rows}"
+        )
+
+    positions = {name: index for index, name in enumerate(schema.names)}
+    fields = list(schema)
+    targets: list[int] = []
+    for field in table.schema:
+        if field.name in positions:
+            fields[positions[field.name]] = field
+        else:
+            positions[field.name] = len(fields)
+            fields.append(field)
+        targets.append(positions[field.name])
+
+    replaced = set(targets)
+    for shard in shards:
+        shard["columns"] = [
+            None if index in replaced else index for index in shard["columns"]
+        ]
+
+    chunks = sorted(
+        {(shard["chunk"], shard["offset"], shard["length"]) for shard in shards}
+    )
+    next_index = max(map(_shard_index, shards), default=-1) + 1
+    dead_shard_keys = [
+        shard["key"]
+        for shard in shards
+        if all(index is None for index in shard["columns"])
+    ]
+    # Cada bloque de filas conserva al menos el shard nuevo
+    shards = [shard for shard in shards if shard["key"] not in dead_shard_keys]
+
+    new_shards: list[tuple[str, pa.Table]] = []
+    for chunk, offset, length in chunks:
+        shard = {
+            "key": shard_key(key, next_index + len(new_shards)),
+            "columns": targets,
+            "chunk": chunk,
+            "offset": offset,
+            "length": length,
+        }
+        shards.append(shard)
+        new_shards.append((shard["key"], table.slice(offset, length)))
+
+    metadata = _merge_schema_metadata(schema, table)
+    metadata[SHARDS_KEY] = json.dumps(shards).encode("utf-8")
+
+    return ColumnShards(
+        manifest=pa.schema(fields, metadata=metadata).empty_table(),
+        new_shards=new_shards,
+        dead_shard_keys=dead_shard_keys,
+    )
@@ -0,0 +1,279 @@
+"""
+Frames en archivos Arrow mapeados en memoria: desborde a disco y handoff.
+
+Desborde a disco:
+
+Los frames cuyo tamaño en memoria Arrow supera REDIS_SPILL_THRESHOLD_BYTES se
+guardan como archivo Arrow IPC (formato de acceso aleatorio, sin compresión)
+en REDIS_SPILL_DIR, y en Redis solo queda un puntero de unos cuantos bytes.
+Los lectores abren el archivo con `pa.memory_map`, por lo que la tabla apunta
+directamente a las páginas del archivo: sin copias y sin ocupar memoria de
+Redis.
+
+El directorio debe ser un volumen compartido por todos los workers
+(REDIS_SPILL_SHARED=true): una etapa siguiente puede correr en otro host. Con
+un directorio local el desborde se desactiva (se registra una advertencia) y
+los frames se quedan en Redis.
+
+Handoff en el mismo host (`set_df(..., handoff=True)`):
+
+Las etapas marcan con `handoff=True` los frames que la etapa siguiente lee
+completos; el handoff solo se escribe si además REDIS_FRAME_HANDOFF lo
+habilita. Además de la copia normal en Redis, el frame se escribe como archivo
+Arrow IPC en memoria compartida (/dev/shm) y su puntero, con el host y la
+versión del frame, se guarda en `<clave>:handoff`. Una etapa siguiente que
+corre en el mismo worker mapea el archivo directamente, sin descargar ni
+decodificar el payload; en otro host, o si la versión ya no coincide, se lee
+la copia de Redis.
+
+Cada escritura crea un archivo nuevo (el nombre lleva una estampa única), de
+modo que los lectores que ya mapearon la versión anterior no se ven afectados
+cuando se reemplaza o elimina. Los archivos cuyo puntero ya venció se eliminan
+al escribir un handoff nuevo (a lo más una vez cada
+HANDOFF_SWEEP_INTERVAL_SECONDS por proceso) y al final de la corrida
+(`RedisRunCollector`).
+
+Configuración por variables de entorno:
+    - REDIS_SPILL_THRESHOLD_BYTES: Tamaño a partir del cual un frame se guarda
+      en disco (sin valor o 0 desactiva el desborde).
+    - REDIS_SPILL_DIR: Directorio de los archivos.
+    - REDIS_SPILL_SHARED: "true" si el directorio es un volumen compartido;
+      sin este valor no se desborda.
+    - REDIS_FRAME_HANDOFF: "true" para escribir el handoff de los frames que
+      lo solicitan (desactivado por defecto).
+    - REDIS_HANDOFF_DIR: Directorio del handoff (default /dev/shm/conciliaciones).
+"""
+
+import re
+import socket
+import time
+from functools import cache
+from pathlib import Path
+
+import pyarrow as pa
+from k_link.tools import env
+from loggerk import LoggerK
+from pydantic import BaseModel
+from typing_extensions import Buffer
+
+from conciliaciones.utils.redis.frame_cache import new_version
+from conciliaciones.utils.redis.frame_codec import (
+    FLAG_FILE,
+    HEADER_SIZE,
+    encode_header,
+    frame_flags,
+)
+
+# Memoria compartida del worker, visible solo para los procesos del host
+DEFAULT_HANDOFF_DIR: str = "/dev/shm/conciliaciones"  # noqa: S108
+
+# Intervalo mínimo entre barridos de handoffs vencidos en un proceso
+HANDOFF_SWEEP_INTERVAL_SECONDS: int = 5 * 60
+
+# Último barrido de cada directorio de handoff (time.monotonic)
+_last_handoff_sweep: dict[str, float] = {}
+
+
+class FramePointer(BaseModel):
+    path: str
+    host: str | None
+    payload_bytes: int
+    version: str | None = None
+
+
+def handoff_key(key: str) -> str:
+    return f"{key}:handoff"
+
+
+def _handoff_dir() -> str:
+    return env.get("REDIS_HANDOFF_DIR") or DEFAULT_HANDOFF_DIR
+
+
+def handoff_enabled(handoff: bool) -> bool:
+    """`handoff` solicitado por la etapa y habilitado con REDIS_FRAME_HANDOFF"""
+    return handoff and (env.get("REDIS_FRAME_HANDOFF") or "").lower() == "true"
+
+
+def spill_threshold() -> int | None:
+    """Bytes a partir de los cuales se desborda a disco (None si no aplica)"""
+    threshold = int(env.get("REDIS_SPILL_THRESHOLD_BYTES") or 0)
+    if threshold <= 0 or not env.get("REDIS_SPILL_DIR"):
+        return None
+    if (env.get("REDIS_SPILL_SHARED") or "").lower() != "true":
+        _warn_local_spill_dir()
+        return None
+    return threshold
+
+
+@cache
+def _warn_local_spill_dir() -> None:
+    LoggerK(__name__).warning(
+        "REDIS_SPILL_DIR no es un volumen compartido (REDIS_SPILL_SHARED); "
+        "los frames grandes se quedan en Redis"
+    )
+
+
+def encode_pointer(pointer: FramePointer) -> bytes:
+    return encode_header(FLAG_FILE) + pointer.model_dump_json().encode("utf-8")
+
+
+def file_pointer(payload: Buffer | None) -> FramePointer | None:
+    """Puntero de un frame desbordado a disco (None si el payload no lo es)"""
+    if not payload or not frame_flags(payload) & FLAG_FILE:
+        return None
+    return FramePointer.model_validate_json(bytes(memoryview(payload)[HEADER_SIZE:]))
+
+
+def _write_arrow_file(table: pa.Table, directory: str, key: str) -> Path:
+    """
+    Escribe la tabla como archivo Arrow IPC con un nombre único.
+
+    El archivo se escribe con otro nombre y se renombra al terminar, de modo
+    que nunca se lee uno incompleto.
+    """
+    Path(directory).mkdir(parents=True, exist_ok=True)
+
+    safe_key = re.sub(r"[^\w.-]", "_", key)
+    path = Path(directory) / f"{safe_key}.{new_version()}.arrow"
+    partial_path = path.with_suffix(".partial")
+
+    with (
+        pa.OSFile(str(partial_path), "wb") as sink,
+        pa.ipc.new_file(sink, table.schema) as writer,
+    ):
+        writer.write_table(table)
+    partial_path.replace(path)
+
+    return path
+
+
+def write_spill_file(table: pa.Table, key: str) -> FramePointer:
+    """Escribe la tabla en el directorio compartido y retorna su puntero"""
+    path = _write_arrow_file(table, env.get("REDIS_SPILL_DIR"), key)
+    return FramePointer(path=str(path), host=None, payload_bytes=path.stat().st_size)
+
+
+def write_handoff_file(
+    table: pa.Table, key: str, version: str, ttl: int | None
+) -> FramePointer | None:
+    """
+    Escribe la tabla en memoria compartida para el handoff en el mismo host.
+
+    Si no se puede escribir (sin /dev/shm o sin espacio) retorna None: los
+    lectores usan la copia de Redis.
+
+    ttl: Vigencia del puntero; los archivos más viejos ya no tienen puntero y
+        se eliminan.
+    """
+    if ttl is not None:
+        _sweep_expired_handoff_files(max_age_seconds=ttl)
+
+    try:
+        path = _write_arrow_file(table, _handoff_dir(), key)
+    except OSError as error:
+        LoggerK(__name__).warning(f"Handoff de {key} omitido: {error}")
+        return None
+
+    return FramePointer(
+        path=str(path),
+        host=socket.gethostname(),
+        payload_bytes=path.stat().st_size,
+        version=version,
+    )
+
+
+def read_spill_file(pointer: FramePointer) -> pa.Table:
+    """
+    Mapea en memoria el archivo de un frame desbordado o de un handoff.
+
+    Los punteros con host (handoff) solo se leen en ese host.
+
+    Raises:
+        ValueError: Si el archivo es local a otro host o ya no existe.
+    """
+    if pointer.host is not None and pointer.host != socket.gethostname():
+        raise ValueError(
+            f"El frame {pointer.path} está en el disco local de {pointer.host}"
+        )
+
+    try:
+        source = pa.memory_map(pointer.path, "r")
+    except FileNotFoundError as error:
+        raise ValueError(f"No existe el archivo del frame: {pointer.path}") from error
+
+    return pa.ipc.open_file(source).read_all()
+
+
+def read_handoff_file(
+    payload: Buffer | None, version: Buffer | None
+) -> pa.Table | None:
+    """
+    Tabla del handoff si el archivo es de este host y de la versión vigente.
+
+    Retorna None cuando hay que leer la copia de Redis.
+    """
+    pointer = file_pointer(payload)
+    if (
+        pointer is None
+        or version is None
+        or pointer.host != socket.gethostname()
+        or pointer.version != bytes(memoryview(version)).decode("utf-8")
+    ):
+        return None
+
+    try:
+        return read_spill_file(pointer)
+    except ValueError:
+        return None
+
+
+def remove_spill_file(pointer: FramePointer | None) -> None:
+    """Elimina el archivo de un frame (los mapeos abiertos siguen siendo válidos)"""
+    if pointer is None:
+        return
+    if pointer.host is not None and pointer.host != socket.gethostname():
+        return
+    Path(pointer.path).unlink(missing_ok=True)
+
+
+def _remove_files_older_than(directory: str | None, max_age_seconds: int) -> int:
+    if not directory or not Path(directory).is_dir():
+        return 0
+
+    removed = 0
+    oldest = time.time() - max_age_seconds
+    for path in Path(directory).glob("*.arrow"):
+        try:
+            if path.stat().st_mtime < oldest:
+                path.unlink(missing_ok=True)
+                removed += 1
+        except FileNotFoundError:
+            # Otro proceso lo eliminó primero
+            continue
+
+    return removed
+
+
+def _sweep_expired_handoff_files(max_age_seconds: int) -> None:
+    """Barre los handoffs vencidos, a lo más una vez por intervalo y directorio"""
+    directory = _handoff_dir()
+    now = time.monotonic()
+    last_sweep = _last_handoff_sweep.get(directory)
+    if last_sweep is not None and now - last_sweep < HANDOFF_SWEEP_INTERVAL_SECONDS:
+        return
+
+    _last_handoff_sweep[directory] = now
+    _remove_files_older_than(directory, max_age_seconds)
+
+
+def remove_expired_spill_files(max_age_seconds: int) -> int:
+    """
+    Elimina archivos de desborde y de handoff más viejos que `max_age_seconds`.
+
+    Cubre los frames cuyo puntero venció en Redis sin que se eliminaran. Solo
+    alcanza los archivos visibles desde este host.
+    """
+    return sum(
+        _remove_files_older_than(directory, max_age_seconds)
+        for directory in (env.get("REDIS_SPILL_DIR"), _handoff_dir())
+    )
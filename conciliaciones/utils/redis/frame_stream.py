@@ -0,0 +1,74 @@
+"""
+Streams de frames de solo agregado.
+
+Un frame que se construye por partes (p. ej. un reporte de KReports por
+empresa) se guarda como una lista de Redis (`<clave>:stream`) de record
+batches Arrow, cada uno codificado como frame. El productor agrega cada parte
+en cuanto la obtiene con `append_frame`, sin acumular el resultado completo
+en memoria, y los consumidores:
+
+    - leen las partes conforme llegan con `iter_stream` (desde un índice), o
+    - leen el frame completo con `get_df`/`get_table` como cualquier otro
+      frame: si la clave no tiene un frame se concatena su stream.
+
+Cada parte conserva su propio esquema. Al concatenar, las columnas se unen por
+nombre (`conciliaciones.utils.data.arrow_tables`): las que faltan en una parte
+quedan nulas (o con el texto de relleno que se indicó al agregarla) y las de
+tipos distintos se promueven al tipo común, o a texto si no lo hay. La tabla
+resultante registra las columnas convertidas a texto de todas las partes.
+
+Cada `append_frame` renueva la estampa de versión de la clave, por lo que la
+concatenación se guarda en la caché del proceso hasta la siguiente parte.
+`set_df` sobre la clave reemplaza el stream y `delete` lo elimina.
+"""
+
+import json
+
+import pyarrow as pa
+
+from conciliaciones.utils.data.arrow_tables import conform_table, unify_schemas
+from conciliaciones.utils.redis.frame_codec import (
+    STRINGIFIED_COLUMNS_KEY,
+    stringified_columns,
+)
+
+# Partes por LRANGE al recorrer un stream
+STREAM_PAGE_SIZE: int = 16
+
+# Metadato de una parte con el texto para sus columnas de texto faltantes
+STREAM_MISSING_TEXT_KEY: bytes = b"conciliaciones.stream_missing_text"
+
+
+def stream_key(key: str) -> str:
+    return f"{key}:stream"
+
+
+def with_missing_text(table: pa.Table, missing_text: str | None) -> pa.Table:
+    """Registra en la parte el texto de relleno de sus columnas faltantes"""
+    if missing_text is None:
+        return table
+    metadata = dict(table.schema.metadata or {})
+    metadata[STREAM_MISSING_TEXT_KEY] = missing_text.encode("utf-8")
+    return table.replace_schema_metadata(metadata)
+
+
+def _missing_text(table: pa.Table) -> str | None:
+    """Texto de relleno registrado en la parte con `with_missing_text`"""
+    missing_text = (table.schema.metadata or {}).get(STREAM_MISSING_TEXT_KEY)
+    return None if missing_text is None else missing_text.decode("utf-8")
+
+
+def concat_stream_tables(tables: list[pa.Table]) -> pa.Table:
+    """Une las partes de un stream en una sola tabla"""
+    schema = unify_schemas([table.schema for table in tables])
+
+    stringified: list[str] = []
+    for table in tables:
+        for col in stringified_columns(table.schema) or []:
+            if col not in stringified:
+                stringified.append(col)
+    metadata = {STRINGIFIED_COLUMNS_KEY: json.dumps(stringified).encode("utf-8")}
+
+    return pa.concat_tables(
+        [conform_table(table, schema, _missing_text(table)) for table in tables]
+    ).replace_schema_metadata(metadata)
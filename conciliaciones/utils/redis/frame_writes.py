@@ -0,0 +1,233 @@
+"""
+Pasos de escritura de frames compartidos por `RedisStorage` y `AsyncRedisStorage`.
+
+Las funciones de este módulo hacen el trabajo de CPU (conversión a Arrow,
+elección del codec, codificación) o encolan comandos en un pipeline; el envío
+(`execute`) queda a cargo de cada storage. Los pipelines de `redis` y de
+`redis.asyncio` encolan igual, de modo que la versión asyncio solo espera la
+red y ejecuta en el executor de hilos los pasos que consumen CPU.
+
+Configuración por variables de entorno:
+    - REDIS_FRAME_DEDUP: "true" para que `set_df` guarde los frames como
+      referencias a blobs deduplicados por defecto (ver `frame_blobs`).
+"""
+
+from collections.abc import Iterator
+
+import pyarrow as pa
+import redis
+import redis.asyncio
+from k_link.tools import env
+from pandas import DataFrame
+from typing_extensions import Buffer
+
+from conciliaciones.utils.redis.frame_blobs import blob_refs_key, blob_size_key
+from conciliaciones.utils.redis.frame_cache import version_key
+from conciliaciones.utils.redis.frame_catalog import FrameCatalogEntry
+from conciliaciones.utils.redis.frame_codec import (
+    FLAG_FILE,
+    FLAG_MANIFEST,
+    FLAG_REFERENCE,
+    IpcCompression,
+    decode_table,
+    encode_table,
+    frame_flags,
+    frame_to_table,
+    is_frame,
+)
+from conciliaciones.utils.redis.frame_compression import (
+    FrameCompression,
+    resolve_ipc_compression,
+)
+from conciliaciones.utils.redis.frame_shards import (
+    ColumnShards,
+    manifest_shards,
+    shard_key,
+)
+from conciliaciones.utils.redis.frame_spill import (
+    FramePointer,
+    encode_pointer,
+    handoff_key,
+)
+from conciliaciones.utils.redis.redis_keys import RedisKeys
+
+# Bytes acumulados en un pipeline antes de enviarlo a Redis
+PIPELINE_BATCH_BYTES: int = 128 * 1024**2
+
+# Ambos pipelines encolan los comandos sin esperar la red
+RedisPipeline = redis.client.Pipeline | redis.asyncio.client.Pipeline
+
+
+def dedup_enabled(dedup: bool | None) -> bool:
+    """`dedup` explícito o, por defecto, el valor de REDIS_FRAME_DEDUP"""
+    if dedup is not None:
+        return dedup
+    return (env.get("REDIS_FRAME_DEDUP") or "").lower() == "true"
+
+
+def prepare_table(
+    df: DataFrame, compression: FrameCompression, key: str
+) -> tuple[pa.Table, IpcCompression]:
+    """Convierte el DataFrame a Arrow y elige el codec IPC de sus frames"""
+    table = frame_to_table(df)
+    return table, resolve_ipc_compression(compression, table, key)
+
+
+def needs_rewrite(header: bytes | None) -> bool:
+    """Frames que `set_columns` reescribe completos: pickle, referencias y archivos"""
+    return not is_frame(header) or bool(
+        frame_flags(header) & (FLAG_REFERENCE | FLAG_FILE)  # type: ignore
+    )
+
+
+def is_manifest(header: bytes | None) -> bool:
+    return bool(header) and bool(frame_flags(header) & FLAG_MANIFEST)  # type: ignore
+
+
+def manifest_shard_keys(manifest_payload: Buffer | None) -> list[str]:
+    """Claves de los shards que lista un manifiesto"""
+    if manifest_payload is None:
+        return []
+    schema: pa.Schema = decode_table(manifest_payload).schema
+    return [shard["key"] for shard in manifest_shards(schema)]
+
+
+def queue_kept_shard_sizes(
+    pipeline: RedisPipeline, key: str, update: ColumnShards, rename_payload: bool
+) -> None:
+    """
+    Encola el STRLEN de los shards anteriores que siguen en el manifiesto.
+
+    Junto con lo escrito por `set_columns` dan el tamaño vigente del frame, sin
+    contar los shards muertos ni el manifiesto reemplazado. Con
+    `rename_payload` el shard 0 todavía es el payload bajo la clave del frame.
+    """
+    new_keys = {new_shard_key for new_shard_key, _ in update.new_shards}
+    for shard in manifest_shards(update.manifest.schema):
+        if shard["key"] not in new_keys:
+            pipeline.strlen(key if rename_payload else shard["key"])
+
+
+def encode_shards(
+    shards: list[tuple[str, pa.Table]], compression: IpcCompression
+) -> Iterator[tuple[str, pa.Buffer]]:
+    """Codifica bajo demanda los shards nuevos de `append_column_shards`"""
+    for new_shard_key, shard_table in shards:
+        yield new_shard_key, encode_table(shard_table, compression=compression)
+
+
+class PayloadBatches:
+    """
+    Encola en un pipeline los SET de una secuencia de frames, por lotes.
+
+    `fill` codifica y encola frames hasta acumular PIPELINE_BATCH_BYTES y
+    retorna True si el lote debe enviarse antes de continuar; al agotarse la
+    secuencia retorna False y el último lote queda pendiente en el pipeline.
+    """
+
+    def __init__(
+        self,
+        pipeline: RedisPipeline,
+        frames: Iterator[tuple[str, pa.Buffer]],
+        ttl: int | None,
+    ) -> None:
+        self._pipeline = pipeline
+        self._frames = frames
+        self._ttl = ttl
+        self.payload_size: int = 0
+        self.frame_keys: list[str] = []
+
+    def fill(self) -> bool:
+        batch_size = 0
+        for frame_key, frame in self._frames:
+            self._pipeline.set(name=frame_key, value=memoryview(frame), ex=self._ttl)
+            self.payload_size += frame.size
+            self.frame_keys.append(frame_key)
+            batch_size += frame.size
+
+            if batch_size >= PIPELINE_BATCH_BYTES:
+                return True
+
+        return False
+
+
+def queue_blob_ref(
+    transaction: RedisPipeline, target: str, key: str, ttl: int | None
+) -> None:
+    """Registra `key` como referencia del blob y consulta si ya existe"""
+    refs_key = blob_refs_key(target)
+    transaction.sadd(refs_key, key)
+    if ttl is not None:
+        transaction.expire(refs_key, ttl)
+    transaction.get(blob_size_key(target))
+
+
+def queue_blob_refresh(
+    pipeline: RedisPipeline, target: str, shard_keys: list[str], ttl: int
+) -> None:
+    """Renueva la vigencia de un blob idéntico ya guardado"""
+    for blob_part in (target, blob_size_key(target), *shard_keys):
+        pipeline.expire(blob_part, ttl)
+
+
+def queue_catalog_entry(
+    pipeline: RedisPipeline, catalog_key: str, entry: FrameCatalogEntry
+) -> None:
+    """El catálogo de la corrida vence con su propia política"""
+    pipeline.hset(catalog_key, entry.key, entry.model_dump_json())
+    ttl = RedisKeys.ttl_for_key(catalog_key)
+    if ttl is not None:
+        pipeline.expire(catalog_key, ttl)
+
+
+def queue_manifest(
+    transaction: RedisPipeline,
+    key: str,
+    update: ColumnShards,
+    rename_payload: bool,
+    ttl: int | None,
+) -> int:
+    """
+    Codifica y publica el manifiesto de `set_columns`; retorna su tamaño.
+
+    Los shards que ya no aportan columnas se eliminan en la misma transacción
+    que publica el manifiesto que deja de listarlos.
+
+    rename_payload: El frame no estaba particionado y su payload pasa a ser el
+        shard 0, sin volver a escribirse.
+    """
+    manifest_frame = encode_table(update.manifest, flags=FLAG_MANIFEST)
+    if rename_payload:
+        transaction.rename(key, shard_key(key, 0))
+    transaction.set(name=key, value=memoryview(manifest_frame), ex=ttl)
+    if update.dead_shard_keys:
+        transaction.unlink(*update.dead_shard_keys)
+    if ttl is not None:
+        # Los shards vigentes vencen junto con el manifiesto
+        for shard in manifest_shards(update.manifest.schema):
+            transaction.expire(shard["key"], ttl)
+
+    return manifest_frame.size
+
+
+def queue_version(
+    pipeline: RedisPipeline,
+    key: str,
+    version: str,
+    ttl: int | None,
+    handoff_pointer: FramePointer | None = None,
+) -> None:
+    """
+    Publica el handoff y la estampa de versión del frame.
+
+    Se encola al final: quien lea la versión ya encuentra el frame nuevo. Sin
+    `handoff_pointer` se elimina el handoff anterior, que quedó desactualizado.
+    """
+    if handoff_pointer is not None:
+        pipeline.set(
+            name=handoff_key(key), value=encode_pointer(handoff_pointer), ex=ttl
+        )
+    else:
+        pipeline.delete(handoff_key(key))
+
+    pipeline.set(name=version_key(key), value=version, ex=ttl)
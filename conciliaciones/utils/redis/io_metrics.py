@@ -0,0 +1,471 @@
+"""
+Instrumentación de E/S de la capa de almacenamiento.
+
+Cada lectura y escritura de `RedisStorage` y `AsyncRedisStorage` (`get`,
+`set`, `set_df`, `set_columns`, `get_df`, `get_table`, `iter_batches`) se mide
+y se acumula por clave, operación y etapa (`ConciliationTask`):
+
+    - Bytes del payload enviados a Redis o recibidos de él.
+    - Tiempo de codificación y de decodificación (conversión pandas/Arrow,
+      Arrow IPC y pickle).
+    - Latencia total de la operación; lo que no es codec es red y Redis.
+    - Lecturas servidas por la caché del proceso o por el handoff.
+
+La instrumentación está apagada salvo que haya dónde entregar las métricas:
+REDIS_IO_METRICS_FILE configurado, o REDIS_IO_METRICS=true para quien las
+lea con `StorageMetrics.drain` (o `snapshot` seguido de `clear`).
+
+La etapa se toma del argumento `task` de `set_df`/`set_columns` o de la etapa
+activa (`storage_stage`). Las métricas viven en el proceso: al cerrar una
+etapa con REDIS_IO_METRICS_FILE configurado, las de esa etapa se agregan al
+archivo y se descartan. Al cerrar la última etapa activa del proceso se
+exporta además todo lo que quedó acumulado: operaciones fuera de una etapa y
+claves sin etiqueta de corrida (blobs, uploads parseados). Así cada tarea de
+la corrida, en su propio proceso, escribe en el mismo archivo, y la etiqueta
+`run` (`RedisKeys.base_key`) permite agregarlas por corrida.
+
+El archivo es de una línea por clave: JSON o line protocol de InfluxDB
+(medición `redis_io`), listo para `influx write` o Telegraf.
+
+Configuración por variables de entorno:
+    - REDIS_IO_METRICS: "true" activa la instrumentación sin archivo; "false"
+      la desactiva aunque haya archivo.
+    - REDIS_IO_METRICS_FILE: Archivo al que se agregan las métricas de cada
+      etapa; basta con configurarlo para activar la instrumentación.
+    - REDIS_IO_METRICS_FORMAT: "jsonl" (default) o "influx".
+"""
+
+import functools
+import json
+import threading
+import time
+from collections.abc import AsyncIterator, Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Literal, ParamSpec, TypeVar
+
+from k_link.tools import env
+from loggerk import LoggerK
+from pydantic import BaseModel
+
+from conciliaciones.models.proceso_conciliacion import ConciliationTask
+from conciliaciones.utils.redis.redis_keys import RedisKeys, run_hash_tag
+
+T = TypeVar("T")
+P = ParamSpec("P")
+
+IOOperation = Literal["get", "set"]
+
+IOMetricsFormat = Literal["jsonl", "influx"]
+
+# Medición del line protocol de InfluxDB
+INFLUX_MEASUREMENT: str = "redis_io"
+
+
+class KeyIOStats(BaseModel):
+    key: str
+    family: str | None
+    operation: IOOperation
+    task: str | None
+    calls: int = 0
+    cache_hits: int = 0
+    payload_bytes: int = 0
+    encode_seconds: float = 0.0
+    decode_seconds: float = 0.0
+    latency_seconds: float = 0.0
+
+    @property
+    def network_seconds(self) -> float:
+        """Latencia que no se fue en codificar o decodificar"""
+        return max(
+            0.0, self.latency_seconds - self.encode_seconds - self.decode_seconds
+        )
+
+
+class IOMeasurement:
+    """Medición en curso de una operación (ver `StorageMetrics.measure`)"""
+
+    def __init__(
+        self, key: str, operation: IOOperation, task: ConciliationTask | None
+    ) -> None:
+        self.key = key
+        self.operation = operation
+        self.task = task
+        self.payload_bytes = 0
+        self.encode_seconds = 0.0
+        self.decode_seconds = 0.0
+        self.latency_seconds = 0.0
+        self.cache_hit = False
+        self.codec_active = False
+
+
+_current_measurement: ContextVar[IOMeasurement | None] = ContextVar(
+    "io_measurement", default=None
+)
+_current_task: ContextVar[ConciliationTask | None] = ContextVar(
+    "storage_task", default=None
+)
+
+
+def add_payload_bytes(size: int) -> None:
+    """Suma bytes de payload a la operación en curso, si se está midiendo"""
+    measurement = _current_measurement.get()
+    if measurement is not None:
+        measurement.payload_bytes += size
+
+
+def mark_cache_hit() -> None:
+    """Marca la operación en curso como servida sin descargar el payload"""
+    measurement = _current_measurement.get()
+    if measurement is not None:
+        measurement.cache_hit = True
+
+
+@contextmanager
+def codec_timer(direction: Literal["encode", "decode"]) -> Iterator[None]:
+    """
+    Suma el tiempo del bloque al codec de la operación en curso.
+
+    Los bloques anidados (p. ej. `decode_table` dentro de otra decodificación)
+    solo se cuentan una vez.
+    """
+    measurement = _current_measurement.get()
+    if measurement is None or measurement.codec_active:
+        yield
+        return
+
+    measurement.codec_active = True
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        measurement.codec_active = False
+        if direction == "encode":
+            measurement.encode_seconds += elapsed
+        else:
+            measurement.decode_seconds += elapsed
+
+
+def codec_timed(
+    direction: Literal["encode", "decode"],
+) -> Callable[[Callable[P, T]], Callable[P, T]]:
+    """Decorador de `codec_timer` para las funciones del codec"""
+
+    def decorator(function: Callable[P, T]) -> Callable[P, T]:
+        @functools.wraps(function)
+        def wrapper(*args: P.args, **kwargs: P.kwargs) -> T:
+            with codec_timer(direction):
+                return function(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+@contextmanager
+def storage_stage(task: ConciliationTask, run: str | None = None) -> Iterator[None]:
+    """
+    Atribuye a `task` las operaciones de almacenamiento del bloque.
+
+    Al salir, si REDIS_IO_METRICS_FILE está configurado, las métricas de la
+    etapa se agregan al archivo con la etiqueta `run`. Si era la última etapa
+    activa del proceso, se agrega también todo lo demás acumulado.
+    """
+    token = _current_task.set(task)
+    StorageMetrics.enter_stage()
+    try:
+        yield
+    finally:
+        _current_task.reset(token)
+        last_stage = StorageMetrics.exit_stage()
+        path = env.get("REDIS_IO_METRICS_FILE")
+        if path:
+            StorageMetrics.export(
+                path,
+                run=run,
+                task=task,
+                fmt=env.get("REDIS_IO_METRICS_FORMAT") or "jsonl",
+                remaining=last_stage,
+            )
+
+
+def _escape_tag(value: str) -> str:
+    return (
+        value.replace("\\", "\\\\")
+        .replace(",", "\\,")
+        .replace(" ", "\\ ")
+        .replace("=", "\\=")
+    )
+
+
+def to_line_protocol(
+    stats: list[KeyIOStats],
+    run: str | None = None,
+    timestamp_ns: int | None = None,
+) -> str:
+    """Métricas en line protocol de InfluxDB, una línea por clave y operación"""
+    timestamp_ns = timestamp_ns if timestamp_ns is not None else time.time_ns()
+    lines: list[str] = []
+    for entry in stats:
+        tags = {
+            "run": run,
+            "family": entry.family,
+            "task": entry.task,
+            "operation": entry.operation,
+            "key": entry.key,
+        }
+        tag_set = ",".join(
+            f"{name}={_escape_tag(value)}" for name, value in tags.items() if value
+        )
+        field_set = ",".join(
+            [
+                f"calls={entry.calls}i",
+                f"cache_hits={entry.cache_hits}i",
+                f"payload_bytes={entry.payload_bytes}i",
+                f"encode_seconds={entry.encode_seconds}",
+                f"decode_seconds={entry.decode_seconds}",
+                f"network_seconds={entry.network_seconds}",
+                f"latency_seconds={entry.latency_seconds}",
+            ]
+        )
+        lines.append(f"{INFLUX_MEASUREMENT},{tag_set} {field_set} {timestamp_ns}")
+
+    return "\n".join(lines)
+
+
+def to_json_lines(stats: list[KeyIOStats], run: str | None = None) -> str:
+    """Métricas en JSON, una línea por clave y operación"""
+    timestamp = time.time()
+    return "\n".join(
+        json.dumps(
+            {
+                "run": run,
+                "timestamp": timestamp,
+                **entry.model_dump(),
+                "network_seconds": entry.network_seconds,
+            }
+        )
+        for entry in stats
+    )
+
+
+class StorageMetrics:
+    _lock: threading.Lock = threading.Lock()
+    _stats: dict[tuple[str, str, str | None], KeyIOStats] = {}
+    _active_stages: int = 0
+
+    @staticmethod
+    def enabled() -> bool:
+        """Activa con REDIS_IO_METRICS=true o con REDIS_IO_METRICS_FILE"""
+        flag = (env.get("REDIS_IO_METRICS") or "").lower()
+        if flag == "false":
+            return False
+        return flag == "true" or bool(env.get("REDIS_IO_METRICS_FILE"))
+
+    @classmethod
+    def enter_stage(cls) -> None:
+        with cls._lock:
+            cls._active_stages += 1
+
+    @classmethod
+    def exit_stage(cls) -> bool:
+        """Cierra una etapa; True si no queda otra activa en el proceso"""
+        with cls._lock:
+            cls._active_stages = max(0, cls._active_stages - 1)
+            return cls._active_stages == 0
+
+    @classmethod
+    @contextmanager
+    def measure(
+        cls,
+        key: str,
+        operation: IOOperation,
+        task: ConciliationTask | None = None,
+    ) -> Iterator[None]:
+        """
+        Mide una operación de almacenamiento sobre `key`.
+
+        Las operaciones anidadas (p. ej. `get_table` dentro de `get_df`) se
+        acumulan en la medición exterior.
+        """
+        if _current_measurement.get() is not None or not cls.enabled():
+            yield
+            return
+
+        measurement = IOMeasurement(key, operation, task or _current_task.get())
+        token = _current_measurement.set(measurement)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            measurement.latency_seconds = time.perf_counter() - start
+            _current_measurement.reset(token)
+            cls.record(measurement)
+
+    @classmethod
+    def measure_iter(cls, key: str, batches: Iterator[T]) -> Iterator[T]:
+        """
+        Mide la lectura de un iterador de `key`.
+
+        Solo se cuenta el tiempo dentro del iterador, no el que el consumidor
+        pasa procesando cada elemento.
+        """
+        if not cls.enabled():
+            yield from batches
+            return
+
+        measurement = IOMeasurement(key, "get", _current_task.get())
+        try:
+            while True:
+                token = _current_measurement.set(measurement)
+                start = time.perf_counter()
+                try:
+                    batch = next(batches, None)
+                finally:
+                    measurement.latency_seconds += time.perf_counter() - start
+                    _current_measurement.reset(token)
+                if batch is None:
+                    return
+                yield batch
+        finally:
+            cls.record(measurement)
+
+    @classmethod
+    async def measure_aiter(
+        cls, key: str, batches: AsyncIterator[T]
+    ) -> AsyncIterator[T]:
+        """Versión asíncrona de `measure_iter`"""
+        if not cls.enabled():
+            async for batch in batches:
+                yield batch
+            return
+
+        measurement = IOMeasurement(key, "get", _current_task.get())
+        try:
+            while True:
+                token = _current_measurement.set(measurement)
+                start = time.perf_counter()
+                try:
+                    batch = await anext(batches, None)
+                finally:
+                    measurement.latency_seconds += time.perf_counter() - start
+                    _current_measurement.reset(token)
+                if batch is None:
+                    return
+                yield batch
+        finally:
+            cls.record(measurement)
+
+    @classmethod
+    def record(cls, measurement: IOMeasurement) -> None:
+        family = RedisKeys.key_family(measurement.key)
+        task = measurement.task.name if measurement.task else None
+        entry_key = (measurement.key, measurement.operation, task)
+
+        with cls._lock:
+            entry = cls._stats.get(entry_key)
+            if entry is None:
+                entry = KeyIOStats(
+                    key=measurement.key,
+                    family=family.value if family else None,
+                    operation=measurement.operation,
+                    task=task,
+                )
+                cls._stats[entry_key] = entry
+
+            entry.calls += 1
+            entry.cache_hits += int(measurement.cache_hit)
+            entry.payload_bytes += measurement.payload_bytes
+            entry.encode_seconds += measurement.encode_seconds
+            entry.decode_seconds += measurement.decode_seconds
+            entry.latency_seconds += measurement.latency_seconds
+
+    @classmethod
+    def snapshot(
+        cls, run: str | None = None, task: ConciliationTask | None = None
+    ) -> list[KeyIOStats]:
+        """
+        Métricas acumuladas, de mayor a menor latencia.
+
+        run: Solo las claves de la corrida (`RedisKeys.base_key`).
+        task: Solo las operaciones de la etapa.
+        """
+        with cls._lock:
+            stats = [
+                entry.model_copy()
+                for entry_key, entry in cls._stats.items()
+                if cls._matches(entry_key, run, task)
+            ]
+        return sorted(stats, key=lambda entry: entry.latency_seconds, reverse=True)
+
+    @classmethod
+    def drain(
+        cls, run: str | None = None, task: ConciliationTask | None = None
+    ) -> list[KeyIOStats]:
+        """Como `snapshot`, pero descarta las métricas retornadas"""
+        with cls._lock:
+            entry_keys = [
+                entry_key
+                for entry_key in cls._stats
+                if cls._matches(entry_key, run, task)
+            ]
+            stats = [cls._stats.pop(entry_key) for entry_key in entry_keys]
+        return sorted(stats, key=lambda entry: entry.latency_seconds, reverse=True)
+
+    @classmethod
+    def export(
+        cls,
+        path: str,
+        run: str | None = None,
+        task: ConciliationTask | None = None,
+        fmt: IOMetricsFormat = "jsonl",
+        *,
+        remaining: bool = False,
+    ) -> int:
+        """
+        Agrega al archivo las métricas acumuladas y las descarta.
+
+        Un error al escribir solo se registra: las métricas no deben detener
+        la etapa.
+
+        remaining: Exporta todo lo acumulado en el proceso, no solo lo de `run`
+            y `task`; todo queda con la etiqueta `run`.
+
+        Returns:
+            int: Número de líneas escritas.
+        """
+        stats = cls.drain() if remaining else cls.drain(run=run, task=task)
+        if not stats:
+            return 0
+
+        content = (
+            to_line_protocol(stats, run=run)
+            if fmt == "influx"
+            else to_json_lines(stats, run=run)
+        )
+        try:
+            with Path(path).open("a", encoding="utf-8") as output:
+                output.write(content + "\n")
+        except OSError as error:
+            LoggerK(cls.__name__).warning(f"Métricas de E/S no exportadas: {error}")
+            return 0
+
+        return len(stats)
+
+    @classmethod
+    def clear(cls) -> None:
+        with cls._lock:
+            cls._stats.clear()
+
+    @staticmethod
+    def _matches(
+        entry_key: tuple[str, str, str | None],
+        run: str | None,
+        task: ConciliationTask | None,
+    ) -> bool:
+        key, _, entry_task = entry_key
+        if run is not None and run not in key and run_hash_tag(run) not in key:
+            return False
+        return task is None or entry_task == task.name
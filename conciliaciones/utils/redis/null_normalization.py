@@ -0,0 +1,117 @@
+"""
+Normalización vectorizada de nulos para los DataFrames leídos desde Redis.
+
+Reglas (equivalentes a `RedisStorage.safe_convert_value` celda por celda):
+    - Columnas de texto: "nan", "nat", "none" y "" (sin importar mayúsculas
+      ni espacios) se convierten en None; el resto se conserva como str.
+    - Columnas int64 se convierten al tipo nullable Int64.
+
+En los frames que conservan su esquema (ver `frame_codec`) las columnas
+object que no son texto en Arrow (fechas, decimales) conservan sus valores
+tipados; en los frames anteriores se convierten a texto como antes.
+"""
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+from pandas import DataFrame
+
+from conciliaciones.utils.redis.frame_codec import stringified_columns
+
+NULL_SENTINELS: list[str] = ["nan", "nat", "none", ""]
+
+_NULL_SENTINELS_ARRAY = pa.array(NULL_SENTINELS, type=pa.string())
+
+
+def _is_string_type(data_type: pa.DataType) -> bool:
+    return pa.types.is_string(data_type) or pa.types.is_large_string(data_type)
+
+
+def _nullable_types_mapper(
+    data_type: pa.DataType,
+) -> pd.api.extensions.ExtensionDtype | None:
+    if pa.types.is_int64(data_type):
+        return pd.Int64Dtype()
+    return None
+
+
+def _sentinel_mask(column: pa.ChunkedArray) -> pa.ChunkedArray:
+    normalized = pc.utf8_lower(pc.utf8_trim_whitespace(column))
+    return pc.is_in(normalized, value_set=_NULL_SENTINELS_ARRAY)
+
+
+def normalize_table(table: pa.Table, columns: list[str] | None = None) -> pa.Table:
+    """
+    Reemplaza por nulos los valores centinela de las columnas de texto.
+
+    columns: Limita la normalización a estas columnas (por defecto, todas).
+    """
+    for index, field in enumerate(table.schema):
+        if not _is_string_type(field.type):
+            continue
+        if columns is not None and field.name not in columns:
+            continue
+
+        column = table.column(index)
+        normalized = pc.if_else(
+            _sentinel_mask(column), pa.scalar(None, type=field.type), column
+        )
+        table = table.set_column(index, field, normalized)
+
+    return table
+
+
+def normalize_series(series: pd.Series) -> pd.Series:
+    """Normaliza una columna object con operaciones vectorizadas de pandas"""
+    series = series.astype(str)
+    mask = series.str.strip().str.lower().isin(NULL_SENTINELS)
+    return series.where(~mask, None)
+
+
+def normalize_frame(df: DataFrame) -> DataFrame:
+    """Normaliza nulos de un DataFrame ya materializado en pandas"""
+    for col in df.columns:
+        match df[col].dtype:
+            case "object":
+                df[col] = normalize_series(df[col])
+            case "int64":
+                df[col] = df[col].astype("Int64")
+
+    return df
+
+
+def table_to_normalized_frame(table: pa.Table) -> DataFrame:
+    """
+    Convierte una tabla Arrow a DataFrame aplicando la normalización de nulos.
+
+    Las columnas de texto se normalizan con kernels de Arrow antes de la
+    conversión y los enteros se materializan directamente como Int64. Solo las
+    columnas que pandas represente como object sin ser texto en Arrow
+    (fechas, decimales, listas) pasan por la ruta vectorizada de pandas.
+
+    Si la tabla conserva su esquema, la ruta de pandas se omite y el resto de
+    los dtypes se respeta tal cual.
+    """
+    return normalized_table_to_frame(normalize_table(table))
+
+
+def normalized_table_to_frame(table: pa.Table) -> DataFrame:
+    """
+    Convierte a DataFrame una tabla que ya pasó por `normalize_table`.
+
+    Permite reutilizar la tabla normalizada (p. ej. desde `FrameCache`) y
+    pagar solo la conversión a pandas.
+    """
+    string_columns: set[str] = {
+        field.name for field in table.schema if _is_string_type(field.type)
+    }
+
+    df: DataFrame = table.to_pandas(types_mapper=_nullable_types_mapper)
+    if stringified_columns(table.schema) is not None:
+        return df
+
+    for col in df.columns:
+        if col not in string_columns and df[col].dtype == "object":
+            df[col] = normalize_series(df[col])
+
+    return df
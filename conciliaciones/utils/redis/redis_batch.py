@@ -0,0 +1,170 @@
+"""
+Escrituras por lotes de claves pequeñas de metadatos.
+
+Las listas de headers (`HeadersTypes`), métricas, excepciones
+(`AirflowContexException`), configuraciones de formato y banderas de etapa se
+escriben con un SET cada una y a menudo se releen enseguida. Dentro de
+`RedisStorage.batch()` esos `set` se encolan y se envían en un solo pipeline
+al salir del bloque (aunque termine con excepción, para no perder la
+excepción guardada) o cuando lo encolado alcanza `max_bytes`.
+
+El lote es del contexto en curso (hilo o tarea asyncio) y aplica a todas las
+instancias de `RedisStorage` del mismo servidor, por lo que las clases que
+crean su propia instancia (`HeadersTypes`, `AirflowContexException`) se suman
+al lote sin cambios. Mientras está abierto:
+
+    - `get` de una clave encolada se responde con el valor encolado, sin ir a
+      Redis; `prefetch` trae varias claves en un solo MGET.
+    - Los valores de más de BATCH_VALUE_MAX_BYTES (buffers de Excel, frames)
+      no se encolan: se envía antes lo encolado y se escriben directo, de
+      modo que el orden de las escrituras se conserva.
+    - Las escrituras de frames y las eliminaciones de una clave encolada
+      envían primero el lote.
+"""
+
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+import redis
+from loggerk import LoggerK
+
+from conciliaciones.utils.redis.frame_cache import version_key
+from conciliaciones.utils.redis.redis_keys import RedisKeys
+
+# Bytes encolados a partir de los cuales el lote se envía sin esperar al final
+BATCH_FLUSH_BYTES: int = 1024**2
+
+# Valores más grandes que esto se escriben directo, fuera del lote
+BATCH_VALUE_MAX_BYTES: int = 64 * 1024
+
+
+class RedisBatch:
+    _logger: LoggerK
+
+    def __init__(
+        self,
+        client: redis.StrictRedis,
+        target: str,
+        max_bytes: int = BATCH_FLUSH_BYTES,
+        transaction: bool = False,
+    ) -> None:
+        self._logger = LoggerK(self.__class__.__name__)
+        self.target = target
+        self._client = client
+        self._max_bytes = max_bytes
+        self._transaction = transaction
+        self._pending: dict[str, bytes] = {}
+        self._pending_bytes = 0
+        self._prefetched: dict[str, bytes | None] = {}
+        self.round_trips = 0
+
+    def queue_set(self, key: str, serialized: bytes) -> bool:
+        """
+        Encola el SET de un valor ya serializado.
+
+        Returns:
+            bool: False si el valor es demasiado grande para el lote; en ese
+                caso lo encolado ya se envió y el llamador debe escribirlo.
+        """
+        if len(serialized) > BATCH_VALUE_MAX_BYTES:
+            self.flush()
+            return False
+
+        previous = self._pending.pop(key, None)
+        if previous is not None:
+            self._pending_bytes -= len(previous)
+        self._pending[key] = serialized
+        self._pending_bytes += len(serialized)
+        self._prefetched.pop(key, None)
+
+        if self._pending_bytes >= self._max_bytes:
+            self.flush()
+        return True
+
+    def lookup(self, key: str) -> tuple[bool, bytes | None]:
+        """
+        Valor de una clave encolada o precargada.
+
+        Returns:
+            tuple[bool, bytes | None]: (encontrado, valor serializado); un
+                valor None encontrado es una clave precargada que no existe.
+        """
+        if key in self._pending:
+            return True, self._pending[key]
+        if key in self._prefetched:
+            return True, self._prefetched[key]
+        return False, None
+
+    def prefetch(self, *keys: str) -> None:
+        """Trae en un solo MGET las claves que se leerán a continuación"""
+        missing = [key for key in keys if not self.lookup(key)[0]]
+        if not missing:
+            return
+        values = self._client.mget(missing)
+        self.round_trips += 1
+        self._prefetched.update(zip(missing, values, strict=True))  # type: ignore
+
+    def sync(self, keys: Iterable[str]) -> None:
+        """
+        Prepara el lote para una operación directa sobre `keys`.
+
+        Si alguna está encolada se envía el lote; las precargadas se descartan.
+        """
+        keys = list(keys)
+        for key in keys:
+            self._prefetched.pop(key, None)
+        if any(key in self._pending for key in keys):
+            self.flush()
+
+    def flush(self) -> None:
+        """Envía lo encolado en un solo pipeline"""
+        if not self._pending:
+            return
+
+        pipeline = self._client.pipeline(transaction=self._transaction)
+        for key, serialized in self._pending.items():
+            pipeline.set(name=key, value=serialized, ex=RedisKeys.ttl_for_key(key))
+            # La clave deja de ser un frame versionado
+            pipeline.delete(version_key(key))
+        pipeline.execute()
+        self.round_trips += 1
+
+        self._logger.info(
+            f"Lote enviado: {len(self._pending)} claves, {self._pending_bytes} bytes"
+        )
+        self._pending.clear()
+        self._pending_bytes = 0
+
+
+_active_batch: ContextVar[RedisBatch | None] = ContextVar("redis_batch", default=None)
+
+
+def active_batch(target: str) -> RedisBatch | None:
+    """Lote abierto en el contexto en curso para el servidor `target`"""
+    batch = _active_batch.get()
+    if batch is None or batch.target != target:
+        return None
+    return batch
+
+
+@contextmanager
+def batch_scope(
+    client: redis.StrictRedis,
+    target: str,
+    max_bytes: int = BATCH_FLUSH_BYTES,
+    transaction: bool = False,
+) -> Iterator[RedisBatch]:
+    """Abre un lote en el contexto en curso; un lote anidado reutiliza el abierto"""
+    current = active_batch(target)
+    if current is not None:
+        yield current
+        return
+
+    batch = RedisBatch(client, target, max_bytes=max_bytes, transaction=transaction)
+    token = _active_batch.set(batch)
+    try:
+        yield batch
+    finally:
+        _active_batch.reset(token)
+        batch.flush()
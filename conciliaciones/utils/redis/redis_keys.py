@@ -1,8 +1,38 @@
+"""
+Nombres de las claves de Redis de una corrida.
+
+Layouts (REDIS_KEY_LAYOUT):
+
+    - "1" (default): `<familia>_<nombre>_<base_key>`, el layout original. Las
+      claves de una corrida caen en slots distintos de un Redis Cluster, por lo
+      que no admiten MGET, pipelines multi-clave ni transacciones entre ellas.
+    - "2": `k2:{<run>}:<familia>_<nombre>`, donde `<run>` es un hash corto del
+      `base_key`. La etiqueta `{<run>}` lleva todas las claves de la corrida, y
+      las derivadas de ellas (versión, shards, streams, handoff), al mismo
+      slot, y el `base_key` ya no se repite dentro de la clave.
+
+Migración: el layout se cambia entre corridas, nunca a mitad de una; todas las
+etapas de una corrida deben usar el mismo. El recolector (`namespace_patterns`)
+recorre las claves de la corrida en ambos layouts hasta que vencen.
+
+Para cambiar al layout 2 con corridas en curso, REDIS_KEY_LEGACY_FALLBACK=true
+hace que las claves que compone `RedisKeys` con el layout 2 recuerden su
+nombre en el layout 1 (`legacy_key`): los lectores de `RedisStorage` que no
+encuentran una clave la buscan con ese nombre y `delete` elimina ambas. Solo
+se recuerdan las LEGACY_KEYS_MAX_SIZE claves compuestas más recientes, y sin
+la bandera no se recuerda ninguna ni se hace la búsqueda adicional.
+"""
+
+import hashlib
+import re
+import threading
+from collections import OrderedDict
 from enum import Enum
 
 from k_link.db.core import ObjectId
 from k_link.extensions.conciliation_type import ConciliationType
 from k_link.extensions.pivot_k import PivoteKHeader
+from k_link.tools import env
 from loggerk import LoggerK
 
 
@@ -28,6 +58,113 @@ class Keys(Enum):
     DATAFRAME_GROUP = "dataframe_group"
     DATAFRAME_PIVOT = "dataframe_pivot"
     WEBHOOKS_CONCILIATION_REQUEST = "WEBHOOKS_CONCILIATION_REQUEST"
+    FRAME_CATALOG = "frame_catalog"
+    FRAME_BLOB = "frame_blob"
+    PARSED_UPLOAD = "parsed_upload"
+
+
+# Vigencia de las claves de una corrida, en múltiplos de REDIS_RUN_TTL_SECONDS.
+# Los frames y buffers se descartan primero; los resultados que se consultan al
+# terminar la corrida (excepciones, estatus del webhook, catálogo, métricas)
+# se conservan más tiempo, igual que la caché de archivos ERP parseados, que se
+# comparte entre corridas.
+KEY_TTL_FACTORS: dict[Keys, int] = {
+    Keys.ERP: 1,
+    Keys.SAT_ERP: 1,
+    Keys.SAT_NO_ERP_PERIODO: 1,
+    Keys.SAT_SHEETS: 1,
+    Keys.SAT: 1,
+    Keys.EXCEL_BUFFER: 1,
+    Keys.INDICATORS: 1,
+    Keys.DATAFRAME_GROUP: 1,
+    Keys.DATAFRAME_PIVOT: 1,
+    Keys.FRAME_BLOB: 1,
+    Keys.LIST_HEADERS: 2,
+    Keys.DYNAMIC: 2,
+    Keys.DYNAMIC_HEADERS: 2,
+    Keys.PIVOTS: 2,
+    Keys.VALIDATIONS: 2,
+    Keys.VALIDATION_META_DATA: 2,
+    Keys.OPERATIONS: 2,
+    Keys.LABELS: 2,
+    Keys.FORMAT_CONFIG: 2,
+    Keys.METRICS: 7,
+    Keys.EXCEPTIONS: 7,
+    Keys.FRAME_CATALOG: 7,
+    Keys.WEBHOOKS_CONCILIATION_REQUEST: 7,
+    Keys.PARSED_UPLOAD: 7,
+}
+
+# Familias que el recolector de fin de corrida conserva hasta que expiren
+RETAINED_KEY_FAMILIES: tuple[Keys, ...] = (
+    Keys.METRICS,
+    Keys.EXCEPTIONS,
+    Keys.FRAME_CATALOG,
+    Keys.WEBHOOKS_CONCILIATION_REQUEST,
+)
+
+KEY_LAYOUT_LEGACY: str = "1"
+KEY_LAYOUT_CLUSTER: str = "2"
+
+# Prefijo de las claves del layout 2
+CLUSTER_KEY_PREFIX: str = "k2"
+
+# Claves del layout 2 cuyo nombre en el layout 1 se recuerda para la migración
+LEGACY_KEYS_MAX_SIZE: int = 4096
+
+# Nombre en el layout 1 de las claves compuestas más recientes del layout 2
+_LEGACY_KEYS: OrderedDict[str, str] = OrderedDict()
+_LEGACY_KEYS_LOCK: threading.Lock = threading.Lock()
+
+# Prefijos de mayor a menor longitud, para que "sat_erp" gane sobre "sat"
+_FAMILY_PREFIXES: list[Keys] = sorted(
+    Keys, key=lambda key: len(key.value), reverse=True
+)
+
+
+def key_layout() -> str:
+    """Layout de claves configurado en REDIS_KEY_LAYOUT"""
+    return env.get("REDIS_KEY_LAYOUT") or KEY_LAYOUT_LEGACY
+
+
+def run_hash_tag(base_key: str) -> str:
+    """Etiqueta de hash de Redis Cluster de las claves de una corrida"""
+    digest = hashlib.blake2b(base_key.encode("utf-8"), digest_size=6).hexdigest()
+    return f"{{{digest}}}"
+
+
+def legacy_fallback_enabled() -> bool:
+    """Búsqueda de claves del layout 1 activada con REDIS_KEY_LEGACY_FALLBACK"""
+    return (env.get("REDIS_KEY_LEGACY_FALLBACK") or "").lower() == "true"
+
+
+def legacy_key(key: str) -> str | None:
+    """Nombre en el layout 1 de una clave del layout 2 (None si no se recuerda)"""
+    if not legacy_fallback_enabled():
+        return None
+    with _LEGACY_KEYS_LOCK:
+        return _LEGACY_KEYS.get(key)
+
+
+def with_legacy_keys(keys: tuple[str, ...]) -> tuple[str, ...]:
+    """Las claves más sus nombres en el layout 1"""
+    legacy = (legacy_key(key) for key in keys)
+    return keys + tuple(key for key in legacy if key is not None)
+
+
+def _remember_legacy_key(key: str, legacy: str) -> None:
+    with _LEGACY_KEYS_LOCK:
+        _LEGACY_KEYS[key] = legacy
+        _LEGACY_KEYS.move_to_end(key)
+        while len(_LEGACY_KEYS) > LEGACY_KEYS_MAX_SIZE:
+            _LEGACY_KEYS.popitem(last=False)
+
+
+def _key_name(key: str) -> str:
+    """Clave sin el prefijo ni la etiqueta de corrida del layout 2"""
+    if key.startswith(f"{CLUSTER_KEY_PREFIX}:"):
+        return key.split(":", 2)[-1]
+    return key
 
 
 class RedisKeys:
@@ -106,8 +243,20 @@ class RedisKeys:
     def get_sat_erp_meta_cancel_key(self) -> str:
         return self._compose_key(f"{Keys.SAT_ERP.value}_meta_cancelada")
 
+    @property
+    def run_tag(self) -> str:
+        return run_hash_tag(self.base_key)
+
     def _compose_key(self, key: str) -> str:
-        return f"{key}_{self.base_key}"
+        composed_key = f"{key}_{self.base_key}"
+        if key_layout() == KEY_LAYOUT_LEGACY:
+            return composed_key
+
+        name = key.replace(f"_{self.base_key}", "")
+        cluster_key = f"{CLUSTER_KEY_PREFIX}:{self.run_tag}:{name}"
+        if legacy_fallback_enabled():
+            _remember_legacy_key(cluster_key, composed_key)
+        return cluster_key
 
     def get_headers_erp_list_key(self) -> str:
         return self._compose_key(f"{Keys.LIST_HEADERS.value}_{Keys.ERP.value}")
@@ -135,6 +284,9 @@ class RedisKeys:
     def get_headers_sat_list_key(self) -> str:
         return self._compose_key(f"{Keys.LIST_HEADERS.value}_{Keys.SAT.value}")
 
+    def get_headers_registry_key(self) -> str:
+        return self._compose_key(f"{Keys.LIST_HEADERS.value}_registry")
+
     def get_headers_report_type_list_key(self, name_report_type: str) -> str:
         return self._compose_key(
             f"{Keys.LIST_HEADERS.value}_report_type_{name_report_type}"
@@ -158,6 +310,59 @@ class RedisKeys:
     def get_dataframe_pivot_redis_key(self, pivot_name: str) -> str:
         return self._compose_key(f"{Keys.DATAFRAME_PIVOT.value}_{pivot_name}")
 
+    def get_frame_catalog_key(self) -> str:
+        return self._compose_key(Keys.FRAME_CATALOG.value)
+
     @property
     def redis_key_conciliation_status(self) -> str:
         return self._compose_key(Keys.WEBHOOKS_CONCILIATION_REQUEST.value)
+
+    @property
+    def namespace_pattern(self) -> str:
+        """Patrón SCAN de todas las claves de la corrida (frames, shards, versiones)"""
+        if key_layout() == KEY_LAYOUT_LEGACY:
+            return self._legacy_namespace_pattern
+        return self._cluster_namespace_pattern
+
+    @property
+    def namespace_patterns(self) -> list[str]:
+        """Patrones SCAN de la corrida en ambos layouts, primero el actual"""
+        patterns = [
+            self.namespace_pattern,
+            self._legacy_namespace_pattern,
+            self._cluster_namespace_pattern,
+        ]
+        return list(dict.fromkeys(patterns))
+
+    @property
+    def _cluster_namespace_pattern(self) -> str:
+        return f"{CLUSTER_KEY_PREFIX}:{self.run_tag}:*"
+
+    @property
+    def _legacy_namespace_pattern(self) -> str:
+        escaped_base_key = re.sub(r"([*?\[\]\\])", r"\\\1", self.base_key)
+        return f"*{escaped_base_key}*"
+
+    @staticmethod
+    def key_family(key: str) -> Keys | None:
+        """Familia de una clave compuesta por `RedisKeys` (None si no tiene)"""
+        name = _key_name(key)
+        for family in _FAMILY_PREFIXES:
+            if name.startswith(family.value):
+                return family
+        return None
+
+    @staticmethod
+    def ttl_for_key(key: str) -> int | None:
+        """
+        Segundos de vigencia de una clave según su familia.
+
+        La base se configura con REDIS_RUN_TTL_SECONDS (default 1 día); 0
+        desactiva la expiración. Las claves sin familia usan la base.
+        """
+        base_ttl = int(env.get("REDIS_RUN_TTL_SECONDS") or 24 * 60 * 60)
+        if base_ttl <= 0:
+            return None
+
+        family = RedisKeys.key_family(key)
+        return base_ttl * KEY_TTL_FACTORS.get(family, 1) if family else base_ttl
@@ -1,19 +1,137 @@
 import io
 import pickle
+from collections.abc import Callable, Hashable, Iterator
+from contextlib import AbstractContextManager
+from functools import partial
 from io import BytesIO
-from typing import Any, Type, TypeVar, overload
+from typing import Any, Literal, TypeVar, overload
 
-import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 import redis
 from k_link.tools import env
 from loggerk import LoggerK
 from pandas import DataFrame
 from typeguard import check_type
-from typing_extensions import Buffer, Literal
+from typing_extensions import Buffer
+
+from conciliaciones.models.proceso_conciliacion import ConciliationTask
+from conciliaciones.utils.redis.connection_pool import RedisPoolRegistry
+from conciliaciones.utils.redis.frame_blobs import (
+    blob_key,
+    blob_refs_key,
+    blob_size_key,
+    table_digest,
+)
+from conciliaciones.utils.redis.frame_cache import FrameCache, new_version, version_key
+from conciliaciones.utils.redis.frame_catalog import (
+    FrameCatalogEntry,
+    append_catalog_entry,
+    build_catalog_entry,
+    current_catalog_entry,
+    parse_catalog,
+    update_catalog_entry,
+)
+from conciliaciones.utils.redis.frame_codec import (
+    FLAG_MANIFEST,
+    FRAME_HEAD_SIZE,
+    HEADER_SIZE,
+    decode_schema,
+    decode_table,
+    encode_reference,
+    encode_table,
+    frame_flags,
+    frame_to_table,
+    is_frame,
+    reference_target,
+    schema_prefix_size,
+    select_columns,
+)
+from conciliaciones.utils.redis.frame_compression import (
+    FrameCompression,
+    select_compression,
+)
+from conciliaciones.utils.redis.frame_shards import (
+    append_column_shards,
+    assemble_chunk_payloads,
+    concat_chunks,
+    iter_frame_payloads,
+    manifest_num_rows,
+    manifest_shards,
+    projected_indices,
+    required_chunks,
+    single_frame_manifest,
+)
+from conciliaciones.utils.redis.frame_spill import (
+    encode_pointer,
+    file_pointer,
+    handoff_enabled,
+    handoff_key,
+    read_handoff_file,
+    read_spill_file,
+    remove_spill_file,
+    spill_threshold,
+    write_handoff_file,
+    write_spill_file,
+)
+from conciliaciones.utils.redis.frame_stream import (
+    STREAM_PAGE_SIZE,
+    concat_stream_tables,
+    stream_key,
+    with_missing_text,
+)
+from conciliaciones.utils.redis.frame_writes import (
+    PayloadBatches,
+    RedisPipeline,
+    dedup_enabled,
+    encode_shards,
+    is_manifest,
+    manifest_shard_keys,
+    needs_rewrite,
+    prepare_table,
+    queue_blob_ref,
+    queue_blob_refresh,
+    queue_catalog_entry,
+    queue_kept_shard_sizes,
+    queue_manifest,
+    queue_version,
+)
+from conciliaciones.utils.redis.io_metrics import (
+    StorageMetrics,
+    add_payload_bytes,
+    codec_timed,
+    mark_cache_hit,
+)
+from conciliaciones.utils.redis.null_normalization import (
+    normalize_frame,
+    normalize_table,
+    normalized_table_to_frame,
+    table_to_normalized_frame,
+)
+from conciliaciones.utils.redis.redis_batch import (
+    BATCH_FLUSH_BYTES,
+    RedisBatch,
+    active_batch,
+    batch_scope,
+)
+from conciliaciones.utils.redis.redis_keys import (
+    RedisKeys,
+    legacy_key,
+    with_legacy_keys,
+)
 
 T = TypeVar("T")
 
+# Columnas por shard para frames anchos (SAT_ERP) guardados por grupos de columnas
+FRAME_COLUMN_GROUP_SIZE: int = 8
+
+# Tamaño máximo (en memoria Arrow) de cada bloque de filas de un frame
+FRAME_CHUNK_SIZE_BYTES: int = 64 * 1024**2
+
+# Claves por iteración de SCAN y por UNLINK en la limpieza de una corrida
+SCAN_BATCH_SIZE: int = 1000
+
 
 class RedisStorage:
     @overload
@@ -36,39 +154,63 @@ class RedisStorage:
         *args,
         **kwargs,
     ):
-        """inicialización de la conexion se usa el valor de docker-compose file para el servicio redis"""
+        """
+        inicialización de la conexion se usa el valor de docker-compose file para el servicio redis
+
+        El cliente toma sus conexiones del pool compartido del proceso
+        (`RedisPoolRegistry`), por lo que no abre ni cierra sockets propios:
+        la instancia no debe cerrar el cliente porque lo comparten todos los
+        `RedisStorage` del mismo destino.
+        """
         self._logger = LoggerK(self.__class__.__name__)
         if not args and not kwargs:
-            url = env.get("REDIS_URL") or "redis://redis:6379/0"
-            self._client = redis.StrictRedis.from_url(url)
+            self._target = env.get("REDIS_URL") or "redis://redis:6379/0"
+            self._client = RedisPoolRegistry.get_client(url=self._target)
             return
 
         if args and not kwargs:
-            self._client = redis.from_url(*args)
+            self._target = args[0]
+            self._client = RedisPoolRegistry.get_client(url=self._target)
             return
 
         host = kwargs.get("host", "redis")
         port = kwargs.get("port", 6379)
         db = kwargs.get("db", 0)
 
-        self._client = redis.StrictRedis(host=host, port=port, db=db)
+        self._target = f"redis://{host}:{port}/{db}"
+        self._client = RedisPoolRegistry.get_client(host=host, port=port, db=db)
         return
 
     @classmethod
     def from_url(cls, url: str):
         """Inicializa la conexión a partir de una URL"""
-        client = redis.StrictRedis.from_url(url)
+        client = RedisPoolRegistry.get_client(url=url)
         new_instance = cls.__new__(cls)
+        new_instance._logger = LoggerK(cls.__name__)
+        new_instance._target = url
         new_instance._client = client
         return new_instance
 
     def set(self, key: str, value: object) -> None:
         """Establece el valor asociado a una clave"""
-        serialized_object = self._serialize(value)
-        self._client.set(
-            name=key,
-            value=serialized_object,
-        )
+        with StorageMetrics.measure(key, "set"):
+            serialized_object = self._serialize(value)
+            add_payload_bytes(len(serialized_object))
+            batch = active_batch(self._target)
+            if batch is not None and batch.queue_set(key, serialized_object):
+                FrameCache.invalidate(self._target, key)
+                return
+
+            pipeline = self._client.pipeline(transaction=False)
+            pipeline.set(
+                name=key,
+                value=serialized_object,
+                ex=RedisKeys.ttl_for_key(key),
+            )
+            # La clave deja de ser un frame versionado
+            pipeline.delete(version_key(key))
+            pipeline.execute()
+            FrameCache.invalidate(self._target, key)
 
     @overload
     def get(
@@ -79,12 +221,12 @@ class RedisStorage:
     def get(
         self,
         key: str,
-        object_type: Type[T] = Type[Any],
+        object_type: type[T] = type[Any],
     ) -> T | None: ...
     def get(
         self,
         key: str,
-        object_type: Type[T] = Type[Any],
+        object_type: type[T] = type[Any],
     ) -> T | None:
         """Obtiene el valor asociado a una clave
 
@@ -92,13 +234,47 @@ class RedisStorage:
 
         object_type: Tipo esperado del objeto almacenado en Redis (por defecto, Any)
         """
-        serialized_object = self._client.get(key)
-        if serialized_object is not None:
-            return self._deserialize(
-                serialized=serialized_object,  # type: ignore
-                object_type=object_type,
+        with StorageMetrics.measure(key, "get"):
+            batch = active_batch(self._target)
+            found, serialized_object = (
+                batch.lookup(key) if batch is not None else (False, None)
             )
-        return None
+            if not found:
+                serialized_object = self._client.get(key)
+            if serialized_object is None and legacy_key(key) is not None:
+                # Clave escrita con el layout original (ver `redis_keys`)
+                serialized_object = self._client.get(legacy_key(key))  # type: ignore
+            if serialized_object is not None:
+                add_payload_bytes(len(serialized_object))  # type: ignore
+                return self._deserialize(
+                    serialized=serialized_object,  # type: ignore
+                    object_type=object_type,
+                )
+            return None
+
+    def batch(
+        self, max_bytes: int = BATCH_FLUSH_BYTES, transaction: bool = False
+    ) -> AbstractContextManager[RedisBatch]:
+        """
+        Agrupa las escrituras de claves pequeñas en un solo pipeline.
+
+        Dentro del bloque los `set` de valores pequeños (de cualquier instancia
+        sobre el mismo servidor) se encolan y se envían al salir o al acumular
+        `max_bytes`; los `get` de claves encoladas no van a Redis (ver
+        `redis_batch`).
+
+        transaction: Envía cada lote en MULTI/EXEC, de modo que sus claves se
+            publican juntas.
+        """
+        return batch_scope(
+            self._client, self._target, max_bytes=max_bytes, transaction=transaction
+        )
+
+    def _sync_batch(self, *keys: str) -> None:
+        """Envía el lote abierto si tiene encolada alguna de `keys`"""
+        batch = active_batch(self._target)
+        if batch is not None:
+            batch.sync(keys)
 
     @property
     def keys(self):
@@ -107,7 +283,7 @@ class RedisStorage:
 
     def _get_all_keys(self):
         """Obtiene todas las claves almacenadas en Redis"""
-        encoded_keys = self._client.keys()
+        encoded_keys = self._client.scan_iter(count=SCAN_BATCH_SIZE)
         keys = map(lambda key: key.decode("utf-8"), encoded_keys)  # type: ignore
         return keys
 
@@ -117,7 +293,7 @@ class RedisStorage:
     def get_members(
         self,
         key: str,
-        object_type: Type[T] = Type[Any],
+        object_type: type[T] = type[Any],
     ) -> list[T]:
         """Obtiene los miembros de un SET
 
@@ -131,58 +307,492 @@ class RedisStorage:
 
     def set_member(self, key: str, value: object) -> None:
         """Establece un miembro de un SET"""
-        self._client.sadd(key, self._serialize(value))
+        pipeline = self._client.pipeline(transaction=False)
+        pipeline.sadd(key, self._serialize(value))
+        ttl = RedisKeys.ttl_for_key(key)
+        if ttl is not None:
+            pipeline.expire(key, ttl)
+        pipeline.execute()
 
     def drop_member(self, key: str, value: Any) -> None:
         """Elimina un miembro del set"""
         # Eliminar el elemento del set
         self._client.srem(key, value)
 
+    def get_fields(
+        self,
+        key: str,
+        object_type: type[T] = type[Any],
+    ) -> dict[str, T]:
+        """Obtiene los campos de un HASH
+
+        object_type: Tipo esperado de los valores de los campos (por defecto, Any)
+        """
+        with StorageMetrics.measure(key, "get"):
+            serialized_fields = self._client.hgetall(key)
+            add_payload_bytes(sum(map(len, serialized_fields.values())))  # type: ignore
+            return {
+                field.decode("utf-8"): self._deserialize(
+                    serialized=value, object_type=object_type
+                )
+                for field, value in serialized_fields.items()  # type: ignore
+            }
+
+    def set_field(self, key: str, field: str, value: object) -> None:
+        """Establece un campo de un HASH"""
+        with StorageMetrics.measure(key, "set"):
+            serialized_object = self._serialize(value)
+            add_payload_bytes(len(serialized_object))
+            pipeline = self._client.pipeline(transaction=False)
+            pipeline.hset(key, field, serialized_object)
+            ttl = RedisKeys.ttl_for_key(key)
+            if ttl is not None:
+                pipeline.expire(key, ttl)
+            pipeline.execute()
+
     def delete(self, key: str) -> None:
-        """Eliminar Clave en Redis"""
-        self._client.delete(key)
+        """Eliminar Clave en Redis, incluyendo los shards si es un frame particionado"""
+        legacy = legacy_key(key)
+        if legacy is not None:
+            self.delete(legacy)
+
+        self._sync_batch(key)
+        pipeline = self._client.pipeline(transaction=False)
+        pipeline.getrange(key, 0, FRAME_HEAD_SIZE - 1)
+        pipeline.get(handoff_key(key))
+        head, handoff = pipeline.execute()
+
+        shard_keys = self._get_shard_keys(key, head=head)
+        self._client.delete(
+            key, version_key(key), handoff_key(key), stream_key(key), *shard_keys
+        )
+        FrameCache.invalidate(self._target, key)
+        self._release_payload(head, key)
+        remove_spill_file(file_pointer(handoff))
 
-    def delete_keys(self, *keys) -> None:
+    def delete_keys(self, *keys: str) -> None:
         """Eliminar Clave en Redis"""
-        self._client.delete(*keys)
+        keys = with_legacy_keys(keys)
+        self._sync_batch(*keys)
+        pipeline = self._client.pipeline(transaction=False)
+        for key in keys:
+            pipeline.getrange(key, 0, FRAME_HEAD_SIZE - 1)
+            pipeline.get(handoff_key(key))
+        heads = pipeline.execute()
+
+        self._client.delete(
+            *keys,
+            *map(version_key, keys),
+            *map(handoff_key, keys),
+            *map(stream_key, keys),
+        )
+        FrameCache.invalidate(self._target, *keys)
+        for key, head, handoff in zip(keys, heads[::2], heads[1::2], strict=True):
+            self._release_payload(head, key)
+            remove_spill_file(file_pointer(handoff))
 
     def delete_pattern(self, pattern: str) -> None:
         """Eliminar Clave en Redis que cumpla con el patron de regex"""
-        for key in self._client.scan_iter(match=pattern):
-            self._client.delete(key)
+        self.unlink_pattern(pattern)
+
+    def scan_batches(
+        self, pattern: str, batch_size: int = SCAN_BATCH_SIZE
+    ) -> Iterator[list[str]]:
+        """Claves que cumplen el patrón, en lotes de `batch_size` (SCAN, sin KEYS)"""
+        batch: list[str] = []
+        for key in self._client.scan_iter(match=pattern, count=batch_size):
+            batch.append(key.decode("utf-8"))  # type: ignore
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def unlink_pattern(
+        self,
+        pattern: str,
+        batch_size: int = SCAN_BATCH_SIZE,
+        keep: Callable[[str], bool] | None = None,
+    ) -> int:
+        """
+        Libera con UNLINK (no bloqueante) las claves que cumplen el patrón.
+
+        Los lotes se envían en un pipeline no transaccional; `keep` permite
+        conservar claves. Las referencias a blobs se descuentan y los archivos de
+        desborde se eliminan. Retorna el número de claves eliminadas.
+        """
+        unlinked = 0
+        for batch in self.scan_batches(pattern, batch_size):
+            keys = [key for key in batch if keep is None or not keep(key)]
+            if not keys:
+                continue
+
+            pipeline = self._client.pipeline(transaction=False)
+            for key in keys:
+                pipeline.getrange(key, 0, FRAME_HEAD_SIZE - 1)
+            pipeline.unlink(*keys)
+            *heads, unlinked_batch = pipeline.execute()
+            unlinked += unlinked_batch
+            FrameCache.invalidate(self._target, *keys)
+
+            for key, head in zip(keys, heads, strict=True):
+                self._release_payload(head, key)
+
+        return unlinked
 
-    def __del__(self):
-        """destructor de la clase cierra la conexion"""
-        self._client.close()
+    def memory_usage(self, keys: list[str]) -> dict[str, int]:
+        """Bytes que ocupa cada clave en Redis (MEMORY USAGE en un pipeline)"""
+        pipeline = self._client.pipeline(transaction=False)
+        for key in keys:
+            pipeline.memory_usage(key, samples=0)
+        return {
+            key: usage
+            for key, usage in zip(keys, pipeline.execute(), strict=True)
+            if usage
+        }
 
-    def _serialize(self, value: object) -> bytes:
+    @staticmethod
+    @codec_timed("encode")
+    def _serialize(value: object) -> bytes:
         """Serializa un objeto"""
         serialized = pickle.dumps(value)
         return serialized
 
-    def _deserialize(self, serialized: Buffer, object_type: Type[T]) -> T:
+    @staticmethod
+    @codec_timed("decode")
+    def _deserialize(serialized: Buffer, object_type: type[T]) -> T:
         """Deserializa un objeto y verifica que sea del tipo esperado"""
         deserialized = pickle.loads(serialized)
         deserialized = check_type(deserialized, object_type)
         return deserialized
 
+    def set_df(  # noqa: PLR0913
+        self,
+        key: str,
+        df: DataFrame,
+        *,
+        compression: FrameCompression = "auto",
+        column_group_size: int | None = None,
+        chunk_size_bytes: int = FRAME_CHUNK_SIZE_BYTES,
+        catalog_key: str | None = None,
+        task: ConciliationTask | None = None,
+        dedup: bool | None = None,
+        handoff: bool = False,
+    ) -> int:
+        """
+        Guarda un DataFrame en Redis como frame Arrow IPC.
+
+        El payload se escribe directamente, sin pickle ni buffers intermedios.
+        El esquema del DataFrame se conserva y el DataFrame no se modifica.
+
+        column_group_size: Si se indica, el frame se guarda particionado en shards
+            de este número de columnas bajo un manifiesto, para que `get_df` con
+            `columns` solo descargue los shards necesarios.
+        chunk_size_bytes: Los frames más grandes se dividen automáticamente en
+            bloques de filas de a lo más este tamaño, escritos en pipelines por
+            lotes, para no acercarse al límite de 512 MB por valor ni bloquear
+            Redis con un solo SET enorme.
+
+        catalog_key: Hash del catálogo de frames de la corrida
+            (`RedisKeys.get_frame_catalog_key`). Si se indica, se registra el
+            esquema, filas, tamaño y `task` del frame (ver `frame_catalog`).
+
+        Los frames mayores a REDIS_SPILL_THRESHOLD_BYTES se guardan en el volumen
+        compartido de desborde y en Redis queda solo su puntero (ver
+        `frame_spill`).
+
+        dedup: Guarda el payload una sola vez bajo el hash de su contenido y deja
+            en `key` solo una referencia (ver `frame_blobs`). Por defecto se toma
+            de REDIS_FRAME_DEDUP.
+        handoff: Deja además una copia en memoria compartida que la siguiente
+            etapa lee sin pasar por Redis si corre en el mismo host. Solo aplica
+            si REDIS_FRAME_HANDOFF lo habilita (ver `frame_spill`).
+
+        Cada escritura renueva la estampa de versión del frame, lo que invalida
+        las copias en caché de todos los procesos (ver `frame_cache`).
+
+        Returns:
+            int: Tamaño en bytes del frame almacenado.
+        """
+        with StorageMetrics.measure(key, "set", task=task):
+            self._sync_batch(key)
+            table, codec = prepare_table(df, compression, key)
+            ttl = RedisKeys.ttl_for_key(key)
+            pipeline = self._client.pipeline(transaction=False)
+            pipeline.getrange(key, 0, FRAME_HEAD_SIZE - 1)
+            pipeline.get(handoff_key(key))
+            head, previous_handoff = pipeline.execute()
+            stale_shard_keys: set[str] = set(self._get_shard_keys(key, head=head))  # type: ignore
+            previous_blob = reference_target(head)  # type: ignore
+
+            version = new_version()
+            handoff_pointer = (
+                write_handoff_file(table, key, version, ttl)
+                if handoff_enabled(handoff)
+                else None
+            )
+
+            pipeline = self._client.pipeline(transaction=False)
+            target: str | None = None
+            threshold = spill_threshold()
+            frames = partial(
+                iter_frame_payloads,
+                table,
+                compression=codec,
+                column_group_size=column_group_size,
+                chunk_size_bytes=chunk_size_bytes,
+            )
+
+            if threshold is not None and table.nbytes >= threshold:
+                pointer = write_spill_file(table, key)
+                payload_size = pointer.payload_bytes
+                pipeline.set(name=key, value=encode_pointer(pointer), ex=ttl)
+            elif dedup_enabled(dedup):
+                target = blob_key(table_digest(table))
+                payload_size = self._store_blob(
+                    target, key, frames(key=target), ttl=ttl
+                )
+                pipeline.set(name=key, value=encode_reference(target), ex=ttl)
+            else:
+                payload_size, frame_keys = self._write_payloads(
+                    pipeline, frames(key=key), ttl=ttl
+                )
+                stale_shard_keys.difference_update(frame_keys)
+
+            # El frame reemplaza al stream que hubiera en la clave
+            pipeline.delete(stream_key(key), *stale_shard_keys)
+
+            if catalog_key is not None:
+                queue_catalog_entry(
+                    pipeline,
+                    catalog_key,
+                    build_catalog_entry(
+                        key, table, payload_size, task=task, version=version
+                    ),
+                )
+
+            queue_version(pipeline, key, version, ttl, handoff_pointer)
+            pipeline.execute()
+            FrameCache.invalidate(self._target, key)
+            remove_spill_file(file_pointer(previous_handoff))
+
+            if previous_blob != target:
+                self._release_blob(previous_blob, key)
+            remove_spill_file(file_pointer(head))
+
+            add_payload_bytes(payload_size)
+            return payload_size
+
+    def _write_payloads(
+        self,
+        pipeline: RedisPipeline,
+        frames: Iterator[tuple[str, pa.Buffer]],
+        ttl: int | None,
+    ) -> tuple[int, list[str]]:
+        """
+        Agrega al pipeline los frames de una tabla, enviándolo por lotes.
+
+        Retorna los bytes y las claves escritas; el último lote queda pendiente
+        en el pipeline.
+        """
+        batches = PayloadBatches(pipeline, frames, ttl=ttl)
+        while batches.fill():
+            pipeline.execute()
+
+        return batches.payload_size, batches.frame_keys
+
+    def _store_blob(
+        self,
+        target: str,
+        key: str,
+        frames: Iterator[tuple[str, pa.Buffer]],
+        ttl: int | None,
+    ) -> int:
+        """
+        Registra `key` como referencia del blob y lo escribe si aún no existe.
+
+        Retorna el tamaño del payload del blob.
+        """
+        transaction = self._client.pipeline(transaction=True)
+        queue_blob_ref(transaction, target, key, ttl)
+        stored_size = transaction.execute()[-1]
+
+        pipeline = self._client.pipeline(transaction=False)
+        if stored_size is not None:
+            # Frame idéntico ya guardado: solo se renueva su vigencia
+            if ttl is not None:
+                queue_blob_refresh(pipeline, target, self._get_shard_keys(target), ttl)
+                pipeline.execute()
+            return int(stored_size)  # type: ignore
+
+        payload_size, _ = self._write_payloads(pipeline, frames, ttl=ttl)
+        pipeline.set(name=blob_size_key(target), value=payload_size, ex=ttl)
+        pipeline.execute()
+
+        return payload_size
+
+    def _release_payload(self, head: bytes | None, key: str) -> None:
+        """Libera el blob o el archivo de desborde de un frame eliminado"""
+        self._release_blob(reference_target(head), key)
+        remove_spill_file(file_pointer(head))
+
+    def _release_blob(self, target: str | None, key: str) -> None:
+        """
+        Descuenta `key` de las referencias del blob; el último lo elimina.
+
+        El SET de referencias se vigila con WATCH, de modo que si otra escritura
+        toma el blob mientras se libera, el blob se conserva.
+        """
+        if target is None:
+            return
+
+        refs_key = blob_refs_key(target)
+        self._client.srem(refs_key, key)
+
+        with self._client.pipeline(transaction=True) as transaction:
+            try:
+                transaction.watch(refs_key)
+                if transaction.scard(refs_key):
+                    return
+                shard_keys = self._get_shard_keys(target)
+                transaction.multi()
+                transaction.unlink(target, blob_size_key(target), *shard_keys)
+                transaction.execute()
+            except redis.WatchError:
+                self._logger.info(f"Blob {target} referenciado de nuevo, se conserva")
+
+    def set_columns(
+        self,
+        key: str,
+        df: DataFrame,
+        compression: FrameCompression = "auto",
+        catalog_key: str | None = None,
+        task: ConciliationTask | None = None,
+    ) -> int:
+        """
+        Agrega o reemplaza columnas de un frame guardado sin reescribirlo.
+
+        Las columnas de `df` se guardan como shards nuevos y el manifiesto del
+        frame se actualiza, de modo que `get_df` arma el frame lógico al leer y
+        la escritura cuesta solo lo que pesan las columnas nuevas. Las filas se
+        alinean por posición (el índice de `df` se ignora). Un frame no
+        particionado se convierte en manifiesto renombrando su payload como
+        shard 0, sin volver a escribirlo ni descargarlo (solo se lee su esquema). Los valores pickle heredados y las
+        referencias a blobs (`dedup`) se reescriben completos con `set_df`.
+
+        Returns:
+            int: Bytes escritos (shards nuevos y manifiesto).
+
+        Raises:
+            ValueError: Si el frame no existe o `df` no tiene sus mismas filas.
+        """
+        with StorageMetrics.measure(key, "set", task=task):
+            self._sync_batch(key)
+            pipeline = self._client.pipeline(transaction=False)
+            pipeline.getrange(key, 0, FRAME_HEAD_SIZE - 1)
+            pipeline.get(handoff_key(key))
+            pipeline.exists(stream_key(key))
+            head, previous_handoff, is_stream = pipeline.execute()
+            if not head and not is_stream:
+                raise ValueError(f"No existe el frame con la clave: {key}")
+
+            if needs_rewrite(head):
+                df_full: DataFrame = self.get_df(redis_key=key)  # type: ignore
+                for col in df.columns:
+                    df_full[col] = df[col].array
+                return self.set_df(
+                    key=key,
+                    df=df_full,
+                    compression=compression,
+                    catalog_key=catalog_key,
+                    task=task,
+                )
+
+            rename_payload = not is_manifest(head)
+            if rename_payload:
+                schema = self._single_frame_manifest_schema(key, head)
+            else:
+                schema = decode_table(self._client.get(key)).schema  # type: ignore
+
+            table, codec = prepare_table(df, compression, key)
+            ttl = RedisKeys.ttl_for_key(key)
+            update = append_column_shards(schema, key=key, table=table)
+
+            pipeline = self._client.pipeline(transaction=False)
+            batches = PayloadBatches(
+                pipeline, encode_shards(update.new_shards, codec), ttl
+            )
+            while batches.fill():
+                pipeline.execute()
+            pipeline.execute()
+
+            # Con los shards ya escritos, el manifiesto se publica en una transacción
+            transaction = self._client.pipeline(transaction=True)
+            payload_size = batches.payload_size + queue_manifest(
+                transaction, key, update, rename_payload, ttl
+            )
+
+            version = new_version()
+            if catalog_key is not None:
+                pipeline = self._client.pipeline(transaction=False)
+                queue_kept_shard_sizes(pipeline, key, update, rename_payload)
+                kept_sizes: list[int] = pipeline.execute()
+                entry = update_catalog_entry(
+                    self.get_frame_entry(catalog_key, key),
+                    key=key,
+                    schema=update.manifest.schema,
+                    num_rows=manifest_num_rows(manifest_shards(update.manifest.schema)),
+                    payload_bytes=sum(kept_sizes) + payload_size,
+                    table=table,
+                    task=task,
+                    version=version,
+                )
+                queue_catalog_entry(transaction, catalog_key, entry)
+
+            # El handoff quedó desactualizado: los lectores usan Redis
+            queue_version(transaction, key, version, ttl)
+            transaction.execute()
+            FrameCache.invalidate(self._target, key)
+            remove_spill_file(file_pointer(previous_handoff))
+
+            add_payload_bytes(payload_size)
+            return payload_size
+
     def set_parquet(
         self,
         df: DataFrame,
         engine: Literal["auto", "pyarrow", "fastparquet"] = "pyarrow",
-        compression: Literal["snappy", "gzip", "brotli", "lz4", "zstd"]
-        | None = "snappy",
+        compression: Literal["auto", "snappy", "gzip", "brotli", "lz4", "zstd"]
+        | None = "auto",
     ) -> BytesIO:
-        """Convierte un DataFrame a un buffer Parquet, manejando columnas mixtas."""
+        """
+        Convierte un DataFrame a un buffer Parquet, manejando columnas mixtas.
+
+        Con `compression="auto"` el codec y su nivel se eligen según el tamaño y
+        la cardinalidad del frame (ver `frame_compression`); con fastparquet,
+        que no pasa por Arrow, "auto" escribe snappy. El DataFrame recibido no
+        se modifica.
+        """
         df_buffer = io.BytesIO()
 
-        for col in df.columns:
-            if df[col].dtype == "object":
-                df[col] = df[col].astype(str)
+        if engine == "fastparquet":
+            df = df.copy(deep=False)
+            self._stringify_object_columns(df)
+            df.to_parquet(
+                path=df_buffer,
+                engine=engine,
+                compression="snappy" if compression == "auto" else compression,
+                index=False,
+            )
+        else:
+            table = frame_to_table(df)
+            options: dict = (
+                select_compression(table, fast_codec="snappy").parquet_options()
+                if compression == "auto"
+                else {"compression": compression}
+            )
+            pq.write_table(table, df_buffer, **options)
 
-        df.to_parquet(
-            path=df_buffer, engine=engine, compression=compression, index=False
-        )
         df_buffer.seek(0)
 
         return df_buffer
@@ -192,34 +802,453 @@ class RedisStorage:
         redis_key: str,
         engine: Literal["auto", "pyarrow", "fastparquet"] = "pyarrow",
         columns: list[str] | None = None,
+        normalize: bool = True,
     ) -> DataFrame | None:
-        """Recupera un DataFrame desde Redis y lo carga desde Parquet."""
-        buffer_df: BytesIO | None = self.get(key=redis_key, object_type=BytesIO)
-        if buffer_df is None:
+        """
+        Recupera un DataFrame desde Redis.
+
+        Soporta frames Arrow IPC (`set_df`) y buffers Parquet serializados con
+        pickle (`set_parquet` + `set`) escritos por versiones anteriores.
+
+        columns: Columnas a recuperar. En frames Arrow IPC las columnas
+            inexistentes se ignoran; en frames particionados solo se descargan
+            los shards que contienen las columnas solicitadas.
+
+        normalize: Convierte valores centinela ("nan", "none", ...) de las columnas
+            de texto en None y los enteros a Int64. Desactivar cuando el
+            consumidor no lo necesite. La tabla normalizada también se guarda
+            en caché, por lo que una lectura repetida no vuelve a normalizar.
+        """
+        with StorageMetrics.measure(redis_key, "get"):
+            self._sync_batch(redis_key)
+            if engine == "fastparquet":
+                payload = self._resolve_reference(self._client.get(redis_key))
+                if payload is None:
+                    legacy = legacy_key(redis_key)
+                    if legacy is None:
+                        return None
+                    return self.get_df(legacy, engine, columns, normalize)
+                return self._payload_to_df(
+                    payload,  # type: ignore
+                    engine=engine,
+                    columns=columns,
+                    normalize=normalize,
+                )
+
+            table = self._get_table(redis_key, columns=columns, normalize=normalize)
+            if table is None:
+                return None
+
+            if normalize:
+                return self._normalized_table_to_df(table)
+            return self._table_to_df(table, normalize=False)
+
+    def get_table(
+        self,
+        redis_key: str,
+        columns: list[str] | None = None,
+    ) -> pa.Table | None:
+        """
+        Recupera un frame como tabla Arrow, sin normalizar.
+
+        Los frames versionados se sirven desde la caché del proceso mientras su
+        versión no cambie, por lo que una lectura repetida solo cuesta un GET
+        de la estampa de versión. Un frame guardado con `handoff` en este mismo
+        host se mapea desde memoria compartida. Si la clave no tiene un frame
+        pero sí un stream (`append_frame`), se concatenan sus partes. La tabla
+        es inmutable y se comparte entre lectores sin copiarse.
+
+        columns: Columnas a recuperar; las inexistentes se ignoran. Si el frame
+            no está en caché y está particionado, solo se descargan los shards
+            necesarios (y el resultado parcial no se guarda en caché).
+        """
+        return self._get_table(redis_key, columns=columns, normalize=False)
+
+    def _get_table(
+        self,
+        redis_key: str,
+        columns: list[str] | None,
+        normalize: bool,
+    ) -> pa.Table | None:
+        """Implementa `get_table`; con `normalize` entrega la tabla normalizada"""
+        with StorageMetrics.measure(redis_key, "get"):
+            self._sync_batch(redis_key)
+            version, handoff = self._client.mget(  # type: ignore
+                version_key(redis_key), handoff_key(redis_key)
+            )
+            if normalize:
+                table = FrameCache.get(
+                    self._target, redis_key, version, normalized=True
+                )
+                if table is not None:
+                    mark_cache_hit()
+                    return select_columns(table, columns)
+
+            table = FrameCache.get(self._target, redis_key, version)
+            if table is None:
+                table = read_handoff_file(handoff, version)
+            if table is not None:
+                mark_cache_hit()
+            else:
+                payload = self._resolve_reference(self._client.get(redis_key))
+                if payload is None:
+                    table = self._get_stream_table(redis_key)
+                    if table is None:
+                        legacy = legacy_key(redis_key)
+                        if legacy is None:
+                            return None
+                        return self._get_table(legacy, columns, normalize)
+                elif frame_flags(payload) & FLAG_MANIFEST:  # type: ignore
+                    if columns is not None:
+                        # Lectura parcial: no se guarda en caché
+                        table = self._get_sharded_table(payload, columns=columns)  # type: ignore
+                        return normalize_table(table) if normalize else table
+                    table = self._get_sharded_table(payload, columns=None)  # type: ignore
+                else:
+                    table = self._payload_to_table(payload, columns=None)  # type: ignore
+
+                FrameCache.put(self._target, redis_key, version, table)  # type: ignore
+
+            if normalize:
+                return self._normalize_cached(
+                    self._target, redis_key, version, table, columns
+                )
+            return select_columns(table, columns)
+
+    @staticmethod
+    @codec_timed("decode")
+    def _normalize_cached(
+        namespace: Hashable,
+        redis_key: str,
+        version: bytes | None,
+        table: pa.Table,
+        columns: list[str] | None,
+    ) -> pa.Table:
+        """
+        Normaliza la tabla completa de un frame y la guarda en caché.
+
+        Si la tabla no cabe en la caché y se pidió una proyección, solo se
+        normalizan las columnas solicitadas.
+        """
+        if columns is not None and not FrameCache.accepts(version, table):
+            return normalize_table(select_columns(table, columns))
+
+        normalized = normalize_table(table)
+        FrameCache.put(namespace, redis_key, version, normalized, normalized=True)
+        return select_columns(normalized, columns)
+
+    def append_frame(  # noqa: PLR0913
+        self,
+        key: str,
+        df: DataFrame,
+        *,
+        compression: FrameCompression = "auto",
+        missing_text: str | None = None,
+        catalog_key: str | None = None,
+        task: ConciliationTask | None = None,
+    ) -> int:
+        """
+        Agrega una parte al stream de la clave (ver `frame_stream`).
+
+        La parte se envía en cuanto se agrega: el productor no necesita
+        conservar las anteriores. Para empezar un stream nuevo, eliminar antes
+        la clave con `delete`; mientras la clave tenga un frame de `set_df`,
+        los lectores leen ese frame y no el stream.
+
+        missing_text: Texto con el que se llenan, al concatenar, las columnas de
+            texto de otras partes que esta parte no tiene (por defecto, nulos).
+        catalog_key: Si se indica, el catálogo acumula las filas, columnas y
+            tamaño de todas las partes.
+
+        Returns:
+            int: Número de partes del stream.
+        """
+        with StorageMetrics.measure(key, "set", task=task):
+            self._sync_batch(key)
+            table, codec = prepare_table(df, compression, key)
+            table = with_missing_text(table, missing_text)
+            frame = encode_table(table, compression=codec)
+            add_payload_bytes(frame.size)
+
+            ttl = RedisKeys.ttl_for_key(key)
+            previous = self.get_frame_entry(catalog_key, key) if catalog_key else None
+
+            pipeline = self._client.pipeline(transaction=False)
+            version = new_version()
+            pipeline.rpush(stream_key(key), memoryview(frame))
+            if ttl is not None:
+                pipeline.expire(stream_key(key), ttl)
+            pipeline.set(name=version_key(key), value=version, ex=ttl)
+            parts = pipeline.execute()[0]
+
+            if catalog_key is not None:
+                # Una lista nueva empieza un stream: la entrada anterior (de un
+                # stream vencido o de un frame de `set_df`) no se acumula
+                entry = append_catalog_entry(
+                    previous if parts > 1 else None,
+                    key,
+                    table,
+                    frame.size,
+                    task,
+                    version=version,
+                )
+                pipeline = self._client.pipeline(transaction=False)
+                queue_catalog_entry(pipeline, catalog_key, entry)
+                pipeline.execute()
+            FrameCache.invalidate(self._target, key)
+
+            return parts
+
+    def iter_stream(self, key: str, start: int = 0) -> Iterator[pa.Table]:
+        """
+        Lee las partes de un stream conforme se agregaron, cada una con su
+        propio esquema y sin normalizar.
+
+        start: Índice de la primera parte; un consumidor que ya procesó `n`
+            partes continúa con `start=n`.
+        """
+        return StorageMetrics.measure_iter(key, self._iter_stream(key, start))
+
+    def _iter_stream(self, key: str, start: int) -> Iterator[pa.Table]:
+        """Descarga las partes de un stream por páginas de STREAM_PAGE_SIZE"""
+        while True:
+            payloads = self._client.lrange(
+                stream_key(key), start, start + STREAM_PAGE_SIZE - 1
+            )
+            add_payload_bytes(sum(len(payload) for payload in payloads))  # type: ignore
+            for payload in payloads:  # type: ignore
+                yield decode_table(payload)
+            if len(payloads) < STREAM_PAGE_SIZE:  # type: ignore
+                return
+            start += STREAM_PAGE_SIZE
+
+    def _get_stream_table(self, key: str) -> pa.Table | None:
+        """Partes de un stream concatenadas (None si la clave no tiene stream)"""
+        parts = list(self._iter_stream(key, start=0))
+        if not parts:
             return None
+        return concat_stream_tables(parts)
 
-        buffer_df.seek(0)
-        df: DataFrame = pd.read_parquet(buffer_df, engine=engine, columns=columns)
+    def get_frame_entry(self, catalog_key: str, key: str) -> FrameCatalogEntry | None:
+        """
+        Esquema y estadísticas de un frame, sin descargar su payload.
 
-        for col in df.columns:
-            match df[col].dtype:
-                case "object":
-                    df[col] = df[col].astype(str)
-                    df[col] = df[col].apply(self.safe_convert_value)
-                case "int64":
-                    df[col] = df[col].astype("Int64")
+        Retorna None si el frame no se registró en el catálogo, o si desde
+        entonces se borró, venció o se reescribió sin registrarse (ver
+        `frame_catalog`).
+        """
+        pipeline = self._client.pipeline(transaction=False)
+        pipeline.hget(catalog_key, key)
+        pipeline.get(version_key(key))
+        raw_entry, version = pipeline.execute()
+        return current_catalog_entry(raw_entry, version)
 
-        return df
+    def get_frame_schema(self, catalog_key: str, key: str) -> DataFrame | None:
+        """
+        DataFrame vacío con las columnas y dtypes que `get_df` produciría para
+        el frame, tomado del catálogo sin descargar su payload.
 
-    def medir_tamano_valor(self, df: DataFrame, buffer_df: BytesIO) -> None:
+        Permite resolver headers y proyecciones antes de leer el frame. Retorna
+        None si el frame no se registró en el catálogo.
+        """
+        entry = self.get_frame_entry(catalog_key, key)
+        if entry is None:
+            return None
+        return self._table_to_df(entry.schema.empty_table(), normalize=True)
+
+    def get_frame_catalog(self, catalog_key: str) -> list[FrameCatalogEntry]:
+        """Frames vigentes del catálogo de una corrida, de mayor a menor"""
+        raw_entries: dict[bytes, bytes] = self._client.hgetall(catalog_key)  # type: ignore
+        pipeline = self._client.pipeline(transaction=False)
+        for key in raw_entries:
+            pipeline.get(version_key(key.decode("utf-8")))
+        return parse_catalog(list(raw_entries.values()), pipeline.execute())
+
+    @staticmethod
+    @codec_timed("decode")
+    def _table_to_df(table: pa.Table, normalize: bool) -> DataFrame:
+        if not normalize:
+            return table.to_pandas()
+        return table_to_normalized_frame(table)
+
+    @staticmethod
+    @codec_timed("decode")
+    def _normalized_table_to_df(table: pa.Table) -> DataFrame:
+        return normalized_table_to_frame(table)
+
+    @classmethod
+    def _payload_to_table(cls, payload: Buffer, columns: list[str] | None) -> pa.Table:
+        """
+        Decodifica un frame no particionado o un buffer Parquet heredado.
+
+        Los frames desbordados a disco se mapean en memoria desde su archivo.
+        """
+        pointer = file_pointer(payload)
+        if pointer is not None:
+            return select_columns(read_spill_file(pointer), columns)
+
+        if is_frame(payload):
+            return decode_table(payload, columns=columns)
+
+        buffer_df: BytesIO = cls._deserialize(serialized=payload, object_type=BytesIO)
+        return pq.read_table(buffer_df, columns=columns)
+
+    @classmethod
+    def _payload_to_df(
+        cls,
+        payload: Buffer,
+        engine: Literal["auto", "pyarrow", "fastparquet"],
+        columns: list[str] | None,
+        normalize: bool,
+    ) -> DataFrame:
+        """Convierte a DataFrame un payload que no es manifiesto"""
+        if engine == "fastparquet" and not is_frame(payload):
+            buffer_df: BytesIO = cls._deserialize(
+                serialized=payload, object_type=BytesIO
+            )
+            df: DataFrame = pd.read_parquet(buffer_df, engine=engine, columns=columns)
+            return normalize_frame(df) if normalize else df
+
+        table = cls._payload_to_table(payload, columns=columns)
+        return cls._table_to_df(table, normalize=normalize)
+
+    def iter_batches(
+        self,
+        redis_key: str,
+        columns: list[str] | None = None,
+    ) -> Iterator[pa.RecordBatch]:
+        """
+        Lee un frame como un iterador de record batches de Arrow.
+
+        En frames divididos en bloques de filas solo se mantiene en memoria un
+        bloque a la vez. Los batches no pasan por la normalización de nulos.
+        Si la clave no existe no se produce ningún batch. Si el frame está en
+        caché los batches se toman de ahí.
+        """
+        return StorageMetrics.measure_iter(
+            redis_key, self._iter_batches(redis_key, columns=columns)
+        )
+
+    def _iter_batches(
+        self, redis_key: str, columns: list[str] | None
+    ) -> Iterator[pa.RecordBatch]:
+        version, handoff = self._client.mget(  # type: ignore
+            version_key(redis_key), handoff_key(redis_key)
+        )
+        table = FrameCache.get(self._target, redis_key, version)
+        if table is None:
+            table = read_handoff_file(handoff, version)
+        if table is not None:
+            mark_cache_hit()
+            yield from select_columns(table, columns).to_batches()
+            return
+
+        payload = self._resolve_reference(self._client.get(redis_key))
+        if payload is None:
+            parts = 0
+            for part in self._iter_stream(redis_key, start=0):
+                parts += 1
+                yield from select_columns(part, columns).to_batches()
+            legacy = legacy_key(redis_key)
+            if not parts and legacy is not None:
+                yield from self._iter_batches(legacy, columns)
+            return
+
+        if frame_flags(payload) & FLAG_MANIFEST:  # type: ignore
+            for chunk_table in self._iter_sharded_chunks(payload, columns=columns):  # type: ignore
+                yield from chunk_table.to_batches()
+            return
+
+        table = self._payload_to_table(payload, columns=columns)  # type: ignore
+        yield from table.to_batches()
+
+    def _single_frame_manifest_schema(self, key: str, head: bytes) -> pa.Schema:
+        """
+        Esquema del manifiesto de un frame no particionado, a partir solo del
+        esquema y el número de filas de su payload.
+        """
+        prefix_size = schema_prefix_size(head)
+        if prefix_size > len(head):
+            head = self._client.getrange(key, 0, prefix_size - 1)  # type: ignore
+        schema, num_rows = decode_schema(head)
+        if num_rows is None:
+            # Frame escrito antes de registrar su número de filas
+            table: pa.Table = self.get_table(key)  # type: ignore
+            schema, num_rows = table.schema, table.num_rows
+        return single_frame_manifest(schema, num_rows, key=key).schema
+
+    def _get_sharded_table(
+        self, manifest_payload: Buffer, columns: list[str] | None
+    ) -> pa.Table:
+        """Descarga los shards necesarios y arma la tabla lógica"""
+        schema: pa.Schema = decode_table(manifest_payload).schema
+        indices = projected_indices(schema, columns)
+
+        return concat_chunks(
+            schema,
+            indices,
+            self._iter_sharded_chunks(manifest_payload, columns=columns),
+        )
+
+    def _iter_sharded_chunks(
+        self, manifest_payload: Buffer, columns: list[str] | None
+    ) -> Iterator[pa.Table]:
+        """
+        Descarga los shards necesarios bloque por bloque de filas.
+
+        Cada bloque se obtiene con un solo MGET de sus grupos de columnas.
+        """
+        schema: pa.Schema = decode_table(manifest_payload).schema
+        indices = projected_indices(schema, columns)
+
+        for shards in required_chunks(manifest_shards(schema), indices):
+            payloads = (
+                self._client.mget([shard["key"] for shard in shards]) if shards else []
+            )
+            add_payload_bytes(sum(len(payload) for payload in payloads if payload))  # type: ignore
+            yield assemble_chunk_payloads(schema, indices, shards, payloads)  # type: ignore
+
+    def _resolve_reference(self, payload: Buffer | None) -> Buffer | None:
+        """Payload del blob si `payload` es una referencia (ver `frame_blobs`)"""
+        target = reference_target(payload)
+        if target is not None:
+            payload = self._client.get(target)  # type: ignore
+        if payload is not None:
+            add_payload_bytes(len(payload))  # type: ignore
+        return payload
+
+    def _get_shard_keys(self, key: str, head: bytes | None = None) -> list[str]:
+        """
+        Claves de los shards de un frame particionado (vacío en otro caso).
+
+        head: Bytes iniciales del valor, si ya se leyeron.
+        """
+        header = (
+            head if head is not None else self._client.getrange(key, 0, HEADER_SIZE - 1)
+        )
+        if not is_manifest(header):  # type: ignore
+            return []
+
+        return manifest_shard_keys(self._client.get(key))  # type: ignore
+
+    @staticmethod
+    def _stringify_object_columns(df: DataFrame) -> None:
+        """Convierte a str las columnas object para evitar tipos mixtos"""
+        for col in df.columns:
+            if df[col].dtype == "object":
+                df[col] = df[col].astype(str)
+
+    def medir_tamano_valor(self, df: DataFrame, buffer_df: BytesIO | int) -> None:
         """Mide el tamaño en bytes del valor almacenado en Redis."""
         size_mb = df.memory_usage(deep=True).sum() / (1024**2)
         self._logger.info(
             f"El DataFrame pesa aproximadamente {size_mb:.2f} MB en memoria"
         )
 
-        compressed_size = buffer_df.getbuffer().nbytes
-        self._logger.info(f"Archivo Parquet comprimido: {compressed_size:,} bytes")
+        compressed_size = (
+            buffer_df if isinstance(buffer_df, int) else buffer_df.getbuffer().nbytes
+        )
+        self._logger.info(f"Payload almacenado: {compressed_size:,} bytes")
 
     def safe_convert_value(self, value: str) -> str | None:
         """Convierte un valor individual a string"""
@@ -0,0 +1,106 @@
+"""
+Limpieza de fin de corrida.
+
+Todas las claves de una corrida comparten un patrón (su etiqueta `{run}` o,
+en el layout original, su `base_key`), de modo que el recolector las recorre
+con SCAN (nunca KEYS) en ambos layouts, reporta cuánta memoria ocupa
+cada familia y libera con UNLINK por lotes las que ya no se necesitan. Las
+familias de `RETAINED_KEY_FAMILIES` se conservan hasta que vence su TTL. Los
+blobs deduplicados (`frame_blobs`) nunca se eliminan por patrón: se liberan
+al descontar la referencia de cada frame eliminado.
+También elimina los archivos de desborde a disco de la corrida y los que
+quedaron huérfanos al vencer su puntero.
+
+Pensado para ejecutarse como última tarea del DAG de conciliación.
+"""
+
+from loggerk import LoggerK
+from pydantic import BaseModel
+
+from conciliaciones.utils.redis.frame_spill import remove_expired_spill_files
+from conciliaciones.utils.redis.redis_keys import (
+    RETAINED_KEY_FAMILIES,
+    Keys,
+    RedisKeys,
+)
+from conciliaciones.utils.redis.redis_storage import SCAN_BATCH_SIZE, RedisStorage
+
+
+class FamilyMemoryUsage(BaseModel):
+    family: str
+    keys: int
+    bytes: int
+
+
+class RunMemoryReport(BaseModel):
+    base_key: str
+    keys: int
+    total_bytes: int
+    families: list[FamilyMemoryUsage]
+
+
+class RedisRunCollector:
+    _logger: LoggerK
+
+    def __init__(
+        self, redis_keys: RedisKeys, redis: RedisStorage | None = None
+    ) -> None:
+        self._logger = LoggerK(self.__class__.__name__)
+        self._redis_keys = redis_keys
+        self._redis = redis or RedisStorage()
+
+    def memory_report(self, batch_size: int = SCAN_BATCH_SIZE) -> RunMemoryReport:
+        """Memoria ocupada por las claves de la corrida, agrupada por familia"""
+        families: dict[str, FamilyMemoryUsage] = {}
+        for pattern in self._redis_keys.namespace_patterns:
+            for batch in self._redis.scan_batches(pattern, batch_size):
+                usage = self._redis.memory_usage(batch)
+                for key in batch:
+                    family = RedisKeys.key_family(key)
+                    name = family.value if family else "otros"
+                    entry = families.setdefault(
+                        name, FamilyMemoryUsage(family=name, keys=0, bytes=0)
+                    )
+                    entry.keys += 1
+                    entry.bytes += usage.get(key, 0)
+
+        report = RunMemoryReport(
+            base_key=self._redis_keys.base_key,
+            keys=sum(entry.keys for entry in families.values()),
+            total_bytes=sum(entry.bytes for entry in families.values()),
+            families=sorted(
+                families.values(), key=lambda entry: entry.bytes, reverse=True
+            ),
+        )
+        self._logger.info(
+            f"Memoria de la corrida {report.base_key}: {report.keys} claves, "
+            f"{report.total_bytes / 1024**2:.2f} MB"
+        )
+        return report
+
+    def collect(
+        self,
+        keep: tuple[Keys, ...] = RETAINED_KEY_FAMILIES,
+        batch_size: int = SCAN_BATCH_SIZE,
+    ) -> int:
+        """Libera las claves de la corrida salvo las familias de `keep`"""
+        # Los blobs son compartidos: solo los libera su conteo de referencias
+        keep = (*keep, Keys.FRAME_BLOB)
+        unlinked = sum(
+            self._redis.unlink_pattern(
+                pattern,
+                batch_size=batch_size,
+                keep=lambda key: RedisKeys.key_family(key) in keep,
+            )
+            for pattern in self._redis_keys.namespace_patterns
+        )
+        self._logger.info(
+            f"Claves liberadas de la corrida {self._redis_keys.base_key}: {unlinked}"
+        )
+
+        # Archivos de desborde cuyo puntero ya venció en Redis
+        frame_ttl = RedisKeys.ttl_for_key(self._redis_keys.get_erp_redis_key())
+        if frame_ttl is not None:
+            remove_expired_spill_files(max_age_seconds=frame_ttl)
+
+        return unlinked
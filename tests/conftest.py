@@ -0,0 +1,94 @@
+"""
+Fixtures de la capa de almacenamiento en Redis.
+
+Las pruebas usan fakeredis en lugar de un servidor real: cada prueba tiene su
+propio servidor en memoria, compartido por los clientes síncronos y asyncio
+que entrega `RedisPoolRegistry`. Las variables de entorno de la capa se
+reemplazan por un diccionario vacío que cada prueba puede llenar.
+"""
+
+from collections.abc import Iterator
+
+import fakeredis
+import pytest
+
+from conciliaciones.utils.redis import (
+    async_redis_storage,
+    connection_pool,
+    frame_cache,
+    frame_compression,
+    frame_spill,
+    frame_writes,
+    io_metrics,
+    redis_keys,
+    redis_storage,
+)
+from conciliaciones.utils.redis.async_redis_storage import AsyncRedisStorage
+from conciliaciones.utils.redis.connection_pool import RedisPoolRegistry
+from conciliaciones.utils.redis.frame_cache import FrameCache
+from conciliaciones.utils.redis.redis_storage import RedisStorage
+
+# Módulos que leen su configuración de `k_link.tools.env`
+ENV_MODULES = (
+    async_redis_storage,
+    connection_pool,
+    frame_cache,
+    frame_compression,
+    frame_spill,
+    frame_writes,
+    io_metrics,
+    redis_keys,
+    redis_storage,
+)
+
+REDIS_URL: str = "redis://test:6379/0"
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    config.addinivalue_line(
+        "markers",
+        "redis_cluster: requiere un Redis Cluster real (REDIS_CLUSTER_TEST_URL)",
+    )
+
+
+@pytest.fixture
+def redis_env(monkeypatch: pytest.MonkeyPatch) -> Iterator[dict[str, str]]:
+    """Variables de entorno de la capa de Redis, vacías por defecto"""
+    values: dict[str, str] = {}
+    for module in ENV_MODULES:
+        monkeypatch.setattr(module, "env", values)
+    frame_compression._env_overrides.cache_clear()
+    yield values
+    frame_compression._env_overrides.cache_clear()
+
+
+@pytest.fixture
+def redis_server(
+    monkeypatch: pytest.MonkeyPatch, redis_env: dict[str, str]
+) -> Iterator[fakeredis.FakeServer]:
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(
+        RedisPoolRegistry,
+        "get_client",
+        classmethod(
+            lambda cls, url=None, **kwargs: fakeredis.FakeStrictRedis(server=server)
+        ),
+    )
+    monkeypatch.setattr(
+        RedisPoolRegistry,
+        "get_async_client",
+        classmethod(lambda cls, url: fakeredis.FakeAsyncRedis(server=server)),
+    )
+    FrameCache.clear()
+    yield server
+    FrameCache.clear()
+
+
+@pytest.fixture
+def storage(redis_server: fakeredis.FakeServer) -> RedisStorage:
+    return RedisStorage(REDIS_URL)
+
+
+@pytest.fixture
+def async_storage(redis_server: fakeredis.FakeServer) -> AsyncRedisStorage:
+    return AsyncRedisStorage(REDIS_URL)
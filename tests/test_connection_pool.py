@@ -0,0 +1,48 @@
+from collections.abc import Iterator
+
+import fakeredis
+import pytest
+
+from conciliaciones.utils.redis.connection_pool import RedisPoolRegistry
+
+POOL_URL: str = "redis://pool-test:6379/0"
+
+
+@pytest.fixture
+def registry(redis_env: dict[str, str]) -> Iterator[type[RedisPoolRegistry]]:
+    RedisPoolRegistry.close_all()
+    yield RedisPoolRegistry
+    RedisPoolRegistry.close_all()
+
+
+def test_clients_share_one_pool_per_target(registry: type[RedisPoolRegistry]):
+    first = registry.get_client(url=POOL_URL)
+    second = registry.get_client(url=POOL_URL)
+    other = registry.get_client(host="pool-test", port=6379, db=1)
+
+    assert first.connection_pool is second.connection_pool
+    assert other.connection_pool is not first.connection_pool
+
+
+def test_stats_report_pool_usage(
+    registry: type[RedisPoolRegistry], redis_env: dict[str, str]
+):
+    redis_env["REDIS_POOL_MAX_CONNECTIONS"] = "7"
+    clients = [registry.get_client(url=POOL_URL) for _ in range(3)]
+    pool = clients[0].connection_pool
+    # Conexiones a un servidor en memoria en lugar de la red
+    pool.connection_class = fakeredis.FakeConnection
+    pool.connection_kwargs["server"] = fakeredis.FakeServer()
+
+    connection = pool.get_connection("PING")
+    (stats,) = registry.stats()
+    pool.release(connection)
+
+    assert stats.target == POOL_URL
+    assert stats.max_connections == int(redis_env["REDIS_POOL_MAX_CONNECTIONS"])
+    assert stats.in_use_connections == 1
+    assert stats.clients_created == len(clients)
+
+    (stats,) = registry.stats()
+    assert stats.in_use_connections == 0
+    assert stats.available_connections == 1
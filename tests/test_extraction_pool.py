@@ -0,0 +1,103 @@
+import asyncio
+from collections.abc import Awaitable, Callable
+
+import pytest
+
+from conciliaciones.clients.erp.erp_data.extraction_pool import ExtractionPool
+
+CONCURRENCY: int = 2
+
+
+def extraction(
+    value: str, delay: float = 0.0, error: Exception | None = None
+) -> Callable[[], Awaitable[str]]:
+    async def extract() -> str:
+        await asyncio.sleep(delay)
+        if error is not None:
+            raise error
+        return value
+
+    return extract
+
+
+@pytest.mark.asyncio
+async def test_same_key_saves_in_submission_order():
+    saved: list[tuple[str, str]] = []
+
+    async def save_to(key: str, value: str) -> None:
+        saved.append((key, value))
+
+    async with ExtractionPool(concurrency=CONCURRENCY, processes=0) as pool:
+        pool.submit(
+            "erp", extraction("primero", delay=0.05), lambda v: save_to("erp", v)
+        )
+        pool.submit("erp", extraction("segundo"), lambda v: save_to("erp", v))
+
+    assert saved == [("erp", "primero"), ("erp", "segundo")]
+
+
+@pytest.mark.asyncio
+async def test_other_keys_save_as_soon_as_they_finish():
+    saved: list[str] = []
+
+    async def save(value: str) -> None:
+        saved.append(value)
+
+    async with ExtractionPool(concurrency=CONCURRENCY, processes=0) as pool:
+        pool.submit("catalogo_lento", extraction("lento", delay=0.05), save)
+        pool.submit("catalogo_rapido", extraction("rapido"), save)
+
+    assert saved == ["rapido", "lento"]
+
+
+@pytest.mark.asyncio
+async def test_concurrency_is_bounded():
+    running = 0
+    peak = 0
+
+    def tracked(value: str) -> Callable[[], Awaitable[str]]:
+        async def extract() -> str:
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            return value
+
+        return extract
+
+    async def save(value: str) -> None:
+        return None
+
+    async with ExtractionPool(concurrency=CONCURRENCY, processes=0) as pool:
+        for index in range(CONCURRENCY * 3):
+            pool.submit(f"archivo_{index}", tracked(str(index)), save)
+
+    assert peak == CONCURRENCY
+
+
+@pytest.mark.asyncio
+async def test_error_is_propagated_and_cancels_pending_jobs():
+    saved: list[str] = []
+
+    async def save(value: str) -> None:
+        saved.append(value)
+
+    with pytest.raises(ValueError, match="archivo corrupto"):
+        async with ExtractionPool(concurrency=CONCURRENCY, processes=0) as pool:
+            pool.submit("lento", extraction("lento", delay=1.0), save)
+            pool.submit(
+                "corrupto",
+                extraction("corrupto", error=ValueError("archivo corrupto")),
+                save,
+            )
+
+    assert saved == []
+
+
+@pytest.mark.asyncio
+async def test_run_in_process_without_processes_uses_threads():
+    async with ExtractionPool(concurrency=1, processes=0) as pool:
+        result = await pool.run_in_process(sorted, [3, 1, 2])
+
+    assert result == [1, 2, 3]
@@ -0,0 +1,96 @@
+import fakeredis
+import pandas as pd
+import pytest
+
+from conciliaciones.utils.redis.frame_blobs import table_digest
+from conciliaciones.utils.redis.frame_codec import frame_to_table
+from conciliaciones.utils.redis.redis_storage import RedisStorage
+
+
+def sample_frame() -> pd.DataFrame:
+    return pd.DataFrame(
+        {"uuid": ["A-1", "A-2", "A-3"], "estatus": pd.Categorical(["a", "b", "a"])}
+    )
+
+
+def blob_keys(storage: RedisStorage) -> list[str]:
+    return [key for key in storage.keys if key.startswith("frame_blob")]
+
+
+def test_digest_depends_only_on_content():
+    df = sample_frame()
+
+    assert table_digest(frame_to_table(df)) == table_digest(frame_to_table(df.copy()))
+    changed = df.assign(estatus=pd.Categorical(["a", "b", "c"]))
+    assert table_digest(frame_to_table(changed)) != table_digest(frame_to_table(df))
+
+
+def test_identical_frame_is_sent_once(
+    storage: RedisStorage, monkeypatch: pytest.MonkeyPatch
+):
+    writes: list[str] = []
+    write_payloads = storage._write_payloads
+
+    def counting_write_payloads(pipeline, frames, ttl):
+        writes.append("payload")
+        return write_payloads(pipeline, frames, ttl=ttl)
+
+    monkeypatch.setattr(storage, "_write_payloads", counting_write_payloads)
+
+    first = storage.set_df("first", sample_frame(), dedup=True)
+    second = storage.set_df("second", sample_frame(), dedup=True)
+
+    assert writes == ["payload"]
+    assert first == second
+    df = storage.get_df("second", normalize=False)
+    assert df is not None
+    pd.testing.assert_frame_equal(df, sample_frame())
+
+
+def test_dedup_env_default(
+    redis_env: dict[str, str],
+    storage: RedisStorage,
+    redis_server: fakeredis.FakeServer,
+):
+    redis_env["REDIS_FRAME_DEDUP"] = "true"
+
+    storage.set_df("frame", sample_frame())
+    storage.set_df("explicit", sample_frame(), dedup=False)
+
+    client = fakeredis.FakeStrictRedis(server=redis_server)
+    # Las referencias son frames de unos cuantos bytes
+    assert client.strlen("frame") < client.strlen("explicit")
+    assert blob_keys(storage)
+
+
+def test_dedup_blob_released_by_last_reference(storage: RedisStorage):
+    storage.set_df("first", sample_frame(), dedup=True)
+    storage.set_df("second", sample_frame(), dedup=True)
+    assert blob_keys(storage)
+
+    storage.delete("first")
+    assert blob_keys(storage)
+    df = storage.get_df("second")
+    assert df is not None
+    assert df["uuid"].tolist() == ["A-1", "A-2", "A-3"]
+
+    storage.delete("second")
+    assert blob_keys(storage) == []
+
+
+def test_dedup_blob_released_on_overwrite(storage: RedisStorage):
+    storage.set_df("frame", sample_frame(), dedup=True)
+    storage.set_df("frame", pd.DataFrame({"otro": [1]}), dedup=True)
+
+    # Solo queda el blob del contenido vigente (payload, tamaño y referencias)
+    assert len({key.split(":")[0] for key in blob_keys(storage)}) == 1
+
+
+def test_unlink_pattern_releases_blob_references(storage: RedisStorage):
+    storage.set_df("run_1:first", sample_frame(), dedup=True)
+    storage.set_df("run_1:second", sample_frame(), dedup=True)
+
+    storage.unlink_pattern("run_1:*")
+
+    assert blob_keys(storage) == []
+    assert storage.keys == []
@@ -0,0 +1,124 @@
+import fakeredis
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from conciliaciones.utils.redis import redis_storage
+from conciliaciones.utils.redis.frame_cache import FrameCache, version_key
+from conciliaciones.utils.redis.redis_storage import RedisStorage
+
+NAMESPACE: str = "redis://cache-test:6379/0"
+
+
+def sample_frame(tipo: str = "nan") -> pd.DataFrame:
+    return pd.DataFrame({"uuid": ["A-1", "A-2"], "tipo": ["FACTURA", tipo]})
+
+
+@pytest.fixture
+def normalize_calls(monkeypatch: pytest.MonkeyPatch) -> list[pa.Table]:
+    """Tablas que pasan por `normalize_table` durante la prueba"""
+    calls: list[pa.Table] = []
+    normalize_table = redis_storage.normalize_table
+
+    def counting_normalize_table(table: pa.Table) -> pa.Table:
+        calls.append(table)
+        return normalize_table(table)
+
+    monkeypatch.setattr(redis_storage, "normalize_table", counting_normalize_table)
+    return calls
+
+
+def test_entries_match_only_their_version(redis_server: fakeredis.FakeServer):
+    table = pa.table({"folio": [1, 2]})
+
+    FrameCache.put(NAMESPACE, "frame", b"v1", table)
+
+    assert FrameCache.get(NAMESPACE, "frame", b"v1") is table
+    assert FrameCache.get(NAMESPACE, "frame", b"v1", normalized=True) is None
+    # Una versión distinta descarta la entrada
+    assert FrameCache.get(NAMESPACE, "frame", b"v2") is None
+    assert FrameCache.get(NAMESPACE, "frame", b"v1") is None
+
+
+def test_unversioned_and_oversized_tables_are_not_cached(
+    redis_server: fakeredis.FakeServer, monkeypatch: pytest.MonkeyPatch
+):
+    table = pa.table({"folio": list(range(100))})
+    monkeypatch.setattr(FrameCache, "_max_bytes", table.nbytes - 1)
+
+    FrameCache.put(NAMESPACE, "frame", None, table)
+    FrameCache.put(NAMESPACE, "frame", b"v1", table)
+
+    assert FrameCache.stats().entries == 0
+
+
+def test_invalidate_drops_raw_and_normalized_tables(
+    redis_server: fakeredis.FakeServer,
+):
+    table = pa.table({"folio": [1, 2]})
+    FrameCache.put(NAMESPACE, "frame", b"v1", table)
+    FrameCache.put(NAMESPACE, "frame", b"v1", table, normalized=True)
+
+    FrameCache.invalidate(NAMESPACE, "frame")
+
+    assert FrameCache.stats().entries == 0
+    assert FrameCache.stats().cached_bytes == 0
+
+
+def test_write_from_another_instance_invalidates_cached_frame(
+    storage: RedisStorage,
+):
+    storage.set_df("frame", sample_frame())
+    assert storage.get_df("frame") is not None
+
+    # Otra instancia (otro proceso) no invalida la caché de esta, pero
+    # cambia la estampa de versión en Redis
+    other = RedisStorage("redis://otro-proceso:6379/0")
+    other.set_df("frame", sample_frame(tipo="NOTA"))
+
+    df = storage.get_df("frame")
+    assert df is not None
+    assert df["tipo"].tolist() == ["FACTURA", "NOTA"]
+
+
+def test_set_drops_version_stamp(
+    storage: RedisStorage, redis_server: fakeredis.FakeServer
+):
+    storage.set_df("frame", sample_frame())
+
+    storage.set("frame", "valor")
+
+    client = fakeredis.FakeStrictRedis(server=redis_server)
+    assert not client.exists(version_key("frame"))
+
+
+def test_cache_hit_reuses_normalized_table(
+    storage: RedisStorage, normalize_calls: list[pa.Table]
+):
+    storage.set_df("frame", sample_frame())
+
+    first = storage.get_df("frame")
+    second = storage.get_df("frame", columns=["tipo"])
+
+    assert len(normalize_calls) == 1
+    assert first is not None
+    assert second is not None
+    assert first["tipo"].tolist() == second["tipo"].tolist() == ["FACTURA", None]
+    # La tabla sin normalizar sigue disponible
+    raw = storage.get_df("frame", normalize=False)
+    assert raw is not None
+    assert raw["tipo"].tolist() == ["FACTURA", "nan"]
+
+
+def test_overwrite_normalizes_again(
+    storage: RedisStorage, normalize_calls: list[pa.Table]
+):
+    storage.set_df("frame", sample_frame())
+    storage.get_df("frame")
+
+    storage.set_df("frame", sample_frame(tipo=" None "))
+    df = storage.get_df("frame")
+
+    assert [table["tipo"][1].as_py() for table in normalize_calls] == ["nan", " None "]
+    assert df is not None
+    assert df["tipo"].tolist() == ["FACTURA", None]
@@ -0,0 +1,115 @@
+from decimal import Decimal
+
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from conciliaciones.models.proceso_conciliacion import ConciliationTask
+from conciliaciones.utils.redis.async_redis_storage import AsyncRedisStorage
+from conciliaciones.utils.redis.frame_catalog import arrow_type
+from conciliaciones.utils.redis.redis_storage import RedisStorage
+
+CATALOG_KEY: str = "corrida:frame_catalog"
+
+
+def sample_frame(rows: int = 3) -> pd.DataFrame:
+    return pd.DataFrame(
+        {"uuid": [f"A-{i}" for i in range(rows)], "total": [1.5] * rows}
+    )
+
+
+def test_set_df_registers_schema_and_size(storage: RedisStorage):
+    task = next(iter(ConciliationTask))
+
+    payload_size = storage.set_df(
+        "frame", sample_frame(), catalog_key=CATALOG_KEY, task=task
+    )
+
+    entry = storage.get_frame_entry(CATALOG_KEY, "frame")
+    assert entry is not None
+    assert entry.dtypes == {"uuid": "string", "total": "double"}
+    assert entry.num_rows == len(sample_frame())
+    assert entry.payload_bytes == payload_size
+    assert entry.task == task
+
+    schema = storage.get_frame_schema(CATALOG_KEY, "frame")
+    assert schema is not None
+    assert schema.empty
+    assert list(schema.columns) == ["uuid", "total"]
+
+
+@pytest.mark.parametrize(
+    "data_type",
+    [
+        pa.timestamp("ns", tz="America/Mexico_City"),
+        pa.decimal128(12, 2),
+        pa.dictionary(pa.int8(), pa.string()),
+        pa.date32(),
+    ],
+)
+def test_catalog_types_round_trip(data_type: pa.DataType):
+    assert arrow_type(str(data_type)) == data_type
+
+
+def test_decimal_column_keeps_its_type(storage: RedisStorage):
+    df = pd.DataFrame({"importe": [Decimal("1.10"), None]})
+
+    storage.set_df("frame", df, catalog_key=CATALOG_KEY)
+
+    entry = storage.get_frame_entry(CATALOG_KEY, "frame")
+    assert entry is not None
+    assert pa.types.is_decimal(entry.schema.field("importe").type)
+
+
+def test_deleted_frame_entry_is_stale(storage: RedisStorage):
+    storage.set_df("frame", sample_frame(), catalog_key=CATALOG_KEY)
+
+    storage.delete("frame")
+
+    assert storage.get_frame_entry(CATALOG_KEY, "frame") is None
+    assert storage.get_frame_schema(CATALOG_KEY, "frame") is None
+    assert storage.get_frame_catalog(CATALOG_KEY) == []
+
+
+def test_uncataloged_overwrite_makes_entry_stale(storage: RedisStorage):
+    storage.set_df("frame", sample_frame(), catalog_key=CATALOG_KEY)
+
+    # Otra etapa reescribe el frame con otras columnas sin registrarlo
+    storage.set_df("frame", pd.DataFrame({"folio": [1]}))
+
+    assert storage.get_frame_entry(CATALOG_KEY, "frame") is None
+
+
+def test_pickled_value_makes_entry_stale(storage: RedisStorage):
+    storage.set_df("frame", sample_frame(), catalog_key=CATALOG_KEY)
+
+    storage.set("frame", {"filas": 0})
+
+    assert storage.get_frame_entry(CATALOG_KEY, "frame") is None
+
+
+def test_catalog_lists_current_frames_by_size(storage: RedisStorage):
+    storage.set_df("small", sample_frame(rows=1), catalog_key=CATALOG_KEY)
+    storage.set_df("large", sample_frame(rows=1_000), catalog_key=CATALOG_KEY)
+    storage.set_df("deleted", sample_frame(), catalog_key=CATALOG_KEY)
+    storage.delete("deleted")
+
+    entries = storage.get_frame_catalog(CATALOG_KEY)
+
+    assert [entry.key for entry in entries] == ["large", "small"]
+
+
+@pytest.mark.asyncio
+async def test_async_catalog_matches_sync_catalog(
+    async_storage: AsyncRedisStorage, storage: RedisStorage
+):
+    await async_storage.set_df("frame", sample_frame(), catalog_key=CATALOG_KEY)
+
+    entry = await async_storage.get_frame_entry(CATALOG_KEY, "frame")
+    assert entry == storage.get_frame_entry(CATALOG_KEY, "frame")
+    assert [
+        entry.key for entry in await async_storage.get_frame_catalog(CATALOG_KEY)
+    ] == ["frame"]
+
+    await async_storage.delete("frame")
+    assert await async_storage.get_frame_entry(CATALOG_KEY, "frame") is None
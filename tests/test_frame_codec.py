@@ -0,0 +1,37 @@
+import pandas as pd
+import pyarrow as pa
+
+from conciliaciones.utils.redis.frame_codec import (
+    FRAME_ROWS_KEY,
+    decode_schema,
+    decode_table,
+    encode_frame,
+    schema_prefix_size,
+)
+
+
+def sample_frame() -> pd.DataFrame:
+    return pd.DataFrame({"uuid": ["A-1", "A-2", "A-3"], "folio": [10, 20, 30]})
+
+
+def test_decode_schema_reads_only_the_frame_prefix():
+    frame = encode_frame(sample_frame()).to_pybytes()
+
+    prefix_size = schema_prefix_size(frame[:16])
+    schema, num_rows = decode_schema(frame[:prefix_size])
+
+    assert prefix_size < len(frame)
+    assert num_rows == len(sample_frame())
+    assert schema == decode_table(frame).schema
+    assert FRAME_ROWS_KEY not in (schema.metadata or {})
+
+
+def test_decoded_table_drops_row_count():
+    table = decode_table(encode_frame(sample_frame()))
+
+    assert FRAME_ROWS_KEY not in (table.schema.metadata or {})
+    pd.testing.assert_frame_equal(table.to_pandas(), sample_frame())
+    # Las partes decodificadas se concatenan aunque difieran en filas
+    assert (
+        pa.concat_tables([table, table.slice(0, 1)]).num_rows == len(sample_frame()) + 1
+    )
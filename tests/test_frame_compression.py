@@ -0,0 +1,115 @@
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from conciliaciones.utils.redis import frame_compression
+from conciliaciones.utils.redis.frame_compression import (
+    FAMILY_COMPRESSION,
+    CompressionPolicy,
+    select_compression,
+)
+from conciliaciones.utils.redis.redis_keys import Keys
+from conciliaciones.utils.redis.redis_storage import RedisStorage
+
+ROWS: int = 2_000
+
+
+@pytest.fixture
+def small_thresholds(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Umbrales reducidos para elegir codecs con tablas pequeñas"""
+    monkeypatch.setattr(frame_compression, "UNCOMPRESSED_MAX_BYTES", 1_000)
+    monkeypatch.setattr(frame_compression, "FAST_CODEC_MAX_BYTES", 10_000)
+    monkeypatch.setattr(frame_compression, "ZSTD_HIGH_LEVEL_MAX_BYTES", 1_000_000)
+
+
+def repetitive_table(rows: int = ROWS) -> pa.Table:
+    return pa.table({"estatus": ["vigente", "cancelado"] * (rows // 2)})
+
+
+def unique_table(rows: int = ROWS) -> pa.Table:
+    return pa.table({"uuid": [f"UUID-{i:08d}" for i in range(rows)]})
+
+
+@pytest.mark.usefixtures("small_thresholds")
+def test_codec_follows_frame_size(redis_env: dict[str, str]):
+    assert select_compression(unique_table(rows=10)).codec == "none"
+    assert select_compression(unique_table(rows=200)).codec == "lz4"
+    assert select_compression(unique_table(rows=200), fast_codec="snappy").codec == (
+        "snappy"
+    )
+
+
+@pytest.mark.usefixtures("small_thresholds")
+def test_repetitive_text_gets_a_higher_zstd_level(redis_env: dict[str, str]):
+    repetitive = select_compression(repetitive_table())
+    unique = select_compression(unique_table())
+
+    assert repetitive == CompressionPolicy(codec="zstd", level=3)
+    assert unique == CompressionPolicy(codec="zstd", level=1)
+
+
+@pytest.mark.usefixtures("small_thresholds")
+def test_very_large_repetitive_frames_keep_the_fast_level(
+    redis_env: dict[str, str], monkeypatch: pytest.MonkeyPatch
+):
+    table = repetitive_table()
+    monkeypatch.setattr(frame_compression, "ZSTD_HIGH_LEVEL_MAX_BYTES", table.nbytes)
+
+    assert select_compression(table) == CompressionPolicy(codec="zstd", level=1)
+
+
+def test_family_policy_overrides_selection(
+    redis_env: dict[str, str], monkeypatch: pytest.MonkeyPatch
+):
+    monkeypatch.setitem(
+        FAMILY_COMPRESSION, Keys.SAT_ERP, CompressionPolicy(codec="zstd", level=6)
+    )
+
+    policy = select_compression(unique_table(rows=10), key="sat_erp_run_1")
+
+    assert policy == CompressionPolicy(codec="zstd", level=6)
+    assert select_compression(unique_table(rows=10), key="erp_run_1").codec == "none"
+
+
+def test_env_policy_takes_precedence(
+    redis_env: dict[str, str], monkeypatch: pytest.MonkeyPatch
+):
+    monkeypatch.setitem(
+        FAMILY_COMPRESSION, Keys.SAT_ERP, CompressionPolicy(codec="zstd", level=6)
+    )
+    redis_env["REDIS_FRAME_COMPRESSION"] = (
+        "sat_erp=zstd:9, dynamic_headers=none, familia=lz4, erp=zstd:12"
+    )
+
+    assert select_compression(unique_table(), key="sat_erp_run_1") == (
+        CompressionPolicy(codec="zstd", level=9)
+    )
+    assert select_compression(unique_table(), key="dynamic_headers_run_1").codec == (
+        "none"
+    )
+    # Las entradas inválidas se ignoran y la familia vuelve a la selección
+    assert Keys.ERP not in frame_compression._env_overrides()
+
+
+@pytest.mark.parametrize("compression", ["auto", "zstd", "lz4", None])
+def test_frames_round_trip_with_any_codec(
+    storage: RedisStorage, compression: frame_compression.FrameCompression
+):
+    df = pd.DataFrame({"estatus": ["vigente", "cancelado"] * (ROWS // 2)})
+
+    storage.set_df("frame", df, compression=compression)
+
+    stored = storage.get_df("frame", normalize=False)
+    assert stored is not None
+    pd.testing.assert_frame_equal(stored, df)
+
+
+def test_policy_options(redis_env: dict[str, str]):
+    zstd = CompressionPolicy(codec="zstd", level=9)
+
+    assert zstd.parquet_options() == {"compression": "zstd", "compression_level": 9}
+    assert zstd.ipc_codec().compression_level == zstd.level
+    # IPC no soporta snappy: se escribe con lz4
+    assert CompressionPolicy(codec="snappy").ipc_codec().name == "lz4"
+    assert CompressionPolicy(codec="none").ipc_codec() is None
+    assert str(zstd) == "zstd:9"
@@ -0,0 +1,160 @@
+import os
+import time
+from pathlib import Path
+
+import fakeredis
+import pandas as pd
+import pytest
+
+from conciliaciones.utils.redis import frame_spill
+from conciliaciones.utils.redis.frame_spill import (
+    file_pointer,
+    handoff_key,
+    remove_expired_spill_files,
+)
+from conciliaciones.utils.redis.redis_storage import RedisStorage
+
+MAX_AGE_SECONDS: int = 60
+
+
+def large_frame() -> pd.DataFrame:
+    return pd.DataFrame(
+        {"folio": range(1_000), "uuid": [f"U-{i}" for i in range(1_000)]}
+    )
+
+
+@pytest.fixture
+def spill_dir(redis_env: dict[str, str], tmp_path: Path) -> Path:
+    directory = tmp_path / "spill"
+    redis_env["REDIS_SPILL_DIR"] = str(directory)
+    redis_env["REDIS_SPILL_THRESHOLD_BYTES"] = "1024"
+    redis_env["REDIS_SPILL_SHARED"] = "true"
+    redis_env["REDIS_HANDOFF_DIR"] = str(tmp_path / "handoff")
+    return directory
+
+
+def test_large_frame_spills_to_shared_volume(
+    spill_dir: Path, storage: RedisStorage, redis_server: fakeredis.FakeServer
+):
+    storage.set_df("frame", large_frame())
+
+    client = fakeredis.FakeStrictRedis(server=redis_server)
+    pointer = file_pointer(client.get("frame"))
+    assert pointer is not None
+    # El puntero de un volumen compartido sirve en cualquier host
+    assert pointer.host is None
+    assert Path(pointer.path).parent == spill_dir
+
+    df = storage.get_df("frame", normalize=False)
+    assert df is not None
+    pd.testing.assert_frame_equal(df, large_frame())
+    assert sum(len(batch) for batch in storage.iter_batches("frame")) == len(df)
+
+    storage.delete("frame")
+    assert list(spill_dir.glob("*.arrow")) == []
+
+
+def test_small_frame_stays_in_redis(
+    spill_dir: Path, storage: RedisStorage, redis_server: fakeredis.FakeServer
+):
+    storage.set_df("frame", pd.DataFrame({"folio": [1]}))
+
+    client = fakeredis.FakeStrictRedis(server=redis_server)
+    assert file_pointer(client.get("frame")) is None
+    assert not spill_dir.exists()
+
+
+def test_local_directory_does_not_spill(
+    spill_dir: Path,
+    redis_env: dict[str, str],
+    storage: RedisStorage,
+    redis_server: fakeredis.FakeServer,
+):
+    del redis_env["REDIS_SPILL_SHARED"]
+
+    storage.set_df("frame", large_frame())
+
+    client = fakeredis.FakeStrictRedis(server=redis_server)
+    assert file_pointer(client.get("frame")) is None
+    assert not spill_dir.exists()
+
+
+def test_overwrite_removes_previous_file(spill_dir: Path, storage: RedisStorage):
+    storage.set_df("frame", large_frame())
+    storage.set_df("frame", large_frame())
+
+    assert len(list(spill_dir.glob("*.arrow"))) == 1
+
+
+def test_expired_files_are_removed(spill_dir: Path, storage: RedisStorage):
+    storage.set_df("old", large_frame())
+    storage.set_df("new", large_frame())
+    old_file, new_file = sorted(spill_dir.glob("*.arrow"), key=lambda path: path.name)
+    expired = time.time() - 2 * MAX_AGE_SECONDS
+    os.utime(old_file, (expired, expired))
+
+    removed = remove_expired_spill_files(max_age_seconds=MAX_AGE_SECONDS)
+
+    assert removed == 1
+    assert not old_file.exists()
+    assert new_file.exists()
+
+
+@pytest.fixture
+def handoff_dir(spill_dir: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    # Cada prueba empieza sin barridos previos
+    monkeypatch.setattr(frame_spill, "_last_handoff_sweep", {})
+    return spill_dir.parent / "handoff"
+
+
+def test_handoff_is_off_by_default(
+    handoff_dir: Path, storage: RedisStorage, redis_server: fakeredis.FakeServer
+):
+    storage.set_df("frame", pd.DataFrame({"folio": [1]}), handoff=True)
+
+    client = fakeredis.FakeStrictRedis(server=redis_server)
+    assert client.get(handoff_key("frame")) is None
+    assert not handoff_dir.exists()
+
+
+def test_enabled_handoff_is_read_from_shared_memory(
+    handoff_dir: Path,
+    redis_env: dict[str, str],
+    storage: RedisStorage,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    redis_env["REDIS_FRAME_HANDOFF"] = "true"
+    df = pd.DataFrame({"folio": [1, 2]})
+    storage.set_df("frame", df, handoff=True)
+    assert len(list(handoff_dir.glob("*.arrow"))) == 1
+
+    mapped: list[str] = []
+    read_spill_file = frame_spill.read_spill_file
+
+    def tracking_read(pointer: frame_spill.FramePointer):
+        mapped.append(pointer.path)
+        return read_spill_file(pointer)
+
+    monkeypatch.setattr(frame_spill, "read_spill_file", tracking_read)
+    stored = storage.get_df("frame", normalize=False)
+
+    assert stored is not None
+    pd.testing.assert_frame_equal(stored, df)
+    assert mapped
+
+
+def test_expired_handoff_files_are_swept_on_write(
+    handoff_dir: Path, redis_env: dict[str, str], storage: RedisStorage
+):
+    redis_env["REDIS_FRAME_HANDOFF"] = "true"
+    redis_env["REDIS_RUN_TTL_SECONDS"] = str(MAX_AGE_SECONDS)
+    storage.set_df("old", pd.DataFrame({"folio": [1]}), handoff=True)
+    (old_file,) = handoff_dir.glob("*.arrow")
+    expired = time.time() - 2 * MAX_AGE_SECONDS
+    os.utime(old_file, (expired, expired))
+    frame_spill._last_handoff_sweep.clear()
+
+    storage.set_df("new", pd.DataFrame({"folio": [2]}), handoff=True)
+
+    assert not old_file.exists()
+    assert len(list(handoff_dir.glob("*.arrow"))) == 1
@@ -0,0 +1,146 @@
+import fakeredis
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from conciliaciones.utils.data.arrow_tables import concat_tables, unify_schemas
+from conciliaciones.utils.redis.async_redis_storage import AsyncRedisStorage
+from conciliaciones.utils.redis.frame_stream import concat_stream_tables, stream_key
+from conciliaciones.utils.redis.redis_storage import RedisStorage
+
+CATALOG_KEY: str = "corrida:frame_catalog"
+
+
+def test_schemas_are_promoted_or_stringified():
+    schema = unify_schemas(
+        [
+            pa.schema([("folio", pa.int64()), ("total", pa.int64())]),
+            pa.schema([("total", pa.float64()), ("uuid", pa.string())]),
+            pa.schema([("folio", pa.string()), ("uuid", pa.null())]),
+        ]
+    )
+
+    assert schema == pa.schema(
+        [("folio", pa.string()), ("total", pa.float64()), ("uuid", pa.string())]
+    )
+
+
+def test_parts_are_concatenated_by_column_name(storage: RedisStorage):
+    storage.append_frame("reporte", pd.DataFrame({"uuid": ["A"], "total": [1]}))
+    parts = storage.append_frame(
+        "reporte", pd.DataFrame({"total": [2.5], "empresa": ["K"]})
+    )
+
+    df = storage.get_df("reporte", normalize=False)
+
+    assert parts == len(["primera", "segunda"])
+    assert df is not None
+    assert list(df.columns) == ["uuid", "total", "empresa"]
+    assert df["total"].tolist() == [1.0, 2.5]
+    assert df["uuid"].isna().tolist() == [False, True]
+
+
+def test_missing_text_fills_only_the_part_that_declares_it(storage: RedisStorage):
+    storage.append_frame("reporte", pd.DataFrame({"uuid": ["A"], "rfc": ["XAXX"]}))
+    storage.append_frame(
+        "reporte", pd.DataFrame({"uuid": ["B"]}), missing_text="Sin dato"
+    )
+    storage.append_frame("reporte", pd.DataFrame({"uuid": ["C"]}))
+
+    df = storage.get_df("reporte", normalize=False)
+
+    assert df is not None
+    assert df["rfc"].iloc[:2].tolist() == ["XAXX", "Sin dato"]
+    assert pd.isna(df["rfc"].iloc[2])
+
+
+def test_iter_stream_resumes_from_an_index(storage: RedisStorage):
+    for value in range(3):
+        storage.append_frame("reporte", pd.DataFrame({"n": [value]}))
+
+    parts = list(storage.iter_stream("reporte", start=1))
+
+    assert [part.column("n").to_pylist() for part in parts] == [[1], [2]]
+
+
+def test_concatenation_keeps_stringified_columns():
+    parts = [
+        pa.table({"a": ["1"]}).replace_schema_metadata(
+            {b"conciliaciones.stringified_columns": b'["a"]'}
+        ),
+        pa.table({"a": ["2"], "b": [1]}),
+    ]
+
+    table = concat_stream_tables(parts)
+
+    assert table.schema.metadata[b"conciliaciones.stringified_columns"] == b'["a"]'
+    assert table.num_rows == len(parts)
+    # Fuera de los streams la unión no registra metadatos
+    assert concat_tables(parts).schema.metadata is None
+
+
+def test_set_df_replaces_the_stream(storage: RedisStorage):
+    storage.append_frame("reporte", pd.DataFrame({"n": [1]}))
+
+    storage.set_df("reporte", pd.DataFrame({"m": [2]}))
+
+    assert list(storage.iter_stream("reporte")) == []
+    df = storage.get_df("reporte", normalize=False)
+    assert df is not None
+    assert list(df.columns) == ["m"]
+
+
+def test_catalog_types_follow_the_concatenation(storage: RedisStorage):
+    storage.append_frame(
+        "reporte", pd.DataFrame({"total": [1], "uuid": ["A"]}), catalog_key=CATALOG_KEY
+    )
+    storage.append_frame(
+        "reporte", pd.DataFrame({"total": [2.5]}), catalog_key=CATALOG_KEY
+    )
+
+    entry = storage.get_frame_entry(CATALOG_KEY, "reporte")
+    table = storage.get_table("reporte")
+
+    assert entry is not None
+    assert table is not None
+    assert entry.num_rows == table.num_rows
+    assert entry.schema == table.schema.remove_metadata()
+    assert all(column.memory_bytes for column in entry.columns)
+
+
+def test_restarted_stream_gets_a_fresh_catalog_entry(
+    storage: RedisStorage, redis_server: fakeredis.FakeServer
+):
+    storage.append_frame(
+        "reporte", pd.DataFrame({"viejo": ["A", "B"]}), catalog_key=CATALOG_KEY
+    )
+    # La lista vence o se elimina por fuera; la estampa de versión sigue
+    fakeredis.FakeStrictRedis(server=redis_server).delete(stream_key("reporte"))
+
+    storage.append_frame("reporte", pd.DataFrame({"n": [1]}), catalog_key=CATALOG_KEY)
+
+    entry = storage.get_frame_entry(CATALOG_KEY, "reporte")
+    assert entry is not None
+    assert entry.column_names == ["n"]
+    assert entry.num_rows == 1
+
+
+@pytest.mark.asyncio
+async def test_async_stream_matches_sync_stream(
+    async_storage: AsyncRedisStorage, storage: RedisStorage
+):
+    await async_storage.append_frame(
+        "reporte", pd.DataFrame({"total": [1]}), catalog_key=CATALOG_KEY
+    )
+    await async_storage.append_frame(
+        "reporte", pd.DataFrame({"total": [2.5]}), catalog_key=CATALOG_KEY
+    )
+
+    df = await async_storage.get_df("reporte", normalize=False)
+    entry = await async_storage.get_frame_entry(CATALOG_KEY, "reporte")
+
+    assert df is not None
+    assert df["total"].tolist() == [1.0, 2.5]
+    assert entry is not None
+    assert entry.dtypes == {"total": "double"}
+    assert entry == storage.get_frame_entry(CATALOG_KEY, "reporte")
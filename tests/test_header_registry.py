@@ -0,0 +1,109 @@
+from collections.abc import Iterator
+
+import pytest
+from k_link.extensions.report_config import HeaderConfig, OrigenColumna, TipoDato
+
+from conciliaciones.utils.headers.header_registry import HeaderRegistry, dump_headers
+from conciliaciones.utils.redis.frame_cache import new_version, version_key
+from conciliaciones.utils.redis.redis_storage import RedisStorage
+
+REGISTRY_KEY: str = "list_headers_registry_run_1"
+
+
+def header(nombre: str, tipo: TipoDato = TipoDato.TEXTO) -> HeaderConfig:
+    return HeaderConfig(
+        nombre=nombre,
+        configuracion_tipo_dato=tipo,
+        origen=OrigenColumna.CLEAN_DATA,
+        mostrar_reporte=True,
+    )
+
+
+@pytest.fixture(autouse=True)
+def clear_registries() -> Iterator[None]:
+    HeaderRegistry.invalidate()
+    yield
+    HeaderRegistry.invalidate()
+
+
+def count_downloads(
+    storage: RedisStorage, monkeypatch: pytest.MonkeyPatch
+) -> list[str]:
+    downloads: list[str] = []
+    get_fields = storage.get_fields
+
+    def counting_get_fields(key: str, object_type: type) -> dict:
+        downloads.append(key)
+        return get_fields(key, object_type=object_type)
+
+    monkeypatch.setattr(storage, "get_fields", counting_get_fields)
+    return downloads
+
+
+def test_saved_lists_are_read_back(storage: RedisStorage):
+    HeaderRegistry.save_list(storage, REGISTRY_KEY, "erp", [header("uuid")])
+    HeaderRegistry.save_list(storage, REGISTRY_KEY, "pivot", [header("folio")])
+
+    registry = HeaderRegistry.load(storage, REGISTRY_KEY)
+
+    assert [item.nombre for item in registry.get_list("erp") or []] == ["uuid"]
+    assert [item.nombre for item in registry.get_list("pivot") or []] == ["folio"]
+    assert registry.get_list("sat") is None
+
+
+def test_unchanged_registry_is_served_from_memory(
+    storage: RedisStorage, monkeypatch: pytest.MonkeyPatch
+):
+    HeaderRegistry.save_list(storage, REGISTRY_KEY, "erp", [header("uuid")])
+    downloads = count_downloads(storage, monkeypatch)
+
+    first = HeaderRegistry.load(storage, REGISTRY_KEY)
+    second = HeaderRegistry.load(storage, REGISTRY_KEY)
+
+    assert second is first
+    assert downloads == [REGISTRY_KEY]
+
+
+def test_list_saved_by_another_process_is_seen(
+    storage: RedisStorage, monkeypatch: pytest.MonkeyPatch
+):
+    HeaderRegistry.save_list(storage, REGISTRY_KEY, "erp", [header("uuid")])
+    assert HeaderRegistry.load(storage, REGISTRY_KEY).get_list("sat") is None
+    downloads = count_downloads(storage, monkeypatch)
+
+    # Otro proceso escribe en Redis sin pasar por la copia de este proceso
+    storage.set_field(REGISTRY_KEY, "sat", dump_headers([header("rfc")]))
+    storage.set(version_key(REGISTRY_KEY), new_version())
+
+    registry = HeaderRegistry.load(storage, REGISTRY_KEY)
+    assert [item.nombre for item in registry.get_list("sat") or []] == ["rfc"]
+    assert downloads == [REGISTRY_KEY]
+
+
+def test_save_discards_the_local_copy(storage: RedisStorage):
+    first = HeaderRegistry.load(storage, REGISTRY_KEY)
+
+    HeaderRegistry.save_list(storage, REGISTRY_KEY, "erp", [header("uuid")])
+
+    registry = HeaderRegistry.load(storage, REGISTRY_KEY)
+    assert registry is not first
+    assert registry.get_list("erp") is not None
+
+
+def test_index_keeps_the_first_occurrence(storage: RedisStorage):
+    HeaderRegistry.save_list(
+        storage,
+        REGISTRY_KEY,
+        "erp",
+        [header("fecha", TipoDato.FECHA), header("fecha"), header("uuid")],
+    )
+    registry = HeaderRegistry.load(storage, REGISTRY_KEY)
+
+    found = registry.lookup("erp", "fecha")
+    assert found is not None
+    assert found.configuracion_tipo_dato == TipoDato.FECHA
+    assert list(registry.index("erp")) == ["fecha", "uuid"]
+    assert registry.lookup("erp", "total") is None
+
+    registry.put_list("erp", [header("total")])
+    assert list(registry.index("erp")) == ["total"]
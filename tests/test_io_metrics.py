@@ -0,0 +1,127 @@
+import json
+from collections.abc import Iterator
+from pathlib import Path
+
+import pandas as pd
+import pytest
+from k_link.extensions.conciliation_type import ConciliationType
+
+from conciliaciones.models.proceso_conciliacion import ConciliationTask
+from conciliaciones.utils.redis.io_metrics import (
+    KeyIOStats,
+    StorageMetrics,
+    storage_stage,
+    to_line_protocol,
+)
+from conciliaciones.utils.redis.redis_keys import RedisKeys
+from conciliaciones.utils.redis.redis_storage import RedisStorage
+
+
+@pytest.fixture
+def redis_keys() -> RedisKeys:
+    return RedisKeys(
+        "run_1", "5f0000000000000000000000", 1, 2024, ConciliationType.MONTHLY
+    )
+
+
+@pytest.fixture
+def metrics_file(redis_env: dict[str, str], tmp_path: Path) -> Iterator[Path]:
+    path = tmp_path / "redis_io.jsonl"
+    redis_env["REDIS_IO_METRICS_FILE"] = str(path)
+    StorageMetrics.clear()
+    yield path
+    StorageMetrics.clear()
+
+
+def exported(path: Path) -> list[dict]:
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_operations_are_attributed_to_the_stage(
+    metrics_file: Path, redis_keys: RedisKeys, storage: RedisStorage
+):
+    erp_key = redis_keys.get_erp_redis_key()
+
+    with storage_stage(ConciliationTask.VALIDATE_DATA):
+        storage.set_df(erp_key, pd.DataFrame({"a": range(100)}))
+        storage.get_df(erp_key)
+        storage.get_df(erp_key)
+        stats = StorageMetrics.snapshot(task=ConciliationTask.VALIDATE_DATA)
+
+        by_operation = {entry.operation: entry for entry in stats}
+        assert set(by_operation) == {"get", "set"}
+        assert by_operation["set"].payload_bytes > 0
+        assert by_operation["set"].family == "erp"
+        # La segunda lectura la sirve la caché del proceso
+        assert by_operation["get"].cache_hits == by_operation["get"].calls - 1
+
+
+def test_stage_exports_its_metrics_with_the_run(
+    metrics_file: Path, redis_keys: RedisKeys, storage: RedisStorage
+):
+    run = redis_keys.base_key
+
+    with storage_stage(ConciliationTask.VALIDATE_DATA, run=run):
+        storage.set_df(redis_keys.get_erp_redis_key(), pd.DataFrame({"a": [1]}))
+
+    lines = exported(metrics_file)
+    assert [(line["run"], line["task"]) for line in lines] == [
+        (run, ConciliationTask.VALIDATE_DATA.name)
+    ]
+    assert StorageMetrics.snapshot() == []
+
+
+def test_last_stage_exports_leftover_metrics(
+    metrics_file: Path, redis_keys: RedisKeys, storage: RedisStorage
+):
+    run = redis_keys.base_key
+    # Fuera de una etapa y en una clave sin etiqueta de corrida (un blob)
+    storage.set_df(redis_keys.get_erp_redis_key(), pd.DataFrame({"a": [1]}))
+
+    with storage_stage(ConciliationTask.CONCILIATION, run=run):
+        storage.set_df("frame_blob:abc", pd.DataFrame({"a": [1]}))
+
+    assert {(line["key"], line["run"]) for line in exported(metrics_file)} == {
+        (redis_keys.get_erp_redis_key(), run),
+        ("frame_blob:abc", run),
+    }
+    assert StorageMetrics.snapshot() == []
+
+
+def test_nested_stage_keeps_leftovers_for_the_outer_stage(
+    metrics_file: Path, storage: RedisStorage
+):
+    with storage_stage(ConciliationTask.S3_TO_REDIS):
+        storage.set_df("outer", pd.DataFrame({"a": [1]}))
+        with storage_stage(ConciliationTask.VALIDATE_DATA):
+            storage.set_df("inner", pd.DataFrame({"a": [1]}))
+
+        assert [line["key"] for line in exported(metrics_file)] == ["inner"]
+        assert [entry.key for entry in StorageMetrics.snapshot()] == ["outer"]
+
+    assert [line["key"] for line in exported(metrics_file)] == ["inner", "outer"]
+
+
+def test_metrics_are_off_without_a_destination(
+    redis_env: dict[str, str], storage: RedisStorage
+):
+    StorageMetrics.clear()
+
+    with storage_stage(ConciliationTask.VALIDATE_DATA):
+        storage.set_df("frame", pd.DataFrame({"a": [1]}))
+
+    assert StorageMetrics.snapshot() == []
+
+
+def test_line_protocol_escapes_tags():
+    stats = KeyIOStats(
+        key="erp,run 1", family="erp", operation="set", task=None, calls=2
+    )
+
+    line = to_line_protocol([stats], run="run=1", timestamp_ns=1)
+
+    assert line == (
+        "redis_io,run=run\\=1,family=erp,operation=set,key=erp\\,run\\ 1 "
+        "calls=2i,cache_hits=0i,payload_bytes=0i,encode_seconds=0.0,"
+        "decode_seconds=0.0,network_seconds=0.0,latency_seconds=0.0 1"
+    )
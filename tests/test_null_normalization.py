@@ -0,0 +1,69 @@
+import pandas as pd
+import pyarrow as pa
+
+from conciliaciones.utils.redis.null_normalization import (
+    normalize_frame,
+    table_to_normalized_frame,
+)
+from conciliaciones.utils.redis.redis_storage import RedisStorage
+
+SENTINEL_VALUES: list[str | None] = [
+    "FACTURA",
+    "nan",
+    " None ",
+    "NaT",
+    "",
+    "  ",
+    "nanita",
+    None,
+]
+
+
+def sample_frame() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "uuid": ["A-1", "A-2", "A-3"],
+            "tipo": ["FACTURA", "nan", " None "],
+            "folio": [10, 20, 30],
+        }
+    )
+
+
+def test_get_df_normalizes_null_sentinels(storage: RedisStorage):
+    storage.set_df("frame", sample_frame())
+
+    df = storage.get_df("frame")
+
+    assert df is not None
+    assert df["uuid"].tolist() == ["A-1", "A-2", "A-3"]
+    assert df["tipo"].tolist() == ["FACTURA", None, None]
+    assert str(df["folio"].dtype) == "Int64"
+
+
+def test_get_df_without_normalization(storage: RedisStorage):
+    storage.set_df("frame", sample_frame())
+
+    df = storage.get_df("frame", normalize=False)
+
+    assert df is not None
+    assert df["tipo"].tolist() == ["FACTURA", "nan", " None "]
+    assert str(df["folio"].dtype) == "int64"
+
+
+def test_vectorized_rules_match_per_cell_conversion(storage: RedisStorage):
+    table = pa.table({"tipo": pa.array(SENTINEL_VALUES, pa.string())})
+
+    df = table_to_normalized_frame(table)
+
+    expected = [storage.safe_convert_value(value) for value in SENTINEL_VALUES]  # type: ignore
+    assert df["tipo"].tolist() == expected
+
+
+def test_normalize_frame_matches_arrow_path():
+    df = pd.DataFrame({"tipo": SENTINEL_VALUES[:-1], "folio": range(7)})
+
+    from_pandas = normalize_frame(df.copy())
+    from_arrow = table_to_normalized_frame(pa.Table.from_pandas(df))
+
+    assert from_pandas["tipo"].tolist() == from_arrow["tipo"].tolist()
+    assert str(from_pandas["folio"].dtype) == str(from_arrow["folio"].dtype)
@@ -0,0 +1,105 @@
+import pandas as pd
+import pytest
+from pydantic import BaseModel
+from redis.crc import key_slot
+
+from conciliaciones.clients.erp.erp_data import parsed_cache
+from conciliaciones.clients.erp.erp_data.parsed_cache import (
+    ParsedFrameCache,
+    s3_object_source,
+    upload_source,
+)
+from conciliaciones.utils.redis.frame_cache import version_key
+from conciliaciones.utils.redis.redis_keys import Keys, RedisKeys
+from conciliaciones.utils.redis.redis_storage import RedisStorage
+
+S3_PATH: str = "proyecto/catalogos/clientes.xlsx"
+ETAG: str = "0123456789abcdef0123456789abcdef"
+SIZE: int = 2_048
+
+
+class ReadConfig(BaseModel):
+    sheet: str
+    headers: list[str]
+
+
+CONFIG = ReadConfig(sheet="Hoja1", headers=["uuid", "folio"])
+
+
+@pytest.fixture
+def cache(
+    redis_env: dict[str, str],
+    storage: RedisStorage,
+    monkeypatch: pytest.MonkeyPatch,
+) -> ParsedFrameCache:
+    monkeypatch.setattr(parsed_cache, "env", redis_env)
+    return ParsedFrameCache(storage)
+
+
+def test_key_identifies_the_object_and_its_read(cache: ParsedFrameCache):
+    key = cache.key(s3_object_source(S3_PATH, ETAG, SIZE), CONFIG)
+
+    assert key is not None
+    assert RedisKeys.key_family(key) == Keys.PARSED_UPLOAD
+    # S3 reporta el ETag entre comillas
+    assert cache.key(s3_object_source(S3_PATH, f'"{ETAG}"', SIZE), CONFIG) == key
+    assert cache.key(s3_object_source(S3_PATH, ETAG, SIZE + 1), CONFIG) != key
+    assert cache.key(s3_object_source(S3_PATH, ETAG[::-1], SIZE), CONFIG) != key
+    other_read = CONFIG.model_copy(update={"headers": ["uuid"]})
+    assert cache.key(s3_object_source(S3_PATH, ETAG, SIZE), other_read) != key
+
+
+def test_format_version_changes_the_key(
+    cache: ParsedFrameCache, monkeypatch: pytest.MonkeyPatch
+):
+    source = s3_object_source(S3_PATH, ETAG, SIZE)
+    key = cache.key(source, CONFIG)
+
+    monkeypatch.setattr(parsed_cache, "PARSED_CACHE_FORMAT", 2)
+
+    assert cache.key(source, CONFIG) != key
+
+
+def test_upload_source_follows_the_upload_record(cache: ParsedFrameCache):
+    first = upload_source(ReadConfig(sheet="upload_1", headers=[]))
+    second = upload_source(ReadConfig(sheet="upload_2", headers=[]))
+
+    assert cache.key(first, CONFIG) != cache.key(second, CONFIG)
+
+
+def test_unknown_source_is_not_cached(cache: ParsedFrameCache):
+    key = cache.key(s3_object_source(S3_PATH, None, SIZE), CONFIG)
+
+    assert key is None
+    assert cache.get(key) is None
+    cache.put(key, pd.DataFrame({"a": [1]}))
+    assert cache.redis.keys == []
+
+
+def test_cache_can_be_disabled(redis_env: dict[str, str], cache: ParsedFrameCache):
+    redis_env["ERP_PARSED_CACHE"] = "false"
+
+    assert ParsedFrameCache(cache.redis).key(upload_source(CONFIG), CONFIG) is None
+
+
+def test_cached_frame_round_trips(cache: ParsedFrameCache):
+    key = cache.key(upload_source(CONFIG), CONFIG)
+    df = pd.DataFrame({"uuid": ["A-1"], "folio": [10]})
+
+    assert cache.get(key) is None
+    cache.put(key, df)
+
+    cached = cache.get(key)
+    assert cached is not None
+    pd.testing.assert_frame_equal(cached, df)
+
+
+def test_cluster_layout_keeps_derived_keys_in_one_slot(
+    redis_env: dict[str, str], cache: ParsedFrameCache
+):
+    redis_env["REDIS_KEY_LAYOUT"] = "2"
+
+    key = cache.key(upload_source(CONFIG), CONFIG)
+
+    assert key is not None
+    assert key_slot(key.encode("utf-8")) == key_slot(version_key(key).encode("utf-8"))
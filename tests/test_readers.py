@@ -0,0 +1,174 @@
+import io
+from datetime import datetime
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+from openpyxl import Workbook
+
+from conciliaciones.clients.erp.erp_data import readers
+from conciliaciones.clients.erp.erp_data.readers import read_selected_columns
+
+HEADER: list[str] = ["uuid", "descripcion", "folio", "monto", "notas", "pagada"]
+
+# Columnas configuradas, en el orden del archivo
+COLUMNS: list[str] = ["uuid", "folio", "monto", "pagada"]
+
+ROWS: list[list[object]] = [
+    ["A-1", "Factura", 10, 1500.5, "", True],
+    ["A-2", "Pago", 11, 200.0, "parcial", False],
+    ["A-3", "", 12, 35.25, "", True],
+    ["A-4", "Nota", 13, 0.0, "sin folio", False],
+]
+
+
+def catalog(columns: list[str] = COLUMNS, **layout: object) -> SimpleNamespace:
+    return SimpleNamespace(
+        header_types=dict.fromkeys(columns),
+        excel_sheet_data=layout.pop("excel_sheet_data", None),
+        **layout,
+    )
+
+
+def csv_file(rows: list[list[object]] = ROWS, delimiter: str = ",") -> io.BytesIO:
+    frame = pd.DataFrame(rows, columns=HEADER)
+    return io.BytesIO(frame.to_csv(index=False, sep=delimiter).encode("utf-8"))
+
+
+def xlsx_file(rows: list[list[object] | None] = ROWS) -> io.BytesIO:
+    workbook = Workbook()
+    worksheet = workbook.active
+    worksheet.title = "Datos"
+    worksheet.append(HEADER)
+    for index, row in enumerate(rows, start=2):
+        # None deja la fila sin celdas en la hoja
+        if row is not None:
+            for column, value in enumerate(row, start=1):
+                if value != "":
+                    worksheet.cell(row=index, column=column, value=value)
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    buffer.seek(0)
+    return buffer
+
+
+@pytest.fixture(params=["xlsx_parser", "iter_rows"])
+def sheet_parser(request: pytest.FixtureRequest, monkeypatch: pytest.MonkeyPatch):
+    # Sin versiones probadas la hoja se lee con la API pública de openpyxl
+    if request.param == "iter_rows":
+        monkeypatch.setattr(readers, "OPENPYXL_PARSER_VERSIONS", ())
+
+
+@pytest.fixture(autouse=True)
+def readers_env(monkeypatch: pytest.MonkeyPatch) -> dict[str, str]:
+    values: dict[str, str] = {}
+    monkeypatch.setattr(readers, "env", values)
+    return values
+
+
+def test_csv_matches_read_csv():
+    source = csv_file()
+
+    df = read_selected_columns(source, "clientes.csv", catalog(), engine="pandas")
+
+    assert source.tell() == 0
+    pd.testing.assert_frame_equal(df, pd.read_csv(csv_file())[COLUMNS])
+
+
+@pytest.mark.usefixtures("sheet_parser")
+def test_xlsx_matches_read_excel():
+    rows = [
+        *ROWS,
+        # Fila vacía en medio, fila con valor solo en una columna no
+        # configurada, fechas y una columna de tipos mixtos
+        None,
+        ["A-5", "", 14, 99.9, "solo notas", None],
+        ["A-6", "Pago", "sin folio", datetime(2024, 1, 31), "", True],
+        [None, None, None, None, "al final", None],
+    ]
+    source = xlsx_file(rows)
+
+    df = read_selected_columns(source, "clientes.xlsx", catalog(), engine="pandas")
+
+    assert source.tell() == 0
+    pd.testing.assert_frame_equal(df, pd.read_excel(xlsx_file(rows))[COLUMNS])
+
+
+@pytest.mark.usefixtures("sheet_parser")
+def test_xlsx_drops_trailing_empty_rows():
+    source = xlsx_file([*ROWS, None, [None] * len(HEADER)])
+
+    df = read_selected_columns(source, "clientes.xlsx", catalog(), engine="pandas")
+
+    pd.testing.assert_frame_equal(df, pd.read_excel(xlsx_file(ROWS))[COLUMNS])
+
+
+@pytest.mark.usefixtures("sheet_parser")
+def test_xlsx_configured_sheet():
+    config = catalog(excel_sheet_data="Datos")
+
+    df = read_selected_columns(xlsx_file(), "clientes.xlsx", config, engine="pandas")
+
+    assert df is not None
+    assert list(df.columns) == COLUMNS
+    assert (
+        read_selected_columns(
+            xlsx_file(),
+            "clientes.xlsx",
+            catalog(excel_sheet_data="Otra"),
+            engine="pandas",
+        )
+        is None
+    )
+
+
+@pytest.mark.usefixtures("sheet_parser")
+@pytest.mark.parametrize("file_name", ["clientes.csv", "clientes.xlsx"])
+def test_missing_column_falls_back_to_full_read(file_name: str):
+    source = xlsx_file() if file_name.endswith("xlsx") else csv_file()
+    config = catalog([*COLUMNS, "rfc"])
+
+    assert read_selected_columns(source, file_name, config, engine="pandas") is None
+    assert source.tell() == 0
+
+
+def test_read_window_falls_back_to_full_read():
+    config = catalog(skip_rows=2)
+
+    assert read_selected_columns(csv_file(), "clientes.csv", config) is None
+    assert read_selected_columns(csv_file(), "clientes.json", catalog()) is None
+
+
+def test_readers_can_be_disabled(readers_env: dict[str, str]):
+    readers_env["ERP_PRUNED_READERS"] = "false"
+
+    assert read_selected_columns(csv_file(), "clientes.csv", catalog()) is None
+
+
+def test_arrow_csv_matches_read_csv():
+    source = csv_file(delimiter=";")
+
+    df = read_selected_columns(source, "clientes.txt", catalog(), engine="arrow")
+
+    expected = pd.read_csv(csv_file(delimiter=";"), sep=";")[COLUMNS]
+    pd.testing.assert_frame_equal(df, expected)
+
+
+@pytest.mark.usefixtures("sheet_parser")
+def test_arrow_xlsx_matches_read_excel(monkeypatch: pytest.MonkeyPatch):
+    # Bloques de una fila: los tipos de cada bloque se unen al concatenar
+    monkeypatch.setattr(readers, "XLSX_BATCH_ROWS", 1)
+    rows = [*ROWS, ["A-5", "", 14, 7, "", False]]
+
+    df = read_selected_columns(xlsx_file(rows), "clientes.xlsx", catalog(), "arrow")
+
+    pd.testing.assert_frame_equal(df, pd.read_excel(xlsx_file(rows))[COLUMNS])
+
+
+def test_arrow_xlsx_mixed_column_is_text():
+    rows = [*ROWS, ["A-5", "", "sin folio", 1.0, "", True]]
+
+    df = read_selected_columns(xlsx_file(rows), "clientes.xlsx", catalog(), "arrow")
+
+    assert df is not None
+    assert df["folio"].tolist() == ["10", "11", "12", "13", "sin folio"]
@@ -0,0 +1,127 @@
+import fakeredis
+import pandas as pd
+import pytest
+
+from conciliaciones.utils.redis import redis_batch
+from conciliaciones.utils.redis.frame_cache import version_key
+from conciliaciones.utils.redis.redis_storage import RedisStorage
+
+
+@pytest.fixture
+def client(redis_server: fakeredis.FakeServer) -> fakeredis.FakeStrictRedis:
+    return fakeredis.FakeStrictRedis(server=redis_server)
+
+
+def test_sets_are_sent_on_exit_in_one_round_trip(
+    storage: RedisStorage, client: fakeredis.FakeStrictRedis
+):
+    with storage.batch() as batch:
+        storage.set("headers", ["uuid", "folio"])
+        # Otra instancia del mismo servidor se suma al lote
+        RedisStorage(storage._target).set("bandera", True)
+
+        assert client.exists("headers", "bandera") == 0
+        assert storage.get("headers", object_type=list) == ["uuid", "folio"]
+        assert batch.round_trips == 0
+
+    assert batch.round_trips == 1
+    assert storage.get("headers", object_type=list) == ["uuid", "folio"]
+    assert storage.get("bandera", object_type=bool) is True
+
+
+def test_batch_flushes_at_max_bytes(
+    storage: RedisStorage, client: fakeredis.FakeStrictRedis
+):
+    with storage.batch(max_bytes=1) as batch:
+        storage.set("first", 1)
+        assert client.exists("first") == 1
+        storage.set("second", 2)
+
+    assert batch.round_trips == len(["first", "second"])
+
+
+def test_large_values_keep_write_order(
+    storage: RedisStorage,
+    client: fakeredis.FakeStrictRedis,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    monkeypatch.setattr(redis_batch, "BATCH_VALUE_MAX_BYTES", 16)
+
+    with storage.batch():
+        storage.set("reporte", "valor pequeño")
+        storage.set("reporte", "x" * 1_000)
+
+        # Lo encolado se envió antes de la escritura directa
+        assert storage.get("reporte", object_type=str) == "x" * 1_000
+
+    assert storage.get("reporte", object_type=str) == "x" * 1_000
+    assert client.exists("reporte") == 1
+
+
+def test_delete_of_queued_key_flushes_first(
+    storage: RedisStorage, client: fakeredis.FakeStrictRedis
+):
+    with storage.batch():
+        storage.set("bandera", True)
+        storage.delete("bandera")
+
+    # La escritura encolada no revive la clave al cerrar el lote
+    assert client.exists("bandera") == 0
+
+
+def test_frame_write_over_queued_key_flushes_first(storage: RedisStorage):
+    df = pd.DataFrame({"a": [1, 2]})
+
+    with storage.batch():
+        storage.set("frame", {"pendiente": True})
+        storage.set_df("frame", df)
+
+    stored = storage.get_df("frame", normalize=False)
+    assert stored is not None
+    pd.testing.assert_frame_equal(stored, df)
+
+
+def test_queued_set_replaces_a_versioned_frame(
+    storage: RedisStorage, client: fakeredis.FakeStrictRedis
+):
+    storage.set_df("frame", pd.DataFrame({"a": [1]}))
+
+    with storage.batch():
+        storage.set("frame", {"filas": 0})
+
+    assert client.exists(version_key("frame")) == 0
+    assert storage.get("frame", object_type=dict) == {"filas": 0}
+
+
+def test_prefetch_reads_keys_in_one_round_trip(
+    storage: RedisStorage, monkeypatch: pytest.MonkeyPatch
+):
+    storage.set("headers_erp", ["uuid"])
+    storage.set("headers_sat", ["folio"])
+
+    with storage.batch() as batch:
+        batch.prefetch("headers_erp", "headers_sat", "sin_valor")
+        monkeypatch.setattr(storage._client, "get", pytest.fail)
+
+        assert storage.get("headers_erp", object_type=list) == ["uuid"]
+        assert storage.get("headers_sat", object_type=list) == ["folio"]
+        assert storage.get("sin_valor", object_type=list) is None
+        assert batch.round_trips == 1
+
+
+def test_batch_is_sent_when_the_block_fails(
+    storage: RedisStorage, client: fakeredis.FakeStrictRedis
+):
+    with pytest.raises(RuntimeError), storage.batch():
+        storage.set("excepcion", "detalle del error")
+        raise RuntimeError
+
+    assert client.exists("excepcion") == 1
+
+
+def test_nested_batch_reuses_the_open_one(storage: RedisStorage):
+    with storage.batch() as outer, storage.batch() as inner:
+        storage.set("bandera", True)
+
+    assert inner is outer
+    assert outer.round_trips == 1
@@ -0,0 +1,271 @@
+import os
+import uuid
+from collections import OrderedDict
+
+import fakeredis
+import pandas as pd
+import pytest
+from k_link.extensions.conciliation_type import ConciliationType
+from redis.crc import key_slot
+
+from conciliaciones.utils.redis import redis_keys as redis_keys_module
+from conciliaciones.utils.redis.async_redis_storage import AsyncRedisStorage
+from conciliaciones.utils.redis.frame_cache import FrameCache, version_key
+from conciliaciones.utils.redis.frame_shards import shard_key
+from conciliaciones.utils.redis.redis_keys import (
+    CLUSTER_KEY_PREFIX,
+    KEY_LAYOUT_LEGACY,
+    KEY_TTL_FACTORS,
+    Keys,
+    RedisKeys,
+    key_layout,
+    legacy_key,
+)
+from conciliaciones.utils.redis.redis_storage import RedisStorage
+from conciliaciones.utils.redis.run_collector import RedisRunCollector
+
+RUN_TTL_SECONDS: int = 600
+
+# Redis Cluster real para la prueba de varias instancias (se omite sin él)
+CLUSTER_URL: str | None = os.environ.get("REDIS_CLUSTER_TEST_URL")
+
+
+@pytest.fixture
+def redis_keys() -> RedisKeys:
+    return RedisKeys(
+        "run_1", "5f0000000000000000000000", 1, 2024, ConciliationType.MONTHLY
+    )
+
+
+def test_ttl_follows_key_family(redis_env: dict[str, str], redis_keys: RedisKeys):
+    redis_env["REDIS_RUN_TTL_SECONDS"] = str(RUN_TTL_SECONDS)
+
+    assert RedisKeys.ttl_for_key(redis_keys.get_erp_redis_key()) == RUN_TTL_SECONDS
+    assert (
+        RedisKeys.ttl_for_key(redis_keys.get_metrics_redis_key())
+        == RUN_TTL_SECONDS * KEY_TTL_FACTORS[Keys.METRICS]
+    )
+    # "sat_erp" no se confunde con la familia "sat"
+    assert RedisKeys.key_family(redis_keys.get_sat_erp_redis_key()) == Keys.SAT_ERP
+    assert RedisKeys.ttl_for_key("sin_familia") == RUN_TTL_SECONDS
+
+
+def test_zero_ttl_disables_expiration(redis_env: dict[str, str], redis_keys: RedisKeys):
+    redis_env["REDIS_RUN_TTL_SECONDS"] = "0"
+
+    assert RedisKeys.ttl_for_key(redis_keys.get_erp_redis_key()) is None
+
+
+def test_frames_expire_with_their_version(
+    redis_env: dict[str, str],
+    redis_keys: RedisKeys,
+    storage: RedisStorage,
+    redis_server: fakeredis.FakeServer,
+):
+    redis_env["REDIS_RUN_TTL_SECONDS"] = str(RUN_TTL_SECONDS)
+    erp_key = redis_keys.get_erp_redis_key()
+
+    storage.set_df(erp_key, pd.DataFrame({"a": [1]}))
+
+    client = fakeredis.FakeStrictRedis(server=redis_server)
+    assert 0 < client.ttl(erp_key) <= RUN_TTL_SECONDS
+    assert 0 < client.ttl(version_key(erp_key)) <= RUN_TTL_SECONDS
+
+
+def test_collector_keeps_retained_families(
+    redis_keys: RedisKeys, storage: RedisStorage
+):
+    storage.set_df(redis_keys.get_erp_redis_key(), pd.DataFrame({"a": [1]}))
+    storage.set_df(
+        redis_keys.get_sat_erp_redis_key(),
+        pd.DataFrame({"a": [1]}),
+        column_group_size=1,
+        catalog_key=redis_keys.get_frame_catalog_key(),
+    )
+    storage.set(redis_keys.get_metrics_redis_key(), {"filas": 1})
+    storage.set("otra_corrida", 1)
+
+    unlinked = RedisRunCollector(redis_keys, storage).collect()
+
+    assert unlinked > 0
+    assert sorted(storage.keys) == sorted(
+        [
+            redis_keys.get_metrics_redis_key(),
+            redis_keys.get_frame_catalog_key(),
+            "otra_corrida",
+        ]
+    )
+
+
+def test_memory_report_groups_by_family(
+    redis_keys: RedisKeys,
+    storage: RedisStorage,
+    redis_server: fakeredis.FakeServer,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    # fakeredis no implementa MEMORY USAGE: se aproxima con STRLEN
+    client = fakeredis.FakeStrictRedis(server=redis_server)
+    monkeypatch.setattr(
+        storage, "memory_usage", lambda keys: {key: client.strlen(key) for key in keys}
+    )
+    storage.set_df(redis_keys.get_erp_redis_key(), pd.DataFrame({"a": range(1_000)}))
+    storage.set(redis_keys.get_metrics_redis_key(), {"filas": 1})
+    storage.set("otra_corrida", 1)
+
+    report = RedisRunCollector(redis_keys, storage).memory_report()
+
+    families = {entry.family: entry for entry in report.families}
+    assert report.base_key == redis_keys.base_key
+    assert set(families) == {Keys.ERP.value, Keys.METRICS.value}
+    # La clave del frame y su estampa de versión
+    assert families[Keys.ERP.value].keys == len(["frame", "version"])
+    assert report.families[0].family == Keys.ERP.value
+    assert report.total_bytes == sum(entry.bytes for entry in report.families)
+
+
+def test_default_layout_is_legacy(redis_env: dict[str, str], redis_keys: RedisKeys):
+    assert key_layout() == KEY_LAYOUT_LEGACY
+
+    erp_key = redis_keys.get_erp_redis_key()
+
+    assert not erp_key.startswith(f"{CLUSTER_KEY_PREFIX}:")
+    assert erp_key.endswith(redis_keys.base_key)
+
+
+def test_cluster_layout_shares_slot(redis_env: dict[str, str], redis_keys: RedisKeys):
+    redis_env["REDIS_KEY_LAYOUT"] = "2"
+
+    erp_key = redis_keys.get_erp_redis_key()
+    run_keys = [
+        erp_key,
+        version_key(erp_key),
+        shard_key(erp_key, 3),
+        redis_keys.get_frame_catalog_key(),
+    ]
+
+    assert erp_key.startswith(f"{CLUSTER_KEY_PREFIX}:{redis_keys.run_tag}:")
+    assert redis_keys.base_key not in erp_key
+    assert len({key_slot(key.encode("utf-8")) for key in run_keys}) == 1
+
+
+def test_layouts_do_not_fall_back_by_default(
+    redis_env: dict[str, str], redis_keys: RedisKeys, storage: RedisStorage
+):
+    storage.set_df(redis_keys.get_erp_redis_key(), pd.DataFrame({"a": [1]}))
+
+    redis_env["REDIS_KEY_LAYOUT"] = "2"
+
+    assert storage.get_df(redis_keys.get_erp_redis_key()) is None
+    assert legacy_key(redis_keys.get_erp_redis_key()) is None
+
+
+def test_legacy_fallback_reads_and_deletes_layout_1(
+    redis_env: dict[str, str], redis_keys: RedisKeys, storage: RedisStorage
+):
+    legacy_erp_key = redis_keys.get_erp_redis_key()
+    storage.set_df(legacy_erp_key, pd.DataFrame({"a": [1]}))
+    storage.set(redis_keys.get_metrics_redis_key(), {"filas": 1})
+
+    redis_env["REDIS_KEY_LAYOUT"] = "2"
+    redis_env["REDIS_KEY_LEGACY_FALLBACK"] = "true"
+    erp_key = redis_keys.get_erp_redis_key()
+
+    df = storage.get_df(erp_key, normalize=False)
+    assert df is not None
+    assert df["a"].tolist() == [1]
+    assert sum(len(batch) for batch in storage.iter_batches(erp_key)) == 1
+    assert storage.get(redis_keys.get_metrics_redis_key(), object_type=dict) == {
+        "filas": 1
+    }
+
+    storage.delete(erp_key)
+    assert legacy_erp_key not in storage.keys
+
+
+@pytest.mark.asyncio
+async def test_async_legacy_fallback(
+    redis_env: dict[str, str],
+    redis_keys: RedisKeys,
+    storage: RedisStorage,
+    async_storage: AsyncRedisStorage,
+):
+    storage.set_df(redis_keys.get_erp_redis_key(), pd.DataFrame({"a": [1]}))
+    redis_env["REDIS_KEY_LAYOUT"] = "2"
+    redis_env["REDIS_KEY_LEGACY_FALLBACK"] = "true"
+
+    df = await async_storage.get_df(redis_keys.get_erp_redis_key(), normalize=False)
+
+    assert df is not None
+    assert df["a"].tolist() == [1]
+
+
+def test_legacy_keys_are_bounded(
+    redis_env: dict[str, str], monkeypatch: pytest.MonkeyPatch
+):
+    monkeypatch.setattr(redis_keys_module, "LEGACY_KEYS_MAX_SIZE", 2)
+    monkeypatch.setattr(redis_keys_module, "_LEGACY_KEYS", OrderedDict())
+    redis_env["REDIS_KEY_LAYOUT"] = "2"
+    redis_env["REDIS_KEY_LEGACY_FALLBACK"] = "true"
+    runs = [
+        RedisKeys(run, "5f0000000000000000000000", 1, 2024, ConciliationType.MONTHLY)
+        for run in ("run_1", "run_2", "run_3")
+    ]
+
+    keys = [run.get_erp_redis_key() for run in runs]
+
+    assert legacy_key(keys[0]) is None
+    assert legacy_key(keys[-1]) == "erp_" + runs[-1].base_key
+    assert len(redis_keys_module._LEGACY_KEYS) == redis_keys_module.LEGACY_KEYS_MAX_SIZE
+
+
+def test_collector_releases_both_layouts(
+    redis_env: dict[str, str], redis_keys: RedisKeys, storage: RedisStorage
+):
+    storage.set_df(redis_keys.get_erp_redis_key(), pd.DataFrame({"a": [1]}))
+    redis_env["REDIS_KEY_LAYOUT"] = "2"
+    storage.set_df(redis_keys.get_erp_redis_key(), pd.DataFrame({"a": [1]}))
+    storage.set("otra_corrida", 1)
+
+    RedisRunCollector(redis_keys, storage).collect()
+
+    assert storage.keys == ["otra_corrida"]
+
+
+@pytest.mark.redis_cluster
+@pytest.mark.skipif(CLUSTER_URL is None, reason="REDIS_CLUSTER_TEST_URL no configurado")
+def test_cluster_layout_across_instances(redis_env: dict[str, str]):
+    redis_env.update({"REDIS_CLUSTER": "true", "REDIS_KEY_LAYOUT": "2"})
+    run = RedisKeys(
+        f"run_{uuid.uuid4().hex}",
+        "5f0000000000000000000000",
+        1,
+        2024,
+        ConciliationType.MONTHLY,
+    )
+    writer, reader = RedisStorage(CLUSTER_URL), RedisStorage(CLUSTER_URL)
+    erp_key = run.get_erp_redis_key()
+    catalog_key = run.get_frame_catalog_key()
+    df = pd.DataFrame({"uuid": ["A", "B"], "total": [1.5, 2.5], "rfc": ["X", "Y"]})
+
+    try:
+        writer.set_df(erp_key, df, column_group_size=1, catalog_key=catalog_key)
+        # Otra instancia (otro worker) no comparte la caché del proceso
+        FrameCache.clear()
+        stored = reader.get_df(erp_key, normalize=False)
+        assert stored is not None
+        pd.testing.assert_frame_equal(stored, df)
+
+        reader.set_columns(
+            erp_key, pd.DataFrame({"total": [3.0, 4.0]}), catalog_key=catalog_key
+        )
+        FrameCache.clear()
+        updated = writer.get_df(erp_key, columns=["total"], normalize=False)
+        assert updated is not None
+        assert updated["total"].tolist() == [3.0, 4.0]
+        entry = writer.get_frame_entry(catalog_key, erp_key)
+        assert entry is not None
+        assert entry.column_names == ["uuid", "total", "rfc"]
+    finally:
+        RedisRunCollector(run, reader).collect()
+        reader._client.delete(catalog_key)
+        FrameCache.clear()
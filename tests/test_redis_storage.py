@@ -0,0 +1,297 @@
+import math
+from decimal import Decimal
+
+import fakeredis
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from conciliaciones.utils.redis.async_redis_storage import AsyncRedisStorage
+from conciliaciones.utils.redis.frame_codec import encode_header
+from conciliaciones.utils.redis.frame_writes import manifest_shard_keys
+from conciliaciones.utils.redis.redis_storage import RedisStorage
+
+
+def typed_frame() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "uuid": ["A-1", "A-2", "A-3"],
+            "fecha": pd.to_datetime(["2024-01-31", "2024-02-29", None]),
+            "total": [1.5, None, 3.25],
+            "pagado": [True, False, True],
+            "folio": pd.array([10, None, 30], dtype="Int64"),
+            "estatus": pd.Categorical(["vigente", "cancelado", "vigente"]),
+            "importe": [Decimal("1.10"), Decimal("2.20"), None],
+        }
+    )
+
+
+@pytest.mark.parametrize("column_group_size", [None, 2])
+def test_set_df_preserves_dtypes(storage: RedisStorage, column_group_size: int | None):
+    df = typed_frame()
+
+    storage.set_df("frame", df, column_group_size=column_group_size)
+
+    stored = storage.get_df("frame", normalize=False)
+    assert stored is not None
+    pd.testing.assert_frame_equal(stored, df)
+
+
+def test_normalized_read_keeps_typed_columns(storage: RedisStorage):
+    storage.set_df("frame", typed_frame())
+
+    df = storage.get_df("frame")
+
+    assert df is not None
+    assert str(df["fecha"].dtype) == "datetime64[ns]"
+    assert str(df["pagado"].dtype) == "bool"
+    assert str(df["estatus"].dtype) == "category"
+    assert df["importe"].tolist()[:2] == [Decimal("1.10"), Decimal("2.20")]
+
+
+def test_mixed_object_column_is_stored_as_normalized_text(storage: RedisStorage):
+    df = pd.DataFrame({"referencia": [1, "nan", "B-2"]})
+
+    storage.set_df("frame", df)
+
+    stored = storage.get_df("frame")
+    assert stored is not None
+    assert stored["referencia"].tolist() == ["1", None, "B-2"]
+    # El DataFrame del llamador no se modifica
+    assert df["referencia"].tolist() == [1, "nan", "B-2"]
+
+
+def shard_keys_in_redis(server: fakeredis.FakeServer, key: str) -> list[str]:
+    client = fakeredis.FakeStrictRedis(server=server)
+    return sorted(
+        shard.decode("utf-8") for shard in client.scan_iter(match=f"{key}:shard:*")
+    )
+
+
+def listed_shard_keys(server: fakeredis.FakeServer, key: str) -> list[str]:
+    client = fakeredis.FakeStrictRedis(server=server)
+    return sorted(manifest_shard_keys(client.get(key)))
+
+
+def test_get_df_projects_sharded_columns(
+    storage: RedisStorage, redis_server: fakeredis.FakeServer
+):
+    storage.set_df("frame", typed_frame(), column_group_size=3)
+    # 7 columnas en grupos de 3
+    assert len(shard_keys_in_redis(redis_server, "frame")) == math.ceil(7 / 3)
+
+    df = storage.get_df("frame", columns=["total", "uuid", "inexistente"])
+
+    assert df is not None
+    assert list(df.columns) == ["total", "uuid"]
+    assert df["uuid"].tolist() == ["A-1", "A-2", "A-3"]
+
+
+def test_get_df_missing_key(storage: RedisStorage):
+    assert storage.get_df("missing") is None
+
+
+def test_delete_removes_shards(
+    storage: RedisStorage, redis_server: fakeredis.FakeServer
+):
+    storage.set_df("frame", typed_frame(), column_group_size=1)
+
+    storage.delete("frame")
+
+    assert storage.get_df("frame") is None
+    assert shard_keys_in_redis(redis_server, "frame") == []
+    assert storage.keys == []
+
+
+def test_large_frame_is_split_into_row_chunks(
+    storage: RedisStorage, redis_server: fakeredis.FakeServer
+):
+    df = pd.DataFrame(
+        {"folio": range(10_000), "uuid": [f"U-{i}" for i in range(10_000)]}
+    )
+
+    storage.set_df("frame", df, chunk_size_bytes=32 * 1024)
+
+    assert len(shard_keys_in_redis(redis_server, "frame")) > 1
+    batches = list(storage.iter_batches("frame", columns=["folio"]))
+    assert sum(batch.num_rows for batch in batches) == len(df)
+    assert all(batch.schema.names == ["folio"] for batch in batches)
+    stored = storage.get_df("frame", normalize=False)
+    assert stored is not None
+    pd.testing.assert_frame_equal(stored, df)
+
+
+@pytest.mark.asyncio
+async def test_async_storage_shares_frames_with_sync_storage(
+    async_storage: AsyncRedisStorage, storage: RedisStorage
+):
+    await async_storage.set_df("frame", typed_frame(), column_group_size=2)
+    await async_storage.set("meta", {"filas": 3})
+
+    df = await async_storage.get_df("frame", columns=["uuid", "folio"])
+    assert df is not None
+    assert df["uuid"].tolist() == ["A-1", "A-2", "A-3"]
+    assert await async_storage.get("meta", object_type=dict) == {"filas": 3}
+    batches = [batch async for batch in async_storage.iter_batches("frame")]
+    assert sum(batch.num_rows for batch in batches) == len(typed_frame())
+
+    # El storage síncrono lee lo que escribió el asíncrono
+    sync_df = storage.get_df("frame", normalize=False)
+    assert sync_df is not None
+    pd.testing.assert_frame_equal(sync_df, typed_frame())
+
+    await async_storage.delete("frame")
+    assert await async_storage.get_df("frame") is None
+    assert storage.keys == ["meta"]
+
+
+def catalog_frame() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "uuid": ["A-1", "A-2", "A-3"],
+            "folio": [10, 20, 30],
+            "total": [1.5, None, 3.25],
+        }
+    )
+
+
+def stored_bytes(server: fakeredis.FakeServer, key: str) -> int:
+    """Tamaño vigente del frame: manifiesto (o payload) y shards listados"""
+    client = fakeredis.FakeStrictRedis(server=server)
+    keys = [key, *manifest_shard_keys(client.get(key))]
+    return sum(client.strlen(part) for part in keys)
+
+
+def test_set_columns_replaces_and_appends(
+    storage: RedisStorage, redis_server: fakeredis.FakeServer
+):
+    storage.set_df("frame", catalog_frame(), column_group_size=1)
+    shards_before = shard_keys_in_redis(redis_server, "frame")
+
+    storage.set_columns(
+        "frame", pd.DataFrame({"folio": [7, 8, 9], "estado": ["p", "q", "r"]})
+    )
+
+    df = storage.get_df("frame")
+    assert df is not None
+    assert list(df.columns) == ["uuid", "folio", "total", "estado"]
+    assert df["folio"].tolist() == [7, 8, 9]
+    assert df["estado"].tolist() == ["p", "q", "r"]
+
+    # El shard que solo tenía la columna reemplazada se elimina y ningún shard
+    # queda fuera del manifiesto
+    shards_after = shard_keys_in_redis(redis_server, "frame")
+    assert shards_after == listed_shard_keys(redis_server, "frame")
+    assert len(shards_after) == len(shards_before)
+    assert set(shards_before) - set(shards_after)
+
+
+def test_set_columns_replacing_every_column(
+    storage: RedisStorage, redis_server: fakeredis.FakeServer
+):
+    storage.set_df("frame", pd.DataFrame({"folio": [1, 2]}))
+
+    storage.set_columns("frame", pd.DataFrame({"folio": [3, 4]}))
+    storage.set_columns("frame", pd.DataFrame({"folio": [5, 6]}))
+
+    df = storage.get_df("frame")
+    assert df is not None
+    assert df["folio"].tolist() == [5, 6]
+    assert len(shard_keys_in_redis(redis_server, "frame")) == 1
+    assert shard_keys_in_redis(redis_server, "frame") == listed_shard_keys(
+        redis_server, "frame"
+    )
+
+
+def test_set_columns_reads_only_the_schema_of_unsharded_frames(
+    storage: RedisStorage, monkeypatch: pytest.MonkeyPatch
+):
+    storage.set_df("frame", catalog_frame())
+
+    def fail_download(*args, **kwargs):
+        raise AssertionError("set_columns descargó el payload completo")
+
+    monkeypatch.setattr(storage, "get_table", fail_download)
+    monkeypatch.setattr(storage, "_get_table", fail_download)
+    storage.set_columns("frame", pd.DataFrame({"estado": ["p", "q", "r"]}))
+    monkeypatch.undo()
+
+    df = storage.get_df("frame", normalize=False)
+    assert df is not None
+    assert list(df.columns) == ["uuid", "folio", "total", "estado"]
+
+
+def test_set_columns_on_frame_without_row_count(
+    storage: RedisStorage, redis_server: fakeredis.FakeServer
+):
+    # Frame escrito antes de registrar su número de filas en el esquema
+    table = pa.Table.from_pandas(catalog_frame(), preserve_index=False)
+    sink = pa.BufferOutputStream()
+    sink.write(encode_header(0))
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    client = fakeredis.FakeStrictRedis(server=redis_server)
+    client.set("frame", sink.getvalue().to_pybytes())
+
+    storage.set_columns("frame", pd.DataFrame({"folio": [7, 8, 9]}))
+
+    df = storage.get_df("frame", normalize=False)
+    assert df is not None
+    assert df["folio"].tolist() == [7, 8, 9]
+
+
+@pytest.mark.parametrize("column_group_size", [None, 1])
+def test_set_columns_catalog_counts_live_bytes(
+    storage: RedisStorage,
+    redis_server: fakeredis.FakeServer,
+    column_group_size: int | None,
+):
+    storage.set_df(
+        "frame",
+        catalog_frame(),
+        column_group_size=column_group_size,
+        catalog_key="catalogo",
+    )
+
+    for folio in ([7, 8, 9], [4, 5, 6]):
+        storage.set_columns(
+            "frame", pd.DataFrame({"folio": folio}), catalog_key="catalogo"
+        )
+
+    entry = storage.get_frame_entry("catalogo", "frame")
+    table = storage.get_table("frame")
+    assert entry is not None
+    assert table is not None
+    # Los shards reemplazados ya no cuentan
+    assert entry.payload_bytes == stored_bytes(redis_server, "frame")
+    assert entry.memory_bytes == table.nbytes
+    assert entry.num_rows == table.num_rows
+
+
+@pytest.mark.asyncio
+async def test_async_set_columns_matches_sync_storage(
+    async_storage: AsyncRedisStorage,
+    storage: RedisStorage,
+    redis_server: fakeredis.FakeServer,
+):
+    await async_storage.set_df("frame", catalog_frame(), catalog_key="catalogo")
+    await async_storage.set_columns(
+        "frame", pd.DataFrame({"uuid": ["x", "y", "z"]}), catalog_key="catalogo"
+    )
+
+    df = await async_storage.get_df("frame")
+
+    assert df is not None
+    assert df["uuid"].tolist() == ["x", "y", "z"]
+    assert df["folio"].tolist() == [10, 20, 30]
+    assert shard_keys_in_redis(redis_server, "frame") == listed_shard_keys(
+        redis_server, "frame"
+    )
+    entry = await async_storage.get_frame_entry("catalogo", "frame")
+    assert entry is not None
+    assert entry.payload_bytes == stored_bytes(redis_server, "frame")
+
+    # El storage síncrono lee lo que escribió el asíncrono
+    sync_df = storage.get_df("frame")
+    assert sync_df is not None
+    pd.testing.assert_frame_equal(df, sync_df)
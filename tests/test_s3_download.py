@@ -0,0 +1,107 @@
+import hashlib
+import tempfile
+
+import httpx
+import pytest
+
+from conciliaciones.clients.erp.erp_data import s3_download
+from conciliaciones.clients.erp.erp_data.s3_download import (
+    download_to_spool,
+    probe_object,
+)
+
+URL: str = "https://s3.test/catalogo.xlsx"
+
+CONTENT: bytes = b"uuid,folio\n" + b"A-1,10\n" * 1_000
+
+
+def md5(content: bytes) -> str:
+    return hashlib.md5(content, usedforsecurity=False).hexdigest()
+
+
+def client_for(
+    content: bytes, etag: str | None = None, status_code: int = 200
+) -> httpx.AsyncClient:
+    def handler(request: httpx.Request) -> httpx.Response:
+        headers = {"ETag": f'"{etag}"'} if etag is not None else {}
+        if request.headers.get("Range") == "bytes=0-0":
+            headers["Content-Range"] = f"bytes 0-0/{len(content)}"
+            return httpx.Response(206, headers=headers, content=content[:1])
+        return httpx.Response(status_code, headers=headers, content=content)
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+@pytest.fixture
+def spool_env(monkeypatch: pytest.MonkeyPatch) -> dict[str, str]:
+    values: dict[str, str] = {}
+    monkeypatch.setattr(s3_download, "env", values)
+    return values
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("spool_env")
+async def test_download_matches_single_part_etag():
+    async with client_for(CONTENT, etag=md5(CONTENT)) as client:
+        with await download_to_spool(client, URL) as download:
+            assert download.read_bytes() == CONTENT
+            assert download.size == len(CONTENT)
+            assert download.md5 == md5(CONTENT)
+            assert download.in_memory
+
+
+@pytest.mark.asyncio
+async def test_large_download_spills_to_disk(spool_env: dict[str, str], tmp_path):
+    spool_env["ERP_DOWNLOAD_SPOOL_DIR"] = str(tmp_path)
+
+    async with client_for(CONTENT) as client:
+        with await download_to_spool(client, URL, max_bytes=1_024) as download:
+            assert not download.in_memory
+            assert download.read_bytes() == CONTENT
+            # Una segunda lectura empieza otra vez desde el inicio
+            assert download.handle.read(4) == CONTENT[:4]
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("spool_env")
+async def test_checksum_mismatch_closes_the_spool(monkeypatch: pytest.MonkeyPatch):
+    spools: list[tempfile.SpooledTemporaryFile] = []
+    spooled_file = tempfile.SpooledTemporaryFile
+
+    def recording_spool(*args, **kwargs) -> tempfile.SpooledTemporaryFile:
+        spool = spooled_file(*args, **kwargs)
+        spools.append(spool)
+        return spool
+
+    monkeypatch.setattr(tempfile, "SpooledTemporaryFile", recording_spool)
+
+    async with client_for(CONTENT, etag=md5(b"otro contenido")) as client:
+        with pytest.raises(ValueError, match="checksum"):
+            await download_to_spool(client, URL)
+
+    assert [spool.closed for spool in spools] == [True]
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("spool_env")
+async def test_multipart_etag_is_not_verified():
+    async with client_for(CONTENT, etag=f"{md5(b'partes')}-2") as client:
+        with await download_to_spool(client, URL) as download:
+            assert download.read_bytes() == CONTENT
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("spool_env")
+async def test_http_error_is_raised():
+    async with client_for(b"", status_code=403) as client:
+        with pytest.raises(httpx.HTTPStatusError):
+            await download_to_spool(client, URL)
+
+
+@pytest.mark.asyncio
+async def test_probe_reads_etag_and_size_from_one_byte():
+    async with client_for(CONTENT, etag=md5(CONTENT)) as client:
+        etag, size = await probe_object(client, URL)
+
+    assert etag == f'"{md5(CONTENT)}"'
+    assert size == len(CONTENT)